@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Pelix and iPOPO benchmarks
+
+Each module of this package can be run with ``python -m benchmarks.<name>``
+
+:author: Thomas Calmant
+"""
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Compares the request rate of the basic and asyncio-based HTTP services, with
+clients using persistent connections, while other connections stay idle.
+
+Usage: python -m benchmarks.http_load [-c CLIENTS] [-n REQUESTS] [-i IDLE]
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import argparse
+import socket
+import sys
+import threading
+import time
+
+try:
+    # Python 3
+    import http.client as httplib
+except ImportError:
+    # Python 2
+    import httplib
+
+# Pelix
+from pelix.ipopo.constants import use_ipopo
+import pelix.framework
+import pelix.http as http
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+HOST = "127.0.0.1"
+
+# ------------------------------------------------------------------------------
+
+
+class _Servlet(object):
+    """
+    Servlet sending a small response
+    """
+
+    def do_GET(self, _, response):
+        """
+        Handles a GET request
+        """
+        response.send_content(200, "Hello, World!", "text/plain")
+
+
+def _client(port, requests, results):
+    """
+    Sends requests on a persistent connection
+
+    :param port: Server port
+    :param requests: Number of requests to send
+    :param results: List where to store the number of failed requests
+    """
+    errors = 0
+    conn = httplib.HTTPConnection(HOST, port, timeout=30)
+    for _ in range(requests):
+        try:
+            conn.request("GET", "/bench")
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+                conn.close()
+        except (IOError, httplib.HTTPException):
+            errors += 1
+            conn.close()
+
+    conn.close()
+    results.append(errors)
+
+
+def run(factory, clients, requests, idle):
+    """
+    Measures the request rate of an HTTP service
+
+    :param factory: HTTP service factory
+    :param clients: Number of concurrent clients
+    :param requests: Number of requests per client
+    :param idle: Number of idle connections
+    :return: The request rate (per second) and the number of failed requests
+    """
+    framework = pelix.framework.create_framework(
+        ["pelix.ipopo.core", "pelix.http.basic", "pelix.http.async_server"]
+    )
+    framework.start()
+    context = framework.get_bundle_context()
+    idle_sockets = []
+    try:
+        with use_ipopo(context) as ipopo:
+            http_svc = ipopo.instantiate(
+                factory,
+                "benchmark-http",
+                {
+                    http.HTTP_SERVICE_ADDRESS: HOST,
+                    http.HTTP_SERVICE_PORT: 0,
+                    http.HTTP_SERVICE_KEEP_ALIVE_TIMEOUT: 60,
+                    "pelix.http.request_queue_size": 1024,
+                },
+            )
+
+        http_svc.register_servlet("/bench", _Servlet())
+        port = http_svc.get_access()[1]
+
+        # Connections which never send a request
+        for _ in range(idle):
+            idle_sockets.append(socket.create_connection((HOST, port)))
+
+        results = []
+        threads = [
+            threading.Thread(target=_client, args=(port, requests, results))
+            for _ in range(clients)
+        ]
+
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.time() - start
+    finally:
+        for sock in idle_sockets:
+            sock.close()
+
+        framework.stop()
+        pelix.framework.FrameworkFactory.delete_framework()
+
+    return (clients * requests) / duration, sum(results)
+
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "-c", "--clients", type=int, default=8, help="Concurrent clients"
+    )
+    parser.add_argument(
+        "-n", "--requests", type=int, default=500, help="Requests per client"
+    )
+    parser.add_argument(
+        "-i", "--idle", type=int, default=0, help="Idle connections"
+    )
+    args = parser.parse_args(argv)
+
+    for name, factory in (
+        ("basic", http.FACTORY_HTTP_BASIC),
+        ("async", http.FACTORY_HTTP_ASYNC),
+    ):
+        rate, errors = run(factory, args.clients, args.requests, args.idle)
+        print(
+            "{0}: {1:.0f} requests/s ({2} errors)".format(name, rate, errors)
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
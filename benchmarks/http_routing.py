@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Measures the dispatch rate of a REST dispatcher with many routes
+
+Usage: python -m benchmarks.http_routing [-r ROUTES] [-n REQUESTS]
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import argparse
+import sys
+import time
+
+# Pelix
+import pelix.http.routing as routing
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# ------------------------------------------------------------------------------
+
+
+class _Request(object):
+    """
+    Minimal servlet request
+    """
+
+    def __init__(self, command, sub_path):
+        """
+        :param command: HTTP verb
+        :param sub_path: Request sub-path
+        """
+        self.command = command
+        self.sub_path = sub_path
+
+    def get_command(self):
+        """
+        Returns the HTTP verb
+        """
+        return self.command
+
+    def get_sub_path(self):
+        """
+        Returns the request sub-path
+        """
+        return self.sub_path
+
+
+class _Response(object):
+    """
+    Minimal servlet response, keeping the last status code
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self.code = None
+
+    def send_content(self, http_code, *_):
+        """
+        Keeps the status code of the response
+        """
+        self.code = http_code
+
+
+def _make_method(idx):
+    """
+    Prepares a REST method handling two routes, with and without arguments
+
+    :param idx: Index of the resource
+    :return: The decorated method
+    """
+
+    @routing.HttpGet("/api/resource-{0}/<item:int>/<field>".format(idx))
+    @routing.HttpGet("/api/resource-{0}".format(idx))
+    def method(self, request, response, item=None, field=None):
+        """
+        Handles a request
+        """
+        response.send_content(200, "OK")
+
+    return method
+
+
+def make_servlet(routes):
+    """
+    Creates a REST dispatcher with the given number of routes
+
+    :param routes: Number of routes
+    :return: The servlet class
+    """
+    members = {
+        "handle_{0}".format(idx): _make_method(idx)
+        for idx in range(routes // 2)
+    }
+    return type("BenchmarkServlet", (routing.RestDispatcher,), members)
+
+
+def run(routes, requests):
+    """
+    Dispatches *requests* requests to a servlet handling *routes* routes
+
+    :param routes: Number of routes
+    :param requests: Number of requests
+    :return: The setup time (milliseconds) and dispatch rate (per second)
+    """
+    servlet_class = make_servlet(routes)
+    start = time.time()
+    servlet = servlet_class()
+    setup_time = 1000.0 * (time.time() - start)
+
+    # Requests with and without arguments, to every route
+    paths = []
+    for idx in range(routes // 2):
+        paths.append("/api/resource-{0}".format(idx))
+        paths.append("/api/resource-{0}/{1}/name".format(idx, idx * 10))
+    requests_beans = [_Request("GET", path) for path in paths]
+
+    response = _Response()
+    nb_paths = len(requests_beans)
+    dispatch = servlet.do_GET
+    start = time.time()
+    for idx in range(requests):
+        dispatch(requests_beans[idx % nb_paths], response)
+        if response.code != 200:
+            raise ValueError("Request not dispatched")
+    dispatch_rate = requests / (time.time() - start)
+
+    return setup_time, dispatch_rate
+
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "-r", "--routes", type=int, default=200, help="Number of routes"
+    )
+    parser.add_argument(
+        "-n",
+        "--requests",
+        type=int,
+        default=20000,
+        help="Number of dispatched requests",
+    )
+    args = parser.parse_args(argv)
+
+    setup_time, dispatch_rate = run(args.routes, args.requests)
+    print("setup:    {0:.1f} ms".format(setup_time))
+    print("dispatch: {0:.0f} requests/s".format(dispatch_rate))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Measures the servlet path resolution rate of the basic HTTP service with many
+registered servlets
+
+Usage: python -m benchmarks.http_servlets [-n COUNT] [-l LOOKUPS] [-t THREADS]
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import argparse
+import sys
+import threading
+import time
+
+# Pelix
+from pelix.ipopo.constants import use_ipopo
+import pelix.framework
+import pelix.http as http
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# ------------------------------------------------------------------------------
+
+
+def _make_paths(count):
+    """
+    Prepares the servlet paths, looking like the ones of exported services
+
+    :param count: Number of paths
+    :return: The list of servlet paths
+    """
+    return [
+        "/api/service-{0}/v{1}".format(idx // 10, idx % 10)
+        for idx in range(count)
+    ]
+
+
+def _resolve(http_svc, paths, lookups):
+    """
+    Resolves request paths
+
+    :param http_svc: The HTTP service
+    :param paths: Request paths
+    :param lookups: Number of resolutions
+    """
+    nb_paths = len(paths)
+    get_servlet = http_svc.get_servlet
+    for idx in range(lookups):
+        if get_servlet(paths[idx % nb_paths]) is None:
+            raise ValueError("No servlet found")
+
+
+def run(count, lookups, threads):
+    """
+    Registers *count* servlets, then resolves *lookups* request paths in each
+    of the *threads* threads
+
+    :param count: Number of servlets
+    :param lookups: Number of resolutions per thread
+    :param threads: Number of threads
+    :return: The registration rate and resolution rate (per second)
+    """
+    framework = pelix.framework.create_framework(
+        ["pelix.ipopo.core", "pelix.http.basic"]
+    )
+    framework.start()
+    context = framework.get_bundle_context()
+    try:
+        with use_ipopo(context) as ipopo:
+            http_svc = ipopo.instantiate(
+                http.FACTORY_HTTP_BASIC,
+                "benchmark-http",
+                {
+                    http.HTTP_SERVICE_ADDRESS: "127.0.0.1",
+                    http.HTTP_SERVICE_PORT: 0,
+                },
+            )
+
+        paths = _make_paths(count)
+        start = time.time()
+        for path in paths:
+            http_svc.register_servlet(path, object())
+        register_rate = count / (time.time() - start)
+
+        # Request paths are deeper than the servlets ones
+        requests = [path + "/method/42" for path in paths]
+
+        workers = [
+            threading.Thread(
+                target=_resolve, args=(http_svc, requests, lookups)
+            )
+            for _ in range(threads)
+        ]
+        start = time.time()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        resolve_rate = (lookups * threads) / (time.time() - start)
+    finally:
+        framework.stop()
+        pelix.framework.FrameworkFactory.delete_framework()
+
+    return register_rate, resolve_rate
+
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "-n", "--servlets", type=int, default=1000, help="Number of servlets"
+    )
+    parser.add_argument(
+        "-l",
+        "--lookups",
+        type=int,
+        default=100000,
+        help="Number of path resolutions per thread",
+    )
+    parser.add_argument(
+        "-t", "--threads", type=int, default=1, help="Number of threads"
+    )
+    args = parser.parse_args(argv)
+
+    register_rate, resolve_rate = run(args.servlets, args.lookups, args.threads)
+    print("register: {0:.0f} servlets/s".format(register_rate))
+    print("resolve:  {0:.0f} paths/s".format(resolve_rate))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Measures the number of components iPOPO can instantiate and kill per second
+
+Usage: python -m benchmarks.ipopo_instantiate [-n COUNT] [-r ROUNDS]
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import argparse
+import sys
+import time
+
+# Pelix
+from pelix.ipopo.constants import use_ipopo
+from pelix.ipopo.decorators import (
+    ComponentFactory,
+    HiddenProperty,
+    Property,
+    Provides,
+    Requires,
+    Validate,
+)
+import pelix.framework
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+FACTORY = "benchmark-instantiate-factory"
+
+# ------------------------------------------------------------------------------
+
+
+@ComponentFactory(FACTORY)
+@Provides("benchmark.service")
+@Requires("_log", "pelix.log", optional=True)
+@Requires("_listeners", "benchmark.listener", aggregate=True, optional=True)
+@Property("_value", "benchmark.value", 42)
+@Property("_name", "benchmark.name", "component")
+@HiddenProperty("_secret", "benchmark.secret", "secret")
+class BenchmarkComponent(object):
+    """
+    Component with the most common handlers
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self._log = None
+        self._listeners = None
+        self._value = None
+        self._name = None
+        self._secret = None
+
+    @Validate
+    def _validate(self, _):
+        """
+        Component validated
+        """
+        pass
+
+
+# ------------------------------------------------------------------------------
+
+
+def run(count, rounds):
+    """
+    Instantiates and kills *count* components *rounds* times
+
+    :param count: Number of components per round
+    :param rounds: Number of rounds
+    :return: The best instantiation and kill rates (components per second)
+    """
+    framework = pelix.framework.create_framework(["pelix.ipopo.core"])
+    framework.start()
+    context = framework.get_bundle_context()
+
+    best_create = 0.0
+    best_kill = 0.0
+    try:
+        with use_ipopo(context) as ipopo:
+            ipopo.register_factory(context, BenchmarkComponent)
+            names = ["component-{0}".format(idx) for idx in range(count)]
+
+            for _ in range(rounds):
+                start = time.time()
+                for name in names:
+                    ipopo.instantiate(FACTORY, name, {"benchmark.value": 1})
+                best_create = max(best_create, count / (time.time() - start))
+
+                start = time.time()
+                for name in names:
+                    ipopo.kill(name)
+                best_kill = max(best_kill, count / (time.time() - start))
+    finally:
+        framework.stop()
+        pelix.framework.FrameworkFactory.delete_framework()
+
+    return best_create, best_kill
+
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "-n", "--count", type=int, default=2000, help="Components per round"
+    )
+    parser.add_argument(
+        "-r", "--rounds", type=int, default=5, help="Number of rounds"
+    )
+    args = parser.parse_args(argv)
+
+    create_rate, kill_rate = run(args.count, args.rounds)
+    print("instantiate: {0:.0f} components/s".format(create_rate))
+    print("kill:        {0:.0f} components/s".format(kill_rate))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Measures how iPOPO scales with the number of components.
+
+For each scale, a new framework is started and the following measures are
+taken with synthetic components:
+
+* ``instantiate``: instantiation rate (components per second)
+* ``validation``: latency between the instantiation request and the
+  validation of a component (milliseconds)
+* ``churn``: time for N consumers to react to the disappearance and
+  re-appearance of the provider they depend on (milliseconds per cycle)
+* ``fan_out``: time for N consumers to be notified of an update of the
+  properties of their provider (milliseconds per update)
+* ``memory``: memory allocated per instance (bytes, requires tracemalloc)
+* ``shutdown``: time to stop the framework with N instances (milliseconds)
+
+The results are printed (or written) as a JSON document, to be compared
+between revisions.
+
+Usage: python -m benchmarks.ipopo_scalability [-s 10,100,1000] [-o FILE]
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import argparse
+import json
+import platform
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python < 3.4
+    tracemalloc = None
+
+# Pelix
+from pelix.ipopo.constants import use_ipopo
+from pelix.ipopo.decorators import (
+    ComponentFactory,
+    Property,
+    Provides,
+    Requires,
+    Update,
+    Validate,
+)
+import pelix
+import pelix.framework
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+SPEC_PROVIDER = "benchmark.scalability.provider"
+""" Specification of the service the consumers depend on """
+
+FACTORY_SIMPLE = "benchmark-scalability-simple"
+FACTORY_CONSUMER = "benchmark-scalability-consumer"
+
+DEFAULT_SCALES = (10, 100, 1000, 10000)
+""" Default number of components per run """
+
+# ------------------------------------------------------------------------------
+
+
+@ComponentFactory(FACTORY_SIMPLE)
+@Provides("benchmark.scalability.simple")
+@Property("_value", "benchmark.value", 42)
+class SimpleComponent(object):
+    """
+    Component without dependency
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self._value = None
+        self.validated = None
+
+    @Validate
+    def _validate(self, _):
+        """
+        Component validated
+        """
+        self.validated = time.time()
+
+
+@ComponentFactory(FACTORY_CONSUMER)
+@Requires("_provider", SPEC_PROVIDER)
+class ConsumerComponent(object):
+    """
+    Component depending on the provider service
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self._provider = None
+        self.updates = 0
+
+    @Update
+    def _update(self, *_):
+        """
+        Properties of the provider updated
+        """
+        self.updates += 1
+
+
+# ------------------------------------------------------------------------------
+
+
+def _stats(values):
+    """
+    Computes the statistics of a list of durations, in milliseconds
+
+    :param values: Durations in seconds
+    :return: A dictionary
+    """
+    if not values:
+        return {}
+
+    values = sorted(values)
+    count = len(values)
+    return {
+        "mean": 1000.0 * sum(values) / count,
+        "p50": 1000.0 * values[count // 2],
+        "p95": 1000.0 * values[min(count - 1, int(count * 0.95))],
+        "max": 1000.0 * values[-1],
+    }
+
+
+def _measure_simple(ipopo, count, results):
+    """
+    Measures the instantiation rate, validation latency and memory usage of
+    components without dependencies
+
+    :param ipopo: The iPOPO service
+    :param count: Number of components
+    :param results: Dictionary where to store the results
+    """
+    names = ["simple-{0}".format(idx) for idx in range(count)]
+    latencies = []
+
+    start = time.time()
+    for name in names:
+        requested = time.time()
+        component = ipopo.instantiate(FACTORY_SIMPLE, name, {})
+        latencies.append(component.validated - requested)
+    results["instantiate"] = {"rate": count / (time.time() - start)}
+    results["validation"] = _stats(latencies)
+
+    start = time.time()
+    for name in names:
+        ipopo.kill(name)
+    results["kill"] = {"rate": count / (time.time() - start)}
+
+    if tracemalloc is not None:
+        # Separate pass, as tracing slows down allocations
+        tracemalloc.start()
+        try:
+            mem_before = tracemalloc.get_traced_memory()[0]
+            for name in names:
+                ipopo.instantiate(FACTORY_SIMPLE, name, {})
+            mem_after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        results["memory"] = {
+            "per_instance": (mem_after - mem_before) / float(count)
+        }
+
+        for name in names:
+            ipopo.kill(name)
+
+
+def _measure_consumers(ipopo, context, count, cycles, results):
+    """
+    Measures the dependency churn and the properties update fan-out
+
+    :param ipopo: The iPOPO service
+    :param context: The bundle context
+    :param count: Number of consumers
+    :param cycles: Number of churn cycles and updates
+    :param results: Dictionary where to store the results
+    """
+    registration = context.register_service(
+        SPEC_PROVIDER, object(), {"benchmark.value": 0}
+    )
+    consumers = [
+        ipopo.instantiate(FACTORY_CONSUMER, "consumer-{0}".format(idx), {})
+        for idx in range(count)
+    ]
+
+    # Provider going away and coming back
+    durations = []
+    for _ in range(cycles):
+        start = time.time()
+        registration.unregister()
+        registration = context.register_service(
+            SPEC_PROVIDER, object(), {"benchmark.value": 0}
+        )
+        durations.append(time.time() - start)
+
+    results["churn"] = _stats(durations)
+
+    # Provider properties updates
+    durations = []
+    for value in range(1, cycles + 1):
+        start = time.time()
+        registration.set_properties({"benchmark.value": value})
+        durations.append(time.time() - start)
+
+    if any(consumer.updates != cycles for consumer in consumers):
+        raise ValueError("Some consumers missed updates")
+
+    results["fan_out"] = _stats(durations)
+
+
+def run(count, cycles=10):
+    """
+    Runs all the measures with the given number of components
+
+    :param count: Number of components
+    :param cycles: Number of churn cycles and properties updates
+    :return: A dictionary of results
+    """
+    results = {"components": count}
+
+    framework = pelix.framework.create_framework(["pelix.ipopo.core"])
+    framework.start()
+    context = framework.get_bundle_context()
+    try:
+        with use_ipopo(context) as ipopo:
+            ipopo.register_factory(context, SimpleComponent)
+            ipopo.register_factory(context, ConsumerComponent)
+
+            _measure_simple(ipopo, count, results)
+            _measure_consumers(ipopo, context, count, cycles, results)
+
+            # Shutdown with N instances
+            for idx in range(count):
+                ipopo.instantiate(FACTORY_SIMPLE, "simple-{0}".format(idx), {})
+
+        start = time.time()
+        framework.stop()
+        results["shutdown"] = {"duration": 1000.0 * (time.time() - start)}
+    finally:
+        pelix.framework.FrameworkFactory.delete_framework()
+
+    return results
+
+
+def main(argv=None):
+    """
+    Entry point
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "-s",
+        "--scales",
+        default=",".join(str(scale) for scale in DEFAULT_SCALES),
+        help="Comma-separated numbers of components",
+    )
+    parser.add_argument(
+        "-c",
+        "--cycles",
+        type=int,
+        default=10,
+        help="Number of churn cycles and properties updates",
+    )
+    parser.add_argument(
+        "-o", "--output", help="Output file (standard output by default)"
+    )
+    args = parser.parse_args(argv)
+
+    report = {
+        "benchmark": "ipopo_scalability",
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "pelix": pelix.__version__,
+        "results": [
+            run(int(scale), args.cycles)
+            for scale in args.scales.split(",")
+            if scale.strip()
+        ],
+    }
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
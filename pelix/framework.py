@@ -1781,6 +1781,22 @@ class BundleContext(object):
         """
         return self.__framework._dispatcher.remove_service_listener(listener)
 
+    def set_service_listener_filter(self, listener, ldap_filter=None):
+        """
+        Changes the filter of a registered service listener, keeping its
+        registration
+
+        :param listener: The service listener
+        :param ldap_filter: The new filter on service properties
+                            (None to accept all services)
+        :return: True if the filter has been updated, False if the listener
+                 is unknown
+        :raise BundleException: Invalid filter
+        """
+        return self.__framework._dispatcher.set_service_listener_filter(
+            listener, ldap_filter
+        )
+
     def unget_service(self, reference):
         # type: (ServiceReference) -> bool
         """
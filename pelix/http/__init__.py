@@ -27,15 +27,20 @@ Defines the interfaces that must respect HTTP service implementations.
     limitations under the License.
 """
 
+# Standard library
+import mimetypes
+import mmap
+import os
+
 # Standard typing module should be optional
 try:
     # pylint: disable=W0611
-    from typing import Any, ByteString, Dict, Iterable, IO, Tuple
+    from typing import Any, ByteString, Dict, Iterable, IO, Tuple, Union
 except ImportError:
     pass
 
 # Pelix utility methods
-from pelix.utilities import to_bytes
+from pelix.utilities import is_string, to_bytes
 
 # ------------------------------------------------------------------------------
 
@@ -76,6 +81,67 @@ HTTPS_KEY_FILE = "pelix.https.key_file"
 # (supported since Python 3.3)
 HTTPS_KEY_PASSWORD = "pelix.https.key_password"
 
+# ... the cipher suites of HTTPS servers
+HTTPS_CIPHERS = "pelix.https.ciphers"
+"""
+OpenSSL cipher list string of a HTTPS server. By default, a restricted list
+of secure ciphers is used.
+"""
+
+# ... the protocols negotiated with ALPN by HTTPS servers
+HTTPS_ALPN_PROTOCOLS = "pelix.https.alpn_protocols"
+"""
+Protocols negotiated with ALPN by a HTTPS server, by order of preference
+(list of strings, e.g. ``["http/1.1"]``)
+"""
+
+# ... the time to wait for the next request of a persistent connection
+HTTP_SERVICE_KEEP_ALIVE_TIMEOUT = "pelix.http.keep_alive.timeout"
+"""
+Time to wait for the next request on a persistent (keep-alive) connection,
+in seconds (float). If 0 or less, connections are closed after each request.
+"""
+
+# ... the maximum number of threads handling connections
+HTTP_SERVICE_POOL_MAX_THREADS = "pelix.http.pool.max_threads"
+"""
+Maximum number of threads handling the client connections (int).
+If 0 or less, a new thread is started for each connection.
+"""
+
+# ... the number of threads kept to handle connections
+HTTP_SERVICE_POOL_MIN_THREADS = "pelix.http.pool.min_threads"
+""" Minimum number of threads handling the client connections (int) """
+
+# ... the size of the queue of accepted connections
+HTTP_SERVICE_POOL_QUEUE_SIZE = "pelix.http.pool.queue_size"
+"""
+Number of accepted connections waiting for a thread (int). Connections
+accepted when the queue is full get a "503 Service Unavailable" response.
+"""
+
+# ... the time an idle thread is kept alive
+HTTP_SERVICE_POOL_KEEP_ALIVE = "pelix.http.pool.keep_alive"
+""" Time an idle thread is kept alive, in seconds (float) """
+
+# ... the delay to give to clients rejected by an overloaded server
+HTTP_SERVICE_RETRY_AFTER = "pelix.http.overload.retry_after"
+"""
+Value of the "Retry-After" header (in seconds) of the response sent when
+the server is overloaded (int)
+"""
+
+# ... the recording of the request metrics
+HTTP_SERVICE_METRICS = "pelix.http.metrics.enabled"
+""" If False, the HTTP service doesn't record request metrics (bool) """
+
+# Request metrics of an HTTP service
+HTTP_METRICS_SERVICE = "pelix.http.metrics"
+"""
+Specification of the service giving the request metrics of the servlets,
+provided by the HTTP services
+"""
+
 # HTTP servlet constants
 HTTP_SERVLET = "pelix.http.servlet"
 """ HTTP Servlet service specification """
@@ -87,11 +153,35 @@ HTTP_SERVLET_PATH = "pelix.http.path"
 # Service to provide custom 404 and 500 error pages
 HTTP_ERROR_PAGES = "pelix.http.error.pages"
 
+FILE_CHUNK_SIZE = 262144
+""" Size of the blocks written when a file can't be sent without copy """
+
+READ_BLOCK_SIZE = 65536
+""" Default size of the blocks of request body returned by ``iter_data()`` """
+
 # ------------------------------------------------------------------------------
 
 FACTORY_HTTP_BASIC = "pelix.http.service.basic.factory"
 """ Name of the HTTP service component factory """
 
+FACTORY_HTTP_ASYNC = "pelix.http.service.async.factory"
+""" Name of the asyncio-based HTTP service component factory """
+
+FACTORY_HTTP_STATIC = "pelix.http.servlet.static.factory"
+""" Name of the static files servlet component factory """
+
+HTTP_STATIC_ROOT = "pelix.http.static.root"
+""" Directory served by a static files servlet (string) """
+
+HTTP_STATIC_CACHE_TTL = "pelix.http.static.cache_ttl"
+"""
+Time (in seconds) the metadata of a file is kept by a static files servlet
+without being checked (float)
+"""
+
+FACTORY_HTTP_METRICS = "pelix.http.servlet.metrics.factory"
+""" Name of the metrics servlet component factory """
+
 # ------------------------------------------------------------------------------
 
 PARAM_NAME = "http.name"
@@ -126,6 +216,34 @@ Entry in the parameters dictionary of ``bound_to`` and ``unbound_from``.
 Contains a boolean: if True, the connection to the server is encrypted (HTTPS)
 """
 
+PARAM_COMPRESSION = "http.compression"
+"""
+Servlet registration parameter or service property: content encodings
+(``gzip``, ``deflate``) allowed to compress the responses, or True to allow
+all of them. Responses are not compressed by default.
+"""
+
+PARAM_COMPRESSION_MIN_SIZE = "http.compression.min_size"
+"""
+Servlet registration parameter or service property: minimal size (in bytes)
+of a content to compress (1024 by default)
+"""
+
+PARAM_ETAG = "http.etag"
+"""
+Servlet registration parameter or service property: if "strong" (or True)
+or "weak", the ETag of the contents given to ``send_content()`` is computed
+and a 304 response is sent if it matches the If-None-Match header of the
+request
+"""
+
+PARAM_MAX_REQUEST_SIZE = "http.request.max_size"
+"""
+Servlet registration parameter or service property: maximum size (in bytes)
+of the body of the requests handled by the servlet. Larger requests are
+rejected with a 413 error. The size is not limited by default.
+"""
+
 # ------------------------------------------------------------------------------
 
 
@@ -254,6 +372,33 @@ class AbstractHTTPServletRequest(object):
 
         return self.get_rfile().read(size)
 
+    def iter_data(self, block_size=READ_BLOCK_SIZE):
+        # type: (int) -> Iterable[ByteString]
+        """
+        Reads the input stream block by block, to handle large request bodies
+        without keeping them in memory
+
+        :param block_size: Maximum size of a block
+        :return: An iterator over the blocks of the request body
+        """
+        try:
+            remaining = int(self.get_header("content-length"))
+        except (ValueError, TypeError):
+            remaining = None
+
+        rfile = self.get_rfile()
+        while remaining is None or remaining > 0:
+            if remaining is None:
+                data = rfile.read(block_size)
+            else:
+                data = rfile.read(min(block_size, remaining))
+                remaining -= len(data)
+
+            if not data:
+                break
+
+            yield data
+
 
 class AbstractHTTPServletResponse(object):
     """
@@ -378,3 +523,174 @@ class AbstractHTTPServletResponse(object):
 
         # Send the content
         self.write(raw_content)
+
+    def flush(self):
+        """
+        Flushes the output stream
+        """
+        self.get_wfile().flush()
+
+    def write_chunk(self, data, flush=False):
+        # type: (Union[str, ByteString], bool) -> None
+        """
+        Writes a chunk of a response using the chunked transfer encoding
+        (see ``send_stream()``).
+        Empty chunks are ignored, as they would mark the end of the response.
+
+        :param data: Chunk content (string or bytes)
+        :param flush: If True, flush the output stream after the chunk
+        """
+        raw_content = to_bytes(data)
+        if raw_content:
+            self.write(
+                "{0:x}\r\n".format(len(raw_content)).encode("ascii")
+                + raw_content
+                + b"\r\n"
+            )
+
+        if flush:
+            self.flush()
+
+    def end_chunks(self):
+        """
+        Ends a response using the chunked transfer encoding
+        """
+        self.write(b"0\r\n\r\n")
+
+    def send_stream(
+        self,
+        http_code,
+        chunks,
+        mime_type="text/html",
+        http_message=None,
+        flush=False,
+    ):
+        # type: (int, Iterable[Union[str, ByteString]], str, str, bool) -> None
+        """
+        Utility method to send the content given by an iterable (list,
+        generator, ...) as an answer, using the chunked transfer encoding:
+        the response is written while the content is produced, without
+        knowing its length.
+
+        :param http_code: HTTP result code
+        :param chunks: An iterable giving the content (strings or bytes)
+        :param mime_type: Content MIME type (content-type)
+        :param http_message: HTTP code description
+        :param flush: If True, flush the output stream after each chunk
+        """
+        self.set_response(http_code, http_message)
+        if mime_type and not self.is_header_set("content-type"):
+            self.set_header("content-type", mime_type)
+
+        self.set_header("transfer-encoding", "chunked")
+        self.end_headers()
+
+        for chunk in chunks:
+            self.write_chunk(chunk, flush)
+
+        self.end_chunks()
+
+    def send_file(
+        self,
+        path_or_fd,
+        offset=0,
+        length=None,
+        mime_type=None,
+        http_code=200,
+        http_message=None,
+    ):
+        # type: (Union[str, int, IO], int, int, str, int, str) -> None
+        """
+        Utility method to send the content of a file, or a part of it, as an
+        answer. The file is sent without copy when possible (see
+        ``write_file()``).
+
+        :param path_or_fd: Path to the file, file descriptor or file object
+        :param offset: Position of the first byte to send
+        :param length: Number of bytes to send (until the end of the file
+                       by default)
+        :param mime_type: Content MIME type (content-type), guessed from the
+                          path by default
+        :param http_code: HTTP result code
+        :param http_message: HTTP code description
+        :raise OSError: Error opening or reading the file
+        """
+        if is_string(path_or_fd):
+            if not mime_type:
+                mime_type = (
+                    mimetypes.guess_type(path_or_fd)[0]
+                    or "application/octet-stream"
+                )
+
+            fd = os.open(path_or_fd, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            try:
+                self.send_file(
+                    fd, offset, length, mime_type, http_code, http_message
+                )
+            finally:
+                os.close(fd)
+            return
+
+        if not isinstance(path_or_fd, int):
+            # File object
+            path_or_fd = path_or_fd.fileno()
+
+        if length is None:
+            length = max(0, os.fstat(path_or_fd).st_size - offset)
+
+        self.set_response(http_code, http_message)
+        if mime_type and not self.is_header_set("content-type"):
+            self.set_header("content-type", mime_type)
+
+        self.set_header("content-length", length)
+        self.end_headers()
+        self.write_file(path_or_fd, offset, length)
+
+    def write_file(self, fd, offset, length):
+        # type: (int, int, int) -> None
+        """
+        Writes a part of a file. ``end_headers()`` should have been called
+        before.
+
+        This implementation maps the file in memory and writes it by blocks.
+        HTTP service implementations can override it to avoid copies.
+
+        :param fd: File descriptor
+        :param offset: Position of the first byte to write
+        :param length: Number of bytes to write
+        :raise OSError: Error reading the file
+        """
+        if length <= 0:
+            return
+
+        # The mapping must start at a multiple of the allocation granularity
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        try:
+            mapped = mmap.mmap(
+                fd,
+                offset + length - start,
+                access=mmap.ACCESS_READ,
+                offset=start,
+            )
+        except (EnvironmentError, ValueError, OverflowError):
+            # Not a regular file: read it
+            os.lseek(fd, offset, os.SEEK_SET)
+            while length > 0:
+                data = os.read(fd, min(length, FILE_CHUNK_SIZE))
+                if not data:
+                    raise IOError("Unexpected end of file")
+
+                self.write(data)
+                length -= len(data)
+            return
+
+        try:
+            position = offset - start
+            end = position + length
+            while position < end:
+                self.write(
+                    mapped[position : min(end, position + FILE_CHUNK_SIZE)]
+                )
+                position += FILE_CHUNK_SIZE
+        finally:
+            mapped.close()
@@ -0,0 +1,1068 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Pelix asyncio-based HTTP service bundle.
+
+Provides an implementation of the Pelix HTTP service based on asyncio
+streams: all connections are handled by a single event loop thread, which
+allows to keep a lot of idle persistent connections.
+
+Servlets are the same as the ones of the basic HTTP service: their ``do_*``
+methods are called in a thread pool, while the ones defined with
+``async def`` are awaited in the event loop.
+
+This module requires Python 3.5+.
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# Standard library
+import asyncio
+import email.utils
+import io
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http.client import parse_headers, responses
+
+# iPOPO
+from pelix.ipopo.async_loop import AsyncLoop
+from pelix.ipopo.decorators import ComponentFactory
+from pelix.utilities import to_bytes
+import pelix
+import pelix.misc.ssl_wrap as ssl_wrap
+
+# HTTP service
+from pelix.http.basic import HttpService
+import pelix.http as http
+import pelix.http.body as body
+import pelix.http.content as content
+import pelix.http.metrics as metrics
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+MAX_HEADERS = 100
+""" Maximum number of headers in a request """
+
+BUFFER_SIZE = 65536
+""" Size of the output buffer of blocking servlets """
+
+MAX_DISCARD_SIZE = 65536
+"""
+Maximum size of the part of a request body a servlet didn't read, which is
+skipped to handle the next request of the connection
+"""
+
+SERVER_NAME = "Pelix-Async/{0}".format(pelix.__version__)
+""" Value of the Server header """
+
+# ------------------------------------------------------------------------------
+
+
+class _AsyncServletRequest(http.AbstractHTTPServletRequest):
+    """
+    HTTP Servlet request helper
+    """
+
+    def __init__(self, command, path, prefix, headers, rfile, client_address):
+        """
+        :param command: HTTP verb
+        :param path: Request path
+        :param prefix: The path to the servlet root
+        :param headers: Request headers
+        :param rfile: Request body input stream
+        :param client_address: Address of the client
+        """
+        self._command = command
+        self._path = path
+        self._prefix = prefix
+        self._headers = headers
+        self._body = rfile
+        self._client_address = client_address
+
+        # Compute the sub path
+        self._sub_path = path[len(prefix) :]
+        if not self._sub_path.startswith("/"):
+            self._sub_path = "/{0}".format(self._sub_path)
+
+        while "//" in self._sub_path:
+            self._sub_path = self._sub_path.replace("//", "/")
+
+    def get_command(self):
+        """
+        Returns the HTTP verb (GET, POST, ...) used for the request
+        """
+        return self._command
+
+    def get_client_address(self):
+        """
+        Retrieves the address of the client
+
+        :return: A (host, port) tuple
+        """
+        return self._client_address
+
+    def get_header(self, name, default=None):
+        """
+        Retrieves the value of a header
+        """
+        return self._headers.get(name, default)
+
+    def get_headers(self):
+        """
+        Retrieves all headers
+        """
+        return self._headers
+
+    def get_path(self):
+        """
+        Retrieves the request full path
+        """
+        return self._path
+
+    def get_prefix_path(self):
+        """
+        Returns the path to the servlet root
+
+        :return: A request path (string)
+        """
+        return self._prefix
+
+    def get_sub_path(self):
+        """
+        Returns the servlet-relative path, i.e. after the prefix
+
+        :return: A request path (string)
+        """
+        return self._sub_path
+
+    def get_rfile(self):
+        """
+        Retrieves the input as a file stream
+        """
+        return self._body
+
+
+class _AsyncRequestBody(object):
+    """
+    Reads the body of a request in the event loop, without going further than
+    its end. Decodes the chunked transfer encoding.
+    """
+
+    def __init__(self, reader, headers, max_size=None):
+        """
+        :param reader: Connection input stream
+        :param headers: Request headers
+        :param max_size: Maximum size of the body (None for no limit)
+        :raise RequestBodyError: Invalid headers or body too large
+        """
+        self._reader = reader
+        self._max_size = max_size
+
+        # Data read from the connection but not returned yet
+        self._pending = b""
+
+        # Number of bytes left in the body or in the current chunk
+        self._left = 0
+        self._done = False
+        self.size = 0
+
+        transfer_encoding = headers.get("transfer-encoding")
+        if transfer_encoding:
+            if transfer_encoding.strip().lower() != "chunked":
+                raise body.RequestBodyError(
+                    "Unsupported transfer encoding: {0}".format(
+                        transfer_encoding
+                    ),
+                    501,
+                )
+
+            self._chunked = True
+        else:
+            self._chunked = False
+            length = headers.get("content-length", 0)
+            try:
+                self._left = int(length)
+            except ValueError:
+                self._left = -1
+
+            if self._left < 0:
+                raise body.RequestBodyError(
+                    "Invalid content length: {0}".format(length)
+                )
+
+            self.__check_size(self._left)
+
+    def __check_size(self, size):
+        """
+        Checks if the body can be read
+
+        :param size: Number of bytes of the body
+        :raise RequestBodyError: Body too large
+        """
+        if self._max_size is not None and size > self._max_size:
+            raise body.RequestBodyError(
+                "Request body larger than {0} bytes".format(self._max_size),
+                413,
+            )
+
+    async def __next_chunk(self):
+        """
+        Reads the header of the next chunk, or the trailers after the last one
+
+        :return: False if the end of the body has been reached
+        :raise RequestBodyError: Invalid chunk or body too large
+        """
+        if not self._chunked or self._done:
+            return False
+
+        line = await self._reader.readline()
+        try:
+            size = int(line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise body.RequestBodyError("Invalid chunk size")
+
+        if size < 0:
+            raise body.RequestBodyError("Invalid chunk size")
+        elif not size:
+            # Last chunk: skip the trailers
+            while await self._reader.readline() not in (b"\r\n", b"\n", b""):
+                pass
+
+            self._done = True
+            return False
+
+        self.__check_size(self.size + size)
+        self._left = size
+        return True
+
+    async def __read_raw(self, size):
+        """
+        Reads at most *size* bytes of the body from the connection
+
+        :param size: Number of bytes to read (negative for the rest of the
+                     current chunk)
+        :return: The read bytes, or an empty string at the end of the body
+        :raise RequestBodyError: Invalid chunk or connection closed
+        """
+        if not self._left and not await self.__next_chunk():
+            return b""
+
+        if size < 0 or size > self._left:
+            size = self._left
+
+        data = await self._reader.read(size)
+        if not data:
+            raise body.RequestBodyError("Connection closed in the request body")
+
+        self._left -= len(data)
+        self.size += len(data)
+        if self._chunked and not self._left:
+            # Skip the end of the chunk
+            await self._reader.readline()
+
+        return data
+
+    async def read(self, size=-1):
+        """
+        Reads at most *size* bytes of the body
+
+        :param size: Number of bytes to read (negative to read all)
+        :return: The read bytes
+        :raise RequestBodyError: Invalid chunk or body too large
+        """
+        if size is None:
+            size = -1
+
+        parts = []
+        while size:
+            if self._pending:
+                data = self._pending if size < 0 else self._pending[:size]
+                self._pending = self._pending[len(data) :]
+            else:
+                data = await self.__read_raw(size)
+                if not data:
+                    break
+
+            parts.append(data)
+            if size > 0:
+                size -= len(data)
+
+        return b"".join(parts)
+
+    async def readline(self, size=-1):
+        """
+        Reads a line of the body
+
+        :param size: Maximum number of bytes to read (negative for no limit)
+        :return: The read line
+        :raise RequestBodyError: Invalid chunk or body too large
+        """
+        if size is None:
+            size = -1
+
+        parts = []
+        while size:
+            if not self._pending:
+                # Never read further than the body
+                self._pending = await self.__read_raw(size)
+                if not self._pending:
+                    break
+
+            end = self._pending.find(b"\n") + 1 or len(self._pending)
+            if 0 < size < end:
+                end = size
+
+            data = self._pending[:end]
+            self._pending = self._pending[end:]
+            parts.append(data)
+            if data.endswith(b"\n"):
+                break
+            elif size > 0:
+                size -= len(data)
+
+        return b"".join(parts)
+
+    async def discard(self, limit):
+        """
+        Reads and drops the rest of the body, if it is small enough
+
+        :param limit: Maximum number of bytes to read
+        :return: True if the body has been consumed, else False
+        """
+        try:
+            while limit >= 0:
+                data = await self.read(min(limit + 1, body.DISCARD_BLOCK_SIZE))
+                if not data:
+                    return True
+
+                limit -= len(data)
+        except (body.RequestBodyError, ConnectionError):
+            pass
+
+        return False
+
+
+class _BlockingRequestBody(object):
+    """
+    File-like view of the body of a request, given to the blocking servlets
+    methods: the data is read by the event loop
+    """
+
+    def __init__(self, loop, request_body):
+        """
+        :param loop: The AsyncLoop reading the connection
+        :param request_body: The _AsyncRequestBody to read
+        """
+        self._loop = loop
+        self._body = request_body
+
+    def read(self, size=-1):
+        """
+        Reads at most *size* bytes of the body
+
+        :param size: Number of bytes to read (negative to read all)
+        :return: The read bytes
+        """
+        return self._loop.run(self._body.read(size))
+
+    def readline(self, size=-1):
+        """
+        Reads a line of the body
+
+        :param size: Maximum number of bytes to read (negative for no limit)
+        :return: The read line
+        """
+        return self._loop.run(self._body.readline(size))
+
+
+class _ResponseFile(object):
+    """
+    File-like output of a response
+    """
+
+    def __init__(self, response):
+        """
+        :param response: The associated response
+        """
+        self._response = response
+
+    def write(self, data):
+        """
+        Writes the given data
+        """
+        self._response.write(data)
+
+    def flush(self):
+        """
+        Waits for the written data to be sent
+        """
+        self._response.flush()
+
+
+class _AsyncServletResponse(http.AbstractHTTPServletResponse):
+    """
+    HTTP Servlet response helper.
+
+    Can be used from the event loop thread (``async def`` servlets) or from
+    the threads of the executor (blocking servlets). In the latter case, the
+    output is buffered until it is flushed, the buffer is full or the servlet
+    method returns.
+    """
+
+    def __init__(self, loop, writer, version, keep_alive):
+        """
+        :param loop: The AsyncLoop running the connection
+        :param writer: The StreamWriter of the connection
+        :param version: HTTP version of the request
+        :param keep_alive: If True, try to keep the connection open
+        """
+        self._loop = loop
+        self._writer = writer
+        self._version = version
+        self._status = None
+        self._code = None
+        self._headers = {}
+        self._chunked = False
+        self._buffer = []
+        self._buffer_size = 0
+        self.headers_sent = False
+        self.close_connection = not keep_alive
+
+        # Number of bytes written, for the request metrics
+        self.bytes_written = 0
+
+    def set_response(self, code, message=None):
+        """
+        Sets the response line.
+        This method should be the first called when sending an answer.
+
+        :param code: HTTP result code
+        :param message: Associated message
+        """
+        if message is None:
+            message = responses.get(code, "")
+
+        self._code = code
+        self._status = "HTTP/1.1 {0} {1}\r\n".format(code, message)
+
+    def set_header(self, name, value):
+        """
+        Sets the value of a header.
+        This method should not be called after ``end_headers()``.
+
+        :param name: Header name
+        :param value: Header value
+        """
+        self._headers[name.lower()] = value
+
+    def is_header_set(self, name):
+        """
+        Checks if the given header has already been set
+
+        :param name: Header name
+        :return: True if it has already been set
+        """
+        return name.lower() in self._headers
+
+    def end_headers(self):
+        """
+        Ends the headers part
+        """
+        has_body = self._code not in (204, 304)
+        if str(self._headers.get("transfer-encoding")).lower() == "chunked":
+            if self._version >= "HTTP/1.1":
+                self._chunked = True
+            else:
+                # Client doesn't support chunks: end of connection ends data
+                del self._headers["transfer-encoding"]
+                self.close_connection = True
+        elif has_body and "content-length" not in self._headers:
+            # The end of the connection will mark the end of the content
+            self.close_connection = True
+
+        if str(self._headers.get("connection")).lower() == "close":
+            self.close_connection = True
+
+        if self.close_connection:
+            self._headers["connection"] = "close"
+        elif self._version < "HTTP/1.1":
+            self._headers["connection"] = "keep-alive"
+
+        self._headers.setdefault("server", SERVER_NAME)
+        self._headers.setdefault("date", email.utils.formatdate(usegmt=True))
+
+        lines = [self._status or "HTTP/1.1 200 OK\r\n"]
+        lines.extend(
+            "{0}: {1}\r\n".format(name, value)
+            for name, value in self._headers.items()
+        )
+        lines.append("\r\n")
+        self.headers_sent = True
+        self.write("".join(lines).encode("latin-1"))
+
+    def get_wfile(self):
+        """
+        Retrieves the output as a file stream.
+        ``end_headers()`` should have been called before, except if you want
+        to write your own headers.
+
+        :return: The output file-like object
+        """
+        return _ResponseFile(self)
+
+    def write(self, data):
+        """
+        Writes the given data.
+        ``end_headers()`` should have been called before, except if you want
+        to write your own headers.
+
+        :param data: Data to be written
+        """
+        self.bytes_written += len(data)
+        if self._loop.is_loop_thread():
+            self._writer.write(data)
+        else:
+            self._buffer.append(data)
+            self._buffer_size += len(data)
+            if self._buffer_size >= BUFFER_SIZE:
+                self.flush()
+
+    async def __write(self, data):
+        """
+        Writes the given data in the event loop, waiting for the buffer to
+        be sent
+
+        :param data: Data to be written
+        """
+        self._writer.write(data)
+        await self._writer.drain()
+
+    def flush(self):
+        """
+        Sends the buffered data and waits for it to be sent. Does nothing if
+        called from the event loop thread: ``async def`` servlets should
+        call ``drain()`` instead.
+        """
+        if not self._loop.is_loop_thread():
+            data = b"".join(self._buffer)
+            del self._buffer[:]
+            self._buffer_size = 0
+
+            # Write from the event loop, waiting for the data to be sent
+            self._loop.run(self.__write(data))
+
+    def send_buffer(self):
+        """
+        Writes the buffered data. Must be called from the event loop thread.
+        """
+        if self._buffer:
+            self._writer.write(b"".join(self._buffer))
+            del self._buffer[:]
+            self._buffer_size = 0
+
+    async def drain(self):
+        """
+        Waits for the written data to be sent (for ``async def`` servlets)
+        """
+        await self._writer.drain()
+
+    def write_chunk(self, data, flush=False):
+        """
+        Writes a chunk of a response using the chunked transfer encoding.
+        Writes the raw data if the client doesn't support this encoding.
+
+        :param data: Chunk content (string or bytes)
+        :param flush: If True, flush the output stream after the chunk
+        """
+        if self._chunked:
+            super(_AsyncServletResponse, self).write_chunk(data, flush)
+        else:
+            self.write(to_bytes(data))
+            if flush:
+                self.flush()
+
+    def end_chunks(self):
+        """
+        Ends a response using the chunked transfer encoding
+        """
+        if self._chunked:
+            super(_AsyncServletResponse, self).end_chunks()
+
+    def write_file(self, fd, offset, length):
+        """
+        Writes a part of a file. ``end_headers()`` should have been called
+        before.
+
+        Blocking servlets send the file with the ``sendfile()`` method of the
+        event loop (Python 3.7+), without copy on plain sockets.
+        Falls back to memory-mapped writes on SSL connections or when called
+        from the event loop thread.
+
+        :param fd: File descriptor
+        :param offset: Position of the first byte to write
+        :param length: Number of bytes to write
+        :raise OSError: Error reading the file
+        """
+        loop = self._loop.loop
+        if (
+            length <= 0
+            or self._loop.is_loop_thread()
+            or self._writer.get_extra_info("sslcontext") is not None
+            or not hasattr(loop, "sendfile")
+        ):
+            super(_AsyncServletResponse, self).write_file(fd, offset, length)
+            return
+
+        # Send the buffered data first
+        self.flush()
+
+        with io.open(fd, "rb", closefd=False) as file_obj:
+            sent = self._loop.run(
+                loop.sendfile(self._writer.transport, file_obj, offset, length)
+            )
+
+        self.bytes_written += sent
+
+        if sent < length:
+            raise IOError("Unexpected end of file")
+
+
+# ------------------------------------------------------------------------------
+
+
+class _BadRequest(Exception):
+    """
+    Invalid request received
+    """
+
+    pass
+
+
+@ComponentFactory(http.FACTORY_HTTP_ASYNC)
+class AsyncHttpService(HttpService):
+    """
+    asyncio-based HTTP service component.
+
+    Servlets registry and configuration are inherited from the basic HTTP
+    service. The ``pelix.http.pool.max_threads`` property sets the number of
+    threads running the blocking servlets methods.
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        super(AsyncHttpService, self).__init__()
+
+        # Event loop and asyncio server
+        self._loop = None  # type: AsyncLoop
+        self._async_server = None  # type: asyncio.AbstractServer
+
+        # Executor of the blocking servlets methods
+        self._executor = None  # type: ThreadPoolExecutor
+        self._nb_blocking = 0
+        self._nb_rejected = 0
+
+        # Connections tasks
+        self._connections = set()
+
+    def __str__(self):
+        """
+        String representation of the instance
+        """
+        return "AsyncHttpService({0}, {1:d})".format(self._address, self._port)
+
+    def get_access(self):
+        """
+        Retrieves the (address, port) tuple to access the server
+        """
+        sock_info = self._async_server.sockets[0].getsockname()
+
+        # Only keep the address and the port information
+        return sock_info[0], sock_info[1]
+
+    def get_pool_stats(self):
+        """
+        Returns the state of the connections handling
+
+        :return: A dictionary with the number of open connections
+                 (``connections``), of threads running blocking servlets
+                 (``threads``), of blocking servlets calls in progress
+                 (``active``) or waiting for a thread (``queued``) and of
+                 rejected requests (``rejected``)
+        """
+        threads = self._pool_max_threads
+        if threads <= 0:
+            return {
+                "connections": len(self._connections),
+                "threads": None,
+                "active": self._nb_blocking,
+                "queued": 0,
+                "rejected": self._nb_rejected,
+            }
+
+        return {
+            "connections": len(self._connections),
+            "threads": threads,
+            "active": min(threads, self._nb_blocking),
+            "queued": max(0, self._nb_blocking - threads),
+            "rejected": self._nb_rejected,
+        }
+
+    def __make_ssl_context(self):
+        """
+        Returns the server SSL context, shared with the other servers using
+        the same certificate
+
+        :return: An SSLContext
+        """
+        return ssl_wrap.get_server_context(
+            self._cert_file,
+            self._key_file,
+            self._key_password,
+            ciphers=self._ciphers,
+            alpn_protocols=self._alpn_protocols,
+        )
+
+    def _start_server(self):
+        """
+        Starts the event loop and the asyncio server
+        """
+        self._loop = AsyncLoop("{0}-Loop".format(self._instance_name))
+        self._loop.start()
+
+        # Use the default number of threads if none is given
+        self._executor = ThreadPoolExecutor(
+            self._pool_max_threads if self._pool_max_threads > 0 else None
+        )
+
+        ssl_context = None
+        if self._uses_ssl:
+            ssl_context = self.__make_ssl_context()
+
+        try:
+            self._async_server = self._loop.run(
+                asyncio.start_server(
+                    self.__handle_connection,
+                    self._address,
+                    self._port,
+                    ssl=ssl_context,
+                    backlog=self._request_queue_size,
+                )
+            )
+        except Exception:
+            self._loop.stop()
+            self._executor.shutdown(False)
+            raise
+
+        # Property update (if port was 0)
+        self._port = self._async_server.sockets[0].getsockname()[1]
+
+    def _stop_server(self):
+        """
+        Stops the asyncio server and its event loop
+        """
+        if self._async_server is not None:
+            self._loop.run(self.__close_server())
+            self._async_server = None
+
+        if self._loop is not None:
+            self._loop.stop()
+            self._loop = None
+
+        if self._executor is not None:
+            # Don't wait for the blocking servlets calls
+            self._executor.shutdown(False)
+            self._executor = None
+
+    async def __close_server(self):
+        """
+        Closes the server and its connections
+        """
+        self._async_server.close()
+        for task in list(self._connections):
+            task.cancel()
+
+        await self._async_server.wait_closed()
+
+    async def __handle_connection(self, reader, writer):
+        """
+        Handles a client connection
+
+        :param reader: Connection input stream
+        :param writer: Connection output stream
+        """
+        try:
+            task = asyncio.current_task()
+        except AttributeError:
+            # Python < 3.7
+            task = asyncio.Task.current_task()
+
+        self._connections.add(task)
+        client_address = writer.get_extra_info("peername")
+        try:
+            while await self.__handle_request(reader, writer, client_address):
+                pass
+        except _BadRequest as ex:
+            self.log(
+                logging.DEBUG, "Bad request from %s: %s", client_address, ex
+            )
+            writer.write(
+                b"HTTP/1.1 400 Bad Request\r\n"
+                b"Content-Length: 0\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+        except asyncio.CancelledError:
+            # Server is stopping
+            pass
+        except (
+            asyncio.IncompleteReadError,
+            asyncio.TimeoutError,
+            ConnectionError,
+            ValueError,
+        ):
+            # Client is gone or idle for too long
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def __handle_request(self, reader, writer, client_address):
+        """
+        Reads a request and handles it
+
+        :param reader: Connection input stream
+        :param writer: Connection output stream
+        :param client_address: Address of the client
+        :return: True if the connection can be kept open
+        :raise _BadRequest: Invalid request
+        """
+        timeout = None
+        if self._keep_alive_timeout > 0:
+            timeout = self._keep_alive_timeout
+
+        request_line = await asyncio.wait_for(reader.readline(), timeout)
+        if not request_line:
+            # Connection closed
+            return False
+
+        try:
+            command, path, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise _BadRequest("Invalid request line")
+
+        if not version.startswith("HTTP/"):
+            raise _BadRequest("Invalid HTTP version: {0}".format(version))
+
+        # Read headers
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+
+            lines.append(line)
+            if len(lines) > MAX_HEADERS:
+                raise _BadRequest("Too many headers")
+
+        headers = parse_headers(io.BytesIO(b"".join(lines)))
+
+        # Persistent connection
+        connection = headers.get("connection", "").lower()
+        if self._keep_alive_timeout <= 0 or connection == "close":
+            keep_alive = False
+        elif version >= "HTTP/1.1":
+            keep_alive = True
+        else:
+            keep_alive = connection == "keep-alive"
+
+        # The body is read by the servlet
+        if headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        response = _AsyncServletResponse(
+            self._loop, writer, version, keep_alive
+        )
+        await self.__dispatch(
+            command, path, headers, reader, client_address, response
+        )
+        await writer.drain()
+        return not response.close_connection
+
+    async def __dispatch(
+        self, command, path, headers, reader, client_address, response
+    ):
+        """
+        Calls the servlet handling the request
+
+        :param command: HTTP verb
+        :param path: Request path
+        :param headers: Request headers
+        :param reader: Connection input stream, to read the request body
+        :param client_address: Address of the client
+        :param response: The response helper
+        """
+        # Remove the query part and double-slashes in the request path
+        parsed_path = path.split("?", 1)[0].replace("//", "/")
+
+        method = None
+        found_servlet = self.get_servlet(parsed_path)
+        if found_servlet is not None:
+            servlet, parameters, prefix = found_servlet
+            method = getattr(servlet, "do_{0}".format(command), None)
+
+        if method is None:
+            if headers.get("content-length", "0") != "0" or headers.get(
+                "transfer-encoding"
+            ):
+                # Don't try to read the request body
+                response.close_connection = True
+
+            response.send_content(404, self.make_not_found_page(path))
+            return
+
+        start = metrics.HttpMetrics.now()
+        max_size = parameters.get(http.PARAM_MAX_REQUEST_SIZE)
+        try:
+            request_body = _AsyncRequestBody(reader, headers, max_size)
+            if asyncio.iscoroutinefunction(method):
+                # Can't wait for the body in the event loop thread: read it
+                rfile = io.BytesIO(await request_body.read())
+            else:
+                rfile = _BlockingRequestBody(self._loop, request_body)
+        except body.RequestBodyError as ex:
+            self.__send_body_error(response, client_address, ex)
+            self.__record_request(prefix, response, start, None)
+            return
+
+        request = _AsyncServletRequest(
+            command, path, prefix, headers, rfile, client_address
+        )
+        servlet_response = content.wrap_response(request, response, parameters)
+
+        try:
+            if asyncio.iscoroutinefunction(method):
+                await method(request, servlet_response)
+            elif 0 < self._pool_max_threads and (
+                self._nb_blocking
+                >= self._pool_max_threads + self._pool_queue_size
+            ):
+                # Too many blocking calls
+                self._nb_rejected += 1
+                response.set_header("retry-after", self._retry_after)
+                response.send_content(503, "", None)
+                response.close_connection = True
+            else:
+                self._nb_blocking += 1
+                try:
+                    await self._loop.loop.run_in_executor(
+                        self._executor, method, request, servlet_response
+                    )
+                finally:
+                    self._nb_blocking -= 1
+        except asyncio.CancelledError:
+            raise
+        except body.RequestBodyError as ex:
+            response.send_buffer()
+            self.__send_body_error(response, client_address, ex)
+            self.__record_request(prefix, response, start, request_body)
+            return
+        except Exception:
+            response.send_buffer()
+            stack = traceback.format_exc()
+            self.log(
+                logging.ERROR,
+                "Error handling request upon: %s\n%s\n",
+                path,
+                stack,
+            )
+
+            if response.headers_sent:
+                # Can't send an error page
+                response.close_connection = True
+            else:
+                response.send_content(
+                    500, self.make_exception_page(path, stack)
+                )
+        else:
+            response.send_buffer()
+            if servlet_response is not response:
+                # Send the end of the compressed content
+                servlet_response.finish()
+
+            if not response.headers_sent:
+                # Nothing was sent
+                response.close_connection = True
+
+        if not await request_body.discard(MAX_DISCARD_SIZE):
+            # Can't reach the next request
+            response.close_connection = True
+
+        self.__record_request(prefix, response, start, request_body)
+
+    def __record_request(self, prefix, response, start, request_body):
+        """
+        Records a request in the metrics of its servlet
+
+        :param prefix: Path of the servlet
+        :param response: The response helper
+        :param start: Time when the request handling started
+        :param request_body: The request body reader (None if invalid)
+        """
+        # pylint: disable=W0212
+        self.record_request(
+            prefix,
+            response._code,
+            start,
+            request_body.size if request_body is not None else 0,
+            response.bytes_written,
+        )
+
+    def __send_body_error(self, response, client_address, error):
+        """
+        Sends an error response to a request which body can't be read. The
+        connection is closed, as the rest of the body can't be skipped.
+
+        :param response: The response helper
+        :param client_address: Address of the client
+        :param error: The RequestBodyError exception
+        """
+        response.close_connection = True
+        self.log(
+            logging.DEBUG,
+            "Can't read the request body from %s: %s",
+            client_address,
+            error,
+        )
+
+        if not response.headers_sent:
+            response.send_content(error.code, str(error), "text/plain")
@@ -29,11 +29,31 @@ Python library.
 """
 
 # Standard library
+import functools
+import io
 import logging
 import socket
+import ssl
 import threading
+import time
 import traceback
 
+try:
+    # Python 3
+    # pylint: disable=F0401
+    import queue
+except ImportError:
+    # Python 2
+    # pylint: disable=F0401
+    import Queue as queue
+
+try:
+    # Python 3.4+
+    import selectors
+except ImportError:
+    # Python 2: idle connections are kept by their thread
+    selectors = None
+
 # Basic HTTP server
 try:
     # Python 3
@@ -66,9 +86,13 @@ import pelix.ipv6utils
 import pelix.utilities as utilities
 import pelix.misc.ssl_wrap as ssl_wrap
 import pelix.remote
+import pelix.threadpool
 
 # HTTP service constants
 import pelix.http as http
+import pelix.http.body as body
+import pelix.http.content as content
+import pelix.http.metrics as metrics
 
 # ------------------------------------------------------------------------------
 
@@ -92,6 +116,14 @@ LOCALHOST_ADDRESS = "127.0.0.1"
 Local address, if None is given as binding address, instead of the default one
 """
 
+SERVLET_PARAMETERS_PROPERTIES = (
+    http.PARAM_COMPRESSION,
+    http.PARAM_COMPRESSION_MIN_SIZE,
+    http.PARAM_ETAG,
+    http.PARAM_MAX_REQUEST_SIZE,
+)
+""" Servlet service properties given as registration parameters """
+
 # ------------------------------------------------------------------------------
 
 
@@ -100,12 +132,14 @@ class _HTTPServletRequest(http.AbstractHTTPServletRequest):
     HTTP Servlet request helper
     """
 
-    def __init__(self, request_handler, prefix):
+    def __init__(self, request_handler, prefix, max_size=None):
         """
         Sets up the request helper
 
         :param request_handler: The basic request handler
         :param prefix: Teh path to the servlet root
+        :param max_size: Maximum size of the request body (None for no limit)
+        :raise RequestBodyError: Invalid or too large request body
         """
         self._handler = request_handler
         self._prefix = prefix
@@ -118,6 +152,17 @@ class _HTTPServletRequest(http.AbstractHTTPServletRequest):
         while "//" in self._sub_path:
             self._sub_path = self._sub_path.replace("//", "/")
 
+        # Prepare the body reader
+        self._body = body.make_body_reader(
+            request_handler.rfile,
+            request_handler.headers,
+            max_size,
+            request_handler.close_connection,
+        )
+        if getattr(self._body, "remaining", 0) is None:
+            # Body can't be separated from the next request
+            request_handler.close_connection = True
+
     def get_command(self):
         """
         Returns the HTTP verb (GET, POST, ...) used for the request
@@ -168,9 +213,19 @@ class _HTTPServletRequest(http.AbstractHTTPServletRequest):
 
     def get_rfile(self):
         """
-        Retrieves the input as a file stream
+        Retrieves the input as a file stream, limited to the request body
+        """
+        return self._body
+
+    def discard_body(self, limit=65536):
+        """
+        Reads and drops the part of the body the servlet didn't read, to
+        allow the connection to handle the next request
+
+        :param limit: Maximum number of bytes to read
+        :return: True if the body has been consumed
         """
-        return self._handler.rfile
+        return self._body.discard(limit)
 
 
 class _HTTPServletResponse(http.AbstractHTTPServletResponse):
@@ -186,6 +241,8 @@ class _HTTPServletResponse(http.AbstractHTTPServletResponse):
         """
         self._handler = request_handler
         self._headers = {}
+        self._code = None
+        self._chunked = False
 
     def set_response(self, code, message=None):
         """
@@ -195,6 +252,7 @@ class _HTTPServletResponse(http.AbstractHTTPServletResponse):
         :param code: HTTP result code
         :param message: Associated message
         """
+        self._code = code
         self._handler.send_response(code, message)
 
     def set_header(self, name, value):
@@ -220,6 +278,22 @@ class _HTTPServletResponse(http.AbstractHTTPServletResponse):
         """
         Ends the headers part
         """
+        handler = self._handler
+        has_body = self._code not in (204, 304)
+        if str(self._headers.get("transfer-encoding")).lower() == "chunked":
+            if (
+                handler.protocol_version >= "HTTP/1.1"
+                and handler.request_version >= "HTTP/1.1"
+            ):
+                self._chunked = True
+            else:
+                # Client doesn't support chunks: end of connection ends data
+                del self._headers["transfer-encoding"]
+                self._headers["connection"] = "close"
+        elif has_body and "content-length" not in self._headers:
+            # The end of the connection will mark the end of the content
+            self._headers["connection"] = "close"
+
         # Send them all at once
         for name, value in self._headers.items():
             self._handler.send_header(name, value)
@@ -246,10 +320,91 @@ class _HTTPServletResponse(http.AbstractHTTPServletResponse):
         """
         self._handler.wfile.write(data)
 
+    def write_chunk(self, data, flush=False):
+        """
+        Writes a chunk of a response using the chunked transfer encoding.
+        Writes the raw data if the client doesn't support this encoding.
+
+        :param data: Chunk content (string or bytes)
+        :param flush: If True, flush the output stream after the chunk
+        """
+        if self._chunked:
+            super(_HTTPServletResponse, self).write_chunk(data, flush)
+        else:
+            self.write(utilities.to_bytes(data))
+            if flush:
+                self.flush()
+
+    def end_chunks(self):
+        """
+        Ends a response using the chunked transfer encoding
+        """
+        if self._chunked:
+            super(_HTTPServletResponse, self).end_chunks()
+
+    def write_file(self, fd, offset, length):
+        """
+        Writes a part of a file. ``end_headers()`` should have been called
+        before.
+
+        Uses ``sendfile()`` on plain sockets, to avoid copying the file
+        content. Falls back to memory-mapped writes on SSL sockets or if
+        ``sendfile()`` isn't available.
+
+        :param fd: File descriptor
+        :param offset: Position of the first byte to write
+        :param length: Number of bytes to write
+        :raise OSError: Error reading the file
+        """
+        connection = self._handler.connection
+        if (
+            length <= 0
+            or isinstance(connection, ssl.SSLSocket)
+            or not hasattr(connection, "sendfile")
+        ):
+            super(_HTTPServletResponse, self).write_file(fd, offset, length)
+            return
+
+        # Send the buffered data first
+        self._handler.wfile.flush()
+
+        with io.open(fd, "rb", closefd=False) as file_obj:
+            sent = connection.sendfile(file_obj, offset, length)
+
+        self._handler.wfile.written += sent
+        if sent < length:
+            raise IOError("Unexpected end of file")
+
 
 # ------------------------------------------------------------------------------
 
 
+class _CountingWriter(object):
+    """
+    Output stream of a connection, counting the bytes written in it
+    """
+
+    def __init__(self, wfile):
+        """
+        :param wfile: The output stream of the connection
+        """
+        self._wfile = wfile
+        self.written = 0
+
+    def __getattr__(self, name):
+        """
+        Delegates to the output stream
+        """
+        return getattr(self._wfile, name)
+
+    def write(self, data):
+        """
+        Writes the given data
+        """
+        self.written += len(data)
+        return self._wfile.write(data)
+
+
 class _RequestHandler(BaseHTTPRequestHandler, object):
     """
     Basic HTTP server request handler
@@ -258,17 +413,118 @@ class _RequestHandler(BaseHTTPRequestHandler, object):
     # Override the default HTTP version
     default_request_version = "HTTP/1.0"
 
+    # Support persistent connections
+    protocol_version = "HTTP/1.1"
+
+    # Don't delay the body after the headers on persistent connections
+    disable_nagle_algorithm = True
+
     def __init__(self, http_svc, *args, **kwargs):
         """
-        Sets up the request handler (called for each request)
+        Sets up the request handler (called for each connection)
 
         :param http_svc: The associated HTTP service
         """
         self._service = http_svc
 
+        # Number of requests handled on this connection
+        self.__nb_requests = 0
+
+        # Flag to indicate we're waiting for the next request
+        self.__idle = False
+
+        # Flag to indicate the connection must be kept open to wait for its
+        # next request out of this thread
+        self.parked = False
+
         # This calls the do_* methods
         BaseHTTPRequestHandler.__init__(self, *args, **kwargs)
 
+    def setup(self):
+        """
+        Prepares the connection
+        """
+        if self.server.keep_alive_timeout <= 0:
+            # Persistent connections are disabled
+            self.protocol_version = "HTTP/1.0"
+
+        BaseHTTPRequestHandler.setup(self)
+
+        # Count the bytes sent, for the request metrics
+        self.wfile = _CountingWriter(self.wfile)
+
+    def handle(self):
+        """
+        Handles the requests of the connection.
+
+        When the server watches idle connections, the connection is handed
+        back to it once it has no pending request: the thread can handle
+        other connections meanwhile.
+        """
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            if (
+                self.server.idle_connections is not None
+                and not self.__has_pending_data()
+            ):
+                # Wait for the next request out of this thread
+                self.parked = True
+                return
+
+            self.handle_one_request()
+
+    def __has_pending_data(self):
+        """
+        Checks if the client already sent (a part of) its next request
+
+        :return: True if data can be read without waiting
+        """
+        pending = getattr(self.connection, "pending", None)
+        if pending is not None and pending():
+            # Data in the TLS layer
+            return True
+
+        try:
+            peek = self.rfile.peek
+        except AttributeError:
+            # Can't look into the buffer: keep the connection in this thread
+            return True
+
+        timeout = self.connection.gettimeout()
+        self.connection.settimeout(0)
+        try:
+            return bool(peek(1))
+        except (socket.error, ValueError):
+            # Nothing to read yet
+            return False
+        finally:
+            self.connection.settimeout(timeout)
+
+    def handle_one_request(self):
+        """
+        Handles a request of the connection, with a timeout if it has
+        already handled one
+        """
+        if self.__nb_requests:
+            # Wait for the next request on a persistent connection
+            self.__idle = True
+            self.connection.settimeout(self.server.keep_alive_timeout)
+
+        self.__nb_requests += 1
+        BaseHTTPRequestHandler.handle_one_request(self)
+
+    def parse_request(self):
+        """
+        Parses the request line and headers
+        """
+        if self.__idle:
+            # The request has arrived: restore the default timeout
+            self.__idle = False
+            self.connection.settimeout(self.timeout)
+
+        return BaseHTTPRequestHandler.parse_request(self)
+
     def __getattr__(self, name):
         """
         Retrieves the do_* in the servlet corresponding to the request path.
@@ -288,11 +544,28 @@ class _RequestHandler(BaseHTTPRequestHandler, object):
         # Get the corresponding servlet
         found_servlet = self._service.get_servlet(parsed_path)
         if found_servlet is not None:
-            servlet, _, prefix = found_servlet
+            servlet, parameters, prefix = found_servlet
             if hasattr(servlet, name):
                 # Prepare the helpers
-                request = _HTTPServletRequest(self, prefix)
+                start = metrics.HttpMetrics.now()
+                written = self.wfile.written
                 response = _HTTPServletResponse(self)
+                max_size = parameters.get(http.PARAM_MAX_REQUEST_SIZE)
+                try:
+                    request = _HTTPServletRequest(self, prefix, max_size)
+                except body.RequestBodyError as ex:
+                    return functools.partial(
+                        self.__reject_request,
+                        prefix,
+                        response,
+                        ex,
+                        start,
+                        written,
+                    )
+
+                servlet_response = content.wrap_response(
+                    request, response, parameters
+                )
 
                 # Create a wrapper to pass the handler to the servlet
                 def wrapper():
@@ -301,10 +574,32 @@ class _RequestHandler(BaseHTTPRequestHandler, object):
                     """
                     try:
                         # Handle the request
-                        return getattr(servlet, name)(request, response)
+                        result = getattr(servlet, name)(
+                            request, servlet_response
+                        )
+                        if servlet_response is not response:
+                            # Send the end of the compressed content
+                            servlet_response.finish()
+                        return result
+                    except body.RequestBodyError as ex:
+                        # Invalid or too large request body
+                        return self.send_body_error(response, ex)
                     except:
                         # Send a 500 error page on error
                         return self.send_exception(response)
+                    finally:
+                        if not request.discard_body():
+                            # Can't reach the next request
+                            self.close_connection = True
+
+                        # pylint: disable=W0212
+                        self._service.record_request(
+                            prefix,
+                            response._code,
+                            start,
+                            request.get_rfile().size,
+                            self.wfile.written - written,
+                        )
 
                 # Return it
                 return wrapper
@@ -317,7 +612,13 @@ class _RequestHandler(BaseHTTPRequestHandler, object):
         """
         Log server error
         """
-        self._service.log(logging.ERROR, message, *args, **kwargs)
+        if self.__idle:
+            # Persistent connection timed out
+            level = logging.DEBUG
+        else:
+            level = logging.ERROR
+
+        self._service.log(level, message, *args, **kwargs)
 
     def log_request(self, code="-", size="-"):
         """
@@ -329,10 +630,53 @@ class _RequestHandler(BaseHTTPRequestHandler, object):
         """
         Default response sent when no servlet is found for the requested path
         """
+        headers = self.headers
+        if headers.get("content-length", "0") != "0" or headers.get(
+            "transfer-encoding"
+        ):
+            # Don't try to read the request body
+            self.close_connection = True
+
         # Use the helper to send the error page
         response = _HTTPServletResponse(self)
         response.send_content(404, self._service.make_not_found_page(self.path))
 
+    def __reject_request(self, prefix, response, error, start, written):
+        """
+        Sends an error response to a request which body can't be accepted,
+        and records it in the metrics of the servlet
+
+        :param prefix: Path of the servlet
+        :param response: The response handler
+        :param error: The RequestBodyError exception
+        :param start: Time when the request handling started
+        :param written: Number of bytes written before the response
+        """
+        try:
+            self.send_body_error(response, error)
+        finally:
+            # pylint: disable=W0212
+            self._service.record_request(
+                prefix, response._code, start, 0, self.wfile.written - written
+            )
+
+    def send_body_error(self, response, error):
+        """
+        Sends an error response to a request which body can't be read. The
+        connection is closed, as the rest of the body can't be skipped.
+
+        :param response: The response handler
+        :param error: The RequestBodyError exception
+        """
+        self.close_connection = True
+        self._service.log(
+            logging.DEBUG,
+            "Can't read the request body from %s: %s",
+            self.client_address,
+            error,
+        )
+        response.send_content(error.code, str(error), "text/plain")
+
     def send_exception(self, response):
         """
         Sends an exception page with a 500 error code.
@@ -357,6 +701,158 @@ class _RequestHandler(BaseHTTPRequestHandler, object):
 # ------------------------------------------------------------------------------
 
 
+class _IdleConnections(object):
+    """
+    Waits for the next request of idle persistent connections in a single
+    thread, and hands them back to the server when it arrives
+    """
+
+    def __init__(self, server, timeout):
+        """
+        :param server: The server handling the connections
+        :param timeout: Time to wait for the next request of a connection
+                        before closing it (in seconds)
+        """
+        self.__server = server
+        self.__timeout = timeout
+        self.__lock = threading.Lock()
+        self.__running = True
+
+        # Connections parked since the last loop: [(socket, client address)]
+        self.__parked = []
+
+        # Number of connections waiting for a request
+        self.count = 0
+
+        # Wakes up the selector when a connection is parked
+        self.__wakeup_in, self.__wakeup_out = socket.socketpair()
+        self.__wakeup_in.setblocking(False)
+        self.__selector = selectors.DefaultSelector()
+        self.__selector.register(self.__wakeup_in, selectors.EVENT_READ)
+
+        self.__thread = threading.Thread(
+            target=self.__loop,
+            name="HttpService-{0}-Idle".format(server.server_port),
+        )
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def park(self, request, client_address):
+        """
+        Waits for the next request of the given connection
+
+        :param request: The client socket
+        :param client_address: The client address
+        :return: False if the connection must be closed
+        """
+        with self.__lock:
+            if not self.__running:
+                return False
+
+            self.__parked.append((request, client_address))
+            self.count += 1
+
+        self.__wakeup()
+        return True
+
+    def close(self):
+        """
+        Stops the loop and closes the idle connections
+        """
+        with self.__lock:
+            self.__running = False
+
+        self.__wakeup()
+        self.__thread.join(2)
+
+    def __wakeup(self):
+        """
+        Wakes up the loop
+        """
+        try:
+            self.__wakeup_out.send(b"\0")
+        except socket.error:
+            # Already awake (full buffer) or closed
+            pass
+
+    def __loop(self):
+        """
+        Waits for the requests of the idle connections and closes the ones
+        which reached the timeout
+        """
+        # Client socket -> (client address, deadline)
+        idle = {}
+
+        while True:
+            with self.__lock:
+                running = self.__running
+                parked = self.__parked
+                self.__parked = []
+
+            if not running:
+                break
+
+            deadline = time.time() + self.__timeout
+            for request, client_address in parked:
+                idle[request] = (client_address, deadline)
+                self.__selector.register(request, selectors.EVENT_READ)
+
+            timeout = None
+            if idle:
+                timeout = max(
+                    0, min(item[1] for item in idle.values()) - time.time()
+                )
+
+            for key, _ in self.__selector.select(timeout):
+                if key.fileobj is self.__wakeup_in:
+                    try:
+                        while self.__wakeup_in.recv(4096):
+                            pass
+                    except socket.error:
+                        # Nothing more to read
+                        pass
+                    continue
+
+                # A new request is arriving: hand the connection back
+                request = key.fileobj
+                self.__selector.unregister(request)
+                client_address = idle.pop(request)[0]
+                self.__release()
+                self.__server.process_request(request, client_address)
+
+            now = time.time()
+            for request, (_, deadline) in list(idle.items()):
+                if deadline <= now:
+                    # No request in time
+                    self.__selector.unregister(request)
+                    del idle[request]
+                    self.__release()
+                    self.__server.shutdown_request(request)
+
+        # Close the remaining connections
+        with self.__lock:
+            idle.update(
+                (request, (client_address, None))
+                for request, client_address in self.__parked
+            )
+            del self.__parked[:]
+            self.count = 0
+
+        for request in idle:
+            self.__server.shutdown_request(request)
+
+        self.__selector.close()
+        self.__wakeup_in.close()
+        self.__wakeup_out.close()
+
+    def __release(self):
+        """
+        Updates the count of idle connections
+        """
+        with self.__lock:
+            self.count -= 1
+
+
 class _HttpServerFamily(ThreadingMixIn, HTTPServer):
     """
     A small modification to have a threaded HTTP Server with a custom address
@@ -394,6 +890,17 @@ class _HttpServerFamily(ThreadingMixIn, HTTPServer):
         # Set the queue size
         self.request_queue_size = request_queue_size
 
+        # Thread pool handling the connections (thread per connection if None)
+        self.pool = None  # type: pelix.threadpool.ThreadPool
+        self.retry_after = 5
+        self.nb_rejected = 0
+
+        # Time to wait for the next request on persistent connections
+        self.keep_alive_timeout = 5
+
+        # Idle persistent connections (kept by their thread if None)
+        self.idle_connections = None  # type: _IdleConnections
+
         # Set up the server, socket, ... but do not bind immediately
         HTTPServer.__init__(self, server_address, request_handler_class, False)
         self.server_name = server_address[0]
@@ -433,9 +940,19 @@ class _HttpServerFamily(ThreadingMixIn, HTTPServer):
 
     def process_request(self, request, client_address):
         """
-        Starts a new thread to process the request, adding the client address
-        in its name.
+        Processes the request in the thread pool, or starts a new thread to
+        process it, adding the client address in its name.
         """
+        if self.pool is not None:
+            try:
+                self.pool.try_enqueue(
+                    self.process_request_thread, request, client_address
+                )
+            except queue.Full:
+                # Overloaded server
+                self.reject_request(request)
+            return
+
         thread = threading.Thread(
             name="HttpService-{0}-Client-{1}".format(
                 self.server_port, client_address
@@ -446,12 +963,153 @@ class _HttpServerFamily(ThreadingMixIn, HTTPServer):
         thread.daemon = self.daemon_threads
         thread.start()
 
+    def process_request_thread(self, request, client_address):
+        """
+        Handles the requests of a connection, then closes it unless it waits
+        for its next request in the idle connections
+        """
+        try:
+            handler = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+        else:
+            if handler.parked and self.idle_connections.park(
+                request, client_address
+            ):
+                return
+
+        self.shutdown_request(request)
+
+    def reject_request(self, request):
+        """
+        Sends a "503 Service Unavailable" response and closes the connection,
+        without reading the request
+
+        :param request: The client socket
+        """
+        self.nb_rejected += 1
+        response = (
+            "HTTP/1.0 503 Service Unavailable\r\n"
+            "Retry-After: {0}\r\n"
+            "Content-Length: 0\r\n"
+            "Connection: close\r\n\r\n".format(self.retry_after)
+        )
+        try:
+            request.sendall(response.encode("ascii"))
+        except (socket.error, ValueError):
+            # Client is gone
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def get_stats(self):
+        """
+        Returns the state of the connections handling
+
+        :return: A dictionary with the number of threads (``threads``), of
+                 threads handling a connection (``active``), of connections
+                 waiting for a thread (``queued``), of rejected
+                 connections (``rejected``) and of persistent connections
+                 waiting for their next request out of a thread (``idle``)
+        """
+        if self.pool is not None:
+            stats = self.pool.get_stats()
+        else:
+            stats = {"threads": None, "active": None, "queued": 0}
+
+        stats["rejected"] = self.nb_rejected
+        if self.idle_connections is not None:
+            stats["idle"] = self.idle_connections.count
+        else:
+            stats["idle"] = 0
+        return stats
+
+
+# ------------------------------------------------------------------------------
+
+
+def _split_path(path):
+    """
+    Splits a lower-case path into its segments, ignoring the trailing slash:
+    "/" gives an empty list, "/a/b" and "/a/b/" both give ``["a", "b"]``
+
+    :param path: A path starting with a slash
+    :return: The list of segments of the path
+    """
+    if path[-1] != "/":
+        path += "/"
+
+    return path.split("/")[1:-1]
+
+
+class _PathNode(object):
+    """
+    Immutable node of the servlets paths tree. Each update returns a new
+    tree, sharing the untouched nodes with the previous one, so that it can
+    be read without locking.
+    """
+
+    __slots__ = ("children", "servlet")
+
+    def __init__(self, children=None, servlet=None):
+        """
+        :param children: Segment -> _PathNode
+        :param servlet: A (servlet, parameters, path) tuple or None
+        """
+        self.children = children or {}
+        self.servlet = servlet
+
+    def set(self, segments, servlet):
+        """
+        Returns a copy of this tree where the servlet of the node at the
+        given path is replaced
+
+        :param segments: Segments of the path of the node
+        :param servlet: A (servlet, parameters, path) tuple or None
+        :return: The new root of the tree
+        """
+        if not segments:
+            return _PathNode(self.children, servlet)
+
+        segment = segments[0]
+        children = self.children.copy()
+        child = children.get(segment, _EMPTY_NODE).set(segments[1:], servlet)
+        if child.children or child.servlet is not None:
+            children[segment] = child
+        else:
+            # Prune empty branches
+            children.pop(segment, None)
+
+        return _PathNode(children, self.servlet)
+
+    def find(self, segments):
+        """
+        Looks for the servlet of the deepest node matching the given path
+
+        :param segments: Segments of the path
+        :return: A (servlet, parameters, path) tuple or None
+        """
+        node = self
+        found = node.servlet
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            elif node.servlet is not None:
+                found = node.servlet
+
+        return found
+
+
+_EMPTY_NODE = _PathNode()
+""" The empty tree """
 
 # ------------------------------------------------------------------------------
 
 
 @ComponentFactory(http.FACTORY_HTTP_BASIC)
 @Provides(http.HTTP_SERVICE)
+@Provides(http.HTTP_METRICS_SERVICE)
 @Requires("_servlets_services", http.HTTP_SERVLET, True, True)
 @Requires("_error_handler", http.HTTP_ERROR_PAGES, optional=True)
 @Property("_address", http.HTTP_SERVICE_ADDRESS, DEFAULT_BIND_ADDRESS)
@@ -460,11 +1118,20 @@ class _HttpServerFamily(ThreadingMixIn, HTTPServer):
 @Property("_cert_file", http.HTTPS_CERT_FILE, None)
 @Property("_key_file", http.HTTPS_KEY_FILE, None)
 @HiddenProperty("_key_password", http.HTTPS_KEY_PASSWORD, None)
+@Property("_ciphers", http.HTTPS_CIPHERS, None)
+@Property("_alpn_protocols", http.HTTPS_ALPN_PROTOCOLS, None)
 @Property("_extra", HTTP_SERVICE_EXTRA, None)
 @Property("_instance_name", constants.IPOPO_INSTANCE_NAME)
 @Property("_logger_name", "pelix.http.logger.name", "")
 @Property("_logger_level", "pelix.http.logger.level", None)
 @Property("_request_queue_size", "pelix.http.request_queue_size", 100)
+@Property("_keep_alive_timeout", http.HTTP_SERVICE_KEEP_ALIVE_TIMEOUT, 5)
+@Property("_pool_max_threads", http.HTTP_SERVICE_POOL_MAX_THREADS, 32)
+@Property("_pool_min_threads", http.HTTP_SERVICE_POOL_MIN_THREADS, 2)
+@Property("_pool_queue_size", http.HTTP_SERVICE_POOL_QUEUE_SIZE, 100)
+@Property("_pool_keep_alive", http.HTTP_SERVICE_POOL_KEEP_ALIVE, 60)
+@Property("_retry_after", http.HTTP_SERVICE_RETRY_AFTER, 5)
+@Property("_metrics_enabled", http.HTTP_SERVICE_METRICS, True)
 class HttpService(object):
     """
     Basic HTTP service component
@@ -480,11 +1147,25 @@ class HttpService(object):
         self._logger_name = None
         self._logger_level = None
         self._request_queue_size = 5
+        self._keep_alive_timeout = 5
+
+        # Connections thread pool
+        self._pool_max_threads = 32
+        self._pool_min_threads = 2
+        self._pool_queue_size = 100
+        self._pool_keep_alive = 60
+        self._retry_after = 5
+
+        # Request metrics
+        self._metrics_enabled = True
+        self._metrics = metrics.HttpMetrics()
 
         # SSL Parameters
         self._cert_file = None
         self._key_file = None
         self._key_password = None
+        self._ciphers = None
+        self._alpn_protocols = None
 
         # Validation flag
         self._validated = False
@@ -498,6 +1179,9 @@ class HttpService(object):
         # Path -> (servlet, parameters)
         self._servlets = {}
 
+        # Snapshot of the servlets paths tree, read without locking
+        self._servlets_tree = _EMPTY_NODE
+
         # Fields injected by iPOPO
         self._servlets_services = None
         self._error_handler = None
@@ -561,12 +1245,21 @@ class HttpService(object):
         # Servlet bound
         paths = service_reference.get_property(http.HTTP_SERVLET_PATH)
         if utilities.is_string(paths):
-            # Register the servlet to a single path
-            self.register_servlet(paths, service)
-        elif isinstance(paths, (list, tuple)):
-            # Register the servlet to multiple paths
-            for path in paths:
-                self.register_servlet(path, service)
+            paths = [paths]
+        elif not isinstance(paths, (list, tuple)):
+            # Invalid paths
+            return
+
+        # Content-related parameters
+        properties = service_reference.get_properties()
+        parameters = {
+            key: properties[key]
+            for key in SERVLET_PARAMETERS_PROPERTIES
+            if key in properties
+        }
+
+        for path in paths:
+            self.register_servlet(path, service, parameters.copy())
 
     @BindField("_servlets_services")
     def _bind(self, _, service, service_reference):
@@ -647,6 +1340,50 @@ class HttpService(object):
         """
         return self._uses_ssl
 
+    def get_pool_stats(self):
+        """
+        Returns the state of the connections handling: number of threads,
+        active threads, queued and rejected connections
+
+        :return: A dictionary (see ``_HttpServerFamily.get_stats()``)
+        """
+        server = self._server
+        if server is None:
+            return {}
+
+        return server.get_stats()
+
+    def get_metrics(self, path=None):
+        """
+        Returns the request metrics of the servlets
+
+        :param path: If given, only return the metrics of this servlet path
+        :return: A servlet path -> metrics dictionary
+                 (see ``pelix.http.metrics.ServletMetrics.to_dict()``)
+        """
+        return self._metrics.get_metrics(path)
+
+    def reset_metrics(self):
+        """
+        Clears the request metrics of the servlets
+        """
+        self._metrics.reset()
+
+    def record_request(self, path, code, start, bytes_in, bytes_out):
+        """
+        Records a request handled by a servlet. Does nothing if the metrics
+        are disabled.
+
+        :param path: Path of the servlet
+        :param code: HTTP status code of the response
+        :param start: Value of ``HttpMetrics.now()`` when the request was
+                      received
+        :param bytes_in: Size of the request body read by the servlet
+        :param bytes_out: Number of bytes sent in the response
+        """
+        if self._metrics_enabled:
+            self._metrics.record(path, code, start, bytes_in, bytes_out)
+
     def get_registered_paths(self):
         """
         Returns the paths registered by servlets
@@ -668,37 +1405,7 @@ class HttpService(object):
             return None
 
         # Use lower case for comparison
-        path = path.lower()
-
-        if path[-1] != "/":
-            # Add a trailing slash
-            path += "/"
-
-        with self._lock:
-            longest_match = ""
-            longest_match_len = 0
-            for servlet_path in self._servlets:
-                tested_path = servlet_path
-                if tested_path[-1] != "/":
-                    # Add a trailing slash
-                    tested_path += "/"
-
-                if (
-                    path.startswith(tested_path)
-                    and len(servlet_path) > longest_match_len
-                ):
-                    # Found a corresponding servlet
-                    # which is deeper than the previous one
-                    longest_match = servlet_path
-                    longest_match_len = len(servlet_path)
-
-            # Return the found servlet
-            if not longest_match:
-                # No match found
-                return None
-
-            # Retrieve the stored information
-            return tuple(self._servlets[longest_match]) + (longest_match,)
+        return self._servlets_tree.find(_split_path(path.lower()))
 
     def make_not_found_page(self, path):
         """
@@ -759,6 +1466,31 @@ class HttpService(object):
 
         return page
 
+    def __update_tree(self, path):
+        """
+        Updates the servlets paths tree after a change in the given path.
+        Must be called with the servlets lock held.
+
+        :param path: A lower-case servlet path
+        """
+        segments = _split_path(path)
+
+        # "/a" and "/a/" share the same node: the longest one is used
+        base_path = "/" + "/".join(segments)
+        if segments:
+            candidates = (base_path + "/", base_path)
+        else:
+            candidates = (base_path,)
+
+        servlet = None
+        for candidate in candidates:
+            servlet_info = self._servlets.get(candidate)
+            if servlet_info is not None:
+                servlet = tuple(servlet_info) + (candidate,)
+                break
+
+        self._servlets_tree = self._servlets_tree.set(segments, servlet)
+
     def register_servlet(self, path, servlet, parameters=None):
         """
         Registers a servlet
@@ -823,6 +1555,7 @@ class HttpService(object):
             if self.__safe_callback(servlet, "bound_to", path, parameters):
                 # Store the servlet
                 self._servlets[path] = (servlet, parameters)
+                self.__update_tree(path)
                 return True
 
             # The servlet refused the binding
@@ -873,6 +1606,7 @@ class HttpService(object):
 
                 # Remove the servlet
                 del self._servlets[path]
+                self.__update_tree(path)
                 return True
 
     def log(self, level, message, *args, **kwargs):
@@ -927,6 +1661,29 @@ class HttpService(object):
         if self._request_queue_size <= 0:
             self._request_queue_size = 5
 
+        # Normalize the persistent connections timeout
+        try:
+            self._keep_alive_timeout = float(self._keep_alive_timeout)
+        except (ValueError, TypeError):
+            self._keep_alive_timeout = 5
+
+        # Normalize the thread pool configuration
+        try:
+            self._pool_max_threads = int(self._pool_max_threads)
+            self._pool_min_threads = max(0, int(self._pool_min_threads))
+            self._pool_queue_size = max(1, int(self._pool_queue_size))
+            self._pool_keep_alive = float(self._pool_keep_alive)
+            self._retry_after = max(0, int(self._retry_after))
+        except (ValueError, TypeError) as ex:
+            self.log(
+                logging.WARNING, "Invalid thread pool configuration: %s", ex
+            )
+            self._pool_max_threads = 32
+            self._pool_min_threads = 2
+            self._pool_queue_size = 100
+            self._pool_keep_alive = 60
+            self._retry_after = 5
+
         # Normalize the extra properties
         if not isinstance(self._extra, dict):
             self._extra = {}
@@ -952,6 +1709,30 @@ class HttpService(object):
             self._port,
         )
 
+        # Start the server
+        self._start_server()
+
+        with self._binding_lock:
+            # Set the validation flag up, once the server is ready
+            self._validated = True
+
+            # Register bound servlets
+            for service, svc_ref in self._servlets_refs.items():
+                self.__register_servlet_service(service, svc_ref)
+
+        self.log(
+            logging.INFO,
+            "HTTP%s server started: [%s]:%d",
+            "S" if self._uses_ssl else "",
+            self._address,
+            self._port,
+        )
+
+    def _start_server(self):
+        """
+        Creates the server and starts its thread. Updates the port if it was
+        chosen by the system.
+        """
         # Create the server
         self._server = _HttpServerFamily(
             (self._address, self._port),
@@ -967,10 +1748,31 @@ class HttpService(object):
                 self._cert_file,
                 self._key_file,
                 self._key_password,
+                self._ciphers,
+                self._alpn_protocols,
             )
 
         # Property update (if port was 0)
         self._port = self._server.server_port
+        self._server.keep_alive_timeout = self._keep_alive_timeout
+
+        if self._pool_max_threads > 0:
+            # Handle connections in a bounded thread pool
+            self._server.pool = pelix.threadpool.ThreadPool(
+                self._pool_max_threads,
+                self._pool_min_threads,
+                self._pool_queue_size,
+                self._pool_keep_alive,
+                "HttpService-{0}-Worker".format(self._port),
+            )
+            self._server.retry_after = self._retry_after
+            self._server.pool.start()
+
+            if selectors is not None and self._keep_alive_timeout > 0:
+                # Idle persistent connections don't hold a thread
+                self._server.idle_connections = _IdleConnections(
+                    self._server, self._keep_alive_timeout
+                )
 
         # Run it in a separate thread
         self._thread = threading.Thread(
@@ -980,22 +1782,6 @@ class HttpService(object):
         self._thread.daemon = True
         self._thread.start()
 
-        with self._binding_lock:
-            # Set the validation flag up, once the server is ready
-            self._validated = True
-
-            # Register bound servlets
-            for service, svc_ref in self._servlets_refs.items():
-                self.__register_servlet_service(service, svc_ref)
-
-        self.log(
-            logging.INFO,
-            "HTTP%s server started: [%s]:%d",
-            "S" if self._uses_ssl else "",
-            self._address,
-            self._port,
-        )
-
     @Invalidate
     def invalidate(self, _):
         """
@@ -1017,6 +1803,24 @@ class HttpService(object):
         )
 
         # Shutdown server (if active)
+        self._stop_server()
+
+        self.log(
+            logging.INFO,
+            "HTTP server down: [%s]:%d ...",
+            self._address,
+            self._port,
+        )
+
+        # Clean up
+        self._servlets.clear()
+        self._servlets_tree = _EMPTY_NODE
+        self._logger = None
+
+    def _stop_server(self):
+        """
+        Stops the server and waits for its thread, if it is running
+        """
         if self._server is not None:
             self._server.shutdown()
 
@@ -1032,18 +1836,18 @@ class HttpService(object):
             # Close the server
             self._server.server_close()
 
-        self.log(
-            logging.INFO,
-            "HTTP server down: [%s]:%d ...",
-            self._address,
-            self._port,
-        )
+            if self._server.idle_connections is not None:
+                # Close the idle persistent connections
+                self._server.idle_connections.close()
+                self._server.idle_connections = None
+
+            if self._server.pool is not None:
+                # Stop the connections thread pool
+                self._server.pool.stop()
+                self._server.pool = None
 
-        # Clean up
-        self._servlets.clear()
         self._thread = None
         self._server = None
-        self._logger = None
 
     @staticmethod
     def __is_imported(service_reference):
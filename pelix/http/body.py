@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Readers of the body of HTTP requests.
+
+The body is read from the input stream of the connection on demand, without
+going further than its end, so that servlets can handle large requests
+without keeping them in memory. The chunked transfer encoding is decoded on
+the fly, and the size of the body can be limited.
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# Standard typing module should be optional
+try:
+    # pylint: disable=W0611
+    from typing import Any, ByteString, IO, Optional
+except ImportError:
+    pass
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+MAX_LINE_SIZE = 65536
+""" Maximum size of a chunk header or trailer line """
+
+DISCARD_BLOCK_SIZE = 8192
+""" Size of the blocks read when discarding a body """
+
+# ------------------------------------------------------------------------------
+
+
+class RequestBodyError(IOError):
+    """
+    Error reading the body of a request: invalid framing or body too large.
+    The HTTP service replies with the associated HTTP code.
+    """
+
+    def __init__(self, message, code=400):
+        """
+        :param message: Description of the error
+        :param code: HTTP code of the error response
+        """
+        super(RequestBodyError, self).__init__(message)
+        self.code = code
+
+
+def _check_size(size, max_size):
+    # type: (int, Optional[int]) -> None
+    """
+    Checks if a body can be read
+
+    :param size: Number of bytes of the body
+    :param max_size: Maximum size of the body (None for no limit)
+    :raise RequestBodyError: Body too large
+    """
+    if max_size is not None and size > max_size:
+        raise RequestBodyError(
+            "Request body larger than {0} bytes".format(max_size), 413
+        )
+
+
+class BodyReader(object):
+    """
+    Reads the body of a request without going further than its length, to
+    keep the connection usable for the next request
+    """
+
+    def __init__(self, rfile, length, max_size=None):
+        """
+        :param rfile: The input stream of the connection
+        :param length: Length of the body, None to read until the end of
+                       the connection
+        :param max_size: Maximum size of the body (None for no limit)
+        :raise RequestBodyError: Body too large
+        """
+        if length is not None:
+            _check_size(length, max_size)
+
+        self._rfile = rfile
+        self._max_size = max_size
+        self.remaining = length
+        self.size = 0
+
+    def __read(self, method, size):
+        """
+        Reads a part of the body
+
+        :param method: Read method of the input stream
+        :param size: Requested number of bytes (negative for all)
+        :return: The read bytes
+        """
+        if size is None:
+            size = -1
+
+        if self.remaining is not None:
+            if size < 0 or size > self.remaining:
+                size = self.remaining
+                if not size:
+                    return b""
+        elif self._max_size is not None:
+            # Don't read more than the first byte after the limit
+            limit = self._max_size - self.size + 1
+            if size < 0 or size > limit:
+                size = limit
+
+        data = method(size)
+        self.size += len(data)
+        if self.remaining is not None:
+            self.remaining -= len(data)
+        else:
+            _check_size(self.size, self._max_size)
+
+        return data
+
+    def read(self, size=-1):
+        # type: (int) -> ByteString
+        """
+        Reads at most *size* bytes of the body
+
+        :param size: Number of bytes to read (negative to read all)
+        :return: The read bytes
+        :raise RequestBodyError: Body too large
+        """
+        return self.__read(self._rfile.read, size)
+
+    def readline(self, size=-1):
+        # type: (int) -> ByteString
+        """
+        Reads a line of the body
+
+        :param size: Maximum number of bytes to read (negative for no limit)
+        :return: The read line
+        :raise RequestBodyError: Body too large
+        """
+        return self.__read(self._rfile.readline, size)
+
+    def discard(self, limit):
+        # type: (int) -> bool
+        """
+        Reads and drops the rest of the body, if it is small enough
+
+        :param limit: Maximum number of bytes to read
+        :return: True if the body has been consumed, else False
+        """
+        if self.remaining is None or self.remaining > limit:
+            return False
+
+        try:
+            while self.remaining:
+                if not self.read(min(self.remaining, DISCARD_BLOCK_SIZE)):
+                    # Connection closed
+                    return False
+        except (IOError, OSError, ValueError):
+            return False
+
+        return True
+
+
+class ChunkedBodyReader(object):
+    """
+    Decodes a request body sent with the chunked transfer encoding, while it
+    is read
+    """
+
+    def __init__(self, rfile, max_size=None):
+        """
+        :param rfile: The input stream of the connection
+        :param max_size: Maximum size of the body (None for no limit)
+        """
+        self._rfile = rfile
+        self._max_size = max_size
+        self._chunk_left = 0
+        self._done = False
+        self.size = 0
+
+    def __next_chunk(self):
+        # type: () -> bool
+        """
+        Reads the header of the next chunk, or the trailers after the last one
+
+        :return: False if the end of the body has been reached
+        :raise RequestBodyError: Invalid chunk or body too large
+        """
+        if self._done:
+            return False
+
+        line = self._rfile.readline(MAX_LINE_SIZE)
+        try:
+            size = int(line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise RequestBodyError("Invalid chunk size")
+
+        if size < 0:
+            raise RequestBodyError("Invalid chunk size")
+        elif not size:
+            # Last chunk: skip the trailers
+            while self._rfile.readline(MAX_LINE_SIZE) not in (
+                b"\r\n",
+                b"\n",
+                b"",
+            ):
+                pass
+
+            self._done = True
+            return False
+
+        _check_size(self.size + size, self._max_size)
+        self._chunk_left = size
+        return True
+
+    def __read(self, size, line):
+        """
+        Reads a part of the body, through chunks
+
+        :param size: Requested number of bytes (negative for all)
+        :param line: If True, stop at the end of a line
+        :return: The read bytes
+        """
+        if size is None:
+            size = -1
+
+        method = self._rfile.readline if line else self._rfile.read
+        parts = []
+        while size:
+            if not self._chunk_left and not self.__next_chunk():
+                # End of body
+                break
+
+            if size < 0 or size > self._chunk_left:
+                data = method(self._chunk_left)
+            else:
+                data = method(size)
+
+            if not data:
+                raise RequestBodyError("Connection closed in a chunk")
+
+            self._chunk_left -= len(data)
+            self.size += len(data)
+            if not self._chunk_left:
+                # Skip the end of the chunk
+                self._rfile.readline(MAX_LINE_SIZE)
+
+            parts.append(data)
+            if size > 0:
+                size -= len(data)
+
+            if line and data.endswith(b"\n"):
+                # End of line
+                break
+
+        if len(parts) == 1:
+            return parts[0]
+        return b"".join(parts)
+
+    def read(self, size=-1):
+        # type: (int) -> ByteString
+        """
+        Reads at most *size* bytes of the body
+
+        :param size: Number of bytes to read (negative to read all)
+        :return: The read bytes
+        :raise RequestBodyError: Invalid chunk or body too large
+        """
+        return self.__read(size, False)
+
+    def readline(self, size=-1):
+        # type: (int) -> ByteString
+        """
+        Reads a line of the body
+
+        :param size: Maximum number of bytes to read (negative for no limit)
+        :return: The read line
+        :raise RequestBodyError: Invalid chunk or body too large
+        """
+        return self.__read(size, True)
+
+    def discard(self, limit):
+        # type: (int) -> bool
+        """
+        Reads and drops the rest of the body, if it is small enough
+
+        :param limit: Maximum number of bytes to read
+        :return: True if the body has been consumed, else False
+        """
+        try:
+            while limit >= 0:
+                data = self.read(min(limit + 1, DISCARD_BLOCK_SIZE))
+                if not data:
+                    return self._done
+
+                limit -= len(data)
+        except (IOError, OSError, ValueError):
+            pass
+
+        return False
+
+
+def make_body_reader(rfile, headers, max_size=None, until_close=False):
+    # type: (IO, Any, Optional[int], bool) -> Any
+    """
+    Prepares the reader of the body of a request, according to its headers
+
+    :param rfile: The input stream of the connection
+    :param headers: The request headers
+    :param max_size: Maximum size of the body (None for no limit)
+    :param until_close: If True, a request without Content-Length has a body
+                        which ends with the connection
+    :return: A BodyReader or ChunkedBodyReader object
+    :raise RequestBodyError: Invalid headers or body too large
+    """
+    transfer_encoding = headers.get("transfer-encoding")
+    if transfer_encoding:
+        if transfer_encoding.strip().lower() != "chunked":
+            raise RequestBodyError(
+                "Unsupported transfer encoding: {0}".format(transfer_encoding),
+                501,
+            )
+
+        return ChunkedBodyReader(rfile, max_size)
+
+    length = headers.get("content-length")
+    if length is None:
+        # No body, except if the client closes the connection after it
+        return BodyReader(rfile, None if until_close else 0, max_size)
+
+    try:
+        size = int(length)
+    except ValueError:
+        size = -1
+
+    if size < 0:
+        raise RequestBodyError("Invalid content length: {0}".format(length))
+
+    return BodyReader(rfile, size, max_size)
@@ -0,0 +1,575 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Utility methods to negotiate the compression of HTTP responses and to handle
+conditional requests (ETag and If-None-Match headers).
+
+The HTTP service implementations use ``wrap_response()`` to apply the
+compression and ETag parameters given when registering a servlet.
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# Standard library
+import hashlib
+import zlib
+
+# Standard typing module should be optional
+try:
+    # pylint: disable=W0611
+    from typing import Any, ByteString, Dict, Iterable, Optional, Union
+except ImportError:
+    pass
+
+# Pelix
+from pelix.utilities import is_string, to_bytes
+import pelix.http as http
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+ENCODING_GZIP = "gzip"
+""" The gzip content encoding """
+
+ENCODING_DEFLATE = "deflate"
+""" The deflate content encoding (zlib format) """
+
+SUPPORTED_ENCODINGS = (ENCODING_GZIP, ENCODING_DEFLATE)
+""" Supported content encodings, by order of preference """
+
+DEFAULT_MIN_SIZE = 1024
+""" Default minimal size of a content to compress (in bytes) """
+
+COMPRESSION_LEVEL = 6
+""" Compression level given to zlib """
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+""" Beginning of the MIME types worth compressing """
+
+_WBITS = {ENCODING_GZIP: 16 + zlib.MAX_WBITS, ENCODING_DEFLATE: zlib.MAX_WBITS}
+""" Encoding -> zlib window bits parameter """
+
+# ------------------------------------------------------------------------------
+
+
+def negotiate_encoding(accept_encoding, encodings=SUPPORTED_ENCODINGS):
+    # type: (Optional[str], Iterable[str]) -> Optional[str]
+    """
+    Selects the content encoding to use according to the ``Accept-Encoding``
+    header of a request
+
+    :param accept_encoding: Value of the Accept-Encoding header (can be None)
+    :param encodings: Encodings supported by the server, by order of
+                      preference
+    :return: The selected encoding, or None to send the content as is
+    """
+    if not accept_encoding:
+        return None
+
+    # Encoding -> quality
+    qualities = {}  # type: Dict[str, float]
+    for entry in accept_encoding.split(","):
+        parts = entry.split(";")
+        name = parts[0].strip().lower()
+        quality = 1.0
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name] = quality
+
+    best = None
+    best_quality = 0.0
+    default_quality = qualities.get("*", 0.0)
+    for encoding in encodings:
+        quality = qualities.get(encoding, default_quality)
+        if quality > best_quality:
+            best = encoding
+            best_quality = quality
+
+    return best
+
+
+def is_compressible(mime_type):
+    # type: (Optional[str]) -> bool
+    """
+    Checks if a content of the given type is worth compressing
+
+    :param mime_type: Value of the Content-Type header
+    :return: True if the content should be compressed
+    """
+    if not mime_type:
+        return False
+
+    mime_type = str(mime_type).split(";", 1)[0].strip().lower()
+    return mime_type.startswith(COMPRESSIBLE_TYPES) or mime_type.endswith(
+        ("+json", "+xml")
+    )
+
+
+def make_compressor(encoding):
+    """
+    Prepares a zlib compression object for the given content encoding
+
+    :param encoding: A supported content encoding
+    :return: A zlib compression object
+    :raise KeyError: Unsupported encoding
+    """
+    return zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, _WBITS[encoding])
+
+
+def compress(data, encoding):
+    # type: (ByteString, str) -> bytes
+    """
+    Compresses the given data
+
+    :param data: Data to compress
+    :param encoding: A supported content encoding
+    :return: The compressed data
+    :raise KeyError: Unsupported encoding
+    """
+    compressor = make_compressor(encoding)
+    return compressor.compress(data) + compressor.flush()
+
+
+# ------------------------------------------------------------------------------
+
+
+def make_etag(content, weak=False):
+    # type: (Union[str, ByteString], bool) -> str
+    """
+    Computes an entity tag from a content
+
+    :param content: Content of a response (string or bytes)
+    :param weak: If True, returns a weak entity tag
+    :return: The value of the ETag header
+    """
+    return format_etag(hashlib.sha1(to_bytes(content)).hexdigest(), weak)
+
+
+def format_etag(tag, weak=False):
+    # type: (Any, bool) -> str
+    """
+    Formats an entity tag
+
+    :param tag: An opaque tag, like a version number or a hash
+    :param weak: If True, returns a weak entity tag
+    :return: The value of the ETag header
+    """
+    return '{0}"{1}"'.format("W/" if weak else "", tag)
+
+
+def etag_matches(if_none_match, etag):
+    # type: (Optional[str], str) -> bool
+    """
+    Checks if an entity tag is listed in an ``If-None-Match`` header, using
+    the weak comparison (RFC 7232)
+
+    :param if_none_match: Value of the If-None-Match header (can be None)
+    :param etag: Current entity tag (see ``format_etag()``)
+    :return: True if the client has the current version of the resource
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    if etag.startswith("W/"):
+        etag = etag[2:]
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+
+        if candidate == etag:
+            return True
+
+    return False
+
+
+def check_etag(request, response, etag, weak=False):
+    # type: (http.AbstractHTTPServletRequest, http.AbstractHTTPServletResponse, Any, bool) -> bool
+    """
+    Sets the ETag header of a response and sends a *304 Not Modified*
+    response if the client already has this version of the resource.
+
+    Must be called before sending the response::
+
+        if check_etag(request, response, self._version):
+            return
+
+        response.send_content(200, ...)
+
+    :param request: The servlet request
+    :param response: The servlet response
+    :param etag: An opaque tag, like a version number or a hash
+    :param weak: If True, the tag is sent as a weak entity tag
+    :return: True if the 304 response has been sent
+    """
+    etag = format_etag(etag, weak)
+    response.set_header("etag", etag)
+
+    if request.get_command() in ("GET", "HEAD") and etag_matches(
+        request.get_header("if-none-match"), etag
+    ):
+        response.set_response(304)
+        response.end_headers()
+        return True
+
+    return False
+
+
+# ------------------------------------------------------------------------------
+
+
+class ContentResponse(http.AbstractHTTPServletResponse):
+    """
+    Servlet response wrapper, compressing the content according to the
+    encoding negotiated with the client and computing the ETag of the
+    contents given to ``send_content()``.
+
+    The compression of a content with a known length smaller than the
+    threshold is skipped. Otherwise, the content is compressed while it is
+    written, using the chunked transfer encoding.
+    """
+
+    def __init__(self, request, response, encoding, min_size, etag):
+        """
+        :param request: The servlet request
+        :param response: The wrapped servlet response
+        :param encoding: Content encoding negotiated with the client (or None)
+        :param min_size: Minimal size of a content to compress
+        :param etag: "strong" or "weak" to compute the ETag of contents, or
+                     None
+        """
+        self._request = request
+        self._response = response
+        self._encoding = encoding
+        self._min_size = min_size
+        self._etag = etag
+        self._code = None
+        self._headers = {}
+        self._compressor = None
+        self._end_chunks = False
+
+    def __getattr__(self, name):
+        """
+        Gives access to the implementation-specific members of the wrapped
+        response
+        """
+        return getattr(self._response, name)
+
+    def set_response(self, code, message=None):
+        """
+        Sets the response line.
+        This method should be the first called when sending an answer.
+
+        :param code: HTTP result code
+        :param message: Associated message
+        """
+        self._code = code
+        self._response.set_response(code, message)
+
+    def set_header(self, name, value):
+        """
+        Sets the value of a header.
+        This method should not be called after ``end_headers()``.
+
+        :param name: Header name
+        :param value: Header value
+        """
+        self._headers[name.lower()] = value
+
+    def is_header_set(self, name):
+        """
+        Checks if the given header has already been set
+
+        :param name: Header name
+        :return: True if it has already been set
+        """
+        return name.lower() in self._headers
+
+    def __accepts_compression(self, length=None):
+        """
+        Checks if the content can be compressed
+
+        :param length: Length of the content, if known
+        :return: True if the content should be compressed
+        """
+        headers = self._headers
+        if self._code in (204, 304) or (
+            self._code is not None and self._code < 200
+        ):
+            # No content
+            return False
+
+        if (
+            "content-encoding" in headers
+            or "content-range" in headers
+            or not is_compressible(headers.get("content-type"))
+        ):
+            # Already encoded, partial content or not worth it
+            return False
+
+        if length is None:
+            length = headers.get("content-length")
+
+        try:
+            return length is None or int(length) >= self._min_size
+        except (TypeError, ValueError):
+            return False
+
+    def end_headers(self):
+        """
+        Ends the headers part
+        """
+        headers = self._headers
+        if is_compressible(headers.get("content-type")):
+            # The content depends on the Accept-Encoding header
+            headers.setdefault("vary", "Accept-Encoding")
+
+        if self._encoding and self.__accepts_compression():
+            self._compressor = make_compressor(self._encoding)
+            headers["content-encoding"] = self._encoding
+            headers.pop("content-length", None)
+
+            # Compressed data is written in chunks
+            if str(headers.get("transfer-encoding")).lower() != "chunked":
+                # Compressed length is unknown: the chunks will be ended
+                # once the servlet has returned
+                headers["transfer-encoding"] = "chunked"
+                self._end_chunks = True
+
+        response = self._response
+        for name, value in headers.items():
+            response.set_header(name, value)
+
+        response.end_headers()
+
+    def get_wfile(self):
+        """
+        Retrieves the output as a file stream.
+        ``end_headers()`` should have been called before, except if you want
+        to write your own headers.
+
+        :return: The output file-like object
+        """
+        if self._compressor is None:
+            return self._response.get_wfile()
+
+        return self
+
+    def write(self, data):
+        """
+        Writes the given data.
+        ``end_headers()`` should have been called before, except if you want
+        to write your own headers.
+
+        :param data: Data to be written
+        """
+        if self._compressor is None:
+            self._response.write(data)
+        else:
+            self._response.write_chunk(self._compressor.compress(data))
+
+    def write_file(self, fd, offset, length):
+        """
+        Writes a part of a file, compressing it if necessary
+
+        :param fd: File descriptor
+        :param offset: Position of the first byte to write
+        :param length: Number of bytes to write
+        :raise OSError: Error reading the file
+        """
+        if self._compressor is None:
+            self._response.write_file(fd, offset, length)
+        else:
+            super(ContentResponse, self).write_file(fd, offset, length)
+
+    def flush(self):
+        """
+        Flushes the output stream, including the data kept by the compressor
+        """
+        if self._compressor is None:
+            self._response.flush()
+        else:
+            self._response.write_chunk(
+                self._compressor.flush(zlib.Z_SYNC_FLUSH), True
+            )
+
+    def write_chunk(self, data, flush=False):
+        """
+        Writes a chunk of a response using the chunked transfer encoding
+
+        :param data: Chunk content (string or bytes)
+        :param flush: If True, flush the output stream after the chunk
+        """
+        if self._compressor is None:
+            self._response.write_chunk(data, flush)
+        else:
+            raw_content = self._compressor.compress(to_bytes(data))
+            if flush:
+                raw_content += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._response.write_chunk(raw_content, flush)
+
+    def end_chunks(self):
+        """
+        Ends a response using the chunked transfer encoding
+        """
+        if self._compressor is not None:
+            self._response.write_chunk(self._compressor.flush())
+            self._compressor = None
+
+        self._end_chunks = False
+        self._response.end_chunks()
+
+    def send_content(
+        self,
+        http_code,
+        content,
+        mime_type="text/html",
+        http_message=None,
+        content_length=-1,
+    ):
+        """
+        Utility method to send the given content as an answer.
+        The content is compressed at once, if possible, to send its length.
+
+        :param http_code: HTTP result code
+        :param content: Data to be sent (must be a string)
+        :param mime_type: Content MIME type (content-type)
+        :param http_message: HTTP code description
+        :param content_length: Forced content length
+        """
+        if mime_type and not self.is_header_set("content-type"):
+            self.set_header("content-type", mime_type)
+
+        raw_content = to_bytes(content)
+        self._code = http_code
+        compress_content = (
+            self._encoding
+            and content_length is not None
+            and content_length < 0
+            and self.__accepts_compression(len(raw_content))
+        )
+
+        if self._etag and http_code == 200 and "etag" not in self._headers:
+            # Compute the ETag if the servlet didn't give one
+            weak = self._etag == "weak"
+            tag = hashlib.sha1(raw_content).hexdigest()
+            if compress_content and not weak:
+                # Strong tags must differ between encodings
+                tag = "{0}-{1}".format(tag, self._encoding)
+
+            if check_etag(self._request, self, tag, weak):
+                # Not modified
+                return
+
+        if not compress_content:
+            super(ContentResponse, self).send_content(
+                http_code, raw_content, None, http_message, content_length
+            )
+            return
+
+        raw_content = compress(raw_content, self._encoding)
+        self._headers["content-encoding"] = self._encoding
+        self._headers["vary"] = "Accept-Encoding"
+        self._headers.pop("content-length", None)
+
+        response = self._response
+        for name, value in self._headers.items():
+            response.set_header(name, value)
+
+        response.send_content(http_code, raw_content, None, http_message)
+
+    def finish(self):
+        """
+        Writes the data kept by the compressor. Called by the HTTP service
+        once the servlet has handled the request.
+        """
+        if self._compressor is not None:
+            self._response.write_chunk(self._compressor.flush())
+            self._compressor = None
+
+        if self._end_chunks:
+            self._end_chunks = False
+            self._response.end_chunks()
+
+
+# ------------------------------------------------------------------------------
+
+
+def wrap_response(request, response, parameters):
+    # type: (http.AbstractHTTPServletRequest, http.AbstractHTTPServletResponse, Dict[str, Any]) -> http.AbstractHTTPServletResponse
+    """
+    Wraps a servlet response according to the compression and ETag
+    parameters of the servlet
+
+    :param request: The servlet request
+    :param response: The servlet response
+    :param parameters: The servlet registration parameters
+    :return: A ContentResponse or the given response
+    """
+    compression = parameters.get(http.PARAM_COMPRESSION)
+    etag = parameters.get(http.PARAM_ETAG)
+    if not compression and not etag:
+        return response
+
+    encoding = None
+    if compression:
+        if compression is True:
+            compression = SUPPORTED_ENCODINGS
+        elif is_string(compression):
+            compression = (compression,)
+
+        encoding = negotiate_encoding(
+            request.get_header("accept-encoding"),
+            [item for item in compression if item in _WBITS],
+        )
+
+    if etag is True:
+        etag = "strong"
+
+    min_size = int(
+        parameters.get(http.PARAM_COMPRESSION_MIN_SIZE, DEFAULT_MIN_SIZE)
+    )
+    return ContentResponse(request, response, encoding, min_size, etag)
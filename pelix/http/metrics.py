@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Request metrics of the HTTP service servlets.
+
+The HTTP service implementations record the number of requests, the classes
+of status codes, the bytes received and sent, and the latency distribution
+of each servlet path. The metrics are returned by the
+``pelix.http.metrics`` service, and can be exposed as JSON by the metrics
+servlet defined in this module.
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# Standard library
+import bisect
+import json
+import threading
+import time
+
+try:
+    # Python 3
+    from time import perf_counter as _clock
+except ImportError:
+    # Python 2
+    from time import time as _clock
+
+try:
+    # Python 3
+    from urllib.parse import parse_qs
+except ImportError:
+    # Python 2
+    from urlparse import parse_qs
+
+# Standard typing module should be optional
+try:
+    # pylint: disable=W0611
+    from typing import Any, Dict, List, Optional
+except ImportError:
+    pass
+
+# iPOPO decorators
+from pelix.ipopo.decorators import (
+    ComponentFactory,
+    Property,
+    Provides,
+    Requires,
+)
+
+# HTTP service
+import pelix.http as http
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+""" Upper bounds (in seconds) of the buckets of the latency histograms """
+
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+""" Classes of HTTP status codes """
+
+# ------------------------------------------------------------------------------
+
+
+class ServletMetrics(object):
+    """
+    Request metrics of a servlet path
+    """
+
+    __slots__ = (
+        "requests",
+        "statuses",
+        "bytes_in",
+        "bytes_out",
+        "total_time",
+        "max_time",
+        "histogram",
+    )
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self.requests = 0
+        self.statuses = [0] * len(STATUS_CLASSES)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+        # One entry per bucket, plus one for longer requests
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, code, duration, bytes_in, bytes_out):
+        # type: (Optional[int], float, int, int) -> None
+        """
+        Records a request
+
+        :param code: HTTP status code of the response (None if no response
+                     was sent)
+        :param duration: Time spent handling the request (in seconds)
+        :param bytes_in: Size of the request body read by the servlet
+        :param bytes_out: Number of bytes sent in the response
+        """
+        self.requests += 1
+        if code:
+            status_class = code // 100 - 1
+            if 0 <= status_class < len(STATUS_CLASSES):
+                self.statuses[status_class] += 1
+
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.total_time += duration
+        if duration > self.max_time:
+            self.max_time = duration
+
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    def percentile(self, ratio):
+        # type: (float) -> float
+        """
+        Estimates a latency percentile from the histogram: returns the upper
+        bound of the bucket containing it
+
+        :param ratio: Percentile, between 0 and 1
+        :return: A duration in seconds, at most the maximum latency
+        """
+        if not self.requests:
+            return 0.0
+
+        threshold = ratio * self.requests
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.histogram):
+            total += count
+            if total >= threshold:
+                return min(bound, self.max_time)
+
+        return self.max_time
+
+    def to_dict(self):
+        # type: () -> Dict[str, Any]
+        """
+        Returns a snapshot of the metrics.
+        The result dictionary has the following keys:
+
+        * ``requests``: number of requests
+        * ``statuses``: status code class (``2xx``, ...) -> number of
+          responses
+        * ``errors``: number of 4xx and 5xx responses
+        * ``bytes_in``, ``bytes_out``: bytes received and sent
+        * ``total_time``, ``mean_time``, ``max_time``: latency (in seconds)
+        * ``p50``, ``p90``, ``p99``: latency percentiles (in seconds)
+        * ``histogram``: list of (bucket upper bound, count) tuples, the
+          last bound being None
+
+        :return: A dictionary
+        """
+        statuses = dict(zip(STATUS_CLASSES, self.statuses))
+        return {
+            "requests": self.requests,
+            "statuses": statuses,
+            "errors": statuses["4xx"] + statuses["5xx"],
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "total_time": self.total_time,
+            "mean_time": (
+                self.total_time / self.requests if self.requests else 0.0
+            ),
+            "max_time": self.max_time,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "histogram": list(zip(LATENCY_BUCKETS + (None,), self.histogram)),
+        }
+
+
+class HttpMetrics(object):
+    """
+    Request metrics of the servlets of an HTTP service
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self._lock = threading.Lock()
+
+        # Servlet path -> ServletMetrics
+        self._servlets = {}  # type: Dict[str, ServletMetrics]
+
+        # Beginning of the recording
+        self.since = time.time()
+
+    @staticmethod
+    def now():
+        # type: () -> float
+        """
+        Returns the current value of the clock used to time requests
+
+        :return: A time in seconds, only meaningful to compute durations
+        """
+        return _clock()
+
+    def record(self, path, code, start, bytes_in, bytes_out):
+        # type: (str, Optional[int], float, int, int) -> None
+        """
+        Records a request handled by a servlet
+
+        :param path: Path of the servlet
+        :param code: HTTP status code of the response
+        :param start: Value of ``now()`` when the request was received
+        :param bytes_in: Size of the request body read by the servlet
+        :param bytes_out: Number of bytes sent in the response
+        """
+        duration = _clock() - start
+        with self._lock:
+            try:
+                metrics = self._servlets[path]
+            except KeyError:
+                metrics = self._servlets[path] = ServletMetrics()
+
+            metrics.record(code, duration, bytes_in, bytes_out)
+
+    def get_metrics(self, path=None):
+        # type: (Optional[str]) -> Dict[str, Dict[str, Any]]
+        """
+        Returns a snapshot of the metrics of the servlets
+
+        :param path: If given, only return the metrics of this servlet path
+        :return: A servlet path -> metrics dictionary (see
+                 ``ServletMetrics.to_dict()``)
+        """
+        with self._lock:
+            if path is not None:
+                metrics = self._servlets.get(path)
+                if metrics is None:
+                    return {}
+                return {path: metrics.to_dict()}
+
+            return {
+                servlet_path: metrics.to_dict()
+                for servlet_path, metrics in self._servlets.items()
+            }
+
+    def reset(self):
+        # type: () -> None
+        """
+        Clears the recorded metrics
+        """
+        with self._lock:
+            self._servlets.clear()
+            self.since = time.time()
+
+
+# ------------------------------------------------------------------------------
+
+
+@ComponentFactory(http.FACTORY_HTTP_METRICS)
+@Provides(http.HTTP_SERVLET)
+@Requires("_metrics", http.HTTP_METRICS_SERVICE, aggregate=True, optional=True)
+@Property("_path", http.HTTP_SERVLET_PATH, "/metrics")
+class MetricsServlet(object):
+    """
+    Servlet returning the request metrics of the HTTP services as JSON.
+
+    The result is a dictionary associating the "host:port" string of each
+    HTTP service to its metrics. A ``path`` query parameter filters the
+    servlets.
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        # Servlet path property
+        self._path = None
+
+        # Injected metrics services
+        self._metrics = []
+
+    def do_GET(self, request, response):
+        # pylint: disable=C0103
+        """
+        Handles a GET request
+        """
+        query = request.get_path().partition("?")[2]
+        path = parse_qs(query).get("path", [None])[0]
+
+        result = {}
+        for svc in self._metrics or ():
+            result["{0}:{1}".format(*svc.get_access())] = svc.get_metrics(path)
+
+        response.send_content(
+            200, json.dumps(result, sort_keys=True), "application/json"
+        )
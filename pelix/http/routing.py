@@ -29,12 +29,13 @@ of HTTP requests.
 # Standard library
 import inspect
 import re
+import sys
 import uuid
 
 # Standard typing module should be optional
 try:
     # pylint: disable=W0611
-    from typing import Any, Callable, Dict, Pattern, Tuple
+    from typing import Any, Callable, Dict, List, Optional, Tuple
     from pelix.http import (
         AbstractHTTPServletRequest,
         AbstractHTTPServletResponse,
@@ -42,9 +43,6 @@ try:
 except ImportError:
     pass
 
-# Pelix utility methods
-from pelix.utilities import get_method_arguments
-
 # ------------------------------------------------------------------------------
 
 # Module version
@@ -87,6 +85,40 @@ TYPE_PATTERNS[None] = TYPE_PATTERNS["string"]
 _MARKER_PATTERN = re.compile(r"<[^<>]*>")
 _TYPED_MARKER_PATTERN = re.compile(r"<(\w+):?(\w+)?>")
 
+# Beginning of a route without marker nor special regex character
+_STATIC_PREFIX_PATTERN = re.compile(r"[^<.^$*+?{}\[\]\\|()]*")
+
+_MAX_GROUPS = 100 if sys.version_info < (3, 5) else 0
+"""
+Maximum number of groups in a regular expression (0 for no limit)
+"""
+
+
+def _static_segments(route):
+    # type: (str) -> List[str]
+    """
+    Computes the path segments all the paths matching the given route start
+    with
+
+    :param route: A route string
+    :return: The list of segments (can be empty)
+    """
+    prefix = _STATIC_PREFIX_PATTERN.match(route).group()
+    if len(prefix) < len(route):
+        stop = route[len(prefix)]
+        if stop == "|":
+            # Alternative: the prefix is not mandatory
+            return []
+        elif stop in "*+?{":
+            # The last character is quantified
+            prefix = prefix[:-1]
+
+    last_slash = prefix.rfind("/")
+    if last_slash <= 0 or prefix[0] != "/":
+        return []
+
+    return prefix[1:last_slash].split("/")
+
 
 def path_filter(path):
     # type: (str) -> str
@@ -223,6 +255,160 @@ class HttpDelete(Http):
 # ------------------------------------------------------------------------------
 
 
+class _Route(object):
+    """
+    Compiled description of a route
+    """
+
+    __slots__ = ("method", "arguments")
+
+    def __init__(self, method, arguments):
+        """
+        :param method: Method handling the route
+        :param arguments: List of (group name, argument name, converter)
+        """
+        self.method = method
+        self.arguments = arguments
+
+    def get_arguments(self, match):
+        """
+        Converts the arguments found in the request path. They are all given
+        by name, as the method can declare them as keyword-only arguments.
+
+        :param match: The result of the regex match of the request path
+        :return: The keyword arguments of the method
+        """
+        kwargs = {}
+        for group, name, converter in self.arguments:
+            str_value = match.group(group)
+            if str_value:
+                # Keep the default value when an argument is missing,
+                # i.e. don't give it in kwargs
+                if converter is not None:
+                    kwargs[name] = converter(str_value)
+                else:
+                    kwargs[name] = str_value
+
+        return kwargs
+
+
+class _RouteNode(object):
+    """
+    Node of the static prefix tree of the routes of an HTTP verb
+    """
+
+    __slots__ = ("children", "alternatives", "matchers")
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        # Path segment -> _RouteNode
+        self.children = {}  # type: Dict[str, _RouteNode]
+
+        # Patterns of the routes whose static prefix ends at this node
+        self.alternatives = []  # type: List[str]
+
+        # Combined patterns of those routes
+        self.matchers = []  # type: List[Any]
+
+    def compile(self):
+        """
+        Combines the patterns of the routes of this node and of its children
+        """
+        parts = []
+        nb_groups = 0
+        for alternative in self.alternatives:
+            if _MAX_GROUPS:
+                alt_groups = re.compile(alternative).groups
+                if parts and nb_groups + alt_groups > _MAX_GROUPS:
+                    self.matchers.append(re.compile("|".join(parts)))
+                    parts = []
+                    nb_groups = 0
+
+                nb_groups += alt_groups
+
+            parts.append(alternative)
+
+        if parts:
+            self.matchers.append(re.compile("|".join(parts)))
+
+        # Free some memory
+        self.alternatives = None
+
+        for child in self.children.values():
+            child.compile()
+
+
+class _RouteTable(object):
+    """
+    Routes of an HTTP verb, stored in a tree of static path prefixes.
+    The routes sharing a prefix are combined in a single regex.
+    """
+
+    def __init__(self, routes):
+        """
+        :param routes: List of (route, group name, regex pattern, _Route)
+                       tuples, by order of priority
+        """
+        # Group name -> (priority, _Route)
+        self.__routes = {}  # type: Dict[str, Tuple[int, _Route]]
+
+        self.__root = _RouteNode()
+        for priority, (route, name, pattern, compiled) in enumerate(routes):
+            self.__routes[name] = (priority, compiled)
+
+            node = self.__root
+            for segment in _static_segments(route):
+                node = node.children.setdefault(segment, _RouteNode())
+            node.alternatives.append("(?P<{0}>{1})".format(name, pattern))
+
+        self.__root.compile()
+
+    def match(self, path):
+        # type: (str) -> Tuple[Optional[_Route], Any]
+        """
+        Looks for the route with the highest priority matching the given
+        path
+
+        :param path: A request sub-path
+        :return: A (_Route, regex match) tuple or (None, None)
+        """
+        if path[:1] == "/":
+            segments = path.split("/")[1:-1]
+        else:
+            segments = []
+
+        best = None
+        best_match = None
+        node = self.__root
+        depth = 0
+        while node is not None:
+            for matcher in node.matchers:
+                match = matcher.match(path)
+                if match is not None:
+                    found = self.__routes[match.lastgroup]
+                    if best is None or found[0] < best[0]:
+                        best = found
+                        best_match = match
+                    break
+
+            # Look for routes with a longer prefix
+            try:
+                node = node.children[segments[depth]]
+                depth += 1
+            except (IndexError, KeyError):
+                node = None
+
+        if best is None:
+            return None, None
+
+        return best[1], best_match
+
+
+# ------------------------------------------------------------------------------
+
+
 class RestDispatcher(object):
     """
     Parent class for servlets: dispatches requests according to the @Http
@@ -233,11 +419,8 @@ class RestDispatcher(object):
         """
         Looks for the methods where to dispatch requests
         """
-        # HTTP verb -> route pattern -> function
-        self.__routes = {}
-
-        # function -> arg name -> arg converter
-        self.__methods_args = {}
+        # HTTP verb -> routes
+        self.__routes = {}  # type: Dict[str, _RouteTable]
 
         # Find all REST methods
         self._setup_rest_dispatcher()
@@ -289,38 +472,14 @@ class RestDispatcher(object):
         http_verb = request.get_command()
         sub_path = request.get_sub_path()
 
-        # Find the best matching method, according to the number of
-        # readable arguments
-        max_valid_args = -1
-        best_method = None
-        best_args = None
-        best_match = None
-
-        for route, method in self.__routes.get(http_verb, {}).items():
-            # Parse the request path
-            match = route.match(sub_path)
-            if not match:
-                continue
+        # Find the best matching method, i.e. the one with the most readable
+        # arguments
+        try:
+            route, match = self.__routes[http_verb].match(sub_path)
+        except KeyError:
+            route = None
 
-            # Count the number of valid arguments
-            method_args = self.__methods_args[method]
-            nb_valid_args = 0
-            for name in method_args:
-                try:
-                    match.group(name)
-                    nb_valid_args += 1
-                except IndexError:
-                    # Argument not found
-                    pass
-
-            if nb_valid_args > max_valid_args:
-                # Found a better match
-                max_valid_args = nb_valid_args
-                best_method = method
-                best_args = method_args
-                best_match = match
-
-        if best_method is None:
+        if route is None:
             # No match: return a 404 plain text error
             response.send_content(
                 404,
@@ -328,45 +487,26 @@ class RestDispatcher(object):
                 "text/plain",
             )
         else:
-            # Found a method
-            # ... convert arguments
-            kwargs = {}
-            if best_args:
-                for name, converter in best_args.items():
-                    try:
-                        str_value = best_match.group(name)
-                    except IndexError:
-                        # Argument is missing: do nothing
-                        pass
-                    else:
-                        if str_value:
-                            # Keep the default value when an argument is
-                            # missing, i.e. don't give it in kwargs
-                            if converter is not None:
-                                # Convert the argument
-                                kwargs[name] = converter(str_value)
-                            else:
-                                # Use the string value as is
-                                kwargs[name] = str_value
-
-            # Prepare positional arguments
-            extra_pos_args = []
-            if kwargs:
-                # Ignore the first two parameters (request and response)
-                method_args = get_method_arguments(best_method).args[:2]
-                for pos_arg in method_args:
-                    try:
-                        extra_pos_args.append(kwargs.pop(pos_arg))
-                    except KeyError:
-                        pass
+            # Found a method: convert arguments
+            kwargs = route.get_arguments(match)
 
             # ... call the method (exceptions will be handled by the server)
-            best_method(request, response, *extra_pos_args, **kwargs)
+            route.method(request, response, **kwargs)
 
     def _setup_rest_dispatcher(self):
         """
-        Finds all methods to call when handling a route
+        Finds all methods to call when handling a route and compiles the
+        routes of each HTTP verb
         """
+        # HTTP verb -> route -> method
+        verbs_routes = {}  # type: Dict[str, Dict[str, Callable]]
+
+        # method -> arg name -> arg converter
+        methods_args = {}  # type: Dict[Callable, Dict[str, Callable]]
+
+        # route -> number of arguments
+        routes_args = {}  # type: Dict[str, int]
+
         for _, method in inspect.getmembers(self, inspect.isroutine):
             try:
                 config = getattr(method, HTTP_ROUTE_ATTRIBUTE)
@@ -375,14 +515,45 @@ class RestDispatcher(object):
                 continue
 
             for route in config["routes"]:
-                pattern, arguments = self.__convert_route(route)
-                self.__methods_args.setdefault(method, {}).update(arguments)
+                arguments = self.__convert_route(route)[1]
+                routes_args[route] = len(arguments)
+                methods_args.setdefault(method, {}).update(arguments)
                 for http_verb in config["methods"]:
-                    self.__routes.setdefault(http_verb, {})[pattern] = method
+                    verbs_routes.setdefault(http_verb, {})[route] = method
+
+        self.__routes.clear()
+        for http_verb, routes in verbs_routes.items():
+            # Routes with more arguments have a higher priority
+            sorted_routes = sorted(
+                routes.items(), key=lambda item: -routes_args[item[0]]
+            )
+
+            compiled = []
+            for idx, (route, method) in enumerate(sorted_routes):
+                name = "r{0}".format(idx)
+                pattern, arguments = self.__convert_route(route, name + "_")
+
+                method_args = methods_args[method]
+                compiled.append(
+                    (
+                        route,
+                        name,
+                        pattern,
+                        _Route(
+                            method,
+                            [
+                                (name + "_" + arg, arg, method_args[arg])
+                                for arg in arguments
+                            ],
+                        ),
+                    )
+                )
+
+            self.__routes[http_verb] = _RouteTable(compiled)
 
     @staticmethod
-    def __convert_route(route):
-        # type: (str) -> Tuple[Pattern[str], Dict[str, Callable[[str], Any]]]
+    def __convert_route(route, group_prefix=""):
+        # type: (str, str) -> Tuple[str, Dict[str, Callable[[str], Any]]]
         """
         Converts a route pattern into a regex.
         The result is a tuple containing the regex pattern to match and a
@@ -391,6 +562,7 @@ class RestDispatcher(object):
         A route can be: "/hello/<name>/<age:int>"
 
         :param route: A route string, i.e. a path with type markers
+        :param group_prefix: Prefix of the names of the regex groups
         :return: A tuple (pattern, {argument name: converter})
         """
         arguments = {}  # type: Dict[str, Callable[[str], Any]]
@@ -423,6 +595,7 @@ class RestDispatcher(object):
 
             # Generate the regex pattern for this part
             final_pattern.append("((?P<")
+            final_pattern.append(group_prefix)
             final_pattern.append(match_type.group(1))
             final_pattern.append(">")
             final_pattern.append(regex)
@@ -433,4 +606,4 @@ class RestDispatcher(object):
 
         # Ensure we don't accept trailing values
         final_pattern.append("$")
-        return re.compile("".join(final_pattern)), arguments
+        return "".join(final_pattern), arguments
@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Servlet serving the files of a directory.
+
+Files are sent with ``send_file()``, i.e. without copy when the HTTP service
+allows it. The servlet handles the ETag, Last-Modified, If-None-Match,
+If-Modified-Since, Range and If-Range headers. The metadata of the files is
+kept in cache for a short time.
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# Standard library
+import email.utils
+import mimetypes
+import os
+import stat
+import time
+
+try:
+    # Python 3
+    # pylint: disable=F0401,E0611
+    from urllib.parse import unquote
+except ImportError:
+    # Python 2
+    # pylint: disable=F0401
+    from urllib import unquote
+
+# Standard typing module should be optional
+try:
+    # pylint: disable=W0611
+    from typing import Dict, Optional, Tuple
+except ImportError:
+    pass
+
+# iPOPO decorators
+from pelix.ipopo.decorators import (
+    ComponentFactory,
+    Invalidate,
+    Property,
+    Provides,
+    Validate,
+)
+
+# HTTP service
+import pelix.http as http
+import pelix.http.content as content
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+INDEX_FILE = "index.html"
+""" File sent when a directory is requested """
+
+MAX_CACHE_SIZE = 1024
+""" Maximum number of entries in the metadata cache """
+
+# ------------------------------------------------------------------------------
+
+
+def parse_range(header, size):
+    # type: (Optional[str], int) -> Optional[Tuple[int, int]]
+    """
+    Parses the value of a Range header. Only single byte ranges are
+    supported.
+
+    :param header: Value of the Range header (can be None)
+    :param size: Size of the file
+    :return: The (first, last) positions of the range (inclusive), or None if
+             the header must be ignored
+    :raise ValueError: The range can't be satisfied
+    """
+    if not header:
+        return None
+
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        # Unknown unit or multiple ranges: send the whole file
+        return None
+
+    first, sep, last = ranges.partition("-")
+    first = first.strip()
+    last = last.strip()
+    if (
+        not sep
+        or not (first or last)
+        or (first and not first.isdigit())
+        or (last and not last.isdigit())
+    ):
+        # Invalid syntax
+        return None
+
+    if not first:
+        # Suffix range: last N bytes
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+
+        return max(0, size - suffix), size - 1
+
+    first = int(first)
+    if last:
+        last = int(last)
+        if first > last:
+            # Invalid range
+            return None
+    else:
+        last = size - 1
+
+    if first >= size:
+        raise ValueError("Range starts after the end of the file")
+
+    return first, min(last, size - 1)
+
+
+class _FileInfo(object):
+    """
+    Cached metadata of a file
+    """
+
+    __slots__ = (
+        "path",
+        "size",
+        "mtime",
+        "etag",
+        "last_modified",
+        "mime_type",
+        "checked",
+    )
+
+    def __init__(self, path, file_stat):
+        """
+        :param path: Real path of the file
+        :param file_stat: Result of os.stat()
+        """
+        self.path = path
+        self.size = file_stat.st_size
+        self.mtime = int(file_stat.st_mtime)
+        self.etag = "{0:x}-{1:x}".format(
+            int(file_stat.st_mtime * 1000000), file_stat.st_size
+        )
+        self.last_modified = email.utils.formatdate(self.mtime, usegmt=True)
+        self.mime_type = (
+            mimetypes.guess_type(path)[0] or "application/octet-stream"
+        )
+        self.checked = time.time()
+
+
+# ------------------------------------------------------------------------------
+
+
+@ComponentFactory(http.FACTORY_HTTP_STATIC)
+@Provides(http.HTTP_SERVLET)
+@Property("_path", http.HTTP_SERVLET_PATH, "/static")
+@Property("_root", http.HTTP_STATIC_ROOT, ".")
+@Property("_cache_ttl", http.HTTP_STATIC_CACHE_TTL, 1.0)
+class StaticFileServlet(object):
+    """
+    Servlet sending the files of a directory.
+
+    Can be instantiated as an iPOPO component or registered programmatically
+    to an HTTP service.
+    """
+
+    def __init__(self, root=None, cache_ttl=1.0):
+        """
+        :param root: Directory containing the files to serve
+        :param cache_ttl: Time (in seconds) the metadata of a file is kept
+                          without being checked
+        """
+        # Servlet path property
+        self._path = None
+
+        # Served directory
+        self._root = root
+        self.__real_root = None
+
+        # Request path -> _FileInfo
+        self._cache_ttl = cache_ttl
+        self.__cache = {}  # type: Dict[str, _FileInfo]
+
+    @Validate
+    def _validate(self, _):
+        """
+        Component validated
+        """
+        self.clear_cache()
+
+    @Invalidate
+    def _invalidate(self, _):
+        """
+        Component invalidated
+        """
+        self.clear_cache()
+
+    def clear_cache(self):
+        """
+        Clears the metadata cache
+        """
+        self.__real_root = None
+        self.__cache.clear()
+
+    def __get_real_path(self, path):
+        # type: (str) -> Optional[str]
+        """
+        Resolves the links of a path, relative to the served directory
+
+        :param path: A path, relative to the served directory, or absolute
+        :return: The real path, or None if it is outside the served directory
+        """
+        root = self.__real_root
+        path = os.path.realpath(os.path.join(root, path))
+        if path != root and not path.startswith(root.rstrip(os.sep) + os.sep):
+            return None
+
+        return path
+
+    def get_file_info(self, sub_path):
+        # type: (str) -> Optional[_FileInfo]
+        """
+        Retrieves the metadata of the file matching a request path
+
+        :param sub_path: Path of the file, relative to the served directory
+        :return: A _FileInfo bean, or None if the file can't be sent
+        """
+        info = self.__cache.get(sub_path)
+        if info is not None and time.time() - info.checked < self._cache_ttl:
+            return info
+
+        if self.__real_root is None:
+            self.__real_root = os.path.realpath(self._root or ".")
+
+        path = self.__get_real_path(unquote(sub_path).lstrip("/"))
+        if path is None:
+            # Outside the served directory
+            return None
+
+        info = None
+        try:
+            file_stat = os.stat(path)
+            if stat.S_ISDIR(file_stat.st_mode):
+                # The index file can be a link too
+                path = self.__get_real_path(os.path.join(path, INDEX_FILE))
+                file_stat = os.stat(path) if path is not None else None
+        except OSError:
+            # File not found
+            pass
+        else:
+            if file_stat is not None and stat.S_ISREG(file_stat.st_mode):
+                info = _FileInfo(path, file_stat)
+
+        if info is None:
+            self.__cache.pop(sub_path, None)
+        else:
+            if len(self.__cache) >= MAX_CACHE_SIZE:
+                self.__cache.clear()
+            self.__cache[sub_path] = info
+
+        return info
+
+    def do_GET(self, request, response):
+        # pylint: disable=C0103
+        """
+        Handles a GET request
+        """
+        sub_path = request.get_sub_path().split("?", 1)[0]
+        info = self.get_file_info(sub_path)
+        if info is None:
+            response.send_content(
+                404, "File not found: {0}".format(sub_path), "text/plain"
+            )
+            return
+
+        response.set_header("accept-ranges", "bytes")
+        response.set_header("last-modified", info.last_modified)
+        if content.check_etag(request, response, info.etag):
+            # Same version
+            return
+
+        modified_since = request.get_header("if-modified-since")
+        if modified_since and not request.get_header("if-none-match"):
+            try:
+                if info.mtime <= email.utils.mktime_tz(
+                    email.utils.parsedate_tz(modified_since)
+                ):
+                    response.set_response(304)
+                    response.end_headers()
+                    return
+            except (TypeError, ValueError, OverflowError):
+                # Invalid date
+                pass
+
+        offset = 0
+        length = info.size
+        code = 200
+
+        if_range = request.get_header("if-range")
+        if not if_range or if_range in (
+            content.format_etag(info.etag),
+            info.last_modified,
+        ):
+            try:
+                byte_range = parse_range(request.get_header("range"), length)
+            except ValueError:
+                response.set_header(
+                    "content-range", "bytes */{0}".format(info.size)
+                )
+                response.send_content(416, "", "text/plain")
+                return
+
+            if byte_range is not None:
+                offset, last = byte_range
+                length = last - offset + 1
+                code = 206
+                response.set_header(
+                    "content-range",
+                    "bytes {0}-{1}/{2}".format(offset, last, info.size),
+                )
+
+        if request.get_command() == "HEAD":
+            response.set_response(code)
+            response.set_header("content-type", info.mime_type)
+            response.set_header("content-length", length)
+            response.end_headers()
+        else:
+            response.send_file(info.path, offset, length, info.mime_type, code)
+
+    do_HEAD = do_GET
@@ -135,73 +135,45 @@ class _FactoryCounter(object):
         """
         return bool(self.__factored)
 
-    def _get_from_factory(self, factory, svc_registration):
-        # type: (Any, ServiceRegistration) -> Any
+    def get_factored(self, svc_ref):
+        # type: (ServiceReference) -> Tuple[bool, Any]
         """
-        Returns a service instance from a Prototype Service Factory
+        Returns the service instance a Service Factory already gave to the
+        bundle, and increases its usage counter
 
-        :param factory: The prototype service factory
-        :param svc_registration: The ServiceRegistration object
-        :return: The requested service instance returned by the factory
+        :param svc_ref: The reference to the service factory
+        :return: A (found, service instance) tuple
         """
-        svc_ref = svc_registration.get_reference()
         try:
-            # Use the existing service
             service, counter = self.__factored[svc_ref]
-            counter.inc()
         except KeyError:
-            # Create the service
-            service = factory.get_service(self.__bundle, svc_registration)
-            counter = _UsageCounter()
-            counter.inc()
+            return False, None
 
-            # Store the counter
-            self.__factored[svc_ref] = (service, counter)
-
-        return service
+        counter.inc()
+        return True, service
 
-    def _get_from_prototype(self, factory, svc_registration):
-        # type: (Any, ServiceRegistration) -> Any
+    def store_service(self, svc_ref, service):
+        # type: (ServiceReference, Any) -> None
         """
-        Returns a service instance from a Prototype Service Factory
+        Stores a service instance returned by a (Prototype) Service Factory
 
-        :param factory: The service factory
-        :param svc_registration: The ServiceRegistration object
-        :return: The requested service instance returned by the factory
+        :param svc_ref: The reference to the service factory
+        :param service: The service instance returned by the factory
         """
-        svc_ref = svc_registration.get_reference()
-        service = factory.get_service(self.__bundle, svc_registration)
-
         try:
-            # Check if the service already exists
+            # Check if the service already exists (prototypes)
             services, counter = self.__factored[svc_ref]
-            services.append(service)
-            counter.inc()
         except KeyError:
             counter = _UsageCounter()
             counter.inc()
 
             # Store the counter
-            self.__factored[svc_ref] = ([service], counter)
-
-        return service
-
-    def get_service(self, factory, svc_registration):
-        # type: (Any, ServiceRegistration) -> Any
-        """
-        Returns the service required by the bundle. The Service Factory is
-        called only when necessary while the Prototype Service Factory is
-        called each time
-
-        :param factory: The service factory
-        :param svc_registration: The ServiceRegistration object
-        :return: The requested service instance (created if necessary)
-        """
-        svc_ref = svc_registration.get_reference()
-        if svc_ref.is_prototype():
-            return self._get_from_prototype(factory, svc_registration)
-
-        return self._get_from_factory(factory, svc_registration)
+            if svc_ref.is_prototype():
+                service = [service]
+            self.__factored[svc_ref] = (service, counter)
+        else:
+            services.append(service)
+            counter.inc()
 
     def unget_service(self, factory, svc_registration, service=None):
         # type: (Any, ServiceRegistration, Any) -> bool
@@ -800,6 +772,38 @@ class EventDispatcher(object):
             except KeyError:
                 return False
 
+    def set_service_listener_filter(self, listener, ldap_filter=None):
+        """
+        Changes the filter of a service listener, keeping its position in the
+        listeners list
+
+        :param listener: The service listener
+        :param ldap_filter: The new filter on service properties
+                            (None to accept all services)
+        :return: True if the filter has been updated, False if the listener
+                 is unknown
+        :raise BundleException: Invalid filter
+        """
+        try:
+            ldap_filter = ldapfilter.get_ldap_filter(ldap_filter)
+        except ValueError as ex:
+            raise BundleException("Invalid service filter: {0}".format(ex))
+
+        with self.__svc_lock:
+            try:
+                data = self.__listeners_data[listener]
+            except KeyError:
+                return False
+
+            stored = ListenerInfo(
+                data.bundle_context, listener, data.specification, ldap_filter
+            )
+            self.__listeners_data[listener] = stored
+
+            spec_listeners = self.__svc_listeners[data.specification]
+            spec_listeners[spec_listeners.index(data)] = stored
+            return True
+
     def fire_bundle_event(self, event):
         """
         Notifies bundle events listeners of a new event in the calling thread.
@@ -1013,6 +1017,10 @@ class ServiceRegistry(object):
         # Pending unregistration: Service reference -> Service instance
         self.__pending_services = {}  # type: Dict[ServiceReference, Any]
 
+        # Services being created by factories:
+        # (Bundle, Service reference) -> (Creating thread, Event)
+        self.__pending_factories = {}  # type: Dict[Tuple[Any, ServiceReference], Tuple[threading.Thread, threading.Event]]
+
     def clear(self):
         """
         Clears the registry
@@ -1304,10 +1312,10 @@ class ServiceRegistry(object):
         :return: The requested service
         :raise BundleException: The service could not be found
         """
-        with self.__svc_lock:
-            if reference.is_factory():
-                return self.__get_service_from_factory(bundle, reference)
+        if reference.is_factory():
+            return self.__get_service_from_factory(bundle, reference)
 
+        with self.__svc_lock:
             # Be sure to have the instance
             try:
                 service = self.__svc_registry[reference]
@@ -1329,13 +1337,73 @@ class ServiceRegistry(object):
         Returns a service instance from a service factory or a prototype
         service factory
 
+        The factory is called without holding the registry lock, as it might
+        have to register or to get other services. Concurrent requests of the
+        same bundle to a service factory wait for the first one to create the
+        service.
+
         :param bundle: The bundle requiring the service
         :param reference: A reference pointing to a factory
         :return: The requested service
         :raise BundleException: The service could not be found
         """
+        key = (bundle, reference)
+        while True:
+            with self.__svc_lock:
+                try:
+                    factory, svc_reg = self.__svc_factories[reference]
+                except KeyError:
+                    # Not found
+                    raise BundleException(
+                        "Service not found (reference: {0})".format(reference)
+                    )
+
+                if reference.is_prototype():
+                    # A new instance for each call
+                    break
+
+                factory_counter = self.__factory_usage.get(bundle)
+                if factory_counter is not None:
+                    found, service = factory_counter.get_factored(reference)
+                    if found:
+                        return service
+
+                try:
+                    owner, event = self.__pending_factories[key]
+                except KeyError:
+                    # Create the service in this thread
+                    self.__pending_factories[key] = (
+                        threading.current_thread(),
+                        threading.Event(),
+                    )
+                    break
+
+                if owner is threading.current_thread():
+                    raise BundleException(
+                        "Recursive call to the service factory of {0}".format(
+                            reference
+                        )
+                    )
+
+            # Wait for the other thread to create the service
+            event.wait()
+
         try:
-            factory, svc_reg = self.__svc_factories[reference]
+            service = factory.get_service(bundle, svc_reg)
+        finally:
+            if not reference.is_prototype():
+                with self.__svc_lock:
+                    self.__pending_factories.pop(key)[1].set()
+
+        with self.__svc_lock:
+            if reference not in self.__svc_factories:
+                # Unregistered while the factory was working
+                if reference.is_prototype():
+                    factory.unget_service_instance(bundle, svc_reg, service)
+                factory.unget_service(bundle, svc_reg)
+                raise BundleException(
+                    "Service not found (reference: {0})".format(reference)
+                )
 
             # Indicate the dependency
             imports = self.__bundle_imports.setdefault(bundle, {})
@@ -1348,15 +1416,10 @@ class ServiceRegistry(object):
                 reference.used_by(bundle)
 
             # Check the per-bundle usage counter
-            factory_counter = self.__factory_usage.setdefault(
+            self.__factory_usage.setdefault(
                 bundle, _FactoryCounter(bundle)
-            )
-            return factory_counter.get_service(factory, svc_reg)
-        except KeyError:
-            # Not found
-            raise BundleException(
-                "Service not found (reference: {0})".format(reference)
-            )
+            ).store_service(reference, service)
+            return service
 
     def unget_used_services(self, bundle):
         """
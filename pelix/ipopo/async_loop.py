@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+iPOPO asyncio integration
+
+This bundle runs an asyncio event loop in a framework-owned thread and
+registers it as a service, used by iPOPO to run the ``async def`` callbacks
+of components (``@Validate``, ``@Invalidate``, ``@Bind``, ...).
+
+By default, the life-cycle of a component waits for the end of its coroutine
+callbacks, *i.e.* a component is only valid once its ``@Validate`` coroutine
+has returned. Set the ``pelix.ipopo.async.wait`` component property to False
+to schedule coroutine callbacks without waiting for them.
+
+This module requires Python 3.5+.
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# Standard library
+import asyncio
+import logging
+import threading
+
+# Standard typing module should be optional
+try:
+    # pylint: disable=W0611
+    from typing import Any, Awaitable
+    from pelix.framework import BundleContext, ServiceReference
+except ImportError:
+    pass
+
+# Pelix
+from pelix.constants import BundleActivator, BundleException
+from pelix.ipopo.constants import SERVICE_IPOPO_ASYNC_LOOP
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+_logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------------------
+
+
+async def _await(awaitable):
+    """
+    Wraps any awaitable in a coroutine, as required by
+    ``run_coroutine_threadsafe()``
+
+    :param awaitable: An awaitable object
+    :return: The result of the awaitable
+    """
+    return await awaitable
+
+
+async def get_service(bundle_context, svc_reference):
+    # type: (BundleContext, ServiceReference) -> Any
+    """
+    Awaitable version of ``BundleContext.get_service()``.
+
+    The service is retrieved in the default executor of the running loop, as
+    service factories (like lazy components) can take some time to provide it.
+
+    :param bundle_context: The calling bundle context
+    :param svc_reference: The reference of the service to get
+    :return: The requested service
+    :raise BundleException: Service not found
+    :raise TypeError: Invalid service reference
+    """
+    return await asyncio.get_event_loop().run_in_executor(
+        None, bundle_context.get_service, svc_reference
+    )
+
+
+class use_service(object):
+    # pylint: disable=C0103
+    """
+    Asynchronous version of ``pelix.utilities.use_service()``, to be used in
+    an ``async with`` block::
+
+        async with use_service(context, svc_ref) as svc:
+            await svc.do_something()
+    """
+
+    def __init__(self, bundle_context, svc_reference):
+        # type: (BundleContext, ServiceReference) -> None
+        """
+        :param bundle_context: The calling bundle context
+        :param svc_reference: The reference of the service to use
+        :raise TypeError: Invalid service reference
+        """
+        if svc_reference is None:
+            raise TypeError("Invalid ServiceReference")
+
+        self.__context = bundle_context
+        self.__reference = svc_reference
+
+    async def __aenter__(self):
+        """
+        Gets the service
+        """
+        return await get_service(self.__context, self.__reference)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        Releases the service
+        """
+        try:
+            self.__context.unget_service(self.__reference)
+        except BundleException:
+            # Service might have already been unregistered
+            pass
+
+        return False
+
+
+# ------------------------------------------------------------------------------
+
+
+class AsyncLoop(object):
+    """
+    Runs an asyncio event loop in its own thread
+    """
+
+    def __init__(self, name="pelix-ipopo-async-loop"):
+        """
+        :param name: Name of the event loop thread
+        """
+        self.__name = name
+        self.__loop = None  # type: asyncio.AbstractEventLoop
+        self.__thread = None  # type: threading.Thread
+        self.__ready = threading.Event()
+
+    @property
+    def loop(self):
+        # type: () -> asyncio.AbstractEventLoop
+        """
+        The event loop run by this service
+        """
+        return self.__loop
+
+    def is_loop_thread(self):
+        # type: () -> bool
+        """
+        Checks if the caller is running in the thread of the event loop
+        """
+        return threading.current_thread() is self.__thread
+
+    def start(self):
+        """
+        Starts the event loop thread
+        """
+        self.__loop = asyncio.new_event_loop()
+        self.__ready.clear()
+        self.__thread = threading.Thread(target=self.__run, name=self.__name)
+        self.__thread.daemon = True
+        self.__thread.start()
+        self.__ready.wait()
+
+    def stop(self):
+        """
+        Stops the event loop, cancelling the remaining tasks
+        """
+        loop = self.__loop
+        if loop is None:
+            return
+
+        loop.call_soon_threadsafe(loop.stop)
+        if not self.is_loop_thread():
+            self.__thread.join()
+
+        self.__thread = None
+        self.__loop = None
+
+    def __run(self):
+        """
+        Event loop thread
+        """
+        loop = self.__loop
+        asyncio.set_event_loop(loop)
+        loop.call_soon(self.__ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            # Cancel the remaining tasks
+            try:
+                tasks = asyncio.all_tasks(loop)
+            except AttributeError:
+                # Python < 3.7
+                tasks = asyncio.Task.all_tasks(loop)
+
+            for task in tasks:
+                task.cancel()
+
+            if tasks:
+                loop.run_until_complete(
+                    asyncio.gather(*tasks, return_exceptions=True)
+                )
+
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def submit(self, awaitable):
+        # type: (Awaitable) -> Any
+        """
+        Schedules the given awaitable in the event loop
+
+        :param awaitable: An awaitable object (coroutine, future, ...)
+        :return: A ``concurrent.futures.Future`` object
+        :raise ValueError: The event loop isn't running
+        """
+        if self.__loop is None:
+            raise ValueError("Event loop is not running")
+
+        return asyncio.run_coroutine_threadsafe(_await(awaitable), self.__loop)
+
+    def run(self, awaitable, timeout=None):
+        # type: (Awaitable, float) -> Any
+        """
+        Runs the given awaitable in the event loop and waits for its result.
+        Must not be called from the event loop thread.
+
+        :param awaitable: An awaitable object (coroutine, future, ...)
+        :param timeout: Maximum time to wait for the result (in seconds)
+        :return: The result of the awaitable
+        :raise ValueError: Called from the event loop thread
+        :raise Exception: Error raised by the awaitable
+        """
+        if self.is_loop_thread():
+            raise ValueError("Can't wait for a result in the event loop")
+
+        return self.submit(awaitable).result(timeout)
+
+    def execute(self, awaitable, wait=True):
+        # type: (Awaitable, bool) -> Any
+        """
+        Runs a coroutine returned by an iPOPO callback.
+
+        If *wait* is False, or if the callback has been called from the event
+        loop thread (where waiting would lock the loop), the coroutine is only
+        scheduled, and its errors are logged.
+
+        :param awaitable: The result of an ``async def`` callback
+        :param wait: If True, wait for the result of the coroutine
+        :return: The result of the coroutine, or None if not waited for
+        :raise Exception: Error raised by the coroutine
+        """
+        if wait and not self.is_loop_thread():
+            return self.run(awaitable)
+
+        self.submit(awaitable).add_done_callback(self.__log_error)
+        return None
+
+    @staticmethod
+    def __log_error(future):
+        """
+        Logs the error raised by a coroutine which wasn't waited for
+
+        :param future: A finished future
+        """
+        if not future.cancelled() and future.exception() is not None:
+            _logger.error(
+                "Error running a coroutine callback",
+                exc_info=future.exception(),
+            )
+
+
+# ------------------------------------------------------------------------------
+
+
+@BundleActivator
+class _Activator(object):
+    """
+    The bundle activator
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self._loop = None
+        self._registration = None
+
+    def start(self, context):
+        """
+        Bundle started
+        """
+        self._loop = AsyncLoop()
+        self._loop.start()
+
+        self._registration = context.register_service(
+            SERVICE_IPOPO_ASYNC_LOOP, self._loop, {}
+        )
+
+    def stop(self, _):
+        """
+        Bundle stopped
+        """
+        self._registration.unregister()
+        self._registration = None
+
+        self._loop.stop()
+        self._loop = None
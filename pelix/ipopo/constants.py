@@ -60,6 +60,9 @@ IPOPO_SERVICE_SPECIFICATION = SERVICE_IPOPO
 SERVICE_IPOPO_WAITING_LIST = "pelix.ipopo.waiting_list"
 """ iPOPO waiting list service specification """
 
+SERVICE_IPOPO_ASYNC_LOOP = "pelix.ipopo.async_loop"
+""" Specification of the service running coroutine callbacks """
+
 # ------------------------------------------------------------------------------
 
 HANDLER_REQUIRES = "ipopo.requires"
@@ -98,12 +101,17 @@ IPOPO_METHOD_FIELD_CALLBACKS = "__ipopo_field_callbacks__"
 IPOPO_FACTORY_CONTEXT = "__ipopo_factory_context__"
 """ Storage of the FactoryContext object """
 
+IPOPO_METHOD_OFFLOAD = "__ipopo_offload__"
+""" Contains the (pool name, original function) tuple of an offloaded method """
+
 # Method called by the injected property (must be injected in the instance)
 IPOPO_GETTER_SUFFIX = "_getter"
 IPOPO_SETTER_SUFFIX = "_setter"
 IPOPO_PROPERTY_PREFIX = "_ipopo_property"
 IPOPO_HIDDEN_PROPERTY_PREFIX = "_ipopo_hidden_property"
 IPOPO_CONTROLLER_PREFIX = "_ipopo_controller"
+IPOPO_PROPERTY_BATCH = "_ipopo_property_batch"
+IPOPO_OFFLOAD_PREFIX = "_ipopo_offload_"
 
 # Other injected information
 IPOPO_VALIDATE_ARGS = "__ipopo_validate_args__"
@@ -186,6 +194,18 @@ If True, the component will be re-instantiated after its bundle has been
 updated
 """
 
+IPOPO_POOL_OWNER = "pelix.ipopo.pool.owner"
+"""
+Name of the component holding the pool this component belongs to.
+Components with this property don't register their provided services.
+"""
+
+IPOPO_ASYNC_WAIT = "pelix.ipopo.async.wait"
+"""
+If False, the life-cycle of the component doesn't wait for the end of its
+coroutine callbacks (True by default)
+"""
+
 # ------------------------------------------------------------------------------
 
 
@@ -273,6 +293,36 @@ def use_waiting_list(bundle_context):
             pass
 
 
+@contextlib.contextmanager
+def properties_batch(component):
+    # type: (Any) -> Any
+    """
+    Utility context to update multiple properties of a component at once.
+    The properties are updated immediately in the component, but the service
+    properties are updated once, when exiting the outermost ``with`` block.
+    This avoids a ``MODIFIED`` service event per modified property.
+
+    .. code-block:: python
+
+        with properties_batch(self):
+            self.status = "busy"
+            self.load = 0.8
+
+    :param component: A component instance with properties
+    :raise TypeError: Not a component with properties
+    """
+    try:
+        batch = getattr(component, IPOPO_PROPERTY_BATCH)
+    except AttributeError:
+        batch = None
+
+    if batch is None:
+        raise TypeError("Not a component with properties")
+
+    with batch():
+        yield component
+
+
 # ------------------------------------------------------------------------------
 
 
@@ -299,14 +349,17 @@ class IPopoEvent(object):
     UNBOUND = 6
     """ A reference has been removed from the component """
 
+    UPDATED = 7
+    """ The properties of a reference injected in the component changed """
+
     KILLED = 9
     """ A component has been killed (removed from the list of instances) """
 
     UNREGISTERED = 10
     """ A component factory has been unregistered """
 
-    def __init__(self, kind, factory_name, component_name):
-        # type: (int, str, Optional[str]) -> None
+    def __init__(self, kind, factory_name, component_name, duration=None):
+        # type: (int, str, Optional[str], Optional[float]) -> None
         """
         Sets up the iPOPO event
 
@@ -314,10 +367,24 @@ class IPopoEvent(object):
         :param factory_name: Name of the factory associated to the event
         :param component_name: Name of the component instance associated to the
                                event
+        :param duration: Time spent in the component for this event, in
+                         seconds (optional)
         """
         self.__kind = kind
         self.__factory_name = factory_name
         self.__component_name = component_name
+        self.__duration = duration
+
+    def get_duration(self):
+        # type: () -> Optional[float]
+        """
+        Retrieves the time spent in the component for this event: in the
+        constructor for INSTANTIATED, in the callbacks for VALIDATED,
+        INVALIDATED, BOUND, UNBOUND and UPDATED
+
+        :return: A duration in seconds, or None
+        """
+        return self.__duration
 
     def get_component_name(self):
         # type: () -> Optional[str]
@@ -64,6 +64,7 @@ class Requirement(object):
         "aggregate",
         "optional",
         "immediate_rebind",
+        "immutable",
     )
 
     def __init__(
@@ -73,8 +74,9 @@ class Requirement(object):
         optional=False,
         spec_filter=None,
         immediate_rebind=False,
+        immutable=False,
     ):
-        # type: (str, bool, bool, Any, bool) -> None
+        # type: (str, bool, bool, Any, bool, bool) -> None
         """
         Sets up the requirement
 
@@ -87,6 +89,9 @@ class Requirement(object):
                                  then re-validated if a matching service is
                                  available when the injected dependency is
                                  unbound
+        :param immutable: If True, aggregated dependencies are injected as
+                          read-only snapshots (tuples or mapping proxies),
+                          rebuilt only when the bindings change
         :raise TypeError: A parameter has an invalid type
         :raise ValueError: An error occurred while parsing the filter
         """
@@ -100,6 +105,7 @@ class Requirement(object):
         self.aggregate = aggregate
         self.optional = optional
         self.immediate_rebind = immediate_rebind
+        self.immutable = immutable
 
         # Original filter keeper
         self.__original_filter = None  # type: str
@@ -150,13 +156,11 @@ class Requirement(object):
 
         :return: A copy of this instance
         """
-        return Requirement(
-            self.specification,
-            self.aggregate,
-            self.optional,
-            self.__original_filter,
-            self.immediate_rebind,
-        )
+        # Parsed filters are never modified in place: share them instead of
+        # parsing them again
+        requirement = object.__new__(type(self))
+        requirement.__dict__.update(self.__dict__)
+        return requirement
 
     def matches(self, properties):
         # type: (Optional[dict]) -> bool
@@ -230,6 +234,61 @@ class Requirement(object):
 # ------------------------------------------------------------------------------
 
 
+class InstantiationPlan(object):
+    """
+    Description of a component factory, computed once and shared by all of
+    its instances: only their mutable state is allocated on instantiation.
+
+    The plan must be considered immutable: it is replaced by a new one when
+    the configuration of the factory context changes.
+    """
+
+    __slots__ = (
+        "handlers_ids",
+        "properties",
+        "hidden_properties",
+        "hidden_keys",
+        "__prepared",
+    )
+
+    def __init__(self, factory_context):
+        # type: (FactoryContext) -> None
+        """
+        :param factory_context: The factory context to describe
+        """
+        # IDs of the handlers required by the factory
+        self.handlers_ids = tuple(factory_context.get_handlers_ids())
+
+        # Default public and hidden properties
+        self.properties = factory_context.properties.copy()
+        self.hidden_properties = factory_context.hidden_properties.copy()
+        self.hidden_keys = frozenset(self.hidden_properties)
+
+        # Handler ID -> configuration prepared by its handler factory
+        self.__prepared = {}
+
+    def get_prepared(self, handler_id, builder, configuration):
+        # type: (str, Callable[[Any], Any], Any) -> Any
+        """
+        Returns the configuration of the given handler, as prepared by its
+        handler factory for all the instances of the factory. The builder
+        is called on the first call only.
+
+        :param handler_id: The ID of the configured handler
+        :param builder: A method converting the handler configuration into
+                        the prepared one
+        :param configuration: The handler configuration
+        :return: The prepared configuration
+        """
+        try:
+            return self.__prepared[handler_id]
+        except KeyError:
+            # Concurrent calls can build the same content: keep the first one
+            return self.__prepared.setdefault(
+                handler_id, builder(configuration)
+            )
+
+
 class FactoryContext(object):
     """
     Represents the data stored in a component factory (class)
@@ -249,6 +308,8 @@ class FactoryContext(object):
         "__handlers",
         "__inherited_configuration",
         "__instances",
+        "__lazy_instances",
+        "__plan",
     )
 
     def __init__(self):
@@ -294,6 +355,12 @@ class FactoryContext(object):
         # Instance name -> Instance properties
         self.__instances = {}
 
+        # Names of the instances to start on first use
+        self.__lazy_instances = set()
+
+        # Instantiation plan (computed on demand)
+        self.__plan = None  # type: InstantiationPlan
+
     def __eq__(self, other):
         """
         Equality test
@@ -359,6 +426,7 @@ class FactoryContext(object):
 
         # Remove instances in any case
         new_context.__instances.clear()
+        new_context.__lazy_instances.clear()
         new_context.is_singleton_active = False
         return new_context
 
@@ -395,15 +463,18 @@ class FactoryContext(object):
 
         # Clear the inherited configuration dictionary
         self.__inherited_configuration.clear()
+        self.__plan = None
 
-    def add_instance(self, name, properties):
-        # type: (str, dict) -> None
+    def add_instance(self, name, properties, lazy=False):
+        # type: (str, dict, bool) -> None
         """
         Stores the description of a component instance. The given properties
         are stored as is.
 
         :param name: Instance name
         :param properties: Instance properties
+        :param lazy: If True, the component will be instantiated on the first
+                     use of one of its services
         :raise NameError: Already known instance name
         """
         if name in self.__instances:
@@ -411,6 +482,8 @@ class FactoryContext(object):
 
         # Store properties "as-is"
         self.__instances[name] = properties
+        if lazy:
+            self.__lazy_instances.add(name)
 
     def get_instances(self):
         # type: () -> Dict[str, dict]
@@ -421,6 +494,16 @@ class FactoryContext(object):
         """
         return self._deepcopy(self.__instances)
 
+    def is_lazy_instance(self, name):
+        # type: (str) -> bool
+        """
+        Checks if the given instance must be started on first use
+
+        :param name: Instance name
+        :return: True if the instance has been declared as lazy
+        """
+        return name in self.__lazy_instances
+
     def get_handlers_ids(self):
         # type: () -> List[str]
         """
@@ -449,6 +532,7 @@ class FactoryContext(object):
         :param default: The default configuration value to store if none exists
         :return: The existing configuration or the given default
         """
+        self.__plan = None
         return self.__handlers.setdefault(handler_id, default)
 
     def set_handler(self, handler_id, configuration):
@@ -459,8 +543,30 @@ class FactoryContext(object):
         :param handler_id: The ID of the configured handler
         :param configuration: The complete configuration of the handler
         """
+        self.__plan = None
         self.__handlers[handler_id] = configuration
 
+    def get_plan(self):
+        # type: () -> InstantiationPlan
+        """
+        Returns the instantiation plan of the factory, computing it if
+        necessary
+
+        :return: The instantiation plan of the factory
+        """
+        plan = self.__plan
+        if plan is None:
+            plan = self.__plan = InstantiationPlan(self)
+        return plan
+
+    def reset_plan(self):
+        # type: () -> None
+        """
+        Forgets the current instantiation plan. Must be called after a direct
+        modification of the properties of a completed factory context.
+        """
+        self.__plan = None
+
     def set_bundle_context(self, bundle_context):
         # type: (BundleContext) -> None
         """
@@ -480,7 +586,13 @@ class ComponentContext(object):
     """
 
     # Try to reduce memory footprint (many instances)
-    __slots__ = ("factory_context", "name", "properties", "__hidden_properties")
+    __slots__ = (
+        "factory_context",
+        "name",
+        "properties",
+        "__hidden_properties",
+        "__lazy_registrations",
+    )
 
     def __init__(self, factory_context, name, properties):
         # type: (FactoryContext, str, dict) -> None
@@ -496,29 +608,24 @@ class ComponentContext(object):
         # Force the instance name property
         properties[constants.IPOPO_INSTANCE_NAME] = name
 
-        # Hidden properties
-        hidden_props_keys = set(properties).intersection(
-            factory_context.hidden_properties
-        )
+        # Start from the default properties of the factory
+        plan = factory_context.get_plan()
+        self.__hidden_properties = plan.hidden_properties.copy()
+        self.properties = plan.properties.copy()
 
-        self.__hidden_properties = factory_context.hidden_properties.copy()
-        self.__hidden_properties.update(
-            {
-                key: value
-                for key, value in properties.items()
-                if key in hidden_props_keys
-            }
-        )
+        hidden_props_keys = plan.hidden_keys.intersection(properties)
+        if not hidden_props_keys:
+            # Public properties only (most common case)
+            self.properties.update(properties)
+        else:
+            for key, value in properties.items():
+                if key in hidden_props_keys:
+                    self.__hidden_properties[key] = value
+                else:
+                    self.properties[key] = value
 
-        # Public properties
-        self.properties = factory_context.properties.copy()
-        self.properties.update(
-            {
-                key: value
-                for key, value in properties.items()
-                if key not in hidden_props_keys
-            }
-        )
+        # Placeholder registrations of a lazy component
+        self.__lazy_registrations = None
 
     def get_bundle_context(self):
         # type: () -> BundleContext
@@ -602,3 +709,43 @@ class ComponentContext(object):
         self.__hidden_properties.clear()
         del self.__hidden_properties
         return result
+
+    def set_lazy_registrations(self, registrations):
+        # type: (Dict[Tuple[str, ...], Any]) -> None
+        """
+        Stores the placeholder service registrations of a lazy component, to
+        be adopted by its service providers handlers
+
+        :param registrations: A specifications tuple → ServiceRegistration
+                              dictionary
+        """
+        self.__lazy_registrations = registrations
+
+    def grab_lazy_registration(self, specifications):
+        # type: (Iterable[str]) -> Any
+        """
+        A one-shot access to the placeholder registration of the given
+        specifications
+
+        :param specifications: Specifications of a provided service
+        :return: The placeholder ServiceRegistration, or None
+        """
+        if not self.__lazy_registrations:
+            return None
+
+        return self.__lazy_registrations.pop(tuple(specifications), None)
+
+    def clear_lazy_registrations(self):
+        # type: () -> List[Any]
+        """
+        Retrieves the placeholder registrations which haven't been adopted and
+        forgets about them
+
+        :return: The list of remaining placeholder registrations
+        """
+        if not self.__lazy_registrations:
+            return []
+
+        registrations = list(self.__lazy_registrations.values())
+        self.__lazy_registrations.clear()
+        return registrations
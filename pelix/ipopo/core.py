@@ -41,7 +41,7 @@ except ImportError:
     pass
 
 # Pelix
-from pelix.constants import SERVICE_ID, BundleActivator
+from pelix.constants import OBJECTCLASS, SERVICE_ID, BundleActivator
 from pelix.framework import Bundle, BundleException
 from pelix.internals.events import BundleEvent, ServiceEvent
 from pelix.utilities import add_listener, remove_listener, is_string
@@ -52,7 +52,7 @@ import pelix.ipopo.handlers.constants as handlers_const
 
 # iPOPO beans
 from pelix.ipopo.contexts import FactoryContext, ComponentContext
-from pelix.ipopo.instance import StoredInstance
+from pelix.ipopo.instance import ComponentStats, StoredInstance
 
 # ------------------------------------------------------------------------------
 
@@ -154,6 +154,111 @@ def _load_bundle_factories(bundle):
 # ------------------------------------------------------------------------------
 
 
+class _LazyComponent(object):
+    """
+    Service factory registered as a placeholder for the services of a lazy
+    component: the component is instantiated on the first request of one of
+    its services
+    """
+
+    def __init__(self, ipopo_service, name):
+        # type: (_IPopoService, str) -> None
+        """
+        :param ipopo_service: The iPOPO service
+        :param name: Name of the lazy component
+        """
+        self.__ipopo = ipopo_service
+        self.__name = name
+        self.__lock = threading.RLock()
+        self.__activated = False
+        self.__stored_instance = None  # type: StoredInstance
+
+        # Specifications -> Placeholder registration
+        self.registrations = {}  # type: Dict[Tuple[str, ...], Any]
+
+    @property
+    def activated(self):
+        # type: () -> bool
+        """
+        Flag indicating if the instantiation of the component has been
+        triggered
+        """
+        return self.__activated
+
+    def store_registration(self, registration):
+        """
+        Keeps track of a placeholder registration
+
+        :param registration: A ServiceRegistration object
+        """
+        specs = registration.get_reference().get_property(OBJECTCLASS)
+        self.registrations[tuple(specs)] = registration
+
+    def register_placeholders(self, bundle_context, specifications, properties):
+        # type: (BundleContext, List[List[str]], dict) -> None
+        """
+        Registers the placeholder services. Stops if the component has been
+        instantiated during the registration of a previous placeholder.
+
+        :param bundle_context: The context of the bundle of the component
+        :param specifications: The specifications of the provided services
+        :param properties: The properties of the placeholder services
+        """
+        with self.__lock:
+            for specs in specifications:
+                if self.__activated:
+                    # Instantiated while registering the previous placeholder
+                    break
+
+                self.store_registration(
+                    bundle_context.register_service(
+                        specs, self, properties.copy(), factory=True
+                    )
+                )
+
+    def get_service(self, bundle, registration):
+        """
+        Instantiates the component on the first request
+
+        :param bundle: The bundle requesting the service
+        :param registration: The placeholder registration
+        :return: The component instance
+        :raise BundleException: The component couldn't be validated
+        """
+        with self.__lock:
+            if not self.__activated:
+                # The registration might be used before register_service()
+                # returned (during the REGISTERED event)
+                self.store_registration(registration)
+                self.__activated = True
+
+                # pylint: disable=W0212
+                self.__stored_instance = self.__ipopo._activate_lazy(
+                    self.__name
+                )
+
+            stored_instance = self.__stored_instance
+
+        if (
+            stored_instance is None
+            or stored_instance.state != StoredInstance.VALID
+        ):
+            raise BundleException(
+                "Lazy component '{0}' is not valid".format(self.__name)
+            )
+
+        return stored_instance.instance
+
+    def unget_service(self, bundle, registration):
+        """
+        Nothing to do: the component lives until it is killed
+        """
+        pass
+
+
+# ------------------------------------------------------------------------------
+
+
 class _IPopoService(object):
     """
     The iPOPO registry and service.
@@ -176,6 +281,9 @@ class _IPopoService(object):
         # Instances registry : name -> StoredInstance object
         self.__instances = {}  # type: Dict[str, StoredInstance]
 
+        # Lazy instances: Name -> (ComponentContext, placeholder factory)
+        self.__lazy_instances = {}  # type: Dict[str, Tuple[ComponentContext, _LazyComponent]]
+
         # Event listeners
         self.__listeners = []  # type: List[Any]
 
@@ -195,9 +303,24 @@ class _IPopoService(object):
         self._handlers_refs = set()  # type: Set[ServiceReference]
         self._handlers = {}  # type: Dict[str, Any]
 
+        # Resolved handler factories: Handlers IDs -> Handler factories
+        self.__handler_factories_cache = {}  # type: Dict[Tuple[str, ...], Tuple[Any, ...]]
+
+        # Incremented each time a handler factory comes or goes
+        self.__handlers_generation = 0
+
+        # Names of the components being instantiated
+        self.__reserved_names = set()  # type: Set[str]
+
         # Instances waiting for a handler: Name -> (ComponentContext, instance)
         self.__waiting_handlers = {}  # type: Dict[str, Tuple[ComponentContext, Any]]
 
+        # Missing handler ID -> Names of the instances waiting for it
+        self.__missing_handlers = {}  # type: Dict[str, Set[str]]
+
+        # Statistics of the components not yet managed: Name -> Stats
+        self.__pending_stats = {}  # type: Dict[str, ComponentStats]
+
         # Register the service listener
         bundle_context.add_service_listener(
             self, None, handlers_const.SERVICE_IPOPO_HANDLER_FACTORY
@@ -230,23 +353,33 @@ class _IPopoService(object):
             if handler_id in self._handlers:
                 # Duplicated ID
                 _logger.warning("Already registered handler ID: %s", handler_id)
-            else:
-                # Store the service
-                self._handlers_refs.add(svc_ref)
-                self._handlers[handler_id] = self.__context.get_service(svc_ref)
+                return
 
-                # Try to instantiate waiting components
-                succeeded = set()
-                for (
-                    name,
-                    (context, instance),
-                ) in self.__waiting_handlers.items():
-                    if self.__try_instantiate(context, instance):
-                        succeeded.add(name)
+            handler_factory = self.__context.get_service(svc_ref)
+            with self.__instances_lock:
+                # Store the service: the instances lock excludes the
+                # components being put in the waiting queue
+                self._handlers_refs.add(svc_ref)
+                self._handlers[handler_id] = handler_factory
+                self.__handlers_changed()
+
+                # Take the components waiting for this handler, keeping their
+                # names reserved until they are instantiated
+                to_start = [
+                    self.__pop_waiting(name)
+                    for name in self.__missing_handlers.pop(handler_id, ())
+                ]
+                for context, _ in to_start:
+                    self.__reserved_names.add(context.name)
 
-                # Remove instantiated component from the waiting list
-                for name in succeeded:
-                    del self.__waiting_handlers[name]
+        # Try to instantiate the components waiting for this handler
+        # (they go back to the waiting queue if another one is missing)
+        for context, instance in to_start:
+            try:
+                self.__try_instantiate(context, instance)
+            finally:
+                with self.__instances_lock:
+                    self.__reserved_names.discard(context.name)
 
     def __remove_handler_factory(self, svc_ref):
         # type: (ServiceReference) -> None
@@ -265,19 +398,22 @@ class _IPopoService(object):
 
             # Clean up
             self.__context.unget_service(svc_ref)
-            self._handlers_refs.remove(svc_ref)
-            del self._handlers[handler_id]
-
-            # List the components using this handler
-            to_stop = set()  # type: Set[StoredInstance]
-            for factory_name in self.__factories:
-                _, factory_context = self.__get_factory_with_context(
-                    factory_name
-                )
-                if handler_id in factory_context.get_handlers_ids():
-                    to_stop.update(self.__get_stored_instances(factory_name))
-
             with self.__instances_lock:
+                self._handlers_refs.remove(svc_ref)
+                del self._handlers[handler_id]
+                self.__handlers_changed()
+
+                # List the components using this handler
+                to_stop = set()  # type: Set[StoredInstance]
+                for factory_name in self.__factories:
+                    _, factory_context = self.__get_factory_with_context(
+                        factory_name
+                    )
+                    if handler_id in factory_context.get_handlers_ids():
+                        to_stop.update(
+                            self.__get_stored_instances(factory_name)
+                        )
+
                 for stored_instance in to_stop:
                     # Extract information
                     context = stored_instance.context
@@ -287,9 +423,10 @@ class _IPopoService(object):
                     # Clean up the stored instance (iPOPO side)
                     del self.__instances[name]
                     stored_instance.kill()
+                    self.__pending_stats[name] = stored_instance.stats
 
                     # Add the component to the waiting queue
-                    self.__waiting_handlers[name] = (context, instance)
+                    self.__add_waiting(context, instance)
 
             # Try to find a new handler factory
             new_ref = self.__context.get_service_reference(
@@ -323,17 +460,42 @@ class _IPopoService(object):
 
         return factory, factory_context
 
+    def __handlers_changed(self):
+        """
+        Clears the resolved handler factories cache (must be called with the
+        handlers and instances locks)
+        """
+        self.__handlers_generation += 1
+        self.__handler_factories_cache.clear()
+
     def __get_handler_factories(self, handlers_ids):
-        # type: (list) -> set
+        # type: (Tuple[str, ...]) -> Tuple[Optional[Tuple[Any, ...]], int]
         """
-        Returns the list of Handler Factories for the given Handlers IDs.
-        Raises a KeyError exception is a handler factory is missing.
+        Returns the Handler Factories for the given Handlers IDs, and the
+        generation of the handlers they were resolved in.
 
-        :param handlers_ids: List of handlers IDs
-        :raise KeyError: A handler is missing
+        :param handlers_ids: Tuple of handlers IDs
+        :return: A (handler factories, handlers generation) tuple. Handler
+                 factories are None if one of them is missing
         """
-        # Look for the required handlers
-        return {self._handlers[handler_id] for handler_id in handlers_ids}
+        with self.__handlers_lock:
+            generation = self.__handlers_generation
+            try:
+                return self.__handler_factories_cache[handlers_ids], generation
+            except KeyError:
+                pass
+
+            try:
+                # Look for the required handlers
+                factories = tuple(
+                    {self._handlers[handler_id] for handler_id in handlers_ids}
+                )
+            except KeyError:
+                # A handler is missing
+                return None, generation
+
+            self.__handler_factories_cache[handlers_ids] = factories
+            return factories, generation
 
     def __get_stored_instances(self, factory_name):
         # type: (str) -> List[StoredInstance]
@@ -351,30 +513,86 @@ class _IPopoService(object):
                 if stored_instance.factory_name == factory_name
             ]
 
+    def __add_waiting(self, component_context, instance):
+        # type: (ComponentContext, Any) -> None
+        """
+        Puts a component in the waiting queue and indexes it by missing
+        handler (must be called with the instances lock)
+
+        :param component_context: A ComponentContext bean
+        :param instance: The component instance
+        """
+        name = component_context.name
+        plan = component_context.factory_context.get_plan()
+        self.__waiting_handlers[name] = (component_context, instance)
+        for handler_id in plan.handlers_ids:
+            if handler_id not in self._handlers:
+                self.__missing_handlers.setdefault(handler_id, set()).add(name)
+
+    def __pop_waiting(self, name):
+        # type: (str) -> Tuple[ComponentContext, Any]
+        """
+        Removes a component from the waiting queue and from the missing
+        handlers index (must be called with the instances lock)
+
+        :param name: Name of the waiting component
+        :return: The (ComponentContext, instance) tuple of the component
+        :raise KeyError: Component not in the waiting queue
+        """
+        component_context, instance = self.__waiting_handlers.pop(name)
+        plan = component_context.factory_context.get_plan()
+        for handler_id in plan.handlers_ids:
+            names = self.__missing_handlers.get(handler_id)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.__missing_handlers[handler_id]
+
+        return component_context, instance
+
     def __try_instantiate(self, component_context, instance):
         # type: (ComponentContext, object) -> bool
         """
         Instantiates a component, if all of its handlers are there. Returns
-        False if a handler is missing.
+        False if a handler is missing: in that case, the component has been
+        put in the waiting queue.
+
+        Handlers are created without holding the instances lock: the name of
+        the component must have been reserved by the caller.
+
+        The component can be killed while it is being started: the
+        StoredInstance bean ignores the start and validation calls once
+        killed.
 
         :param component_context: A ComponentContext bean
         :param instance: The component instance
         :return: True if the component has started,
                  False if a handler is missing
         """
+        # Extract information about the component
+        factory_context = component_context.factory_context
+        handlers_ids = factory_context.get_plan().handlers_ids
+        name = component_context.name
+        factory_name = factory_context.name
+
         with self.__instances_lock:
-            # Extract information about the component
-            factory_context = component_context.factory_context
-            handlers_ids = factory_context.get_handlers_ids()
-            name = component_context.name
-            factory_name = factory_context.name
+            stats = self.__pending_stats.pop(name, None)
 
-            try:
-                # Get handlers
-                handler_factories = self.__get_handler_factories(handlers_ids)
-            except KeyError:
-                # A handler is missing, stop here
-                return False
+        while True:
+            # Get handlers
+            handler_factories, generation = self.__get_handler_factories(
+                handlers_ids
+            )
+            if handler_factories is None:
+                # A handler is missing, put the component in the queue, unless
+                # a handler came in the meantime
+                with self.__instances_lock:
+                    if self.__handlers_generation == generation:
+                        self.__add_waiting(component_context, instance)
+                        if stats is not None:
+                            self.__pending_stats[name] = stats
+                        return False
+                continue
 
             # Instantiate the handlers
             all_handlers = set()  # type: Set[Any]
@@ -387,22 +605,34 @@ class _IPopoService(object):
 
             # Prepare the stored instance
             stored_instance = StoredInstance(
-                self, component_context, instance, all_handlers
+                self, component_context, instance, all_handlers, stats
             )
 
             # Manipulate the properties
             for handler in all_handlers:
                 handler.manipulate(stored_instance, instance)
 
-            # Store the instance
-            self.__instances[name] = stored_instance
+            # Store the instance, if the handlers didn't change meanwhile
+            with self.__instances_lock:
+                if self.__handlers_generation == generation:
+                    self.__instances[name] = stored_instance
+                    break
+
+            # Handlers changed: start over
+            stats = stored_instance.stats
 
         # Start the manager
         stored_instance.start()
+        if stored_instance.state == StoredInstance.KILLED:
+            # Killed while starting
+            return True
 
         # Notify listeners now that every thing is ready to run
         self._fire_ipopo_event(
-            constants.IPopoEvent.INSTANTIATED, factory_name, name
+            constants.IPopoEvent.INSTANTIATED,
+            factory_name,
+            name,
+            stored_instance.stats.get_last(ComponentStats.CONSTRUCTOR),
         )
 
         # Try to validate it
@@ -477,8 +707,10 @@ class _IPopoService(object):
             except KeyError:
                 pass
 
-    def _fire_ipopo_event(self, kind, factory_name, instance_name=None):
-        # type: (int, str, Optional[str]) -> None
+    def _fire_ipopo_event(
+        self, kind, factory_name, instance_name=None, duration=None
+    ):
+        # type: (int, str, Optional[str], Optional[float]) -> None
         """
         Triggers an iPOPO event
 
@@ -486,6 +718,7 @@ class _IPopoService(object):
         :param factory_name: Name of the factory associated to the event
         :param instance_name: Name of the component instance associated to the
                               event
+        :param duration: Time spent in the component for this event
         """
         with self.__listeners_lock:
             # Use a copy of the list of listeners
@@ -494,7 +727,9 @@ class _IPopoService(object):
         for listener in listeners:
             try:
                 listener.handle_ipopo_event(
-                    constants.IPopoEvent(kind, factory_name, instance_name)
+                    constants.IPopoEvent(
+                        kind, factory_name, instance_name, duration
+                    )
                 )
             except:
                 _logger.exception("Error calling an iPOPO event handler")
@@ -556,7 +791,10 @@ class _IPopoService(object):
             else:
                 # Instantiate components
                 for name, properties in context.get_instances().items():
-                    self.instantiate(context.name, name, properties)
+                    if context.is_lazy_instance(name):
+                        self.instantiate_lazy(context.name, name, properties)
+                    else:
+                        self.instantiate(context.name, name, properties)
 
     def _register_factory(self, factory_name, factory, override):
         # type: (str, type, bool) -> None
@@ -698,13 +936,11 @@ class _IPopoService(object):
 
         if kind == ServiceEvent.REGISTERED:
             # Service coming
-            with self.__instances_lock:
-                self.__add_handler_factory(svc_ref)
+            self.__add_handler_factory(svc_ref)
 
         elif kind == ServiceEvent.UNREGISTERING:
             # Service gone
-            with self.__instances_lock:
-                self.__remove_handler_factory(svc_ref)
+            self.__remove_handler_factory(svc_ref)
 
     def instantiate(self, factory_name, name, properties=None):
         # type: (str, str, dict) -> Any
@@ -732,11 +968,11 @@ class _IPopoService(object):
             raise ValueError("Framework is stopping")
 
         with self.__instances_lock:
-            if name in self.__instances or name in self.__waiting_handlers:
-                raise ValueError(
-                    "'{0}' is an already running instance name".format(name)
-                )
+            # Reserve the name while the component is being set up
+            self.__check_instance_name(name)
+            self.__reserved_names.add(name)
 
+        try:
             with self.__factories_lock:
                 # Can raise a TypeError exception
                 factory, factory_context = self.__get_factory_with_context(
@@ -745,29 +981,10 @@ class _IPopoService(object):
 
                 # Check if the factory is singleton and if a component is
                 # already started
-                if (
-                    factory_context.is_singleton
-                    and factory_context.is_singleton_active
-                ):
-                    raise ValueError(
-                        "{0} is a singleton: {1} can't be "
-                        "instantiated.".format(factory_name, name)
-                    )
+                self.__check_singleton(factory_context, name)
 
                 # Create component instance
-                try:
-                    instance = factory()
-                except Exception:
-                    _logger.exception(
-                        "Error creating the instance '%s' from factory '%s'",
-                        name,
-                        factory_name,
-                    )
-                    raise TypeError(
-                        "Factory '{0}' failed to create '{1}'".format(
-                            factory_name, name
-                        )
-                    )
+                instance = self.__create_instance(factory, factory_name, name)
 
                 # Instantiation succeeded: update singleton status
                 if factory_context.is_singleton:
@@ -783,13 +1000,290 @@ class _IPopoService(object):
                 factory_context, name, properties
             )
 
-            # Try to instantiate the component immediately
-            if not self.__try_instantiate(component_context, instance):
-                # A handler is missing, put the component in the queue
-                self.__waiting_handlers[name] = (component_context, instance)
+            # Try to instantiate the component immediately, else it will
+            # wait for its handlers
+            self.__try_instantiate(component_context, instance)
+        finally:
+            with self.__instances_lock:
+                self.__reserved_names.discard(name)
+
+        return instance
+
+    def __check_instance_name(self, name):
+        # type: (str) -> None
+        """
+        Checks if the given instance name is available
+
+        :param name: A component instance name
+        :raise ValueError: The name is already used
+        """
+        if (
+            name in self.__instances
+            or name in self.__waiting_handlers
+            or name in self.__lazy_instances
+            or name in self.__reserved_names
+        ):
+            raise ValueError(
+                "'{0}' is an already running instance name".format(name)
+            )
+
+    @staticmethod
+    def __check_singleton(factory_context, name):
+        # type: (FactoryContext, str) -> None
+        """
+        Checks if a component can be instantiated from the given factory
+
+        :param factory_context: The factory context
+        :param name: Name of the new component instance
+        :raise ValueError: A singleton component is already active
+        """
+        if factory_context.is_singleton and factory_context.is_singleton_active:
+            raise ValueError(
+                "{0} is a singleton: {1} can't be instantiated.".format(
+                    factory_context.name, name
+                )
+            )
+
+    def __create_instance(self, factory, factory_name, name):
+        # type: (type, str, str) -> Any
+        """
+        Calls the constructor of the component and times it
+
+        :param factory: The factory class
+        :param factory_name: The factory name
+        :param name: The component instance name
+        :return: The component instance
+        :raise TypeError: Error calling the constructor
+        """
+        stats = ComponentStats()
+        start = stats.now()
+        try:
+            instance = factory()
+        except Exception:
+            _logger.exception(
+                "Error creating the instance '%s' from factory '%s'",
+                name,
+                factory_name,
+            )
+            raise TypeError(
+                "Factory '{0}' failed to create '{1}'".format(
+                    factory_name, name
+                )
+            )
 
+        stats.record(ComponentStats.CONSTRUCTOR, start)
+        self.__pending_stats[name] = stats
         return instance
 
+    def instantiate_lazy(self, factory_name, name, properties=None):
+        # type: (str, str, dict) -> bool
+        """
+        Prepares a component to be instantiated on the first use of one of
+        its services.
+
+        Placeholder service factories are registered for the specifications
+        provided by the component. The component is instantiated, bound and
+        validated on the first call to ``get_service()`` on one of them.
+        Components which don't provide services, which provide service
+        factories, or whose mandatory requirements can't be satisfied yet,
+        are instantiated immediately.
+
+        :param factory_name: Name of the component factory
+        :param name: Name of the instance to be started
+        :param properties: Initial properties of the component instance
+        :return: True if the component will be instantiated on first use,
+                 False if it has been instantiated immediately
+        :raise TypeError: The given factory is unknown
+        :raise ValueError: The given name or factory name is invalid, or an
+                           instance with the given name already exists
+        """
+        if not factory_name or not is_string(factory_name):
+            raise ValueError("Invalid factory name")
+
+        if not name or not is_string(name):
+            raise ValueError("Invalid component name")
+
+        if not self.running:
+            # Stop working if the framework is stopping
+            raise ValueError("Framework is stopping")
+
+        with self.__instances_lock:
+            self.__check_instance_name(name)
+
+            with self.__factories_lock:
+                # Can raise a TypeError exception
+                _, factory_context = self.__get_factory_with_context(
+                    factory_name
+                )
+
+                provides = factory_context.get_handler(
+                    constants.HANDLER_PROVIDES
+                )
+                lazy = bool(provides) and not any(
+                    is_factory or is_prototype or pool
+                    for _, _, is_factory, is_prototype, pool in provides
+                )
+                if not lazy:
+                    # Nothing can trigger the instantiation
+                    _logger.debug(
+                        "Component '%s' can't be lazy: no service provided "
+                        "or service factory or pool provided",
+                        name,
+                    )
+
+            if lazy:
+                # Prepare the component context now, to get the services
+                # properties
+                component_context = ComponentContext(
+                    factory_context,
+                    name,
+                    self._prepare_instance_properties(
+                        properties, factory_context.properties
+                    ),
+                )
+
+                lazy = self.__check_requirements(component_context)
+                if not lazy:
+                    # The component would be returned while invalid
+                    _logger.debug(
+                        "Component '%s' can't be lazy: its requirements "
+                        "can't be satisfied yet",
+                        name,
+                    )
+
+            if lazy:
+                with self.__factories_lock:
+                    self.__check_singleton(factory_context, name)
+                    factory_context.is_singleton_active = (
+                        factory_context.is_singleton
+                    )
+
+                lazy_component = _LazyComponent(self, name)
+                component_context.set_lazy_registrations(
+                    lazy_component.registrations
+                )
+                self.__lazy_instances[name] = (
+                    component_context,
+                    lazy_component,
+                )
+
+        if not lazy:
+            self.instantiate(factory_name, name, properties)
+            return False
+
+        # Register the placeholders, without the instances lock as their
+        # first consumer will instantiate the component
+        lazy_component.register_placeholders(
+            factory_context.bundle_context,
+            [specs for specs, _, _, _, _ in provides],
+            component_context.properties,
+        )
+
+        with self.__instances_lock:
+            killed = (
+                self.__lazy_instances.get(name, (None, None))[1]
+                is not lazy_component
+                and not lazy_component.activated
+            )
+
+        if killed:
+            # Killed while registering the placeholders
+            self.__unregister_placeholders(component_context)
+
+        return True
+
+    @staticmethod
+    def __check_requirements(component_context):
+        # type: (ComponentContext) -> bool
+        """
+        Checks if the services currently registered can satisfy the mandatory
+        requirements of a component
+
+        :param component_context: The context of the component
+        :return: True if a service matches each mandatory requirement
+        """
+        requirements = component_context.get_handler(constants.HANDLER_REQUIRES)
+        if not requirements:
+            return True
+
+        requires_filters = component_context.properties.get(
+            constants.IPOPO_REQUIRES_FILTERS
+        )
+        if not isinstance(requires_filters, dict):
+            requires_filters = {}
+
+        bundle_context = component_context.get_bundle_context()
+        for field, requirement in requirements.items():
+            if requirement.optional:
+                continue
+
+            try:
+                svc_ref = bundle_context.get_service_reference(
+                    requirement.specification,
+                    requires_filters.get(field, requirement.filter),
+                )
+            except (BundleException, ValueError):
+                # Invalid filter: let the handler complain about it
+                return False
+
+            if svc_ref is None:
+                return False
+
+        return True
+
+    def _activate_lazy(self, name):
+        # type: (str) -> StoredInstance
+        """
+        Instantiates a lazy component, on the first use of one of its
+        services.
+
+        If the component can't be validated, its placeholders are
+        unregistered: it will register its services once valid.
+
+        :param name: Name of the lazy component
+        :return: The StoredInstance bean of the component
+        :raise BundleException: Unknown lazy component or component not
+                                validated
+        :raise TypeError: Error creating the component
+        """
+        with self.__instances_lock:
+            try:
+                component_context, _ = self.__lazy_instances[name]
+            except KeyError:
+                raise BundleException(
+                    "Unknown lazy component '{0}'".format(name)
+                )
+
+            factory_name = component_context.get_factory_name()
+            with self.__factories_lock:
+                factory, _ = self.__get_factory_with_context(factory_name)
+                instance = self.__create_instance(factory, factory_name, name)
+
+            # Keep the name reserved while the component starts
+            del self.__lazy_instances[name]
+            self.__reserved_names.add(name)
+
+        try:
+            # Instantiate it, with the placeholders as service registrations
+            # (or wait for its handlers)
+            self.__try_instantiate(component_context, instance)
+        finally:
+            with self.__instances_lock:
+                self.__reserved_names.discard(name)
+                stored_instance = self.__instances.get(name)
+
+        if (
+            stored_instance is None
+            or stored_instance.state != StoredInstance.VALID
+        ):
+            # Don't serve an invalid component
+            self.__unregister_placeholders(component_context)
+            raise BundleException(
+                "Lazy component '{0}' couldn't be validated".format(name)
+            )
+
+        return stored_instance
+
     def retry_erroneous(self, name, properties_update=None):
         # type: (str, dict) -> int
         """
@@ -869,25 +1363,59 @@ class _IPopoService(object):
                 stored_instance = self.__instances.pop(name)
 
                 # Store the reference to the factory context
-                factory_context = stored_instance.context.factory_context
+                component_context = stored_instance.context
+                factory_context = component_context.factory_context
 
                 # Kill it
                 stored_instance.kill()
 
+                # Clean up the placeholders it didn't adopt
+                self.__unregister_placeholders(component_context)
+
                 # Update the singleton state flag
                 factory_context.is_singleton_active = False
             except KeyError:
-                # Queued instance
+                # Queued or lazy instance
                 try:
                     # Extract the component context
-                    context, _ = self.__waiting_handlers.pop(name)
-
-                    # Update the singleton state flag
-                    context.factory_context.is_singleton_active = False
+                    context, _ = self.__pop_waiting(name)
+                    self.__pending_stats.pop(name, None)
                 except KeyError:
-                    raise ValueError(
-                        "Unknown component instance '{0}'".format(name)
-                    )
+                    try:
+                        context, _ = self.__lazy_instances.pop(name)
+                    except KeyError:
+                        if name in self.__reserved_names:
+                            raise ValueError(
+                                "Component '{0}' is being instantiated".format(
+                                    name
+                                )
+                            )
+
+                        raise ValueError(
+                            "Unknown component instance '{0}'".format(name)
+                        )
+
+                # Remove the placeholders of a lazy component
+                self.__unregister_placeholders(context)
+
+                # Update the singleton state flag
+                context.factory_context.is_singleton_active = False
+
+    @staticmethod
+    def __unregister_placeholders(component_context):
+        # type: (ComponentContext) -> None
+        """
+        Unregisters the placeholder services of a lazy component which
+        haven't been adopted by its service providers
+
+        :param component_context: The context of the component
+        """
+        for registration in component_context.clear_lazy_registrations():
+            try:
+                registration.unregister()
+            except BundleException:
+                # Already unregistered (bundle stopped)
+                pass
 
     def register_factory(self, bundle_context, factory):
         # type: (BundleContext, type) -> bool
@@ -961,7 +1489,17 @@ class _IPopoService(object):
                     if context.factory_context.name == factory_name
                 ]
                 for name in names:
-                    del self.__waiting_handlers[name]
+                    self.__pop_waiting(name)
+                    self.__pending_stats.pop(name, None)
+
+                # Remove lazy components
+                names = [
+                    name
+                    for name, (context, _) in self.__lazy_instances.items()
+                    if context.factory_context.name == factory_name
+                ]
+                for name in names:
+                    self.kill(name)
 
             # Clear the bundle context of the factory
             _set_factory_context(factory_class, None)
@@ -1020,6 +1558,17 @@ class _IPopoService(object):
         """
         return self.__instances[name].instance
 
+    def _get_stored_instance(self, name):
+        # type: (str) -> Optional[StoredInstance]
+        """
+        Returns the StoredInstance bean of the component with the given name
+
+        :param name: A component name
+        :return: The StoredInstance bean, or None if the component is unknown
+        """
+        with self.__instances_lock:
+            return self.__instances.get(name)
+
     def get_waiting_components(self):
         # type: () -> List[Tuple[str, str, Set[str]]]
         """
@@ -1039,6 +1588,19 @@ class _IPopoService(object):
             result.sort()
             return result
 
+    def get_missing_handlers(self):
+        # type: () -> Dict[str, int]
+        """
+        Returns the number of components waiting for each missing handler
+
+        :return: A dictionary: missing handler ID → number of components
+        """
+        with self.__instances_lock:
+            return {
+                handler_id: len(names)
+                for handler_id, names in self.__missing_handlers.items()
+            }
+
     def get_instance_details(self, name):
         # type: (str) -> Dict[str, Any]
         """
@@ -1066,6 +1628,8 @@ class _IPopoService(object):
         * ``properties``: A dictionary key → value, with all properties of the
           component. The value is converted to its string representation, to
           avoid unexpected behaviours.
+        * ``stats``: The life cycle statistics of the component, as returned
+          by :meth:`~pelix.ipopo.instance.ComponentStats.to_dict`
 
         :param name: The name of a component instance
         :return: A dictionary of details
@@ -1098,6 +1662,9 @@ class _IPopoService(object):
                 # Error details
                 result["error_trace"] = stored_instance.error_trace
 
+                # Life cycle statistics
+                result["stats"] = stored_instance.stats.to_dict()
+
                 # Provided service
                 result["services"] = {}
                 for handler in stored_instance.get_handlers(
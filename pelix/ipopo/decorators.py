@@ -26,6 +26,8 @@ Defines the iPOPO decorators classes to manipulate component factory classes
 """
 
 # Standard library
+import functools
+import importlib
 import inspect
 import logging
 import sys
@@ -43,6 +45,8 @@ except ImportError:
 from pelix.utilities import is_string, to_iterable, get_method_arguments
 from pelix.ipopo.contexts import FactoryContext, Requirement
 import pelix.ipopo.constants as constants
+import pelix.ldapfilter as ldapfilter
+import pelix.services as services
 
 # ------------------------------------------------------------------------------
 
@@ -317,6 +321,37 @@ def _ipopo_setup_field_callback(cls, context):
     context.field_callbacks.update(callbacks)
 
 
+def _ipopo_setup_offload(cls, context):
+    # type: (type, FactoryContext) -> None
+    """
+    Adds a requirement on the process pools used by the ``@Offload`` methods
+
+    :param cls: The class to handle
+    :param context: The factory class context
+    """
+    assert inspect.isclass(cls)
+    assert isinstance(context, FactoryContext)
+
+    pools = set(
+        getattr(func, constants.IPOPO_METHOD_OFFLOAD)[0]
+        for _, func in inspect.getmembers(cls, inspect.isroutine)
+        if hasattr(func, constants.IPOPO_METHOD_OFFLOAD)
+    )
+    if not pools:
+        return
+
+    config = context.set_handler_default(constants.HANDLER_REQUIRES, {})
+    for pool in pools:
+        field = constants.IPOPO_OFFLOAD_PREFIX + pool
+        config[field] = Requirement(
+            services.SERVICE_PROCESS_POOL,
+            spec_filter="({0}={1})".format(
+                services.PROP_PROCESS_POOL_NAME, ldapfilter.escape_LDAP(pool)
+            ),
+        )
+        setattr(cls, field, None)
+
+
 # ------------------------------------------------------------------------------
 
 
@@ -466,13 +501,35 @@ class Instantiate(object):
                 # We don't have access to the "unit" property value, but it
                 # will be visible in the service properties
                 print("My value is:", self._value)
+
+    If ``lazy`` is set, the component is not instantiated when its bundle
+    starts: iPOPO registers placeholder service factories for the
+    specifications given with ``@Provides`` instead.
+    The component is instantiated, bound and validated on the first call to
+    ``get_service()`` on one of those placeholders, which are then used as
+    the registrations of the component services.
+    Components without provided services, or providing service factories,
+    are instantiated immediately.
+
+    .. code-block:: python
+
+        @ComponentFactory()
+        @Provides("some.optional.service")
+        @Instantiate('component-4', lazy=True)
+        class Baz(object):
+            def __init__(self):
+                # Called on the first use of the "some.optional.service"
+                # service
+                pass
     """
 
-    def __init__(self, name, properties=None):
+    def __init__(self, name, properties=None, lazy=False):
         """
         :param name: The name of the component instance (**mandatory**)
         :param properties: The initial properties of the instance as a
                            dictionary
+        :param lazy: If True, the component is instantiated on the first use
+                     of one of its services
         """
         if not is_string(name):
             raise TypeError("Instance name must be a string")
@@ -486,6 +543,7 @@ class Instantiate(object):
 
         self.__name = name
         self.__properties = properties
+        self.__lazy = lazy
 
     def __call__(self, factory_class):
         """
@@ -504,7 +562,7 @@ class Instantiate(object):
         # Store the instance in the factory context
         context = get_factory_context(factory_class)
         try:
-            context.add_instance(self.__name, self.__properties)
+            context.add_instance(self.__name, self.__properties, self.__lazy)
 
         except NameError:
             _logger.warning(
@@ -602,6 +660,7 @@ class ComponentFactory(object):
             # Find callbacks
             _ipopo_setup_callback(factory_class, context)
             _ipopo_setup_field_callback(factory_class, context)
+            _ipopo_setup_offload(factory_class, context)
 
             # Store the factory context in its field
             setattr(factory_class, constants.IPOPO_FACTORY_CONTEXT, context)
@@ -620,6 +679,9 @@ class ComponentFactory(object):
                     + constants.IPOPO_SETTER_SUFFIX,
                     None,
                 )
+
+            # Precompute what can be shared by all instances
+            context.get_plan()
         else:
             # Manipulation already applied: do nothing more
             _logger.error(
@@ -967,6 +1029,31 @@ class Provides(object):
                 # Implementation of the "reset" service: publish the service
                 # again
                 self._svc_flag = True
+
+    If ``pool`` is set to a positive integer, the service is registered as a
+    prototype service factory backed by a pool of components of the same
+    factory.
+    Those components are instantiated and validated in advance, checked out
+    by ``ServiceObjects.get_service()`` and returned to the pool by
+    ``ServiceObjects.unget_service()``.
+    The ``pool`` value is the maximum number of components in the pool: when
+    all of them are checked out, consumers wait for one to be returned, up to
+    the time given by the ``pelix.ipopo.pool.timeout`` framework property
+    (10 seconds by default).
+    Invalidated components are killed instead of being checked out, and
+    replaced by new ones.
+    Pooled components are named after the component holding the pool and
+    have the :py:const:`pelix.ipopo.constants.IPOPO_POOL_OWNER` property.
+
+    .. code-block:: python
+
+        @ComponentFactory()
+        @Requires("_storage", "storage")
+        @Provides("request.handler", pool=8)
+        class Handler(object):
+            # Each consumer works with its own instance, without locking
+            def handle(self, request):
+                return self._storage.get(request)
     """
     HANDLER_ID = constants.HANDLER_PROVIDES
     """ ID of the handler configured by this decorator """
@@ -979,7 +1066,12 @@ class Provides(object):
     """
 
     def __init__(
-        self, specifications, controller=None, factory=False, prototype=False
+        self,
+        specifications,
+        controller=None,
+        factory=False,
+        prototype=False,
+        pool=0,
     ):
         """
         :param specifications: A list of provided specification(s), or the
@@ -990,8 +1082,18 @@ class Provides(object):
                         (False by default)
         :param prototype: If True, this service is prototype service factory
                           (False by default)
+        :param pool: Number of pooled components serving this service as a
+                     prototype service factory (0 by default: no pool)
         :raise ValueError: If the specifications are invalid
         """
+        pool = int(pool or 0)
+        if pool < 0:
+            raise ValueError("Pool size must be positive")
+        elif pool and (factory or prototype):
+            raise ValueError(
+                "A pooled service can't be a service factory or a prototype"
+            )
+
         if controller is not None:
             if not is_string(controller):
                 raise ValueError("Controller name must be a string")
@@ -1008,6 +1110,7 @@ class Provides(object):
         self.__controller = controller
         self.__is_factory = factory
         self.__is_prototype = prototype
+        self.__pool = pool
 
     def __call__(self, clazz):
         """
@@ -1055,6 +1158,7 @@ class Provides(object):
                 self.__controller,
                 self.__is_factory,
                 self.__is_prototype,
+                self.__pool,
             )
         )
 
@@ -1152,6 +1256,7 @@ class Requires(object):
         optional=False,
         spec_filter=None,
         immediate_rebind=False,
+        immutable=False,
     ):
         """
         :param field: The field where to inject the requirement
@@ -1166,6 +1271,10 @@ class Requires(object):
             If True, the component won't be invalidated then re-validated if a
             matching service is available when the injected dependency is
             unbound
+        :param immutable:
+            If True, an aggregated dependency is injected as a tuple which is
+            only rebuilt when a service is bound or unbound, instead of a new
+            list on each injection
 
         The ``field`` and ``specification`` parameters are mandatory.
         By default, a requirement is neither aggregated nor optional
@@ -1199,6 +1308,7 @@ class Requires(object):
             optional,
             spec_filter,
             immediate_rebind,
+            immutable,
         )
 
     def __call__(self, clazz):
@@ -1398,6 +1508,7 @@ class RequiresMap(Requires):
         aggregate=False,
         optional=False,
         spec_filter=None,
+        immutable=False,
     ):
         """
         :param field: The injected field
@@ -1411,12 +1522,21 @@ class RequiresMap(Requires):
         :param optional: If True, this injection is optional
         :param spec_filter: An LDAP query to filter injected services upon
                             their properties
+        :param immutable: If True, injects a read-only mapping (with tuples
+                          values if ``aggregate`` is set) which is only
+                          rebuilt when the bindings change
         :raise TypeError: A parameter has an invalid type
         :raise ValueError: An error occurred while parsing the filter or an
                            argument is incorrect
         """
         super(RequiresMap, self).__init__(
-            field, specification, aggregate, optional, spec_filter, False
+            field,
+            specification,
+            aggregate,
+            optional,
+            spec_filter,
+            False,
+            immutable,
         )
         # Check if key is valid
         if not key:
@@ -1476,6 +1596,17 @@ class RequiresBroadcast(Requires):
                 # We can use the service as a single object, without taking
                 # care of the number of services matching our requirement:
                 self._notifier.notify("Hello, world")
+
+        # Services can also be called in parallel, outside the handler lock,
+        # and their results gathered
+        @ComponentFactory()
+        @RequiresBroadcast("_sinks", "some.sink", concurrent=True,
+                           timeout=5, gather=True)
+        class Foo(object):
+            def publish(self, data):
+                result = self._sinks.write(data)
+                for svc_ref, error in result.errors.items():
+                    print("Error writing to", svc_ref, ":", error)
     """
     HANDLER_ID = constants.HANDLER_REQUIRES_BRODCAST
     """ ID of the handler configured by this decorator """
@@ -1488,6 +1619,9 @@ class RequiresBroadcast(Requires):
         spec_filter=None,
         muffle_exceptions=True,
         trace_exceptions=True,
+        concurrent=False,
+        timeout=None,
+        gather=False,
     ):
         """
         :param field: The injected field
@@ -1499,6 +1633,15 @@ class RequiresBroadcast(Requires):
                                   services are not propagated (True by default)
         :param trace_exceptions: If True, trace the exceptions that are muffled
                                  (True by default)
+        :param concurrent: If True, services are called in parallel using a
+                           thread pool shared by all proxies, without holding
+                           the handler lock (False by default). Broadcasts
+                           made by the called services run sequentially in
+                           their pool thread.
+        :param timeout: Maximum time to wait for the concurrent calls to end,
+                        in seconds (None to wait forever)
+        :param gather: If True, calls return a ``BroadcastResult`` object
+                       holding the results and errors of each service
         :raise TypeError: A parameter has an invalid type
         :raise ValueError: An error occurred while parsing the filter or an
                            argument is incorrect
@@ -1511,6 +1654,9 @@ class RequiresBroadcast(Requires):
         # Store the flags
         self._muffle_ex = muffle_exceptions
         self._trace_ex = trace_exceptions
+        self._concurrent = concurrent
+        self._timeout = timeout
+        self._gather = gather
 
     def __call__(self, clazz):
         """
@@ -1531,6 +1677,9 @@ class RequiresBroadcast(Requires):
                 self._requirement,
                 self._muffle_ex,
                 self._trace_ex,
+                self._concurrent,
+                self._timeout,
+                self._gather,
             )
         return clazz
 
@@ -2278,3 +2427,110 @@ def PostUnregistration(method):
         constants.IPOPO_CALLBACK_POST_UNREGISTRATION,
     )
     return method
+
+
+# ------------------------------------------------------------------------------
+
+
+def _run_offloaded(module_name, class_name, method_name, args, kwargs):
+    """
+    Calls an ``@Offload`` method in a worker process
+
+    :param module_name: Name of the module defining the component class
+    :param class_name: Name of the component class
+    :param method_name: Name of the offloaded method
+    :param args: Method arguments
+    :param kwargs: Method keyword arguments
+    :return: The result of the method
+    """
+    cls = getattr(importlib.import_module(module_name), class_name)
+    wrapper = getattr(cls, method_name)
+    method = getattr(wrapper, constants.IPOPO_METHOD_OFFLOAD)[1]
+    return method(None, *args, **kwargs)
+
+
+class Offload(object):
+    # pylint: disable=R0903
+    """
+    The ``@Offload`` decorator executes the decorated method in a process
+    pool, *i.e.* a ``concurrent.futures.ProcessPoolExecutor`` registered as a
+    ``pelix.process_pool`` service, for example by the
+    ``pelix.services.process_pool`` bundle.
+
+    The component requires the process pool service with the given name:
+    it won't be valid until that pool is available.
+
+    The arguments and the result of the method must be picklable. As the
+    component instance itself can't be transferred to the worker processes,
+    the decorated method is called with ``None`` as ``self``: it must only
+    work on its arguments. The component class must be defined at the top
+    level of its module.
+
+    :Example:
+
+    .. code-block:: python
+
+       @ComponentFactory()
+       @Provides("compressor")
+       class Foo:
+          @Offload(pool="cpu")
+          def compress(self, data):
+              # self is None here
+              return zlib.compress(data, 9)
+
+          @Offload(pool="cpu", wait=False)
+          def compress_async(self, data):
+              # The caller gets a Future object
+              return zlib.compress(data, 9)
+    """
+
+    def __init__(self, pool="cpu", wait=True):
+        """
+        :param pool: Name of the process pool to use
+        :param wait: If True, the method returns the result of the call in
+                     the worker process, else it returns a
+                     ``concurrent.futures.Future`` object
+        :raise ValueError: Invalid pool name
+        """
+        if not pool or not is_string(pool):
+            raise ValueError("Invalid process pool name: {0}".format(pool))
+
+        self._pool = pool
+        self._wait = wait
+
+    def __call__(self, method):
+        """
+        Wraps the method to execute it in the process pool
+
+        :param method: Method to decorate
+        :return: Decorated method
+        :raise TypeError: The decorated element is not a valid function
+        """
+        if not isinstance(method, types.FunctionType):
+            raise TypeError("@Offload can only be applied on functions")
+
+        field = constants.IPOPO_OFFLOAD_PREFIX + self._pool
+        wait = self._wait
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            """
+            Submits the call to the process pool
+            """
+            executor = getattr(self, field, None)
+            if executor is None:
+                raise ValueError("Process pool is not available")
+
+            cls = type(self)
+            future = executor.submit(
+                _run_offloaded,
+                cls.__module__,
+                cls.__name__,
+                method.__name__,
+                args,
+                kwargs,
+            )
+            return future.result() if wait else future
+
+        setattr(wrapper, constants.IPOPO_METHOD_OFFLOAD, (self._pool, method))
+        return wrapper
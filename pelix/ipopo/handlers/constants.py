@@ -75,6 +75,8 @@ It should also implement the following ones:
   set to False.
 * on_property_change(): Called when a component property has been modified.
   The provided service properties should be modified accordingly.
+* on_properties_change(): Called when a batch of component properties has
+  been modified. The provided service properties should be updated at once.
 """
 
 # ------------------------------------------------------------------------------
@@ -160,6 +162,16 @@ class Handler(object):
         """
         pass
 
+    def on_properties_change(self, changes):
+        """
+        Handles the end of a batch of property changes.
+        By default, calls ``on_property_change()`` for each modified property.
+
+        :param changes: A dictionary: name → (old value, new value)
+        """
+        for name, (old_value, new_value) in changes.items():
+            self.on_property_change(name, old_value, new_value)
+
     def start(self):
         """
         Starts the handler (listeners, ...). Called once, after the component
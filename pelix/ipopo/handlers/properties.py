@@ -102,6 +102,26 @@ class _Activator(object):
 # ------------------------------------------------------------------------------
 
 
+def _make_methods_names(prefix):
+    """
+    Computes the names of the getter and setter fields with the given prefix
+
+    :param prefix: Prefix of the fields names
+    :return: getter and a setter field names
+    """
+    return (
+        "{0}{1}".format(prefix, ipopo_constants.IPOPO_GETTER_SUFFIX),
+        "{0}{1}".format(prefix, ipopo_constants.IPOPO_SETTER_SUFFIX),
+    )
+
+
+# Public flag -> (getter name, setter name)
+_METHODS_NAMES = {
+    True: _make_methods_names(ipopo_constants.IPOPO_PROPERTY_PREFIX),
+    False: _make_methods_names(ipopo_constants.IPOPO_HIDDEN_PROPERTY_PREFIX),
+}
+
+
 class PropertiesHandler(constants.Handler):
     """
     Handles the properties
@@ -175,15 +195,7 @@ class PropertiesHandler(constants.Handler):
                                   accessors, else of hidden property ones
         :return: getter and a setter field names
         """
-        if public_properties:
-            prefix = ipopo_constants.IPOPO_PROPERTY_PREFIX
-        else:
-            prefix = ipopo_constants.IPOPO_HIDDEN_PROPERTY_PREFIX
-
-        return (
-            "{0}{1}".format(prefix, ipopo_constants.IPOPO_GETTER_SUFFIX),
-            "{0}{1}".format(prefix, ipopo_constants.IPOPO_SETTER_SUFFIX),
-        )
+        return _METHODS_NAMES[bool(public_properties)]
 
     def manipulate(self, stored_instance, component_instance):
         """
@@ -213,3 +225,11 @@ class PropertiesHandler(constants.Handler):
             getter_name, setter_name = self.get_methods_names(public_flag)
             setattr(component_instance, getter_name, getter)
             setattr(component_instance, setter_name, setter)
+
+        if True in flags_to_generate:
+            # Inject the properties batch context
+            setattr(
+                component_instance,
+                ipopo_constants.IPOPO_PROPERTY_BATCH,
+                stored_instance.properties_batch,
+            )
@@ -26,14 +26,19 @@ Service providing handler
 """
 
 # Standard library
+import itertools
 import logging
+import threading
+import time
 
 # Pelix beans
 from pelix.constants import BundleActivator, BundleException
+from pelix.threadpool import ThreadPool
 
 # iPOPO constants
 import pelix.ipopo.constants as ipopo_constants
 import pelix.ipopo.handlers.constants as constants
+from pelix.ipopo.instance import StoredInstance
 
 # ------------------------------------------------------------------------------
 
@@ -46,6 +51,17 @@ __docformat__ = "restructuredtext en"
 
 # ------------------------------------------------------------------------------
 
+POOL_TIMEOUT = "pelix.ipopo.pool.timeout"
+"""
+Framework property: maximum time to wait for a pooled component to be
+returned when all of them are checked out (in seconds)
+"""
+
+DEFAULT_POOL_TIMEOUT = 10
+""" Default maximum time to wait for a pooled component """
+
+# ------------------------------------------------------------------------------
+
 
 class _HandlerFactory(constants.HandlerFactory):
     # pylint: disable=R0903
@@ -53,6 +69,14 @@ class _HandlerFactory(constants.HandlerFactory):
     Factory service for service registration handlers
     """
 
+    def __init__(self, reaper, pool_timeout):
+        """
+        :param reaper: The thread pool killing the released pooled components
+        :param pool_timeout: Maximum time to wait for a pooled component
+        """
+        self._reaper = reaper
+        self._pool_timeout = pool_timeout
+
     def get_handlers(self, component_context, instance):
         """
         Sets up service providers for the given component
@@ -72,9 +96,15 @@ class _HandlerFactory(constants.HandlerFactory):
         # 1 handler per provided service
         return [
             ServiceRegistrationHandler(
-                specs, controller, is_factory, is_prototype
+                specs,
+                controller,
+                is_factory,
+                is_prototype,
+                pool,
+                self._reaper,
+                self._pool_timeout,
             )
-            for specs, controller, is_factory, is_prototype in provides
+            for specs, controller, is_factory, is_prototype, pool in provides
         ]
 
 
@@ -89,11 +119,27 @@ class _Activator(object):
         Sets up members
         """
         self._registration = None
+        self._reaper = None
 
     def start(self, context):
         """
         Bundle started
         """
+        pool_timeout = context.get_property(POOL_TIMEOUT)
+        try:
+            pool_timeout = float(
+                DEFAULT_POOL_TIMEOUT if pool_timeout is None else pool_timeout
+            )
+        except (TypeError, ValueError) as ex:
+            logging.getLogger(__name__).warning(
+                "Invalid pooled components timeout: %s", ex
+            )
+            pool_timeout = DEFAULT_POOL_TIMEOUT
+
+        # A single thread kills the components released by the pools
+        self._reaper = ThreadPool(1, 0, logname="ipopo-pool-reaper")
+        self._reaper.start()
+
         # Set up properties
         properties = {
             constants.PROP_HANDLER_ID: ipopo_constants.HANDLER_PROVIDES
@@ -102,7 +148,7 @@ class _Activator(object):
         # Register the handler factory service
         self._registration = context.register_service(
             constants.SERVICE_IPOPO_HANDLER_FACTORY,
-            _HandlerFactory(),
+            _HandlerFactory(self._reaper, pool_timeout),
             properties,
         )
 
@@ -114,9 +160,264 @@ class _Activator(object):
         self._registration.unregister()
         self._registration = None
 
+        # Stop the reaper, once the pending kills are done
+        self._reaper.join()
+        self._reaper.stop()
+        self._reaper = None
+
 
 # ------------------------------------------------------------------------------
 
+_POOL_USABLE_STATES = (StoredInstance.VALID, StoredInstance.VALIDATING)
+""" States of the pooled components which can be served """
+
+
+class _ComponentPool(object):
+    """
+    Prototype service factory serving the components of a pool, instantiated
+    from the factory of the component holding the pool
+
+    The pool holds at most ``size`` components: when all of them are checked
+    out, ``get_service()`` waits for one to be returned.
+    The service registry calls ``get_service()`` without holding its lock,
+    but can call ``unget_service_instance()`` while holding it: the
+    components released by the pool are killed by the reaper thread.
+    """
+
+    def __init__(self, ipopo, owner, size, reaper, timeout):
+        """
+        :param ipopo: The iPOPO service
+        :param owner: The StoredInstance of the component holding the pool
+        :param size: Maximum number of components in the pool
+        :param reaper: The thread pool killing the released components
+        :param timeout: Maximum time to wait for a component to be returned
+                        when all of them are checked out (in seconds)
+        """
+        self.__ipopo = ipopo
+        self.__factory_name = owner.factory_name
+        self.__name = owner.name
+        self.__size = size
+        self.__reaper = reaper
+        self.__timeout = timeout
+
+        # Pooled components share the properties of the owner
+        self.__properties = owner.context.properties.copy()
+        self.__properties[ipopo_constants.IPOPO_POOL_OWNER] = owner.name
+
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__counter = itertools.count(1)
+
+        # Idle components: [(name, instance, StoredInstance)]
+        self.__idle = []
+
+        # Checked out components: id(instance) -> (name, StoredInstance)
+        self.__used = {}
+
+        # Number of components being instantiated for a consumer
+        self.__creating = 0
+
+        self._logger = logging.getLogger(
+            "-".join((owner.name, "ComponentPool"))
+        )
+
+    def __create(self):
+        """
+        Instantiates a new pooled component
+
+        :return: A (name, instance, StoredInstance) tuple
+        :raise BundleException: Error instantiating or validating the
+                                component
+        """
+        name = "{0}.pool-{1}".format(self.__name, next(self.__counter))
+        try:
+            instance = self.__ipopo.instantiate(
+                self.__factory_name, name, self.__properties.copy()
+            )
+        except (TypeError, ValueError) as ex:
+            raise BundleException(
+                "Error instantiating pooled component {0}: {1}".format(
+                    name, ex
+                )
+            )
+
+        # pylint: disable=W0212
+        stored_instance = self.__ipopo._get_stored_instance(name)
+        if (
+            stored_instance is None
+            or stored_instance.state not in _POOL_USABLE_STATES
+        ):
+            self.__kill(name)
+            raise BundleException(
+                "Pooled component {0} couldn't be validated".format(name)
+            )
+
+        return name, instance, stored_instance
+
+    def __kill(self, name):
+        """
+        Kills a pooled component, if it still exists
+
+        :param name: Name of the pooled component
+        """
+        try:
+            self.__ipopo.kill(name)
+        except ValueError:
+            # Already killed
+            pass
+
+    def fill(self):
+        """
+        Instantiates the idle components of the pool
+        """
+        for _ in range(self.__size):
+            try:
+                component = self.__create()
+            except BundleException as ex:
+                self._logger.error("Error filling the pool: %s", ex)
+                break
+
+            with self.__condition:
+                self.__idle.append(component)
+
+    def close(self):
+        """
+        Kills all the components of the pool
+        """
+        with self.__condition:
+            self.__closed = True
+            names = [name for name, _, _ in self.__idle]
+            names.extend(name for name, _ in self.__used.values())
+            del self.__idle[:]
+            self.__used.clear()
+
+            # Wake up the waiting consumers
+            self.__condition.notify_all()
+
+        for name in names:
+            self.__kill(name)
+
+    def __checkout(self, invalid):
+        """
+        Checks out an idle component, or reserves room for a new one, waiting
+        for a component to be returned if all of them are checked out (must
+        be called with the pool lock)
+
+        :param invalid: List filled with the names of the invalid idle
+                        components, to be killed by the caller
+        :return: A checked out component, or None if a new one must be
+                 instantiated
+        :raise BundleException: The pool is closed or no component has been
+                                returned in time
+        """
+        deadline = time.time() + self.__timeout
+        while True:
+            if self.__closed:
+                raise BundleException("Component pool is closed")
+
+            try:
+                name, instance, stored_instance = self.__idle.pop()
+            except IndexError:
+                pass
+            else:
+                if stored_instance.state in _POOL_USABLE_STATES:
+                    self.__used[id(instance)] = (name, stored_instance)
+                    return instance
+
+                # Invalid idle component: it frees its room in the pool
+                invalid.append(name)
+                continue
+
+            if len(self.__used) + self.__creating < self.__size:
+                # Room for a new component
+                self.__creating += 1
+                return None
+
+            # All the components are checked out
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise BundleException(
+                    "No pooled component returned after {0} seconds".format(
+                        self.__timeout
+                    )
+                )
+
+            self.__condition.wait(remaining)
+
+    def get_service(self, bundle, svc_registration):
+        # pylint: disable=W0613
+        """
+        Checks out a valid component from the pool, or instantiates a new
+        one if the pool is not full. Idle components which have been
+        invalidated are killed.
+
+        :param bundle: The bundle requesting the service
+        :param svc_registration: The ServiceRegistration object
+        :return: A pooled component
+        :raise BundleException: The pool is closed, no component has been
+                                returned in time or a new component couldn't
+                                be instantiated
+        """
+        invalid = []
+        try:
+            with self.__condition:
+                instance = self.__checkout(invalid)
+                if instance is not None:
+                    return instance
+        finally:
+            for name in invalid:
+                self.__kill(name)
+
+        try:
+            name, instance, stored_instance = self.__create()
+        except BundleException:
+            with self.__condition:
+                self.__creating -= 1
+                self.__condition.notify()
+            raise
+
+        with self.__condition:
+            self.__creating -= 1
+            if not self.__closed:
+                self.__used[id(instance)] = (name, stored_instance)
+                return instance
+
+        # Pool closed while instantiating the component
+        self.__kill(name)
+        raise BundleException("Component pool is closed")
+
+    def unget_service_instance(self, bundle, svc_registration, service):
+        # pylint: disable=W0613
+        """
+        Returns a component to the pool
+
+        :param bundle: The bundle releasing the service
+        :param svc_registration: The ServiceRegistration object
+        :param service: The released component
+        """
+        with self.__condition:
+            try:
+                name, stored_instance = self.__used.pop(id(service))
+            except KeyError:
+                # Unknown component (pool closed)
+                return
+
+            # Wake up a consumer: the component or its room is available
+            self.__condition.notify()
+            if stored_instance.state in _POOL_USABLE_STATES:
+                # Keep it for the next consumer
+                self.__idle.append((name, service, stored_instance))
+                return
+
+        # Invalid component
+        self.__reaper.enqueue(self.__kill, name)
+
+    def unget_service(self, bundle, svc_registration):
+        """
+        The bundle released all the services it checked out: nothing to do
+        """
+        pass
+
 
 class ServiceRegistrationHandler(constants.ServiceProviderHandler):
     """
@@ -124,7 +425,14 @@ class ServiceRegistrationHandler(constants.ServiceProviderHandler):
     """
 
     def __init__(
-        self, specifications, controller_name, is_factory, is_prototype
+        self,
+        specifications,
+        controller_name,
+        is_factory,
+        is_prototype,
+        pool_size=0,
+        reaper=None,
+        pool_timeout=DEFAULT_POOL_TIMEOUT,
     ):
         """
         Sets up the handler
@@ -134,6 +442,10 @@ class ServiceRegistrationHandler(constants.ServiceProviderHandler):
                                 (can be None)
         :param is_factory: If True, this is a service factory
         :param is_prototype: If True, this is a prototype service factory
+        :param pool_size: Number of components in the pool serving this
+                          service (0 for no pool)
+        :param reaper: The thread pool killing the released pooled components
+        :param pool_timeout: Maximum time to wait for a pooled component
         """
         self.specifications = specifications
         self.__controller = controller_name
@@ -147,6 +459,12 @@ class ServiceRegistrationHandler(constants.ServiceProviderHandler):
         self.__is_factory = is_factory
         self.__is_prototype = is_prototype
 
+        # Components pool
+        self.__pool_size = pool_size
+        self.__reaper = reaper
+        self.__pool_timeout = pool_timeout
+        self.__pool = None  # type: _ComponentPool
+
         # The ServiceRegistration and ServiceReference objects
         self._registration = None
         self._svc_reference = None
@@ -281,6 +599,19 @@ class ServiceRegistrationHandler(constants.ServiceProviderHandler):
             # use the registration to trigger the service event
             self._registration.set_properties({name: new_value})
 
+    def on_properties_change(self, changes):
+        """
+        Called by the instance manager at the end of a batch of property
+        changes: updates the service properties at once
+
+        :param changes: A dictionary: name → (old value, new value)
+        """
+        if self._registration is not None:
+            # A single update, a single service event
+            self._registration.set_properties(
+                {name: new_value for name, (_, new_value) in changes.items()}
+            )
+
     def post_validate(self):
         """
         Called by the instance manager once the component has been validated
@@ -313,14 +644,43 @@ class ServiceRegistrationHandler(constants.ServiceProviderHandler):
             properties = self._ipopo_instance.context.properties.copy()
             bundle_context = self._ipopo_instance.bundle_context
 
-            # Register the service
-            self._registration = bundle_context.register_service(
-                self.specifications,
-                self._ipopo_instance.instance,
-                properties,
-                factory=self.__is_factory,
-                prototype=self.__is_prototype,
+            if ipopo_constants.IPOPO_POOL_OWNER in properties:
+                # Pooled components are served by the pool owner
+                return
+
+            service = self._ipopo_instance.instance
+            is_prototype = self.__is_prototype
+            if self.__pool_size:
+                # Serve the service with a pool of components
+                # pylint: disable=W0212
+                self.__pool = _ComponentPool(
+                    self._ipopo_instance._ipopo_service,
+                    self._ipopo_instance,
+                    self.__pool_size,
+                    self.__reaper,
+                    self.__pool_timeout,
+                )
+                self.__pool.fill()
+                service = self.__pool
+                is_prototype = True
+
+            # Adopt the placeholder of a lazy component, if any
+            registration = self._ipopo_instance.context.grab_lazy_registration(
+                self.specifications
             )
+            if registration is not None:
+                # Keep the registration and its consumers
+                registration.set_properties(properties)
+                self._registration = registration
+            else:
+                # Register the service
+                self._registration = bundle_context.register_service(
+                    self.specifications,
+                    service,
+                    properties,
+                    factory=self.__is_factory,
+                    prototype=is_prototype,
+                )
             self._svc_reference = self._registration.get_reference()
 
             # Notify the component
@@ -352,3 +712,8 @@ class ServiceRegistrationHandler(constants.ServiceProviderHandler):
 
             self._registration = None
             self._svc_reference = None
+
+        if self.__pool is not None:
+            # Kill the pooled components
+            self.__pool.close()
+            self.__pool = None
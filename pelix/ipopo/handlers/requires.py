@@ -87,6 +87,25 @@ class _HandlerFactory(constants.HandlerFactory):
 
         return new_requirements
 
+    @staticmethod
+    def _prepare_handlers_layout(requirements):
+        """
+        Associates each requirement to the class of its dependency handler
+
+        :param requirements: Dictionary of requirements (field → Requirement)
+        :return: A tuple of (field, requirement, handler class) tuples
+        """
+        return tuple(
+            (
+                field,
+                requirement,
+                AggregateDependency
+                if requirement.aggregate
+                else SimpleDependency,
+            )
+            for field, requirement in requirements.items()
+        )
+
     def get_handlers(self, component_context, instance):
         """
         Sets up service providers for the given component
@@ -103,21 +122,24 @@ class _HandlerFactory(constants.HandlerFactory):
             ipopo_constants.IPOPO_REQUIRES_FILTERS, None
         )
 
-        # Prepare requirements
-        requirements = self._prepare_requirements(
-            requirements, requires_filters
-        )
+        if not requires_filters or not isinstance(requires_filters, dict):
+            # Use the layout shared by all instances of the factory
+            layout = component_context.factory_context.get_plan().get_prepared(
+                ipopo_constants.HANDLER_REQUIRES,
+                self._prepare_handlers_layout,
+                requirements,
+            )
+        else:
+            # Prepare requirements
+            layout = self._prepare_handlers_layout(
+                self._prepare_requirements(requirements, requires_filters)
+            )
 
         # Set up the runtime dependency handlers
-        handlers = []
-        for field, requirement in requirements.items():
-            # Construct the handler
-            if requirement.aggregate:
-                handlers.append(AggregateDependency(field, requirement))
-            else:
-                handlers.append(SimpleDependency(field, requirement))
-
-        return handlers
+        return [
+            handler_class(field, requirement)
+            for field, requirement, handler_class in layout
+        ]
 
 
 @BundleActivator
@@ -486,7 +508,7 @@ class AggregateDependency(_RuntimeDependency):
         # Reference -> Service
         self.services = {}
 
-        # Future injected value
+        # Future injected value (a tuple snapshot in immutable mode)
         self._future_value = None
 
     def clear(self):
@@ -515,12 +537,55 @@ class AggregateDependency(_RuntimeDependency):
         :return: The value to inject
         """
         with self._lock:
+            if self.requirement.immutable:
+                # The snapshot can be shared as is
+                return self._future_value
+
             # The value field must be a copy of our list
             if self._future_value is not None:
                 return self._future_value[:]
 
             return None
 
+    def __store_service(self, svc_ref, service):
+        """
+        Stores the given service and updates the future injected value
+
+        :param svc_ref: A service reference
+        :param service: The associated service
+        """
+        self.services[svc_ref] = service
+
+        if self.requirement.immutable:
+            # Rebuild the snapshot once per change
+            self._future_value = tuple(self.services.values())
+        elif self._future_value is None:
+            # First value
+            self._future_value = [service]
+        else:
+            self._future_value.append(service)
+
+    def __remove_service(self, svc_ref):
+        """
+        Removes the given service and updates the future injected value
+
+        :param svc_ref: A service reference
+        :return: The removed service
+        :raise KeyError: Unknown service reference
+        """
+        service = self.services.pop(svc_ref)
+
+        if self.requirement.immutable:
+            self._future_value = tuple(self.services.values())
+        else:
+            self._future_value.remove(service)
+
+        # Nullify the value if needed
+        if not self._future_value:
+            self._future_value = None
+
+        return service
+
     def is_valid(self):
         """
         Tests if the dependency is in a valid state
@@ -540,13 +605,8 @@ class AggregateDependency(_RuntimeDependency):
                 # Get the new service
                 service = self._context.get_service(svc_ref)
 
-                if self._future_value is None:
-                    # First value
-                    self._future_value = []
-
                 # Store the information
-                self._future_value.append(service)
-                self.services[svc_ref] = service
+                self.__store_service(svc_ref, service)
 
                 self._ipopo_instance.bind(self, service, svc_ref)
                 return True
@@ -563,19 +623,12 @@ class AggregateDependency(_RuntimeDependency):
         """
         with self._lock:
             try:
-                # Get the service instance
-                service = self.services.pop(svc_ref)
+                # Forget the service instance
+                service = self.__remove_service(svc_ref)
             except KeyError:
                 # Not a known service reference: ignore
                 pass
             else:
-                # Clean the instance values
-                self._future_value.remove(service)
-
-                # Nullify the value if needed
-                if not self._future_value:
-                    self._future_value = None
-
                 self._ipopo_instance.unbind(self, service, svc_ref)
                 return True
 
@@ -25,8 +25,19 @@ RequiresBest handler implementation
     limitations under the License.
 """
 
+# Standard library
+import heapq
+
+# Standard typing module should be optional
+try:
+    # pylint: disable=W0611
+    from typing import Dict, List, Tuple
+    from pelix.framework import ServiceReference
+except ImportError:
+    pass
+
 # Pelix beans
-from pelix.constants import BundleActivator, SERVICE_RANKING
+from pelix.constants import BundleActivator, SERVICE_ID, SERVICE_RANKING
 
 # iPOPO constants
 import pelix.ipopo.constants as ipopo_constants
@@ -123,6 +134,10 @@ class BestDependency(requires.SimpleDependency):
     """
     Manages a simple dependency field
 
+    All the services matching the requirement are kept in a heap, ordered
+    like the service registry does (highest ranking, then lowest service ID),
+    so that the next best service is found without querying the registry.
+
     TODO: Allow to use a custom service reference comparator
     """
 
@@ -132,17 +147,119 @@ class BestDependency(requires.SimpleDependency):
         """
         super(BestDependency, self).__init__(field, requirement)
 
-        # Current ranking
-        self._current_ranking = None
+        # Heap of (sort key, reference) tuples. Entries are removed lazily:
+        # only those matching self._candidates are valid
+        self._heap = []  # type: List[Tuple[Tuple[int, int], ServiceReference]]
+
+        # Matching references -> current sort key
+        self._candidates = {}  # type: Dict[ServiceReference, Tuple[int, int]]
+
+    @staticmethod
+    def _sort_key(svc_ref):
+        """
+        Computes the sort key of a service reference: the best service has
+        the lowest key
+
+        :param svc_ref: A service reference
+        :return: A (negated ranking, service ID) tuple
+        """
+        return (
+            -int(svc_ref.get_property(SERVICE_RANKING) or 0),
+            svc_ref.get_property(SERVICE_ID),
+        )
+
+    def _add_candidate(self, svc_ref):
+        """
+        Adds or updates a candidate in the heap
+
+        :param svc_ref: A matching service reference
+        :return: The sort key of the reference
+        """
+        key = self._sort_key(svc_ref)
+        if self._candidates.get(svc_ref) != key:
+            self._candidates[svc_ref] = key
+            heapq.heappush(self._heap, (key, svc_ref))
+
+            if len(self._heap) > 2 * len(self._candidates) + 16:
+                # Too many outdated entries: rebuild the heap
+                self._heap = [
+                    (key, ref) for ref, key in self._candidates.items()
+                ]
+                heapq.heapify(self._heap)
+
+        return key
+
+    def _best_candidate(self):
+        """
+        Returns the best candidate, removing outdated heap entries
+
+        :return: The best matching service reference, or None
+        """
+        heap = self._heap
+        while heap:
+            key, svc_ref = heap[0]
+            if self._candidates.get(svc_ref) == key:
+                return svc_ref
+
+            # Outdated entry
+            heapq.heappop(heap)
+
+        return None
+
+    def _switch_to(self, svc_ref):
+        """
+        Unbinds the current service, and let the component bind the given
+        one through ``try_binding()``
+
+        :param svc_ref: The service reference to bind next (can be None)
+        """
+        old_ref = self.reference
+        old_value = self._value
+
+        # Clean up like for a departure
+        self._pending_ref = svc_ref
+        self._value = None
+        self.reference = None
+
+        # Unbind (new binding will be done afterwards)
+        self._ipopo_instance.unbind(self, old_value, old_ref)
 
     def clear(self):
         """
         Cleans up the manager. The manager can't be used after this method has
         been called
         """
-        self._current_ranking = None
+        self._heap = []
+        self._candidates.clear()
         super(BestDependency, self).clear()
 
+    def start(self):
+        """
+        Starts the dependency manager and looks for the current candidates
+        """
+        super(BestDependency, self).start()
+
+        with self._lock:
+            for svc_ref in (
+                self._context.get_all_service_references(
+                    self.requirement.specification, self.requirement.filter
+                )
+                or []
+            ):
+                self._add_candidate(svc_ref)
+
+    def stop(self):
+        """
+        Stops the dependency manager (must be called before clear())
+
+        :return: The removed bindings (list) or None
+        """
+        with self._lock:
+            self._heap = []
+            self._candidates.clear()
+
+        return super(BestDependency, self).stop()
+
     def on_service_arrival(self, svc_ref):
         """
         Called when a service has been registered in the framework
@@ -150,26 +267,17 @@ class BestDependency(requires.SimpleDependency):
         :param svc_ref: A service reference
         """
         with self._lock:
-            new_ranking = svc_ref.get_property(SERVICE_RANKING)
-            if self._current_ranking is not None:
-                if new_ranking > self._current_ranking:
+            new_key = self._add_candidate(svc_ref)
+            if self.reference is not None:
+                if svc_ref is not self.reference and new_key < self._sort_key(
+                    self.reference
+                ):
                     # New service with better ranking: use it
-                    self._pending_ref = svc_ref
-                    old_ref = self.reference
-                    old_value = self._value
-
-                    # Clean up like for a departure
-                    self._current_ranking = None
-                    self._value = None
-                    self.reference = None
-
-                    # Unbind (new binding will be done afterwards)
-                    self._ipopo_instance.unbind(self, old_value, old_ref)
+                    self._switch_to(svc_ref)
             else:
-                # No ranking yet: inject the service
+                # Nothing injected yet: inject the service
                 self.reference = svc_ref
                 self._value = self._context.get_service(svc_ref)
-                self._current_ranking = new_ranking
                 self._pending_ref = None
 
                 self._ipopo_instance.bind(self, self._value, self.reference)
@@ -181,24 +289,16 @@ class BestDependency(requires.SimpleDependency):
         :param svc_ref: A service reference
         """
         with self._lock:
+            # Lazy removal from the heap
+            self._candidates.pop(svc_ref, None)
+
             if svc_ref is self.reference:
                 # Injected service going away...
-                service = self._value
-
-                # Clear the instance values
-                self._current_ranking = None
-                self._value = None
-                self.reference = None
-
                 if self.requirement.immediate_rebind:
-                    # Look for a replacement
-                    self._pending_ref = self._context.get_service_reference(
-                        self.requirement.specification, self.requirement.filter
-                    )
+                    # Use the next best service
+                    self._switch_to(self._best_candidate())
                 else:
-                    self._pending_ref = None
-
-                self._ipopo_instance.unbind(self, service, svc_ref)
+                    self._switch_to(None)
 
     def on_service_modify(self, svc_ref, old_properties):
         """
@@ -208,23 +308,48 @@ class BestDependency(requires.SimpleDependency):
         :param old_properties: Previous properties values
         """
         with self._lock:
-            if self.reference is None:
+            if self.reference is None or svc_ref not in self._candidates:
                 # A previously registered service now matches our filter
                 return self.on_service_arrival(svc_ref)
+
+            # Update its ranking
+            self._add_candidate(svc_ref)
+
+            # Check if the ranking changed the service to inject
+            best_ref = self._best_candidate()
+            if best_ref is self.reference:
+                # Still the best service: notify the property modification
+                if svc_ref is self.reference:
+                    # Call update only if necessary
+                    self._ipopo_instance.update(
+                        self, self._value, svc_ref, old_properties
+                    )
+            elif self.requirement.immediate_rebind:
+                # A new service is now the best: switch to it
+                self._switch_to(best_ref)
             else:
-                # Check if the ranking changed the service to inject
-                best_ref = self._context.get_service_reference(
-                    self.requirement.specification, self.requirement.filter
-                )
-                if best_ref is self.reference:
-                    # Still the best service: notify the property modification
-                    if svc_ref is self.reference:
-                        # Call update only if necessary
-                        self._ipopo_instance.update(
-                            self, self._value, svc_ref, old_properties
-                        )
-                else:
-                    # A new service is now the best: start a departure loop
-                    self.on_service_departure(self.reference)
+                # A new service is now the best: start a departure loop
+                self._switch_to(None)
 
             return None
+
+    def try_binding(self):
+        """
+        Binds the best service if needed
+        """
+        with self._lock:
+            if self.reference is not None:
+                # Already bound
+                return
+
+            if self._pending_ref is not None:
+                # Get the reference we chose to keep this component valid
+                ref = self._pending_ref
+                self._pending_ref = None
+            else:
+                # Get the best known service
+                ref = self._best_candidate()
+
+            if ref is not None:
+                # Found a service
+                self.on_service_arrival(ref)
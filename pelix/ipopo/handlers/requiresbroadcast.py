@@ -28,10 +28,12 @@ RequiresBroadcast handler implementation
 # Standard library
 import logging
 import threading
+import time
 
 # Pelix beans
 from pelix.constants import BundleActivator, BundleException
 from pelix.internals.events import ServiceEvent
+from pelix.threadpool import ThreadPool
 
 # iPOPO constants
 import pelix.ipopo.constants as ipopo_constants
@@ -49,6 +51,23 @@ __docformat__ = "restructuredtext en"
 
 # ------------------------------------------------------------------------------
 
+BROADCAST_POOL_SIZE = "pelix.ipopo.broadcast.pool.size"
+"""
+Framework property: maximum number of threads of the pool shared by the
+concurrent ``@RequiresBroadcast`` proxies
+"""
+
+DEFAULT_POOL_SIZE = 10
+""" Default maximum number of threads of the shared pool """
+
+_WORKER_STATE = threading.local()
+"""
+State of the current thread: its ``calling`` flag is set while it executes a
+broadcast call in the shared pool
+"""
+
+# ------------------------------------------------------------------------------
+
 
 class _HandlerFactory(requires._HandlerFactory):
     # pylint: disable=W0212, R0903
@@ -56,6 +75,12 @@ class _HandlerFactory(requires._HandlerFactory):
     Factory service for service registration handlers
     """
 
+    def __init__(self, pool):
+        """
+        :param pool: The thread pool shared by concurrent proxies
+        """
+        self._pool = pool
+
     def get_handlers(self, component_context, instance):
         """
         Sets up service providers for the given component
@@ -81,11 +106,21 @@ class _HandlerFactory(requires._HandlerFactory):
         handlers = []
         for field, config in requirements.items():
             # Extract values from tuple
-            requirement, muffle_ex, trace_ex = config
+            requirement, muffle_ex, trace_ex, concurrent, timeout, gather = (
+                config
+            )
 
             # Construct the handler
             handlers.append(
-                BroadcastDependency(field, requirement, muffle_ex, trace_ex)
+                BroadcastDependency(
+                    field,
+                    requirement,
+                    muffle_ex,
+                    trace_ex,
+                    self._pool if concurrent else None,
+                    timeout,
+                    gather,
+                )
             )
 
         return handlers
@@ -102,11 +137,27 @@ class _Activator(object):
         Sets up members
         """
         self._registration = None
+        self._pool = None
 
     def start(self, context):
         """
         Bundle started
         """
+        # Prepare the pool shared by concurrent proxies (no idle thread)
+        pool_size = context.get_property(BROADCAST_POOL_SIZE)
+        try:
+            self._pool = ThreadPool(
+                pool_size or DEFAULT_POOL_SIZE, 0, logname="ipopo-broadcast"
+            )
+        except ValueError as ex:
+            logging.getLogger(__name__).warning(
+                "Invalid broadcast pool size: %s", ex
+            )
+            self._pool = ThreadPool(
+                DEFAULT_POOL_SIZE, 0, logname="ipopo-broadcast"
+            )
+        self._pool.start()
+
         # Set up properties
         properties = {
             constants.PROP_HANDLER_ID: ipopo_constants.HANDLER_REQUIRES_BRODCAST
@@ -115,7 +166,7 @@ class _Activator(object):
         # Register the handler factory service
         self._registration = context.register_service(
             constants.SERVICE_IPOPO_HANDLER_FACTORY,
-            _HandlerFactory(),
+            _HandlerFactory(self._pool),
             properties,
         )
 
@@ -127,6 +178,10 @@ class _Activator(object):
         self._registration.unregister()
         self._registration = None
 
+        # Stop the pool
+        self._pool.stop()
+        self._pool = None
+
 
 # ------------------------------------------------------------------------------
 
@@ -172,19 +227,115 @@ class _ProxyDummy(object):
 # ------------------------------------------------------------------------------
 
 
+def _safe_call(method, args, kwargs):
+    """
+    Calls the given method, catching its exception
+
+    :param method: Method to call
+    :param args: Positional arguments
+    :param kwargs: Keyword arguments
+    :return: A (success flag, result or exception) tuple
+    """
+    try:
+        return True, method(*args, **kwargs)
+    except Exception as ex:  # pylint:disable=broad-except
+        return False, ex
+
+
+def _pool_call(abandoned, method, args, kwargs):
+    """
+    Calls the given method in a pool thread, unless the caller stopped
+    waiting for it before it started
+
+    :param abandoned: Event set when the caller doesn't wait anymore
+    :param method: Method to call
+    :param args: Positional arguments
+    :param kwargs: Keyword arguments
+    :return: A (success flag, result or exception) tuple
+    """
+    if abandoned.is_set():
+        # Free the thread for the next calls
+        return False, None
+
+    _WORKER_STATE.calling = True
+    try:
+        return _safe_call(method, args, kwargs)
+    finally:
+        _WORKER_STATE.calling = False
+
+
+# ------------------------------------------------------------------------------
+
+
+class BroadcastResult(object):
+    """
+    Results of a broadcast call, returned by the proxy when the requirement
+    gathers results
+    """
+
+    __slots__ = ("results", "errors", "timed_out")
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        # Service reference -> Result of the call
+        self.results = {}
+
+        # Service reference -> Exception raised by the call
+        self.errors = {}
+
+        # References of the services which didn't answer in time
+        self.timed_out = []
+
+    def __bool__(self):
+        """
+        Returns True if at least one service has been called successfully
+        """
+        return bool(self.results)
+
+    # Python 2 compatibility
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        """
+        String representation
+        """
+        return "BroadcastResult(results={0}, errors={1}, timed_out={2})".format(
+            len(self.results), len(self.errors), len(self.timed_out)
+        )
+
+
+# ------------------------------------------------------------------------------
+
+
 class BroadcastDependency(constants.DependencyHandler):
     """
     Manages a required dependency field when a component is running
     """
 
-    def __init__(self, field, requirement, muffle_exceptions, trace_exceptions):
+    def __init__(
+        self,
+        field,
+        requirement,
+        muffle_exceptions,
+        trace_exceptions,
+        pool=None,
+        timeout=None,
+        gather=False,
+    ):
         """
         Sets up the dependency
 
         :param field: The injected field name
         :param requirement: The Requirement describing this dependency
         :param muffle_exceptions: Flag to not propagate exceptions
-        :param proxy_class: Class to use to emulate the missing requirement
+        :param trace_exceptions: Flag to log muffled exceptions
+        :param pool: Thread pool to use to call services concurrently
+                     (None for sequential calls)
+        :param timeout: Maximum time to wait for concurrent calls to end
+                        (in seconds, None to wait forever)
+        :param gather: If True, calls return a BroadcastResult object
         """
         # The internal state lock
         self._lock = threading.RLock()
@@ -205,6 +356,11 @@ class BroadcastDependency(constants.DependencyHandler):
         self._muffle_ex = muffle_exceptions
         self._trace_ex = trace_exceptions
 
+        # Concurrent calls configuration
+        self._pool = pool
+        self._timeout = timeout
+        self._gather = gather
+
         # Injected proxy
         self._proxy = _ProxyDummy(self, None)
 
@@ -259,6 +415,7 @@ class BroadcastDependency(constants.DependencyHandler):
         self._context = None
         self._muffle_ex = False
         self._trace_ex = False
+        self._pool = None
         self._proxy = None
 
     def get_bindings(self):
@@ -451,6 +608,40 @@ class BroadcastDependency(constants.DependencyHandler):
                 del results[:]
                 raise
 
+    def _find_member(self, svc, all_members, members_str):
+        """
+        Looks for the member to call in the given service
+
+        :param svc: A bound service
+        :param all_members: Path to the member to call
+        :param members_str: Path to the member, as given to the proxy
+        :return: The member to call, or None if not found
+        """
+        try:
+            # Find the element to call
+            to_call = svc
+            for member in all_members:
+                to_call = getattr(to_call, member)
+            return to_call
+        except AttributeError:
+            self._logger.warning("%s as no %s member", svc, members_str)
+            return None
+
+    def _handle_error(self, ex):
+        """
+        Propagates or logs the exception raised by a called service
+
+        :param ex: The exception raised by a service
+        :raise Exception: The given exception, if it must not be muffled
+        """
+        if not self._muffle_ex:
+            # Propagate if requested
+            raise ex
+
+        if self._trace_ex:
+            # Log it
+            self._logger.exception(ex)
+
     def handle_call(self, members_str, args, kwargs):
         """
         Handles a call to the proxy
@@ -460,32 +651,149 @@ class BroadcastDependency(constants.DependencyHandler):
         else:
             all_members = []
 
+        if self._pool is not None:
+            # Concurrent calls are done outside the lock
+            return self._handle_concurrent_call(
+                members_str, all_members, args, kwargs
+            )
+
+        result = BroadcastResult() if self._gather else True
         with self._lock:
             if not self._services:
                 # Nothing we can do: return False
-                return False
+                return result if self._gather else False
 
             # Copy the list, just in case we have a side effect
-            for svc in list(self._services.values()):
+            for svc_ref, svc in list(self._services.items()):
+                to_call = self._find_member(svc, all_members, members_str)
+                if to_call is None:
+                    continue
+
                 try:
-                    # Find the element to call
-                    to_call = svc
-                    for member in all_members:
-                        to_call = getattr(to_call, member)
-                except AttributeError:
-                    self._logger.warning("%s as no %s member", svc, members_str)
+                    # Call it
+                    call_result = to_call(*args, **kwargs)
+                except Exception as ex:  # pylint:disable=broad-except
+                    if self._gather:
+                        result.errors[svc_ref] = ex
+                    self._handle_error(ex)
                 else:
-                    try:
-                        # Call it
-                        to_call(*args, **kwargs)
-                    except Exception as ex:  # pylint:disable=broad-except
-                        if not self._muffle_ex:
-                            # Propagate if requested
-                            raise ex
-
-                        if self._trace_ex:
-                            # Log it
-                            self._logger.exception(ex)
+                    if self._gather:
+                        result.results[svc_ref] = call_result
 
             # Service have been notified (or failed silently): return True
-            return True
+            return result
+
+    def _handle_concurrent_call(self, members_str, all_members, args, kwargs):
+        """
+        Calls all the bound services in parallel, using the shared thread
+        pool, then waits for the results up to the configured timeout.
+
+        A broadcast made by a called service is done in the calling pool
+        thread: waiting for tasks queued behind it could starve the pool.
+
+        :param members_str: Path to the member, as given to the proxy
+        :param all_members: Path to the member to call
+        :param args: Call positional arguments
+        :param kwargs: Call keyword arguments
+        :return: A BroadcastResult if results are gathered, else a boolean
+        """
+        with self._lock:
+            # Snapshot the bindings
+            services = list(self._services.items())
+
+        result = BroadcastResult()
+        if not services:
+            # Nothing we can do: return False
+            return result if self._gather else False
+
+        calls = []
+        for svc_ref, svc in services:
+            to_call = self._find_member(svc, all_members, members_str)
+            if to_call is not None:
+                calls.append((svc_ref, to_call))
+
+        if getattr(_WORKER_STATE, "calling", False):
+            # Nested broadcast: call the services in this thread
+            outcomes = [
+                (svc_ref, _safe_call(to_call, args, kwargs))
+                for svc_ref, to_call in calls
+            ]
+        else:
+            outcomes = self._wait_calls(
+                calls, members_str, args, kwargs, result
+            )
+
+        first_error = None
+        for svc_ref, (success, call_result) in outcomes:
+            if success:
+                result.results[svc_ref] = call_result
+            else:
+                result.errors[svc_ref] = call_result
+                if first_error is None:
+                    first_error = call_result
+
+                if self._trace_ex and self._muffle_ex:
+                    self._logger.error(
+                        "Error calling %s on %s: %s",
+                        members_str,
+                        svc_ref,
+                        call_result,
+                    )
+
+        if first_error is not None and not self._muffle_ex:
+            # Propagate the first error, once all services have been called
+            raise first_error
+
+        return result if self._gather else True
+
+    def _wait_calls(self, calls, members_str, args, kwargs, result):
+        """
+        Submits the calls to the shared thread pool and waits for their
+        results up to the configured timeout. The calls which didn't start
+        before the timeout are skipped.
+
+        :param calls: List of (service reference, method) tuples
+        :param members_str: Path to the member, as given to the proxy
+        :param args: Call positional arguments
+        :param kwargs: Call keyword arguments
+        :param result: The BroadcastResult storing the timed out references
+        :return: A list of (service reference, (success flag, result or
+                 exception)) tuples
+        """
+        # Submit the calls
+        abandoned = threading.Event()
+        futures = [
+            (
+                svc_ref,
+                self._pool.enqueue(
+                    _pool_call, abandoned, to_call, args, kwargs
+                ),
+            )
+            for svc_ref, to_call in calls
+        ]
+
+        # Wait for the results
+        if self._timeout is not None:
+            deadline = time.time() + self._timeout
+
+        outcomes = []
+        for svc_ref, future in futures:
+            if self._timeout is None:
+                timeout = None
+            else:
+                timeout = max(0, deadline - time.time())
+
+            try:
+                outcomes.append((svc_ref, future.result(timeout)))
+            except OSError:
+                # Timeout reached: the call will end in the pool
+                result.timed_out.append(svc_ref)
+                self._logger.warning(
+                    "%s didn't answer to %s in time", svc_ref, members_str
+                )
+
+        if result.timed_out:
+            # Don't start the calls still in the queue
+            abandoned.set()
+
+        return outcomes
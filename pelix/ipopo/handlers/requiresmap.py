@@ -30,6 +30,13 @@ import copy
 import logging
 import threading
 
+try:
+    # Python 3.3+
+    from types import MappingProxyType
+except ImportError:
+    # Python 2: no read-only mapping, inject copies of the snapshot
+    MappingProxyType = None
+
 # Pelix beans
 from pelix.constants import BundleActivator, BundleException
 from pelix.internals.events import ServiceEvent
@@ -210,6 +217,9 @@ class _RuntimeDependency(constants.DependencyHandler):
         # Future injected dictionary
         self._future_value = {}
 
+        # Read-only view of the future value (immutable mode only)
+        self._snapshot = None
+
     def manipulate(self, stored_instance, component_instance):
         """
         Stores the given StoredInstance bean.
@@ -224,7 +234,7 @@ class _RuntimeDependency(constants.DependencyHandler):
         self._context = stored_instance.bundle_context
 
         # Set the default value for the field: an empty dictionary
-        setattr(component_instance, self._field, {})
+        setattr(component_instance, self._field, self.get_value())
 
     def clear(self):
         """
@@ -242,6 +252,7 @@ class _RuntimeDependency(constants.DependencyHandler):
         self._key = None
         self._allow_none = None
         self._future_value = None
+        self._snapshot = None
         self._field = None
 
     def get_bindings(self):
@@ -273,11 +284,33 @@ class _RuntimeDependency(constants.DependencyHandler):
 
         :return: The value to inject
         """
-        # Return a copy of the future value
         with self._lock:
+            if self.requirement.immutable:
+                if self._snapshot is None:
+                    # Bindings changed since the last injection
+                    self._snapshot = self._make_snapshot()
+                    if MappingProxyType is not None:
+                        self._snapshot = MappingProxyType(self._snapshot)
+
+                if MappingProxyType is None:
+                    # The component can't alter the snapshot through a copy
+                    return copy.copy(self._snapshot)
+
+                return self._snapshot
+
+            # Return a copy of the future value
             # IronPython can't copy dictionary with a None key
             return copy.copy(self._future_value)
 
+    def _make_snapshot(self):
+        """
+        Prepares the content of the read-only mapping injected in immutable
+        mode
+
+        :return: A dictionary which won't be modified by the handler
+        """
+        return copy.copy(self._future_value)
+
     def is_valid(self):
         """
         Tests if the dependency is in a valid state
@@ -438,6 +471,7 @@ class SimpleDependency(_RuntimeDependency):
                     # Store the information
                     self._future_value[prop_value] = service
                     self.services[svc_ref] = service
+                    self._snapshot = None
 
                     # Call back iPOPO
                     self._ipopo_instance.bind(self, service, svc_ref)
@@ -461,6 +495,7 @@ class SimpleDependency(_RuntimeDependency):
 
                 # Remove the injected service
                 del self._future_value[prop_value]
+                self._snapshot = None
 
                 self._ipopo_instance.unbind(self, service, svc_ref)
                 return True
@@ -493,6 +528,7 @@ class SimpleDependency(_RuntimeDependency):
                         # New property accepted and not yet in use
                         del self._future_value[old_value]
                         self._future_value[prop_value] = service
+                        self._snapshot = None
 
                         # Notify the property modification, with a value change
                         self._ipopo_instance.update(
@@ -502,6 +538,7 @@ class SimpleDependency(_RuntimeDependency):
                         # Consider the service as gone
                         del self._future_value[old_value]
                         del self.services[svc_ref]
+                        self._snapshot = None
                         self._ipopo_instance.unbind(self, service, svc_ref)
                 else:
                     # Notify the property modification
@@ -526,6 +563,7 @@ class AggregateDependency(_RuntimeDependency):
         :param service: Service to add to the dictionary
         """
         self._future_value.setdefault(key, []).append(service)
+        self._snapshot = None
 
     def __remove_service(self, key, service):
         """
@@ -538,6 +576,7 @@ class AggregateDependency(_RuntimeDependency):
             # Remove the injected service
             prop_services = self._future_value[key]
             prop_services.remove(service)
+            self._snapshot = None
 
             # Clean up
             if not prop_services:
@@ -548,6 +587,15 @@ class AggregateDependency(_RuntimeDependency):
             # if allow_none is False
             pass
 
+    def _make_snapshot(self):
+        """
+        Prepares the content of the read-only mapping injected in immutable
+        mode
+
+        :return: A dictionary of tuples
+        """
+        return {key: tuple(value) for key, value in self._future_value.items()}
+
     def get_value(self):
         """
         Retrieves the value to inject in the component
@@ -555,6 +603,9 @@ class AggregateDependency(_RuntimeDependency):
         :return: The value to inject
         """
         with self._lock:
+            if self.requirement.immutable:
+                return super(AggregateDependency, self).get_value()
+
             # The value field must be a deep copy of our dictionary
             if self._future_value is not None:
                 return {
@@ -230,26 +230,50 @@ class _VariableFilterMixIn:
                 for svc_ref in self.get_bindings():
                     self.on_service_departure(svc_ref)
 
+    def on_properties_change(self, changes):
+        """
+        A batch of component properties has been updated: update the filter
+        only once
+
+        :param changes: A dictionary: name → (old value, new value)
+        """
+        for name in changes:
+            if name in self._keys:
+                # Same behaviour as a single change
+                self.on_property_change(name, *changes[name])
+                break
+
     def _reset(self):
         """
         Called when the filter has been changed
         """
         with self._lock:
-            # Start listening to services with the new filter
-            self.stop()
-            self.start()
-
-            # Force bindings update
-            self._ipopo_instance.update_bindings()
-
-            for svc_ref in self.get_bindings():
-                # Check if the current reference matches the filter
-                if not self.requirement.filter.matches(
-                    svc_ref.get_properties()
-                ):
-                    # Not the case: emulate a service departure
-                    # The instance life cycle will be updated as well
-                    self.on_service_departure(svc_ref)
+            # Listen to services with the new filter
+            if not self._context.set_service_listener_filter(
+                self, self.requirement.filter
+            ):
+                # Listener not yet registered
+                self.start()
+
+            # Look for the matching services only once
+            refs = (
+                self._context.get_all_service_references(
+                    self.requirement.specification, self.requirement.filter
+                )
+                or []
+            )
+
+            # Only bind and unbind the services which need it
+            self._retarget(refs)
+
+    def _retarget(self, refs):
+        """
+        Updates the bindings of the dependency according to the services
+        matching the new filter
+
+        :param refs: The sorted list of the services matching the filter
+        """
+        raise NotImplementedError
 
 
 class SimpleDependency(_VariableFilterMixIn, requires.SimpleDependency):
@@ -280,6 +304,30 @@ class SimpleDependency(_VariableFilterMixIn, requires.SimpleDependency):
             # Look for a service only if the filter is valid
             requires.SimpleDependency.try_binding(self)
 
+    def _retarget(self, refs):
+        """
+        Updates the bindings of the dependency according to the services
+        matching the new filter
+
+        :param refs: The sorted list of the services matching the filter
+        """
+        if self.reference is None:
+            if refs:
+                # A service matches the new filter
+                self.on_service_arrival(refs[0])
+        elif self.reference not in refs:
+            # The bound service doesn't match anymore: the best matching one
+            # will be bound by try_binding(), as it is done after a departure
+            # with immediate_rebind
+            service = self._value
+            svc_ref = self.reference
+
+            self._value = None
+            self.reference = None
+            self._pending_ref = refs[0] if refs else None
+
+            self._ipopo_instance.unbind(self, service, svc_ref)
+
 
 class AggregateDependency(_VariableFilterMixIn, requires.AggregateDependency):
     """
@@ -308,3 +356,23 @@ class AggregateDependency(_VariableFilterMixIn, requires.AggregateDependency):
         if self.valid_filter:
             # Look for a service only if the filter is valid
             requires.AggregateDependency.try_binding(self)
+
+    def _retarget(self, refs):
+        """
+        Updates the bindings of the dependency according to the services
+        matching the new filter
+
+        :param refs: The sorted list of the services matching the filter
+        """
+        bound = set(self.get_bindings())
+
+        # Bind the new services first, to avoid an invalidation
+        for svc_ref in refs:
+            if svc_ref not in bound:
+                self.on_service_arrival(svc_ref)
+
+        # Unbind the services which don't match anymore
+        matching = set(refs)
+        for svc_ref in bound:
+            if svc_ref not in matching:
+                self.on_service_departure(svc_ref)
@@ -192,6 +192,10 @@ class TemporalException(constants.HandlerException):
 class _TemporalProxy(object):
     """
     The injected proxy
+
+    While a service is bound, attributes are read without waiting on the
+    event. Bound methods of the service are cached until the next call to
+    ``set_service()`` or ``unset_service()``.
     """
 
     def __init__(self, timeout):
@@ -201,19 +205,44 @@ class _TemporalProxy(object):
         self.__event = utilities.EventData()
         self.__timeout = timeout
 
+        # (service, bound methods cache) tuple, or None. Replaced as a whole
+        # to avoid mixing a service with the cache of its predecessor
+        self.__bound = None
+
     def set_service(self, service):
         """
         Sets the injected service
 
         :param service: The injected service, or None
         """
+        self.__bound = (service, {})
         self.__event.set(service)
 
     def unset_service(self):
         """
         The injected service has gone away
         """
+        # Clear the event first: a caller seeing no binding must wait
         self.__event.clear()
+        self.__bound = None
+
+    def __get_bound(self):
+        """
+        Returns the current binding, waiting for it if necessary
+
+        :return: A (service, cache) tuple
+        :raise TemporalException: No service bound before timeout
+        """
+        bound = self.__bound
+        if bound is None:
+            # Slow path: wait for a service
+            if self.__event.wait(self.__timeout):
+                bound = self.__bound
+
+            if bound is None:
+                raise TemporalException("No service found before timeout")
+
+        return bound
 
     def __getattr__(self, item):
         """
@@ -221,26 +250,30 @@ class _TemporalProxy(object):
 
         :return: The attribute
         """
-        if self.__event.wait(self.__timeout):
-            return getattr(self.__event.data, item)
-        else:
-            raise TemporalException("No service found before timeout")
+        service, cache = self.__get_bound()
+        try:
+            return cache[item]
+        except KeyError:
+            value = getattr(service, item)
+            if getattr(value, "__self__", None) is service:
+                # Only cache methods bound to the service: other attributes
+                # might be modified by the service itself
+                cache[item] = value
+            return value
 
     def __call__(self, *args, **kwargs):
         """
         Call the underlying object. Lets exception propagate
         """
-        if self.__event.wait(self.__timeout):
-            # We have a service: call it
-            return self.__event.data.__call__(*args, **kwargs)
-        else:
-            raise TemporalException("No service found before timeout")
+        # We have a service: call it
+        return self.__get_bound()[0].__call__(*args, **kwargs)
 
     def __bool__(self):
         """
         Boolean value of the proxy
         """
-        return self.__event.is_set() and bool(self.__event.data)
+        bound = self.__bound
+        return bound is not None and bool(bound[0])
 
     # Python 2 compatibility
     __nonzero__ = __bool__
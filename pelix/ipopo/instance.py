@@ -26,10 +26,18 @@ Instance manager class definition
 """
 
 # Standard library
+import contextlib
 import logging
 import threading
 import traceback
 
+try:
+    # Python 3
+    from time import perf_counter as _clock
+except ImportError:
+    # Python 2
+    from time import time as _clock
+
 # Standard typing module should be optional
 try:
     # pylint: disable=W0611
@@ -41,6 +49,7 @@ except ImportError:
 
 # Pelix
 from pelix.constants import FrameworkException
+from pelix.utilities import use_service
 
 # iPOPO constants
 import pelix.ipopo.constants as constants
@@ -58,6 +67,160 @@ __docformat__ = "restructuredtext en"
 # ------------------------------------------------------------------------------
 
 
+class ComponentStats(object):
+    """
+    Life cycle and binding statistics of a component instance
+    """
+
+    # Try to reduce memory footprint (stored instances)
+    __slots__ = (
+        "validations",
+        "invalidations",
+        "waiting_time",
+        "__waiting_since",
+        "__timings",
+    )
+
+    CONSTRUCTOR = "constructor"
+    """ Time spent in the component constructor """
+
+    VALIDATE = "validate"
+    """ Time spent in the validation callbacks """
+
+    INVALIDATE = "invalidate"
+    """ Time spent in the invalidation callbacks """
+
+    BIND = "bind"
+    """ Time spent injecting a dependency """
+
+    UNBIND = "unbind"
+    """ Time spent removing a dependency """
+
+    UPDATE = "update"
+    """ Time spent notifying the update of a dependency """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        # Number of successful validations and of invalidations
+        self.validations = 0
+        self.invalidations = 0
+
+        # Time spent waiting for dependencies (seconds)
+        self.waiting_time = 0.0
+        self.__waiting_since = None  # type: Optional[float]
+
+        # Kind -> [count, total, max, last]
+        self.__timings = {}  # type: Dict[str, List[Any]]
+
+    @staticmethod
+    def now():
+        # type: () -> float
+        """
+        Returns the current value of the clock used to time callbacks
+
+        :return: A time in seconds, only meaningful to compute durations
+        """
+        return _clock()
+
+    def record(self, kind, start):
+        # type: (str, float) -> float
+        """
+        Records the duration of an operation
+
+        :param kind: Kind of operation (CONSTRUCTOR, VALIDATE, ...)
+        :param start: Value of ``now()`` at the beginning of the operation
+        :return: The duration of the operation, in seconds
+        """
+        duration = _clock() - start
+        try:
+            timing = self.__timings[kind]
+        except KeyError:
+            self.__timings[kind] = [1, duration, duration, duration]
+        else:
+            timing[0] += 1
+            timing[1] += duration
+            timing[2] = max(timing[2], duration)
+            timing[3] = duration
+
+        return duration
+
+    def get_last(self, kind):
+        # type: (str) -> Optional[float]
+        """
+        Returns the duration of the last operation of the given kind
+
+        :param kind: Kind of operation
+        :return: A duration in seconds, or None
+        """
+        try:
+            return self.__timings[kind][3]
+        except KeyError:
+            return None
+
+    def start_waiting(self):
+        # type: () -> None
+        """
+        The component starts waiting for its dependencies
+        """
+        if self.__waiting_since is None:
+            self.__waiting_since = _clock()
+
+    def stop_waiting(self):
+        # type: () -> None
+        """
+        The component doesn't wait for its dependencies anymore
+        """
+        if self.__waiting_since is not None:
+            self.waiting_time += _clock() - self.__waiting_since
+            self.__waiting_since = None
+
+    def to_dict(self):
+        # type: () -> Dict[str, Any]
+        """
+        Returns a snapshot of the statistics.
+        The result dictionary has the following keys:
+
+        * ``validations``: Number of successful validations
+        * ``invalidations``: Number of invalidations
+        * ``waiting``: Time spent waiting for dependencies, in seconds,
+          including the current wait
+        * ``timings``: A dictionary associating a kind of operation to a
+          dictionary with the ``count``, ``total``, ``max``, ``mean`` and
+          ``last`` durations, in seconds
+
+        :return: A dictionary
+        """
+        waiting = self.waiting_time
+        if self.__waiting_since is not None:
+            waiting += _clock() - self.__waiting_since
+
+        return {
+            "validations": self.validations,
+            "invalidations": self.invalidations,
+            "waiting": waiting,
+            "timings": {
+                kind: {
+                    "count": count,
+                    "total": total,
+                    "max": max_duration,
+                    "mean": total / count,
+                    "last": last,
+                }
+                for kind, (
+                    count,
+                    total,
+                    max_duration,
+                    last,
+                ) in self.__timings.items()
+            },
+        }
+
+
+# ------------------------------------------------------------------------------
+
+
 class StoredInstance(object):
     """
     Represents a component instance
@@ -71,10 +234,13 @@ class StoredInstance(object):
         "instance",
         "name",
         "state",
+        "stats",
         "_controllers_state",
         "_handlers",
         "_ipopo_service",
         "_lock",
+        "_properties_batch",
+        "_properties_batch_depth",
         "_logger",
         "error_trace",
         "__all_handlers",
@@ -95,8 +261,8 @@ class StoredInstance(object):
     ERRONEOUS = 4
     """ This component has failed while validating """
 
-    def __init__(self, ipopo_service, context, instance, handlers):
-        # type: (Any, ComponentContext, Any, Iterable[Any]) -> None
+    def __init__(self, ipopo_service, context, instance, handlers, stats=None):
+        # type: (Any, ComponentContext, Any, Iterable[Any], Optional[ComponentStats]) -> None
         """
         Sets up the instance object
 
@@ -105,6 +271,7 @@ class StoredInstance(object):
         :param context: The component context
         :param instance: The component instance
         :param handlers: The list of handlers associated to this component
+        :param stats: The statistics of the component (optional)
         """
         # The logger
         self._logger = logging.getLogger(
@@ -114,6 +281,10 @@ class StoredInstance(object):
         # The lock
         self._lock = threading.RLock()
 
+        # Batch of property changes: name -> (old value, new value)
+        self._properties_batch = {}  # type: Dict[str, Tuple[Any, Any]]
+        self._properties_batch_depth = 0
+
         # The iPOPO service
         self._ipopo_service = ipopo_service
 
@@ -135,6 +306,10 @@ class StoredInstance(object):
         # Stack track of validation error
         self.error_trace = None  # type: str
 
+        # Life cycle statistics: the component waits for its dependencies
+        self.stats = stats if stats is not None else ComponentStats()
+        self.stats.start_waiting()
+
         # Store the bundle context
         self.bundle_context = self.context.get_bundle_context()
 
@@ -259,10 +434,74 @@ class StoredInstance(object):
         :param new_value: The new property value
         """
         with self._lock:
+            if self._properties_batch_depth:
+                # Keep the value from before the batch
+                try:
+                    old_value = self._properties_batch[name][0]
+                except KeyError:
+                    pass
+
+                self._properties_batch[name] = (old_value, new_value)
+                return
+
             self.__safe_handlers_callback(
                 "on_property_change", name, old_value, new_value
             )
 
+    @contextlib.contextmanager
+    def properties_batch(self):
+        """
+        Context in which the changes of properties are kept, and given to the
+        handlers at once when exiting the outermost context
+        """
+        with self._lock:
+            self._properties_batch_depth += 1
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._properties_batch_depth -= 1
+                if not self._properties_batch_depth:
+                    # Commit the changes
+                    changes = {
+                        name: values
+                        for name, values in self._properties_batch.items()
+                        if values[0] != values[1]
+                    }
+                    self._properties_batch.clear()
+
+                    if changes:
+                        self.__notify_properties_change(changes)
+
+    def __notify_properties_change(self, changes):
+        # type: (Dict[str, Tuple[Any, Any]]) -> None
+        """
+        Notifies the handlers about the changes of a batch of properties.
+        Handlers without an ``on_properties_change()`` method are notified
+        of each change.
+
+        :param changes: A dictionary: name → (old value, new value)
+        """
+        if self.state == StoredInstance.KILLED:
+            # Nothing to do
+            return
+
+        for handler in self.get_handlers():
+            if hasattr(handler, "on_properties_change"):
+                self.__safe_handler_callback(
+                    handler, "on_properties_change", changes
+                )
+            else:
+                for name, (old_value, new_value) in changes.items():
+                    self.__safe_handler_callback(
+                        handler,
+                        "on_property_change",
+                        name,
+                        old_value,
+                        new_value,
+                    )
+
     def update_hidden_property(self, name, old_value, new_value):
         # type: (str, Any, Any) -> None
         """
@@ -300,6 +539,10 @@ class StoredInstance(object):
         state and on the state of its dependencies
         """
         with self._lock:
+            if self.state == StoredInstance.KILLED:
+                # Killed while being started
+                return
+
             # Validation flags
             was_valid = self.state == StoredInstance.VALID
             can_validate = self.state not in (
@@ -329,6 +572,10 @@ class StoredInstance(object):
         :return: True if the component can be validated
         """
         with self._lock:
+            if self.state == StoredInstance.KILLED:
+                # Killed while being started
+                return False
+
             all_valid = True
             for handler in self.get_handlers(handlers_const.KIND_DEPENDENCY):
                 # Try to bind
@@ -345,7 +592,8 @@ class StoredInstance(object):
         Starts the handlers
         """
         with self._lock:
-            self.__safe_handlers_callback("start")
+            if self.state != StoredInstance.KILLED:
+                self.__safe_handlers_callback("start")
 
     def retry_erroneous(self, properties_update):
         # type: (dict) -> int
@@ -390,22 +638,27 @@ class StoredInstance(object):
 
             # Change the state
             self.state = StoredInstance.INVALID
+            self.stats.invalidations += 1
+            self.stats.start_waiting()
 
             # Call the handlers
             self.__safe_handlers_callback("pre_invalidate")
 
             # Call the component
             if callback:
+                start = self.stats.now()
                 # pylint: disable=W0212
                 self.__safe_validation_callback(
                     constants.IPOPO_CALLBACK_INVALIDATE
                 )
+                duration = self.stats.record(ComponentStats.INVALIDATE, start)
 
                 # Trigger an "Invalidated" event
                 self._ipopo_service._fire_ipopo_event(
                     constants.IPopoEvent.INVALIDATED,
                     self.factory_name,
                     self.name,
+                    duration,
                 )
 
             # Call the handlers
@@ -457,6 +710,7 @@ class StoredInstance(object):
 
             # Change the state
             self.state = StoredInstance.KILLED
+            self.stats.stop_waiting()
 
             # Trigger the event
             # pylint: disable=W0212
@@ -501,14 +755,18 @@ class StoredInstance(object):
             # Call the handlers
             self.__safe_handlers_callback("pre_validate")
 
+            duration = None
             if safe_callback:
                 # Safe call back needed and not yet passed
                 self.state = StoredInstance.VALIDATING
 
                 # Call @ValidateComponent first, then @Validate
-                if not self.__safe_validation_callback(
+                start = self.stats.now()
+                validated = self.__safe_validation_callback(
                     constants.IPOPO_CALLBACK_VALIDATE
-                ):
+                )
+                duration = self.stats.record(ComponentStats.VALIDATE, start)
+                if not validated:
                     # Stop there if the callback failed
                     self.state = StoredInstance.VALID
                     self.invalidate(True)
@@ -519,6 +777,8 @@ class StoredInstance(object):
 
             # All good
             self.state = StoredInstance.VALID
+            self.stats.validations += 1
+            self.stats.stop_waiting()
 
             # Call the handlers
             self.__safe_handlers_callback("post_validate")
@@ -528,10 +788,41 @@ class StoredInstance(object):
                 # pylint: disable=W0212
                 # Trigger the iPOPO event (after the service _registration)
                 self._ipopo_service._fire_ipopo_event(
-                    constants.IPopoEvent.VALIDATED, self.factory_name, self.name
+                    constants.IPopoEvent.VALIDATED,
+                    self.factory_name,
+                    self.name,
+                    duration,
                 )
         return True
 
+    def __await_callback(self, awaitable):
+        # type: (Any) -> Any
+        """
+        Runs the awaitable returned by a callback in the event loop provided
+        by the ``pelix.ipopo.async_loop`` bundle
+
+        :param awaitable: The result of an ``async def`` callback
+        :return: The callback result, or None if it wasn't waited for
+        :raise Exception: Something went wrong
+        """
+        svc_ref = self.bundle_context.get_service_reference(
+            constants.SERVICE_IPOPO_ASYNC_LOOP
+        )
+        if svc_ref is None:
+            # Avoid the "never awaited" warning
+            close = getattr(awaitable, "close", None)
+            if close is not None:
+                close()
+
+            raise TypeError(
+                "No event loop service to run coroutine callbacks "
+                "of {0}".format(self.name)
+            )
+
+        wait = self.context.properties.get(constants.IPOPO_ASYNC_WAIT, True)
+        with use_service(self.bundle_context, svc_ref) as loop_svc:
+            return loop_svc.execute(awaitable, wait)
+
     def __callback(self, event, *args, **kwargs):
         # type: (str, *Any, **Any) -> Any
         """
@@ -548,6 +839,10 @@ class StoredInstance(object):
 
         # Call it
         result = comp_callback(self.instance, *args, **kwargs)
+        if hasattr(result, "__await__"):
+            # Coroutine callback
+            result = self.__await_callback(result)
+
         if result is None:
             # Special case, if the call back returns nothing
             return True
@@ -588,6 +883,10 @@ class StoredInstance(object):
 
         # Call it
         result = comp_callback(self.instance, *mapped_args)
+        if hasattr(result, "__await__"):
+            # Coroutine callback
+            result = self.__await_callback(result)
+
         if result is None:
             # Special case, if the call back returns nothing
             return True
@@ -619,6 +918,10 @@ class StoredInstance(object):
 
         # Call it
         result = callback(self.instance, field, *args, **kwargs)
+        if hasattr(result, "__await__"):
+            # Coroutine callback
+            result = self.__await_callback(result)
+
         if result is None:
             # Special case, if the call back returns nothing
             return True
@@ -878,6 +1181,8 @@ class StoredInstance(object):
         :param service: The injected service
         :param reference: The reference of the injected service
         """
+        start = self.stats.now()
+
         # Set the value
         setattr(self.instance, dependency.get_field(), dependency.get_value())
 
@@ -891,6 +1196,10 @@ class StoredInstance(object):
             reference,
         )
 
+        self.__fire_timed_event(
+            constants.IPopoEvent.BOUND, ComponentStats.BIND, start
+        )
+
     def __update_binding(
         self, dependency, service, reference, old_properties, new_value
     ):
@@ -905,6 +1214,8 @@ class StoredInstance(object):
         :param old_properties: Previous properties of the dependency
         :param new_value: If True, inject the new value of the handler
         """
+        start = self.stats.now()
+
         if new_value:
             # Set the value
             setattr(
@@ -924,6 +1235,10 @@ class StoredInstance(object):
             constants.IPOPO_CALLBACK_UPDATE, service, reference, old_properties
         )
 
+        self.__fire_timed_event(
+            constants.IPopoEvent.UPDATED, ComponentStats.UPDATE, start
+        )
+
     def __unset_binding(self, dependency, service, reference):
         # type: (Any, Any, ServiceReference) -> None
         """
@@ -933,6 +1248,8 @@ class StoredInstance(object):
         :param service: The injected service
         :param reference: The reference of the injected service
         """
+        start = self.stats.now()
+
         # Call the component back
         self.__safe_field_callback(
             dependency.get_field(),
@@ -948,3 +1265,25 @@ class StoredInstance(object):
 
         # Unget the service
         self.bundle_context.unget_service(reference)
+
+        self.__fire_timed_event(
+            constants.IPopoEvent.UNBOUND, ComponentStats.UNBIND, start
+        )
+
+    def __fire_timed_event(self, event, kind, start):
+        # type: (int, str, float) -> None
+        """
+        Records the duration of a binding operation and notifies the iPOPO
+        event listeners
+
+        :param event: Kind of iPOPO event
+        :param kind: Kind of operation, for the statistics
+        :param start: Value of ``ComponentStats.now()`` at the beginning of
+                      the operation
+        """
+        duration = self.stats.record(kind, start)
+        if self._ipopo_service is not None:
+            # pylint: disable=W0212
+            self._ipopo_service._fire_ipopo_event(
+                event, self.factory_name, self.name, duration
+            )
@@ -35,7 +35,7 @@ import threading
 # Standard typing module should be optional
 try:
     # pylint: disable=W0611
-    from typing import Any, Dict
+    from typing import Any, Dict, Set
     from pelix.framework import BundleContext
 except ImportError:
     pass
@@ -87,6 +87,9 @@ class IPopoWaitingList(object):
         # Component Name -> Factory Name
         self.__names = {}  # type: Dict[str, str]
 
+        # Factory name -> Names of the components not yet instantiated
+        self.__pending = {}  # type: Dict[str, Set[str]]
+
         # Some locking
         self.__lock = threading.RLock()
 
@@ -112,7 +115,7 @@ class IPopoWaitingList(object):
                 ipopo.instantiate(factory, component, properties)
             except TypeError:
                 # Unknown factory: try later
-                pass
+                return
             except ValueError as ex:
                 # Already known component
                 _logger.error("Component already running: %s", ex)
@@ -120,6 +123,28 @@ class IPopoWaitingList(object):
                 # Other error
                 _logger.exception("Error instantiating component: %s", ex)
 
+            # Don't try again until the factory comes back
+            self.__set_pending(factory, component, False)
+
+    def __set_pending(self, factory, component, pending):
+        # type: (str, str, bool) -> None
+        """
+        Updates the index of the components waiting for their factory
+
+        :param factory: Component factory
+        :param component: Component name
+        :param pending: True if the component waits for its factory
+        """
+        with self.__lock:
+            if pending:
+                self.__pending.setdefault(factory, set()).add(component)
+            else:
+                components = self.__pending.get(factory)
+                if components is not None:
+                    components.discard(component)
+                    if not components:
+                        del self.__pending[factory]
+
     def _start(self):
         """
         Starts the instantiation queue (called by its bundle activator)
@@ -156,6 +181,7 @@ class IPopoWaitingList(object):
         """
         self.__names.clear()
         self.__queue.clear()
+        self.__pending.clear()
         self.__context = None
 
     def service_changed(self, event):
@@ -179,22 +205,42 @@ class IPopoWaitingList(object):
         kind = event.get_kind()
         if kind == IPopoEvent.REGISTERED:
             # A factory has been registered
-            try:
-                with use_ipopo(self.__context) as ipopo:
-                    factory = event.get_factory_name()
+            factory = event.get_factory_name()
+            with self.__lock:
+                # Copy the names of the components waiting for this factory
+                components = list(self.__pending.get(factory, ()))
 
-                    with self.__lock:
-                        # Copy the list of components names for this factory
-                        components = self.__queue[factory].copy()
+            if not components:
+                # No components for this new factory
+                return
 
+            try:
+                with use_ipopo(self.__context) as ipopo:
                     for component in components:
                         self._try_instantiate(ipopo, factory, component)
             except BundleException:
                 # iPOPO not yet started
                 pass
-            except KeyError:
-                # No components for this new factory
-                pass
+        elif kind == IPopoEvent.UNREGISTERED:
+            # A factory is gone, with its components: wait for it again
+            factory = event.get_factory_name()
+            with self.__lock:
+                components = self.__queue.get(factory)
+                if components:
+                    self.__pending[factory] = set(components)
+
+    def get_pending_counts(self):
+        # type: () -> Dict[str, int]
+        """
+        Returns the number of queued components waiting for each factory
+
+        :return: A dictionary: factory name → number of waiting components
+        """
+        with self.__lock:
+            return {
+                factory: len(components)
+                for factory, components in self.__pending.items()
+            }
 
     def add(self, factory, component, properties=None):
         # type: (str, str, dict) -> None
@@ -220,6 +266,7 @@ class IPopoWaitingList(object):
             # Store component description
             self.__names[component] = factory
             self.__queue.setdefault(factory, {})[component] = properties
+            self.__set_pending(factory, component, True)
 
             try:
                 with use_ipopo(self.__context) as ipopo:
@@ -247,6 +294,7 @@ class IPopoWaitingList(object):
             if not components:
                 # No more component for this factory
                 del self.__queue[factory]
+            self.__set_pending(factory, component, False)
 
             # Kill the component
             try:
@@ -3,6 +3,9 @@
 """
 Utility methods for SSL
 
+SSL contexts are shared: loading certificates and trust stores is costly, and
+TLS sessions can only be resumed with the context which created them.
+
 :author: Thomas Calmant
 :copyright: Copyright 2023, Thomas Calmant
 :license: Apache License 2.0
@@ -27,7 +30,9 @@ Utility methods for SSL
 
 # Standard library
 import logging
+import os
 import ssl
+import threading
 
 try:
     from ssl import _RESTRICTED_SERVER_CIPHERS
@@ -39,6 +44,13 @@ except ImportError:
         "RSA+3DES:!aNULL:!eNULL:!MD5:!DSS:!RC4"
     )
 
+# Standard typing module should be optional
+try:
+    # pylint: disable=W0611
+    from typing import Any, Dict, Iterable, Optional, Tuple
+except ImportError:
+    pass
+
 # ------------------------------------------------------------------------------
 
 # Module version
@@ -51,14 +63,295 @@ __docformat__ = "restructuredtext en"
 # ------------------------------------------------------------------------------
 
 
-def wrap_socket(socket, certfile, keyfile, password=None):
+_CONTEXTS_LOCK = threading.Lock()
+""" Lock of the contexts and sessions caches """
+
+_CONTEXTS = {}  # type: Dict[Tuple[Any, ...], Tuple[Tuple[Any, ...], ssl.SSLContext]]
+""" Configuration -> (modification times of its files, SSL context) """
+
+_SESSIONS = {}  # type: Dict[Tuple[str, Any], Tuple[ssl.SSLContext, Any]]
+""" (host, port) -> (SSL context, last TLS session) """
+
+# ------------------------------------------------------------------------------
+
+
+def _file_mtime(path):
+    # type: (Optional[str]) -> Optional[float]
+    """
+    Returns the modification time of a file, so that renewed certificates are
+    reloaded
+
+    :param path: Path to a file (can be None)
+    :return: The modification time of the file, or None
+    """
+    if not path:
+        return None
+
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        # Let the SSL context report the error
+        return None
+
+
+def _get_context(key, files, factory):
+    """
+    Returns the SSL context associated to the given key, creating it if
+    necessary. The context is replaced if one of its files has been modified.
+
+    :param key: Cache key
+    :param files: Paths of the files loaded by the context (can be None)
+    :param factory: Method creating the context
+    :return: An SSLContext
+    """
+    mtimes = tuple(_file_mtime(path) for path in files)
+    with _CONTEXTS_LOCK:
+        try:
+            context_mtimes, context = _CONTEXTS[key]
+            if context_mtimes == mtimes:
+                return context
+        except KeyError:
+            pass
+
+        context = factory()
+        _CONTEXTS[key] = (mtimes, context)
+        return context
+
+
+def _configure_context(context, ciphers, alpn_protocols):
+    """
+    Sets the cipher suites and ALPN protocols of an SSL context
+
+    :param context: An SSLContext
+    :param ciphers: OpenSSL cipher list string (None to keep the defaults)
+    :param alpn_protocols: Protocols to negotiate with ALPN, by order of
+                           preference (None to disable)
+    """
+    if ciphers:
+        context.set_ciphers(ciphers)
+
+    if alpn_protocols:
+        try:
+            context.set_alpn_protocols(list(alpn_protocols))
+        except (AttributeError, NotImplementedError):
+            logging.getLogger("ssl_wrap").warning(
+                "ALPN is not supported by this version of Python/OpenSSL"
+            )
+
+
+def get_server_context(
+    certfile,
+    keyfile=None,
+    password=None,
+    ca_file=None,
+    client_auth=False,
+    ciphers=None,
+    alpn_protocols=None,
+):
+    # type: (str, Optional[str], Optional[str], Optional[str], bool, Optional[str], Optional[Iterable[str]]) -> ssl.SSLContext
+    """
+    Returns the shared server-side SSL context for the given configuration.
+
+    The context is created on first call and kept while the certificate files
+    are not modified. Clients can resume their TLS sessions (session IDs and
+    session tickets) on all the servers sharing this context, avoiding a full
+    handshake.
+
+    :param certfile: The server certificate file
+    :param keyfile: The server private key file
+    :param password: Password for the private key file
+    :param ca_file: Certificate authorities used to check client certificates
+                    (None to use the default ones)
+    :param client_auth: If True, clients must send a valid certificate
+    :param ciphers: OpenSSL cipher list string (defaults to a restricted list
+                    of secure ciphers)
+    :param alpn_protocols: Protocols to negotiate with ALPN, by order of
+                           preference (None to disable)
+    :return: An SSLContext
+    :raise SSLError: Error loading the certificates
+    :raise AttributeError: SSL contexts are not supported
+    """
+    if alpn_protocols is not None:
+        alpn_protocols = tuple(alpn_protocols)
+
+    key = (
+        "server",
+        certfile,
+        keyfile,
+        password,
+        ca_file,
+        client_auth,
+        ciphers,
+        alpn_protocols,
+    )
+
+    def make_context():
+        """
+        Creates the server SSL context
+        """
+        # Prefer the default context factory, as it will be updated to
+        # reflect security issues
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+
+        # Disallow ciphers with known vulnerabilities
+        context.set_ciphers(_RESTRICTED_SERVER_CIPHERS)
+        _configure_context(context, ciphers, alpn_protocols)
+
+        # Allow resumption with session tickets
+        context.options &= ~getattr(ssl, "OP_NO_TICKET", 0)
+
+        context.load_cert_chain(certfile, keyfile, password)
+
+        if client_auth:
+            # Force a valid/signed client-side certificate
+            context.verify_mode = ssl.CERT_REQUIRED
+            if ca_file:
+                context.load_verify_locations(ca_file)
+            else:
+                context.load_default_certs(ssl.Purpose.CLIENT_AUTH)
+
+        return context
+
+    return _get_context(key, (certfile, keyfile, ca_file), make_context)
+
+
+def get_client_context(
+    ca_file=None,
+    certfile=None,
+    keyfile=None,
+    password=None,
+    check_hostname=True,
+    ciphers=None,
+    alpn_protocols=None,
+):
+    # type: (Optional[str], Optional[str], Optional[str], Optional[str], bool, Optional[str], Optional[Iterable[str]]) -> ssl.SSLContext
+    """
+    Returns the shared client-side SSL context for the given configuration.
+
+    The trust store is loaded once per configuration, and the sessions of the
+    connections made with this context can be resumed using
+    ``wrap_client_socket()``.
+
+    :param ca_file: Certificate authorities used to check the server
+                    certificates (None to use the default ones)
+    :param certfile: Client certificate file (optional)
+    :param keyfile: Client private key file
+    :param password: Password for the private key file
+    :param check_hostname: If False, don't check that the server certificate
+                           matches its host name
+    :param ciphers: OpenSSL cipher list string (None to keep the defaults)
+    :param alpn_protocols: Protocols to negotiate with ALPN, by order of
+                           preference (None to disable)
+    :return: An SSLContext
+    :raise SSLError: Error loading the certificates
+    """
+    if alpn_protocols is not None:
+        alpn_protocols = tuple(alpn_protocols)
+
+    key = (
+        "client",
+        ca_file,
+        certfile,
+        keyfile,
+        password,
+        check_hostname,
+        ciphers,
+        alpn_protocols,
+    )
+
+    def make_context():
+        """
+        Creates the client SSL context
+        """
+        context = ssl.create_default_context(
+            ssl.Purpose.SERVER_AUTH, cafile=ca_file
+        )
+        context.check_hostname = check_hostname
+        _configure_context(context, ciphers, alpn_protocols)
+
+        if certfile:
+            context.load_cert_chain(certfile, keyfile, password)
+
+        return context
+
+    return _get_context(key, (ca_file, certfile, keyfile), make_context)
+
+
+def clear_cache():
+    # type: () -> None
+    """
+    Forgets the shared SSL contexts and the client TLS sessions
+    """
+    with _CONTEXTS_LOCK:
+        _CONTEXTS.clear()
+        _SESSIONS.clear()
+
+
+def wrap_client_socket(sock, context, host, port=None):
+    """
+    Wraps a client TCP socket, resuming the last TLS session established
+    with the same server and context, if any.
+    The session must be kept with ``save_client_session()`` once the
+    connection is established.
+
+    :param sock: The socket to wrap
+    :param context: The client SSLContext
+    :param host: Server host name
+    :param port: Server port
+    :return: The wrapped socket
+    :raise SSLError: Error during the handshake
+    """
+    with _CONTEXTS_LOCK:
+        entry = _SESSIONS.get((host, port))
+
+    if entry is not None and entry[0] is context:
+        # Resume the previous session (Python 3.6+)
+        return context.wrap_socket(sock, server_hostname=host, session=entry[1])
+
+    return context.wrap_socket(sock, server_hostname=host)
+
+
+def save_client_session(ssl_sock, host, port=None):
+    """
+    Keeps the TLS session of a client connection, to resume it in the next
+    connections to the same server.
+    With TLS 1.3, the session ticket is received after the handshake: this
+    method should be called after the first response has been received.
+
+    :param ssl_sock: A client SSLSocket
+    :param host: Server host name
+    :param port: Server port
+    """
+    # Sessions are accessible since Python 3.6
+    session = getattr(ssl_sock, "session", None)
+    if session is not None:
+        with _CONTEXTS_LOCK:
+            _SESSIONS[(host, port)] = (ssl_sock.context, session)
+
+
+# ------------------------------------------------------------------------------
+
+
+def wrap_socket(
+    socket,
+    certfile,
+    keyfile,
+    password=None,
+    ciphers=None,
+    alpn_protocols=None,
+):
     """
-    Wraps an existing TCP socket and returns an SSLSocket object
+    Wraps an existing TCP socket and returns an SSLSocket object, using the
+    shared server SSL context (see ``get_server_context()``)
 
     :param socket: The socket to wrap
     :param certfile: The server certificate file
     :param keyfile: The server private key file
     :param password: Password for the private key file (Python >= 3.3)
+    :param ciphers: OpenSSL cipher list string (defaults to a restricted list
+                    of secure ciphers)
+    :param alpn_protocols: Protocols to negotiate with ALPN, by order of
+                           preference (None to disable)
     :return: The wrapped socket
     :raise SSLError: Error wrapping the socket / loading the certificate
     :raise OSError: A password has been given, but ciphered key files are not
@@ -85,39 +378,14 @@ def wrap_socket(socket, certfile, keyfile, password=None):
             )
 
     try:
-        # Prefer the default context factory, as it will be updated to reflect
-        # security issues (Python >= 2.7.9 and >= 3.4)
-        default_context = ssl.create_default_context()
-    except AttributeError:
-        default_context = None
-
-    try:
-        # Try to equivalent to create_default_context() in Python 3.5
-        # Create an SSL context and set its options
-        context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
-
-        if default_context is not None:
-            # Copy options
-            context.options = default_context.options
-        else:
-            # Set up the context as create_default_context() does in Python 3.5
-            # SSLv2 considered harmful
-            # SSLv3 has problematic security
-            context.options |= ssl.OP_NO_SSLv2 | ssl.OP_NO_SSLv3
-
-        # disallow ciphers with known vulnerabilities
-        context.set_ciphers(_RESTRICTED_SERVER_CIPHERS)
-
-        try:
-            # Load the certificate, with a password
-            context.load_cert_chain(certfile, keyfile, password)
-        except TypeError:
-            # The "password" argument isn't supported
-            # Check support for key file password
-            _password_support_error()
-
-            # Load the certificate, without the password argument
-            context.load_cert_chain(certfile, keyfile)
+        # Use the shared context (Python >= 2.7.9 and >= 3.4)
+        context = get_server_context(
+            certfile,
+            keyfile,
+            password,
+            ciphers=ciphers,
+            alpn_protocols=alpn_protocols,
+        )
 
         # Return the wrapped socket
         return context.wrap_socket(socket, server_side=True)
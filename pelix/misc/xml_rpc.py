@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+XML-RPC utility methods
+
+Parses the XML-RPC requests while they are read from a stream, instead of
+loading them in memory first, and provides an HTTPS transport resuming the
+TLS sessions of the clients.
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# XML RPC modules
+try:
+    # Python 3
+    # pylint: disable=F0401
+    import http.client as httplib
+    import xmlrpc.client as xmlrpclib
+except ImportError:
+    # Python 2
+    # pylint: disable=F0401
+    import httplib
+    import xmlrpclib
+
+# Standard typing module should be optional
+try:
+    # pylint: disable=W0611
+    from typing import Any, ByteString, Callable, IO, Optional, Tuple
+except ImportError:
+    pass
+
+# Pelix
+import pelix.misc.ssl_wrap as ssl_wrap
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+READ_BLOCK_SIZE = 65536
+""" Size of the blocks read from the stream """
+
+# ------------------------------------------------------------------------------
+
+
+def load_stream(rfile, use_builtin_types=False):
+    # type: (IO, bool) -> Tuple[Tuple[Any, ...], Optional[str]]
+    """
+    Parses an XML-RPC packet while reading it from the given stream
+
+    :param rfile: A file-like object, with a ``read(size)`` method
+    :param use_builtin_types: If True, use the Python 3 builtin types to
+                              represent dates and binary data
+    :return: The unmarshalled data and the method name (None if not present)
+    :raise Fault: The packet represents a fault
+    :raise ExpatError: Invalid XML content
+    """
+    if use_builtin_types:
+        parser, unmarshaller = xmlrpclib.getparser(use_builtin_types=True)
+    else:
+        parser, unmarshaller = xmlrpclib.getparser()
+
+    while True:
+        data = rfile.read(READ_BLOCK_SIZE)
+        if not data:
+            break
+
+        parser.feed(data)
+
+    parser.close()
+    return unmarshaller.close(), unmarshaller.getmethodname()
+
+
+def dispatch_stream(dispatcher, rfile, dispatch_method=None):
+    # type: (Any, IO, Optional[Callable]) -> ByteString
+    """
+    Equivalent of the ``_marshaled_dispatch()`` method of
+    ``SimpleXMLRPCDispatcher``, reading the request from a stream.
+
+    Errors raised while reading the stream (``IOError``) are propagated;
+    the other errors are returned as an XML-RPC fault.
+
+    :param dispatcher: A ``SimpleXMLRPCDispatcher`` instance
+    :param rfile: A file-like object, with a ``read(size)`` method
+    :param dispatch_method: Method to call instead of the ``_dispatch()``
+                            method of the dispatcher
+    :return: The marshalled response
+    :raise IOError: Error reading the stream
+    """
+    allow_none = dispatcher.allow_none
+    encoding = dispatcher.encoding
+
+    parsed = False
+    try:
+        params, method = load_stream(
+            rfile, getattr(dispatcher, "use_builtin_types", False)
+        )
+        parsed = True
+
+        if dispatch_method is not None:
+            response = dispatch_method(method, params)
+        else:
+            # pylint: disable=W0212
+            response = dispatcher._dispatch(method, params)
+
+        response = xmlrpclib.dumps(
+            (response,),
+            methodresponse=True,
+            allow_none=allow_none,
+            encoding=encoding,
+        )
+    except xmlrpclib.Fault as fault:
+        response = xmlrpclib.dumps(
+            fault, allow_none=allow_none, encoding=encoding
+        )
+    except Exception as ex:
+        if not parsed and isinstance(ex, EnvironmentError):
+            # Couldn't read the request
+            raise
+
+        response = xmlrpclib.dumps(
+            xmlrpclib.Fault(1, "{0}:{1}".format(type(ex), ex)),
+            allow_none=allow_none,
+            encoding=encoding,
+        )
+
+    if not isinstance(response, bytes):
+        # Python 3
+        response = response.encode(encoding or "utf-8", "xmlcharrefreplace")
+
+    return response
+
+
+# ------------------------------------------------------------------------------
+
+
+class _HTTPSConnection(httplib.HTTPSConnection):
+    """
+    HTTPS connection resuming the last TLS session established with the same
+    server
+    """
+
+    def __get_server(self):
+        """
+        Returns the host name and port of the server, behind the proxy if any
+
+        :return: A (host, port) tuple
+        """
+        # pylint: disable=E1101
+        if self._tunnel_host:
+            return self._tunnel_host, self._tunnel_port
+
+        return self.host, self.port
+
+    def connect(self):
+        """
+        Connects to the server and does the TLS handshake
+        """
+        # Plain TCP connection (and proxy tunnel)
+        httplib.HTTPConnection.connect(self)
+
+        # pylint: disable=E1101
+        self.sock = ssl_wrap.wrap_client_socket(
+            self.sock, self._context, *self.__get_server()
+        )
+
+    def getresponse(self, *args, **kwargs):
+        """
+        Returns the response of the server, and keeps the TLS session (the
+        TLS 1.3 session tickets are sent after the handshake)
+        """
+        sock = self.sock
+        response = httplib.HTTPSConnection.getresponse(self, *args, **kwargs)
+        if sock is not None:
+            ssl_wrap.save_client_session(sock, *self.__get_server())
+
+        return response
+
+
+class SafeTransport(xmlrpclib.SafeTransport):
+    """
+    XML-RPC HTTPS transport using the shared client SSL context of
+    ``pelix.misc.ssl_wrap`` and resuming the TLS sessions: the handshakes of
+    the successive calls to a server are cheaper.
+    """
+
+    def __init__(self, context=None, **kwargs):
+        """
+        :param context: Client SSLContext (defaults to the shared one)
+        :param kwargs: Other arguments of ``xmlrpclib.SafeTransport``
+        """
+        if context is None:
+            context = ssl_wrap.get_client_context()
+
+        xmlrpclib.SafeTransport.__init__(self, context=context, **kwargs)
+
+    def make_connection(self, host):
+        """
+        Returns the connection to the given host, reusing the current one
+        if possible
+        """
+        # pylint: disable=E0203,W0201
+        if self._connection and host == self._connection[0]:
+            return self._connection[1]
+
+        chost, self._extra_headers, x509 = self.get_host_info(host)
+        self._connection = (
+            host,
+            _HTTPSConnection(chost, None, context=self.context, **(x509 or {})),
+        )
+        return self._connection[1]
+
+
+def make_server_proxy(url, **kwargs):
+    """
+    Prepares an XML-RPC server proxy. HTTPS URLs use the ``SafeTransport``
+    of this module, unless a transport is given.
+
+    :param url: URL of the XML-RPC server
+    :param kwargs: Other arguments of ``xmlrpclib.ServerProxy``
+    :return: A ServerProxy object
+    """
+    if "transport" not in kwargs and url.lower().startswith("https:"):
+        # Unmarshalling options are given to the transport
+        transport_args = {
+            key: kwargs.pop(key)
+            for key in ("use_datetime", "use_builtin_types")
+            if key in kwargs
+        }
+        kwargs["transport"] = SafeTransport(**transport_args)
+
+    return xmlrpclib.ServerProxy(url, **kwargs)
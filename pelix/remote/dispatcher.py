@@ -528,6 +528,8 @@ class Dispatcher(object):
 @Requires("_dispatcher", pelix.remote.SERVICE_DISPATCHER)
 @Requires("_registry", pelix.remote.SERVICE_REGISTRY)
 @Property("_path", pelix.http.HTTP_SERVLET_PATH, "/pelix-dispatcher")
+@Property("_compression", pelix.http.PARAM_COMPRESSION, True)
+@Property("_etag", pelix.http.PARAM_ETAG, True)
 class RegistryServlet(object):
     """
     Servlet to access the content of the registry
@@ -553,6 +555,10 @@ class RegistryServlet(object):
         # Servlet path property
         self._path = None
 
+        # Compression and ETag of the responses
+        self._compression = True
+        self._etag = True
+
         # Ports of exposing servers
         self._ports = []
 
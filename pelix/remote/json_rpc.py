@@ -29,6 +29,7 @@ Based on a modified version of the 3rd-party package jsonrpclib-pelix.
 
 # Standard library
 import logging
+import sys
 
 # JSON-RPC module
 import jsonrpclib.jsonrpc
@@ -69,6 +70,12 @@ PROP_JSONRPC_URL = "{0}.url".format(JSONRPC_CONFIGURATION)
 
 _logger = logging.getLogger(__name__)
 
+_DECODE_REQUEST = (3,) <= sys.version_info < (3, 6)
+"""
+JSON parsers accept the raw request body, except the one of Python 3.4 and
+3.5 which needs a string
+"""
+
 # ------------------------------------------------------------------------------
 
 
@@ -120,10 +127,12 @@ class _JsonRpcServlet(SimpleJSONRPCDispatcher):
         :param request: The HTTP request bean
         :param response: The HTTP response handler
         """
-        try:
-            # Get the request content
-            data = to_str(request.read_data())
+        # Get the request content: reading errors are handled by the service
+        data = request.read_data()
+        if _DECODE_REQUEST:
+            data = to_str(data)
 
+        try:
             # Dispatch
             result = self._marshaled_dispatch(data, self._simple_dispatch)
 
@@ -35,12 +35,10 @@ try:
     # Python 3
     # pylint: disable=F0401
     from xmlrpc.server import SimpleXMLRPCDispatcher
-    import xmlrpc.client as xmlrpclib
 except ImportError:
     # Python 2
     # pylint: disable=F0401
     from SimpleXMLRPCServer import SimpleXMLRPCDispatcher
-    import xmlrpclib
 
 # iPOPO decorators
 from pelix.ipopo.decorators import (
@@ -53,8 +51,8 @@ from pelix.ipopo.decorators import (
 )
 
 # Pelix constants
-from pelix.utilities import to_str
 import pelix.http
+import pelix.misc.xml_rpc as xml_rpc
 import pelix.remote
 import pelix.remote.transport.commons as commons
 
@@ -124,11 +122,10 @@ class _XmlRpcServlet(SimpleXMLRPCDispatcher):
         :param request: The HTTP request bean
         :param response: The HTTP response handler
         """
-        # Get the request content
-        data = to_str(request.read_data())
-
-        # Dispatch
-        result = self._marshaled_dispatch(data, self._simple_dispatch)
+        # Parse the request while reading it, then dispatch it
+        result = xml_rpc.dispatch_stream(
+            self, request.get_rfile(), self._simple_dispatch
+        )
 
         # Send the result
         response.send_content(200, result, "text/xml")
@@ -242,7 +239,7 @@ class _ServiceCallProxy(object):
         # This is an ugly trick to handle multithreaded calls, as the
         # underlying proxy re-uses the same connection when possible: sometimes
         # it means sending a request before retrieving a result
-        proxy = xmlrpclib.ServerProxy(self.__url, allow_none=True)
+        proxy = xml_rpc.make_server_proxy(self.__url, allow_none=True)
         return getattr(proxy, "{0}.{1}".format(self.__name, name))
 
 
@@ -33,19 +33,17 @@ try:
     # Python 3
     # pylint: disable=F0401
     from xmlrpc.server import SimpleXMLRPCDispatcher
-    import xmlrpc.client as xmlrpclib
     from concurrent.futures import Executor
     from concurrent.futures.thread import ThreadPoolExecutor
 except ImportError:
     # Python 2
     # pylint: disable=F0401
     from SimpleXMLRPCServer import SimpleXMLRPCDispatcher
-    import xmlrpclib
 
     Executor = None
 
 from pelix.http import HTTP_SERVICE
-from pelix.utilities import to_str
+from pelix.misc.xml_rpc import dispatch_stream, make_server_proxy
 
 from pelix.ipopo.constants import ARG_BUNDLE_CONTEXT, ARG_PROPERTIES
 from pelix.ipopo.decorators import (
@@ -112,8 +110,7 @@ class ServerDispatcher(SimpleXMLRPCDispatcher, object):
 
     def do_POST(self, request, response):
         # pylint: disable=C0103
-        data = to_str(request.read_data())
-        result = self._marshaled_dispatch(data, self._dispatch)
+        result = dispatch_stream(self, request.get_rfile(), self._dispatch)
         response.send_content(200, result, "text/xml")
 
     def _dispatch(self, method, params):
@@ -303,7 +300,7 @@ class XmlRpcImportContainer(ImportContainer):
 
             def __getattr__(self, name):
                 return getattr(
-                    xmlrpclib.ServerProxy(self._url, allow_none=True),
+                    make_server_proxy(self._url, allow_none=True),
                     "{0}.{1}".format(self._rsid, name),
                 )
 
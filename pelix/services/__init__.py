@@ -129,3 +129,17 @@ SERVICE_MQTT_LISTENER = "pelix.mqtt.listener"
 
 PROP_MQTT_TOPICS = "pelix.mqtt.topics"
 """ List of the topics a listener wants to subscribes to """
+
+# ------------------------------------------------------------------------------
+
+SERVICE_PROCESS_POOL = "pelix.process_pool"
+""" Specification of a process pool (``concurrent.futures.Executor``) """
+
+PROCESS_POOL_FACTORY_PID = "pelix.process_pool"
+""" PID of the process pools factory """
+
+PROP_PROCESS_POOL_NAME = "pool.name"
+""" Name of a process pool """
+
+PROP_PROCESS_POOL_MAX_WORKERS = "pool.max_workers"
+""" Maximum number of worker processes of a pool """
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Process pools service: registers ``concurrent.futures.ProcessPoolExecutor``
+objects as ``pelix.process_pool`` services, used by the ``@Offload`` iPOPO
+decorator.
+
+A default pool (named "cpu" by default) is always available. Its size, and
+other pools, are configured using ConfigAdmin factory configurations, with
+the ``pelix.process_pool`` factory PID and the following properties:
+
+* ``pool.name``: Name of the pool (the configuration PID by default)
+* ``pool.max_workers``: Number of worker processes (number of CPUs by default)
+
+Requires Python 3.2+ or the ``futures`` package.
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# Standard library
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Pelix
+from pelix.ipopo.decorators import (
+    ComponentFactory,
+    Provides,
+    Property,
+    Validate,
+    Invalidate,
+    Instantiate,
+)
+import pelix.constants as constants
+import pelix.services as services
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+_logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------------------
+
+
+class _Pool(object):
+    """
+    A registered process pool
+    """
+
+    __slots__ = ("pid", "name", "max_workers", "executor", "registration")
+
+    def __init__(self, pid, name, max_workers):
+        """
+        :param pid: PID of the configuration of the pool (None for default)
+        :param name: Name of the pool
+        :param max_workers: Number of worker processes (None for default)
+        """
+        self.pid = pid
+        self.name = name
+        self.max_workers = max_workers
+        self.executor = ProcessPoolExecutor(max_workers)
+        self.registration = None
+
+    def register(self, context):
+        """
+        Registers the pool service
+
+        :param context: The bundle context
+        """
+        self.registration = context.register_service(
+            services.SERVICE_PROCESS_POOL,
+            self.executor,
+            {
+                services.PROP_PROCESS_POOL_NAME: self.name,
+                services.PROP_PROCESS_POOL_MAX_WORKERS: self.max_workers,
+            },
+        )
+
+    def close(self):
+        """
+        Unregisters the pool service and shuts down the pool. Pending calls
+        are still executed.
+        """
+        if self.registration is not None:
+            self.registration.unregister()
+            self.registration = None
+
+        self.executor.shutdown(False)
+
+
+@ComponentFactory()
+@Provides(services.SERVICE_CONFIGADMIN_MANAGED_FACTORY)
+@Property("_pid", constants.SERVICE_PID, services.PROCESS_POOL_FACTORY_PID)
+@Property("_default_name", "pool.default.name", "cpu")
+@Property("_default_workers", "pool.default.max_workers", None)
+@Instantiate("pelix-process-pool-factory")
+class ProcessPoolFactory(object):
+    """
+    Handles process pools
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        # ConfigAdmin PID
+        self._pid = None
+
+        # Default pool configuration
+        self._default_name = "cpu"
+        self._default_workers = None
+
+        # Bundle context
+        self._context = None
+
+        # Pool name -> _Pool
+        self._pools = {}
+        self.__lock = threading.RLock()
+
+    @Validate
+    def _validate(self, context):
+        """
+        Component validated
+        """
+        self._context = context
+        with self.__lock:
+            self.__set_pool(None, self._default_name, self._default_workers)
+
+    @Invalidate
+    def _invalidate(self, _):
+        """
+        Component invalidated
+        """
+        with self.__lock:
+            for pool in self._pools.values():
+                pool.close()
+
+            self._pools.clear()
+
+        self._context = None
+
+    def __set_pool(self, pid, name, max_workers):
+        """
+        Creates or replaces a pool
+
+        :param pid: PID of the configuration of the pool (None for default)
+        :param name: Name of the pool
+        :param max_workers: Number of worker processes (None for default)
+        """
+        old_pool = self._pools.get(name)
+        if (
+            old_pool is not None
+            and old_pool.pid == pid
+            and old_pool.max_workers == max_workers
+        ):
+            # Nothing changed
+            return
+
+        # Register the new pool before removing the old one, to let the
+        # consumers switch directly to it
+        pool = self._pools[name] = _Pool(pid, name, max_workers)
+        pool.register(self._context)
+        if old_pool is not None:
+            old_pool.close()
+
+        _logger.debug(
+            "Process pool %s ready (%s workers)", name, max_workers or "default"
+        )
+
+    def updated(self, pid, properties):
+        """
+        Configuration updated
+
+        :param pid: Configuration PID
+        :param properties: Configuration properties
+        """
+        name = properties.get(services.PROP_PROCESS_POOL_NAME) or pid
+        try:
+            max_workers = int(
+                properties.get(services.PROP_PROCESS_POOL_MAX_WORKERS)
+            )
+            if max_workers <= 0:
+                raise ValueError("Invalid number of workers")
+        except (TypeError, ValueError):
+            max_workers = None
+
+        with self.__lock:
+            if self._context is None:
+                # Component invalidated
+                return
+
+            # Check if the configuration renamed the pool
+            for pool in list(self._pools.values()):
+                if pool.pid == pid and pool.name != name:
+                    self.__remove_pool(pool)
+
+            self.__set_pool(pid, name, max_workers)
+
+    def deleted(self, pid):
+        """
+        Configuration deleted
+
+        :param pid: PID of the deleted configuration
+        """
+        with self.__lock:
+            for pool in list(self._pools.values()):
+                if pool.pid == pid:
+                    self.__remove_pool(pool)
+
+    def __remove_pool(self, pool):
+        """
+        Removes a configured pool, restoring the default one if necessary
+
+        :param pool: The pool to remove
+        """
+        if pool.name == self._default_name:
+            # Restore the default pool
+            self.__set_pool(None, self._default_name, self._default_workers)
+        else:
+            del self._pools[pool.name]
+            pool.close()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+HTTP service shell commands
+
+Provides commands to the Pelix shell to print the request metrics of the
+servlets of the HTTP services
+
+:author: Thomas Calmant
+:copyright: Copyright 2023, Thomas Calmant
+:license: Apache License 2.0
+:version: 1.0.2
+
+..
+
+    Copyright 2020 Thomas Calmant
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+"""
+
+# iPOPO Decorators
+from pelix.ipopo.decorators import (
+    ComponentFactory,
+    Requires,
+    Provides,
+    Instantiate,
+)
+import pelix.http
+import pelix.http.metrics
+import pelix.shell
+
+# ------------------------------------------------------------------------------
+
+# Module version
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Documentation strings format
+__docformat__ = "restructuredtext en"
+
+# ------------------------------------------------------------------------------
+
+
+@ComponentFactory("http-shell-commands-factory")
+@Requires(
+    "_metrics", pelix.http.HTTP_METRICS_SERVICE, aggregate=True, optional=True
+)
+@Requires("_utils", pelix.shell.SERVICE_SHELL_UTILS)
+@Provides(pelix.shell.SERVICE_SHELL_COMMAND)
+@Instantiate("http-shell-commands")
+class HttpCommands(object):
+    """
+    HTTP service shell commands
+    """
+
+    def __init__(self):
+        """
+        Sets up members
+        """
+        # Injected services
+        self._metrics = []
+        self._utils = None
+
+    @staticmethod
+    def get_namespace():
+        """
+        Retrieves the name space of this command handler
+        """
+        return "http"
+
+    def get_methods(self):
+        """
+        Retrieves the list of tuples (command, method) for this command handler
+        """
+        return [("stats", self.stats), ("reset", self.reset)]
+
+    def stats(self, session, path=None):
+        """
+        Prints the request metrics of the servlets, by decreasing total time
+        (times in ms)
+        """
+        statuses = pelix.http.metrics.STATUS_CLASSES[1:]
+        headers = (
+            ("Server", "Path", "Requests")
+            + statuses
+            + ("In", "Out", "Mean", "P50", "P90", "P99", "Max")
+        )
+
+        rows = []
+        for svc in self._metrics or ():
+            server = "{0}:{1}".format(*svc.get_access())
+            for servlet_path, metrics in svc.get_metrics(path).items():
+                rows.append(
+                    (metrics["total_time"], server, servlet_path, metrics)
+                )
+
+        rows.sort(key=lambda row: row[0], reverse=True)
+
+        lines = []
+        for _, server, servlet_path, metrics in rows:
+            line = [server, servlet_path, metrics["requests"]]
+            line.extend(metrics["statuses"][status] for status in statuses)
+            line.extend((metrics["bytes_in"], metrics["bytes_out"]))
+            line.extend(
+                "{0:.3f}".format(metrics[key] * 1000)
+                for key in ("mean_time", "p50", "p90", "p99", "max_time")
+            )
+            lines.append(line)
+
+        session.write(self._utils.make_table(headers, lines))
+        session.write_line("{0} servlets", len(lines))
+
+    def reset(self, session):
+        """
+        Clears the request metrics of the HTTP services
+        """
+        for svc in self._metrics or ():
+            svc.reset_metrics()
+
+        session.write_line("Metrics cleared")
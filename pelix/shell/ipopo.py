@@ -37,6 +37,7 @@ from pelix.ipopo.decorators import (
     Provides,
     Instantiate,
 )
+from pelix.ipopo.instance import ComponentStats
 import pelix.ipopo.constants
 import pelix.shell
 
@@ -119,6 +120,7 @@ class IPopoCommands(object):
             ("instances", self.list_instances),
             ("waiting", self.list_waitings),
             ("instance", self.instance_details),
+            ("stats", self.instances_stats),
             ("instantiate", self.instantiate),
             ("kill", self.kill),
             ("retry", self.retry_erroneous),
@@ -327,6 +329,62 @@ class IPopoCommands(object):
         session.write("\n".join(lines))
         return None
 
+    @Completion(COMPONENT)
+    def instances_stats(self, session, name=None):
+        """
+        Prints the life cycle statistics of the components (times in ms)
+        """
+        kinds = (
+            ComponentStats.CONSTRUCTOR,
+            ComponentStats.VALIDATE,
+            ComponentStats.INVALIDATE,
+            ComponentStats.BIND,
+            ComponentStats.UNBIND,
+            ComponentStats.UPDATE,
+        )
+        headers = ("Name", "Validations", "Invalidations", "Waiting") + tuple(
+            kind.title() for kind in kinds
+        )
+
+        names = [instance[0] for instance in self._ipopo.get_instances()]
+        if name is not None:
+            # Filter instances by name
+            names = [instance for instance in names if name in instance]
+
+        lines = []
+        for instance_name in names:
+            try:
+                stats = self._ipopo.get_instance_details(instance_name)[
+                    "stats"
+                ]
+            except ValueError:
+                # Component killed in the meantime
+                continue
+
+            line = [
+                instance_name,
+                stats["validations"],
+                stats["invalidations"],
+                "{0:.3f}".format(stats["waiting"] * 1000),
+            ]
+            for kind in kinds:
+                timing = stats["timings"].get(kind)
+                if timing is None:
+                    line.append("-")
+                else:
+                    # Total time (max time) / count
+                    line.append(
+                        "{0:.3f} ({1:.3f}) / {2}".format(
+                            timing["total"] * 1000,
+                            timing["max"] * 1000,
+                            timing["count"],
+                        )
+                    )
+            lines.append(line)
+
+        session.write(self._utils.make_table(headers, lines))
+        session.write_line("{0} components", len(lines))
+
     @Completion(FACTORY, DUMMY, FACTORY_PROPERTY, multiple=True)
     def instantiate(self, session, factory, name, **properties):
         """
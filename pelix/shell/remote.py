@@ -41,6 +41,7 @@ import sys
 try:
     # Some Python distributions don't support SSL
     import ssl
+    import pelix.misc.ssl_wrap as ssl_wrap
 except ImportError:
     ssl = None
 
@@ -308,27 +309,18 @@ class ThreadingTCPServerFamily(socketserver.ThreadingTCPServer):
         client_socket, client_address = self.socket.accept()
 
         if ssl is not None and self.cert_file:
-            # Setup an SSL context to accept clients with a certificate
-            # signed by a known chain of authority.
-            # Other clients will be rejected during handshake.
-            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            # Get the SSL context accepting clients with a certificate
+            # signed by a known chain of authority (the given one or the
+            # default one). Other clients will be rejected during handshake.
+            # The context is shared, to allow clients to resume their sessions
             try:
-                # Force a valid/signed client-side certificate
-                context.verify_mode = ssl.CERT_REQUIRED
-
-                # Load the server certificate
-                context.load_cert_chain(
-                    certfile=self.cert_file,
-                    keyfile=self.key_file,
-                    password=self.key_password,
+                context = ssl_wrap.get_server_context(
+                    self.cert_file,
+                    self.key_file,
+                    self.key_password,
+                    self.ca_file,
+                    client_auth=True,
                 )
-
-                if self.ca_file:
-                    # Load the given authority chain
-                    context.load_verify_locations(self.ca_file)
-                else:
-                    # Load the default chain if none given
-                    context.load_default_certs(ssl.Purpose.CLIENT_AUTH)
             except Exception as ex:
                 # Explicitly log the error as the default behaviour hides it
                 _logger.error("Error setting up the SSL context: %s", ex)
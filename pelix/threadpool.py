@@ -408,6 +408,32 @@ class ThreadPool(object):
         :raise ValueError: Invalid method
         :raise Full: The task queue is full
         """
+        return self.__enqueue(True, method, args, kwargs)
+
+    def try_enqueue(self, method, *args, **kwargs):
+        """
+        Queues a task in the pool, without waiting for the task queue to have
+        room for it
+
+        :param method: Method to call
+        :return: A FutureResult object, to get the result of the task
+        :raise ValueError: Invalid method
+        :raise Full: The task queue is full
+        """
+        return self.__enqueue(False, method, args, kwargs)
+
+    def __enqueue(self, block, method, args, kwargs):
+        """
+        Queues a task in the pool
+
+        :param block: If True, wait for the queue to have room for the task
+        :param method: Method to call
+        :param args: Method positional arguments
+        :param kwargs: Method keyword arguments
+        :return: A FutureResult object, to get the result of the task
+        :raise ValueError: Invalid method
+        :raise Full: The task queue is full
+        """
         if not hasattr(method, "__call__"):
             raise ValueError(
                 "{0} has no __call__ member.".format(method.__name__)
@@ -419,7 +445,9 @@ class ThreadPool(object):
         # Use a lock, as we might be "resetting" the queue
         with self.__lock:
             # Add the task to the queue
-            self._queue.put((method, args, kwargs, future), True, self._timeout)
+            self._queue.put(
+                (method, args, kwargs, future), block, self._timeout
+            )
             self.__nb_pending_task += 1
 
             if self.__nb_pending_task > self.__nb_threads:
@@ -428,6 +456,21 @@ class ThreadPool(object):
 
         return future
 
+    def get_stats(self):
+        """
+        Returns the current state of the pool
+
+        :return: A dictionary with the number of threads (``threads``), of
+                 threads executing a task (``active``) and of tasks waiting
+                 in the queue (``queued``)
+        """
+        with self.__lock:
+            return {
+                "threads": self.__nb_threads,
+                "active": self.__nb_active_threads,
+                "queued": self._queue.qsize(),
+            }
+
     def clear(self):
         """
         Empties the current queue content.
@@ -219,6 +219,39 @@ class ServiceEventTest(unittest.TestCase):
         self.assertFalse(context.remove_service_listener(self),
                          "Invalid filter was registered anyway")
 
+    def testListenerFilterUpdate(self):
+        """
+        Tests the update of the filter of a service listener
+        """
+        context = self.framework.get_bundle_context()
+        assert isinstance(context, BundleContext)
+
+        # Unknown listener
+        self.assertFalse(context.set_service_listener_filter(self, "(a=1)"))
+
+        self.assertTrue(context.add_service_listener(self, "(a=1)"))
+
+        # Invalid filter
+        log_off()
+        self.assertRaises(BundleException,
+                          context.set_service_listener_filter, self, "Invalid")
+        log_on()
+
+        # Update the filter
+        self.assertTrue(context.set_service_listener_filter(self, "(a=2)"))
+        reg = context.register_service("test", object(), {"a": 1})
+        self.assertListEqual(self.received, [])
+        reg.set_properties({"a": 2})
+        self.assertListEqual(self.received, [ServiceEvent.MODIFIED])
+        del self.received[:]
+
+        # Accept all services
+        self.assertTrue(context.set_service_listener_filter(self, None))
+        reg.set_properties({"a": 3})
+        self.assertListEqual(self.received, [ServiceEvent.MODIFIED])
+
+        self.assertTrue(context.remove_service_listener(self))
+
     def testServiceEventsNormal(self):
         """
         Tests if the signals are correctly received
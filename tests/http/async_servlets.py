@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Servlets with coroutine methods (Python 3.5+)
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import asyncio
+import threading
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# ------------------------------------------------------------------------------
+
+
+class AsyncServlet(object):
+    """
+    Servlet with blocking and coroutine methods
+    """
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self.threads = []
+
+    def do_GET(self, request, response):
+        """
+        Blocking method, streaming its response
+        """
+        response.send_stream(200, (str(idx) for idx in range(5)),
+                             "text/plain")
+
+    async def do_POST(self, request, response):
+        """
+        Coroutine method
+        """
+        self.threads.append(threading.current_thread().name)
+        await asyncio.sleep(.01)
+        response.send_content(200, "async:" + request.get_sub_path(),
+                              "text/plain")
+        await response.drain()
+
+    async def do_PUT(self, request, response):
+        """
+        Coroutine method, sending back the request body
+        """
+        response.send_content(200, request.read_data(), "text/plain")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+REST dispatcher with keyword-only arguments (Python 3)
+
+:author: Thomas Calmant
+"""
+
+# Pelix
+import pelix.http.routing as routing
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# ------------------------------------------------------------------------------
+
+
+class KeywordOnlyServlet(routing.RestDispatcher):
+    """
+    Methods declaring route arguments after the request and the response
+    """
+    def __init__(self):
+        super(KeywordOnlyServlet, self).__init__()
+        self.args = None
+
+    @routing.HttpGet("/kwonly/<name>/<value:int>")
+    def keyword_only(self, request, response, *, name, value=0):
+        self.args = [name, value]
+        response.send_content(200, "OK")
+
+    @routing.HttpGet("/varargs/<name>")
+    def var_args(self, request, response, *args, name=None):
+        self.args = [args, name]
+        response.send_content(200, "OK")
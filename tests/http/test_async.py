@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Pelix asyncio-based HTTP service test module.
+
+:author: Thomas Calmant
+"""
+
+import sys
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    # Python 3
+    import http.client as httplib
+except (ImportError, AttributeError):
+    # Python 2 or IronPython
+    import httplib
+
+from pelix.framework import FrameworkFactory
+
+# HTTP service constants
+import pelix.http as http
+
+from tests.http.test_basic import install_bundle, install_ipopo
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+DEFAULT_HOST = "127.0.0.1"
+
+# ------------------------------------------------------------------------------
+
+
+class Servlet(object):
+    """
+    Blocking servlet
+    """
+    def do_GET(self, request, response):
+        response.send_content(200, request.get_sub_path(), "text/plain")
+
+    def do_POST(self, request, response):
+        response.send_content(200, request.read_data(), "text/plain")
+
+    def do_PUT(self, request, response):
+        raise ValueError("Buggy servlet")
+
+# ------------------------------------------------------------------------------
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "Requires Python 3.5+")
+class AsyncHTTPServiceTest(unittest.TestCase):
+    """
+    Tests of the asyncio-based HTTP service
+    """
+    def setUp(self):
+        """
+        Sets up the test environment
+        """
+        # Start a framework
+        self.framework = FrameworkFactory.get_framework()
+        self.framework.start()
+
+        # Install iPOPO
+        self.ipopo = install_ipopo(self.framework)
+
+        # Install HTTP service
+        install_bundle(self.framework, "pelix.http.async_server")
+        self.http_svc = self.ipopo.instantiate(
+            http.FACTORY_HTTP_ASYNC, "test-async-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0})
+        self.port = self.http_svc.get_access()[1]
+
+    def tearDown(self):
+        """
+        Cleans up the test environment
+        """
+        # Stop the framework
+        FrameworkFactory.delete_framework()
+        self.framework = None
+
+    def _request(self, conn, method, uri, content=None):
+        """
+        Sends a request and returns the status and content of its response
+        """
+        conn.request(method, uri, content)
+        result = conn.getresponse()
+        return result.status, result.read()
+
+    def testServlets(self):
+        """
+        Tests blocking and coroutine servlets on a persistent connection
+        """
+        from tests.http.async_servlets import AsyncServlet
+        async_servlet = AsyncServlet()
+        self.assertTrue(self.http_svc.register_servlet("/sync", Servlet()))
+        self.assertTrue(
+            self.http_svc.register_servlet("/async", async_servlet))
+
+        conn = httplib.HTTPConnection(DEFAULT_HOST, self.port)
+        conn.connect()
+        sock = conn.sock
+        for _ in range(3):
+            self.assertEqual(self._request(conn, "GET", "/sync/test"),
+                             (200, b"/test"))
+            self.assertEqual(self._request(conn, "POST", "/sync", b"abc"),
+                             (200, b"abc"))
+            self.assertEqual(self._request(conn, "GET", "/async"),
+                             (200, b"01234"))
+            self.assertEqual(self._request(conn, "POST", "/async/sub"),
+                             (200, b"async:/sub"))
+
+        # Unknown path and method
+        self.assertEqual(self._request(conn, "GET", "/unknown")[0], 404)
+        self.assertEqual(self._request(conn, "DELETE", "/sync")[0], 404)
+
+        # The same connection has been used for all requests
+        self.assertIs(conn.sock, sock)
+
+        # Error in the servlet
+        self.assertEqual(self._request(conn, "PUT", "/sync")[0], 500)
+        conn.close()
+
+        # Coroutines are executed in the event loop thread
+        self.assertEqual(set(async_servlet.threads),
+                         {"test-async-http-service-Loop"})
+
+    def testWhiteboard(self):
+        """
+        Tests the registration of servlet services
+        """
+        context = self.framework.get_bundle_context()
+        reg = context.register_service(
+            http.HTTP_SERVLET, Servlet(), {http.HTTP_SERVLET_PATH: "/wb"})
+
+        conn = httplib.HTTPConnection(DEFAULT_HOST, self.port)
+        self.assertEqual(self._request(conn, "GET", "/wb/1"), (200, b"/1"))
+
+        reg.unregister()
+        self.assertEqual(self._request(conn, "GET", "/wb/1")[0], 404)
+        conn.close()
+
+    def testKill(self):
+        """
+        Tests the shutdown of the server with open connections
+        """
+        self.http_svc.register_servlet("/sync", Servlet())
+        conn = httplib.HTTPConnection(DEFAULT_HOST, self.port)
+        self.assertEqual(self._request(conn, "GET", "/sync")[0], 200)
+
+        self.assertEqual(self.http_svc.get_pool_stats()["connections"], 1)
+        self.ipopo.kill("test-async-http-service")
+
+        # Connection has been closed
+        self.assertRaises(Exception, self._request, conn, "GET", "/sync")
+        conn.close()
+
+# ------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    unittest.main()
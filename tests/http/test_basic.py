@@ -7,6 +7,9 @@ Pelix basic HTTP service test module.
 """
 
 import logging
+import socket
+import threading
+import time
 
 try:
     import unittest2 as unittest
@@ -25,6 +28,7 @@ import pelix.ipopo.constants as constants
 
 # HTTP service constants
 import pelix.http as http
+import pelix.http.basic as basic
 
 from tests import log_on, log_off
 
@@ -559,6 +563,206 @@ class BasicHTTPServiceMethodsTest(unittest.TestCase):
         self.assertEqual(get_http_page(address, port, only_code=True), 404,
                          "HTTP Service not stated with a random port")
 
+    def testOverload(self):
+        """
+        Tests the 503 response of an overloaded server
+        """
+        kill_server(self.ipopo)
+        self.http_svc = self.ipopo.instantiate(
+            http.FACTORY_HTTP_BASIC, "test-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0,
+             http.HTTP_SERVICE_POOL_MAX_THREADS: 1,
+             http.HTTP_SERVICE_POOL_QUEUE_SIZE: 1,
+             http.HTTP_SERVICE_RETRY_AFTER: 10})
+        port = self.http_svc.get_access()[1]
+
+        class BlockingServlet(object):
+            """
+            Servlet waiting for an event
+            """
+            def __init__(self):
+                self.event = threading.Event()
+                self.called = threading.Event()
+
+            def do_GET(self, _, response):
+                self.called.set()
+                self.event.wait(5)
+                response.send_content(200, "OK", "text/plain")
+
+        servlet = BlockingServlet()
+        self.http_svc.register_servlet("/block", servlet)
+
+        # Lock the only thread, then fill the queue
+        codes = []
+        threads = [threading.Thread(
+            target=lambda: codes.append(
+                get_http_page(DEFAULT_HOST, port, "/block")))
+            for _ in range(2)]
+        threads[0].start()
+        self.assertTrue(servlet.called.wait(5))
+        threads[1].start()
+        for _ in range(50):
+            if self.http_svc.get_pool_stats()["queued"] == 1:
+                break
+            time.sleep(.1)
+        self.assertEqual(self.http_svc.get_pool_stats()["queued"], 1)
+
+        # Next connection is rejected
+        conn = httplib.HTTPConnection(DEFAULT_HOST, port)
+        conn.request("GET", "/block")
+        result = conn.getresponse()
+        result.read()
+        conn.close()
+        self.assertEqual(result.status, 503)
+        self.assertEqual(result.getheader("Retry-After"), "10")
+        self.assertEqual(self.http_svc.get_pool_stats()["rejected"], 1)
+
+        # Release the pending requests
+        servlet.event.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(codes, [200, 200])
+
+    def testKeepAlive(self):
+        """
+        Tests persistent connections and chunked responses
+        """
+        class StreamServlet(object):
+            """
+            Servlet streaming its response
+            """
+            def do_GET(self, _, response):
+                response.send_stream(
+                    200, (str(idx) for idx in range(5)), "text/plain")
+
+            def do_POST(self, request, response):
+                # Only read a part of the body
+                response.send_content(200, request.get_rfile().read(2),
+                                      "text/plain")
+
+        self.http_svc.register_servlet("/stream", StreamServlet())
+
+        conn = httplib.HTTPConnection(DEFAULT_HOST, DEFAULT_PORT)
+        conn.connect()
+        sock = conn.sock
+        for _ in range(3):
+            conn.request("GET", "/stream")
+            result = conn.getresponse()
+            self.assertEqual(result.getheader("Transfer-Encoding"), "chunked")
+            self.assertEqual(result.read(), b"01234")
+
+            conn.request("POST", "/stream", b"abcdef")
+            result = conn.getresponse()
+            self.assertEqual(result.read(), b"ab")
+
+        # The same connection has been used for all requests
+        self.assertIs(conn.sock, sock)
+        conn.close()
+
+        # HTTP/1.0 clients get the raw content
+        sock = socket.create_connection((DEFAULT_HOST, DEFAULT_PORT))
+        sock.sendall(b"GET /stream HTTP/1.0\r\n\r\n")
+        data = b""
+        while True:
+            received = sock.recv(1024)
+            if not received:
+                break
+            data += received
+        sock.close()
+
+        headers, content = data.split(b"\r\n\r\n", 1)
+        self.assertNotIn(b"chunked", headers.lower())
+        self.assertEqual(content, b"01234")
+
+    def testIdleConnections(self):
+        """
+        Tests that idle persistent connections don't hold the threads
+        """
+        if basic.selectors is None:
+            self.skipTest("Idle connections are kept by their thread")
+
+        kill_server(self.ipopo)
+        self.http_svc = self.ipopo.instantiate(
+            http.FACTORY_HTTP_BASIC, "test-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0,
+             http.HTTP_SERVICE_POOL_MAX_THREADS: 1,
+             http.HTTP_SERVICE_KEEP_ALIVE_TIMEOUT: 10})
+        port = self.http_svc.get_access()[1]
+
+        class Servlet(object):
+            """
+            Simple servlet
+            """
+            def do_GET(self, request, response):
+                response.send_content(200, request.get_sub_path(),
+                                      "text/plain")
+
+        self.http_svc.register_servlet("/test", Servlet())
+
+        def wait_idle(count):
+            for _ in range(50):
+                if self.http_svc.get_pool_stats()["idle"] == count:
+                    break
+                time.sleep(.1)
+            self.assertEqual(self.http_svc.get_pool_stats()["idle"], count)
+
+        # The first connection stays open, without its thread
+        first = httplib.HTTPConnection(DEFAULT_HOST, port, timeout=3)
+        first.request("GET", "/test/1")
+        self.assertEqual(first.getresponse().read(), b"/1")
+        sock = first.sock
+        wait_idle(1)
+
+        # The only thread can handle another connection
+        second = httplib.HTTPConnection(DEFAULT_HOST, port, timeout=3)
+        second.request("GET", "/test/2")
+        self.assertEqual(second.getresponse().read(), b"/2")
+        wait_idle(2)
+
+        # The idle connections are handed back on their next request
+        for idx in range(3):
+            first.request("GET", "/test/{0}".format(idx))
+            self.assertEqual(first.getresponse().read(),
+                             "/{0}".format(idx).encode())
+        self.assertIs(first.sock, sock)
+        first.close()
+        second.close()
+        wait_idle(0)
+
+        # Pipelined requests are handled by the same thread
+        sock = socket.create_connection((DEFAULT_HOST, port), timeout=3)
+        sock.sendall(b"GET /test/a HTTP/1.1\r\nHost: test\r\n\r\n"
+                     b"GET /test/b HTTP/1.1\r\nHost: test\r\n"
+                     b"Connection: close\r\n\r\n")
+        data = b""
+        while True:
+            received = sock.recv(1024)
+            if not received:
+                break
+            data += received
+        sock.close()
+        self.assertEqual(data.count(b"200 OK"), 2)
+        self.assertTrue(data.endswith(b"/b"))
+
+        # Idle connections are closed after the keep-alive timeout
+        kill_server(self.ipopo)
+        self.http_svc = self.ipopo.instantiate(
+            http.FACTORY_HTTP_BASIC, "test-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0,
+             http.HTTP_SERVICE_KEEP_ALIVE_TIMEOUT: .2})
+        port = self.http_svc.get_access()[1]
+        self.http_svc.register_servlet("/test", Servlet())
+
+        conn = httplib.HTTPConnection(DEFAULT_HOST, port, timeout=3)
+        conn.request("GET", "/test")
+        self.assertEqual(conn.getresponse().read(), b"/")
+        self.assertEqual(conn.sock.recv(1024), b"")
+        conn.close()
+        wait_idle(0)
+
     def testGetServlet(self):
         """
         Tests the get_servlet() method
@@ -599,6 +803,25 @@ class BasicHTTPServiceMethodsTest(unittest.TestCase):
             self.assertEqual(self.http_svc.get_servlet(path)[2], path_2,
                              "Servlet 2 path is not kept")
 
+        # Paths are case-insensitive and only match full segments
+        self.assertIs(self.http_svc.get_servlet("/TEST/Sub/1")[0], servlet_2)
+        self.assertIs(self.http_svc.get_servlet("/test/subway")[0], servlet_1)
+        self.assertIsNone(self.http_svc.get_servlet("/tes"))
+
+        # Root servlet handles the other paths
+        servlet_root = object()
+        self.assertTrue(self.http_svc.register_servlet("/", servlet_root))
+        self.assertIs(self.http_svc.get_servlet("/tes")[0], servlet_root)
+        self.assertIs(self.http_svc.get_servlet("/test/1")[0], servlet_1)
+
+        # Unregistering a path gives back its requests to its parent
+        self.assertTrue(self.http_svc.unregister(path_2))
+        self.assertIs(self.http_svc.get_servlet("/test/sub/1")[0], servlet_1)
+        self.assertTrue(self.http_svc.unregister(path_1))
+        self.assertIs(self.http_svc.get_servlet("/test/1")[0], servlet_root)
+        self.assertTrue(self.http_svc.unregister("/"))
+        self.assertIsNone(self.http_svc.get_servlet("/test/1"))
+
     def testRegisterServlet(self):
         """
         Tests the behavior of register_servlet with dummy objects
@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Pelix HTTP request body readers test module.
+
+:author: Thomas Calmant
+"""
+
+import io
+import sys
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    # Python 3
+    import http.client as httplib
+except (ImportError, AttributeError):
+    # Python 2 or IronPython
+    import httplib
+
+from pelix.framework import FrameworkFactory
+
+# HTTP service constants
+import pelix.http as http
+import pelix.http.body as body
+
+from tests.http.test_basic import install_bundle, install_ipopo
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+DEFAULT_HOST = "127.0.0.1"
+
+CHUNKED_BODY = b"4\r\nWiki\r\n7;name=value\r\npedia\n \r\n3\r\nin\n\r\n" \
+    b"0\r\nTrailer: value\r\n\r\n"
+""" Chunked encoding of b"Wikipedia\\n in\\n" """
+
+# ------------------------------------------------------------------------------
+
+
+class Servlet(object):
+    """
+    Servlet reading the request body in different ways
+    """
+    def do_POST(self, request, response):
+        response.send_content(200, request.read_data(), "text/plain")
+
+    def do_PUT(self, request, response):
+        lines = []
+        rfile = request.get_rfile()
+        while True:
+            line = rfile.readline(5)
+            if not line:
+                break
+            lines.append(line)
+
+        response.send_content(200, b"|".join(lines), "text/plain")
+
+    def do_PATCH(self, request, response):
+        size = sum(len(data) for data in request.iter_data(3))
+        response.send_content(200, str(size), "text/plain")
+
+    def do_DELETE(self, request, response):
+        # Ignore the body
+        response.send_content(200, "deleted", "text/plain")
+
+# ------------------------------------------------------------------------------
+
+
+class BodyReadersTest(unittest.TestCase):
+    """
+    Tests of the body readers
+    """
+    def testBodyReader(self):
+        """
+        Tests the body reader with a Content-Length
+        """
+        rfile = io.BytesIO(b"abc\ndefNEXT")
+        reader = body.BodyReader(rfile, 7)
+        self.assertEqual(reader.readline(), b"abc\n")
+        self.assertEqual(reader.read(2), b"de")
+        self.assertEqual(reader.read(), b"f")
+        self.assertEqual(reader.read(), b"")
+        self.assertEqual(reader.size, 7)
+        self.assertEqual(rfile.read(), b"NEXT")
+
+        reader = body.BodyReader(io.BytesIO(b"abcdef"), 6)
+        self.assertEqual(reader.read(1), b"a")
+        self.assertTrue(reader.discard(10))
+        self.assertFalse(body.BodyReader(io.BytesIO(b"abcd"), 4).discard(2))
+
+        # Read until the end of the connection
+        reader = body.BodyReader(io.BytesIO(b"abcdef"), None)
+        self.assertEqual(reader.read(), b"abcdef")
+        self.assertFalse(reader.discard(10))
+
+    def testBodyReaderLimit(self):
+        """
+        Tests the size limit of the body reader
+        """
+        self.assertEqual(body.BodyReader(io.BytesIO(b"abc"), 3, 3).read(),
+                         b"abc")
+
+        try:
+            body.BodyReader(io.BytesIO(b"abc"), 3, 2)
+        except body.RequestBodyError as ex:
+            self.assertEqual(ex.code, 413)
+        else:
+            self.fail("Body size not checked")
+
+        reader = body.BodyReader(io.BytesIO(b"abcdef"), None, 4)
+        self.assertEqual(reader.read(4), b"abcd")
+        self.assertRaises(body.RequestBodyError, reader.read)
+
+    def testChunkedReader(self):
+        """
+        Tests the decoding of the chunked transfer encoding
+        """
+        rfile = io.BytesIO(CHUNKED_BODY + b"NEXT")
+        reader = body.ChunkedBodyReader(rfile)
+        self.assertEqual(reader.read(), b"Wikipedia\n in\n")
+        self.assertEqual(reader.read(), b"")
+        self.assertEqual(rfile.read(), b"NEXT")
+
+        reader = body.ChunkedBodyReader(io.BytesIO(CHUNKED_BODY))
+        self.assertEqual(reader.read(2), b"Wi")
+        self.assertEqual(reader.read(5), b"kiped")
+        self.assertEqual(reader.readline(), b"ia\n")
+        self.assertEqual(reader.readline(2), b" i")
+        self.assertEqual(reader.readline(), b"n\n")
+        self.assertEqual(reader.readline(), b"")
+        self.assertEqual(reader.size, 14)
+
+        # Discard
+        rfile = io.BytesIO(CHUNKED_BODY + b"NEXT")
+        self.assertTrue(body.ChunkedBodyReader(rfile).discard(20))
+        self.assertEqual(rfile.read(), b"NEXT")
+        self.assertFalse(
+            body.ChunkedBodyReader(io.BytesIO(CHUNKED_BODY)).discard(5))
+
+    def testChunkedReaderErrors(self):
+        """
+        Tests the errors of the chunked transfer encoding reader
+        """
+        reader = body.ChunkedBodyReader(io.BytesIO(CHUNKED_BODY), 10)
+        self.assertEqual(reader.read(4), b"Wiki")
+        try:
+            reader.read()
+        except body.RequestBodyError as ex:
+            self.assertEqual(ex.code, 413)
+        else:
+            self.fail("Body size not checked")
+
+        for data in (b"zz\r\nabc", b"-1\r\nabc", b"5\r\nabc"):
+            try:
+                body.ChunkedBodyReader(io.BytesIO(data)).read()
+            except body.RequestBodyError as ex:
+                self.assertEqual(ex.code, 400)
+            else:
+                self.fail("Invalid chunk not detected: {0}".format(data))
+
+    def testMakeReader(self):
+        """
+        Tests the selection of the body reader
+        """
+        rfile = io.BytesIO(b"abc")
+        self.assertIsInstance(
+            body.make_body_reader(rfile, {"transfer-encoding": "chunked"}),
+            body.ChunkedBodyReader)
+        self.assertEqual(
+            body.make_body_reader(rfile, {"content-length": "2"}).read(),
+            b"ab")
+        self.assertEqual(body.make_body_reader(rfile, {}).read(), b"")
+        self.assertEqual(body.make_body_reader(rfile, {}, None, True).read(),
+                         b"c")
+
+        for headers, code in (({"transfer-encoding": "gzip"}, 501),
+                              ({"content-length": "abc"}, 400),
+                              ({"content-length": "-1"}, 400),
+                              ({"content-length": "10"}, 413)):
+            try:
+                body.make_body_reader(rfile, headers, 5)
+            except body.RequestBodyError as ex:
+                self.assertEqual(ex.code, code)
+            else:
+                self.fail("Error not raised for {0}".format(headers))
+
+# ------------------------------------------------------------------------------
+
+
+class BasicBodyTest(unittest.TestCase):
+    """
+    Tests of the request bodies with the basic HTTP service
+    """
+    FACTORY = http.FACTORY_HTTP_BASIC
+    BUNDLE = "pelix.http.basic"
+
+    def setUp(self):
+        """
+        Sets up the test environment
+        """
+        # Start a framework
+        self.framework = FrameworkFactory.get_framework()
+        self.framework.start()
+
+        # Install iPOPO
+        self.ipopo = install_ipopo(self.framework)
+
+        # Install HTTP service
+        install_bundle(self.framework, self.BUNDLE)
+        self.http_svc = self.ipopo.instantiate(
+            self.FACTORY, "test-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0})
+        self.http_svc.register_servlet("/test", Servlet())
+        self.http_svc.register_servlet(
+            "/limited", Servlet(), {http.PARAM_MAX_REQUEST_SIZE: 10})
+
+        self.conn = httplib.HTTPConnection(
+            DEFAULT_HOST, self.http_svc.get_access()[1])
+
+    def tearDown(self):
+        """
+        Cleans up the test environment
+        """
+        self.conn.close()
+
+        # Stop the framework
+        FrameworkFactory.delete_framework()
+        self.framework = None
+
+    def _request(self, method, uri, data=None):
+        """
+        Sends a request on the persistent connection
+
+        :return: The status and the content of the response
+        """
+        self.conn.request(method, uri, data)
+        result = self.conn.getresponse()
+        return result.status, result.read()
+
+    def _chunked_request(self, method, uri, data):
+        """
+        Sends a request with a chunked body on the persistent connection
+
+        :return: The status and the content of the response
+        """
+        self.conn.putrequest(method, uri)
+        self.conn.putheader("Transfer-Encoding", "chunked")
+        self.conn.endheaders()
+        self.conn.send(data)
+        result = self.conn.getresponse()
+        return result.status, result.read()
+
+    def testBody(self):
+        """
+        Tests the reading of the request bodies
+        """
+        data = b"Hello\nWorld\n!"
+        for _ in range(2):
+            self.assertEqual(self._request("POST", "/test", data),
+                             (200, data))
+            self.assertEqual(self._request("PUT", "/test", data),
+                             (200, b"Hello|\n|World|\n|!"))
+            self.assertEqual(self._request("PATCH", "/test", data),
+                             (200, b"13"))
+            self.assertEqual(self._request("DELETE", "/test", data),
+                             (200, b"deleted"))
+
+    def testChunkedBody(self):
+        """
+        Tests the reading of chunked request bodies
+        """
+        for _ in range(2):
+            self.assertEqual(
+                self._chunked_request("POST", "/test", CHUNKED_BODY),
+                (200, b"Wikipedia\n in\n"))
+            self.assertEqual(
+                self._chunked_request("PUT", "/test", CHUNKED_BODY),
+                (200, b"Wikip|edia\n| in\n"))
+            self.assertEqual(
+                self._chunked_request("PATCH", "/test", CHUNKED_BODY),
+                (200, b"14"))
+            self.assertEqual(
+                self._chunked_request("DELETE", "/test", CHUNKED_BODY),
+                (200, b"deleted"))
+
+    def testLimit(self):
+        """
+        Tests the maximum size of the request bodies
+        """
+        self.assertEqual(self._request("POST", "/limited", b"a" * 10),
+                         (200, b"a" * 10))
+
+        # The announced length is checked before calling the servlet
+        for method in ("POST", "DELETE"):
+            self.assertEqual(
+                self._request(method, "/limited", b"a" * 11)[0], 413)
+            self.conn.close()
+
+        # Chunked bodies are checked while they are read
+        chunked = b"b\r\n" + b"a" * 11 + b"\r\n0\r\n\r\n"
+        self.assertEqual(
+            self._chunked_request("POST", "/limited", chunked)[0], 413)
+        self.conn.close()
+        self.assertEqual(
+            self._chunked_request("DELETE", "/limited", chunked)[0], 200)
+        self.conn.close()
+
+        self.assertEqual(
+            self._chunked_request("POST", "/test", b"zz\r\n")[0], 400)
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "Requires Python 3.5+")
+class AsyncBodyTest(BasicBodyTest):
+    """
+    Tests of the request bodies with the asyncio-based HTTP service
+    """
+    FACTORY = http.FACTORY_HTTP_ASYNC
+    BUNDLE = "pelix.http.async_server"
+
+    def testCoroutine(self):
+        """
+        Tests the reading of the body from a coroutine
+        """
+        from tests.http.async_servlets import AsyncServlet
+        self.http_svc.register_servlet("/async", AsyncServlet())
+        self.http_svc.register_servlet(
+            "/async-limited", AsyncServlet(),
+            {http.PARAM_MAX_REQUEST_SIZE: 10})
+
+        for _ in range(2):
+            self.assertEqual(self._request("PUT", "/async", b"Hello"),
+                             (200, b"Hello"))
+            self.assertEqual(
+                self._chunked_request("PUT", "/async", CHUNKED_BODY),
+                (200, b"Wikipedia\n in\n"))
+
+        self.assertEqual(
+            self._chunked_request("PUT", "/async-limited", CHUNKED_BODY)[0],
+            413)
+
+# ------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Pelix HTTP content negotiation test module.
+
+:author: Thomas Calmant
+"""
+
+import gzip
+import io
+import sys
+import zlib
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    # Python 3
+    import http.client as httplib
+except (ImportError, AttributeError):
+    # Python 2 or IronPython
+    import httplib
+
+from pelix.framework import FrameworkFactory
+
+# HTTP service constants
+import pelix.http as http
+import pelix.http.content as content
+
+from tests.http.test_basic import install_bundle, install_ipopo
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+DEFAULT_HOST = "127.0.0.1"
+
+LARGE_CONTENT = "Hello, World! " * 1000
+
+# ------------------------------------------------------------------------------
+
+
+class Servlet(object):
+    """
+    Servlet sending contents of various sizes
+    """
+    def __init__(self):
+        self.version = 1
+
+    def do_GET(self, request, response):
+        sub_path = request.get_sub_path()
+        if sub_path == "/small":
+            response.send_content(200, "small", "text/plain")
+        elif sub_path == "/binary":
+            response.send_content(200, LARGE_CONTENT, "image/png")
+        elif sub_path == "/stream":
+            response.send_stream(200, (LARGE_CONTENT for _ in range(5)),
+                                 "text/plain")
+        elif sub_path == "/write":
+            response.set_response(200)
+            response.set_header("content-type", "text/plain")
+            response.end_headers()
+            response.write(LARGE_CONTENT.encode())
+            response.get_wfile().write(LARGE_CONTENT.encode())
+        elif sub_path == "/version":
+            if content.check_etag(request, response, self.version, True):
+                return
+            response.send_content(200, LARGE_CONTENT, "text/plain")
+        else:
+            response.send_content(200, LARGE_CONTENT, "text/plain")
+
+
+def decode(data, encoding):
+    """
+    Decodes a response content
+    """
+    if encoding == "gzip":
+        return gzip.GzipFile(fileobj=io.BytesIO(data)).read()
+    elif encoding == "deflate":
+        return zlib.decompress(data)
+    return data
+
+# ------------------------------------------------------------------------------
+
+
+class ContentUtilitiesTest(unittest.TestCase):
+    """
+    Tests of the content negotiation utility methods
+    """
+    def testNegotiateEncoding(self):
+        """
+        Tests the parsing of the Accept-Encoding header
+        """
+        for header, expected in (
+                (None, None), ("", None), ("identity", None),
+                ("gzip", "gzip"), ("deflate", "deflate"),
+                ("deflate, gzip", "gzip"), ("GZIP;q=0.5, deflate", "deflate"),
+                ("gzip;q=0, deflate;q=0.1", "deflate"), ("*", "gzip"),
+                ("*;q=0.5, gzip;q=0", "deflate"), ("gzip;q=abc", None)):
+            self.assertEqual(content.negotiate_encoding(header), expected,
+                             header)
+
+        self.assertEqual(
+            content.negotiate_encoding("gzip, deflate", ["deflate"]),
+            "deflate")
+
+    def testCompressible(self):
+        """
+        Tests the detection of compressible types
+        """
+        for mime_type in ("text/html", "text/plain; charset=utf-8",
+                          "application/json", "application/vnd.api+json",
+                          "image/svg+xml"):
+            self.assertTrue(content.is_compressible(mime_type), mime_type)
+
+        for mime_type in (None, "", "image/png", "application/zip",
+                          "application/octet-stream"):
+            self.assertFalse(content.is_compressible(mime_type), mime_type)
+
+    def testETag(self):
+        """
+        Tests the entity tags utility methods
+        """
+        self.assertEqual(content.format_etag(42), '"42"')
+        self.assertEqual(content.format_etag("abc", True), 'W/"abc"')
+        self.assertEqual(content.make_etag("abc"), content.make_etag(b"abc"))
+        self.assertNotEqual(content.make_etag("abc"), content.make_etag("abd"))
+        self.assertTrue(content.make_etag("abc", True).startswith('W/"'))
+
+        for header, etag, expected in (
+                (None, '"1"', False), ("", '"1"', False),
+                ('"1"', '"1"', True), ('"1"', 'W/"1"', True),
+                ('W/"1"', '"1"', True), ('"0", "1"', '"1"', True),
+                ('"0", "2"', '"1"', False), ("*", '"1"', True)):
+            self.assertEqual(content.etag_matches(header, etag), expected,
+                             (header, etag))
+
+# ------------------------------------------------------------------------------
+
+
+class BasicContentTest(unittest.TestCase):
+    """
+    Tests of the compression and ETag parameters with the basic HTTP service
+    """
+    FACTORY = http.FACTORY_HTTP_BASIC
+    BUNDLE = "pelix.http.basic"
+
+    def setUp(self):
+        """
+        Sets up the test environment
+        """
+        # Start a framework
+        self.framework = FrameworkFactory.get_framework()
+        self.framework.start()
+
+        # Install iPOPO
+        self.ipopo = install_ipopo(self.framework)
+
+        # Install HTTP service
+        install_bundle(self.framework, self.BUNDLE)
+        self.http_svc = self.ipopo.instantiate(
+            self.FACTORY, "test-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0})
+        self.port = self.http_svc.get_access()[1]
+        self.conn = httplib.HTTPConnection(DEFAULT_HOST, self.port)
+
+    def tearDown(self):
+        """
+        Cleans up the test environment
+        """
+        self.conn.close()
+
+        # Stop the framework
+        FrameworkFactory.delete_framework()
+        self.framework = None
+
+    def _request(self, uri, headers=None):
+        """
+        Sends a GET request on the persistent connection
+
+        :return: The status, the headers and the decoded content
+        """
+        self.conn.request("GET", uri, headers=headers or {})
+        result = self.conn.getresponse()
+        data = result.read()
+        encoding = result.getheader("content-encoding")
+        return result.status, result, decode(data, encoding)
+
+    def testCompression(self):
+        """
+        Tests the negotiation of the compression
+        """
+        self.http_svc.register_servlet(
+            "/test", Servlet(), {http.PARAM_COMPRESSION: True})
+
+        large = LARGE_CONTENT.encode()
+        for uri, expected in (("/test", large),
+                              ("/test/stream", large * 5),
+                              ("/test/write", large * 2)):
+            for encoding in ("gzip", "deflate"):
+                status, result, data = self._request(
+                    uri, {"accept-encoding": encoding})
+                self.assertEqual(status, 200, uri)
+                self.assertEqual(result.getheader("content-encoding"),
+                                 encoding, uri)
+                self.assertEqual(result.getheader("vary"), "Accept-Encoding")
+                self.assertEqual(data, expected, uri)
+
+            # Client without compression support
+            status, result, data = self._request(uri)
+            self.assertEqual(status, 200, uri)
+            self.assertIsNone(result.getheader("content-encoding"), uri)
+            self.assertEqual(data, expected, uri)
+
+        # Content length is kept when compressing at once
+        status, result, _ = self._request("/test", {"accept-encoding": "gzip"})
+        self.assertIsNotNone(result.getheader("content-length"))
+
+        # Small and not compressible contents are sent as is
+        for uri in ("/test/small", "/test/binary"):
+            status, result, _ = self._request(
+                uri, {"accept-encoding": "gzip"})
+            self.assertEqual(status, 200, uri)
+            self.assertIsNone(result.getheader("content-encoding"), uri)
+
+    def testCompressionParameters(self):
+        """
+        Tests the compression parameters and service properties
+        """
+        self.http_svc.register_servlet(
+            "/deflate", Servlet(),
+            {http.PARAM_COMPRESSION: ["deflate"],
+             http.PARAM_COMPRESSION_MIN_SIZE: 2})
+        self.http_svc.register_servlet("/none", Servlet())
+
+        headers = {"accept-encoding": "gzip, deflate"}
+        for uri, expected in (("/deflate", "deflate"),
+                              ("/deflate/small", "deflate"),
+                              ("/none", None)):
+            status, result, _ = self._request(uri, headers)
+            self.assertEqual(status, 200, uri)
+            self.assertEqual(result.getheader("content-encoding"), expected,
+                             uri)
+
+        # Servlet service
+        context = self.framework.get_bundle_context()
+        context.register_service(
+            http.HTTP_SERVLET, Servlet(),
+            {http.HTTP_SERVLET_PATH: "/service",
+             http.PARAM_COMPRESSION: "gzip"})
+        status, result, data = self._request("/service", headers)
+        self.assertEqual(status, 200)
+        self.assertEqual(result.getheader("content-encoding"), "gzip")
+        self.assertEqual(data, LARGE_CONTENT.encode())
+
+    def testETag(self):
+        """
+        Tests the computed ETag and the 304 responses
+        """
+        servlet = Servlet()
+        self.http_svc.register_servlet(
+            "/test", servlet,
+            {http.PARAM_ETAG: True, http.PARAM_COMPRESSION: True})
+
+        # Computed ETag
+        for headers in ({}, {"accept-encoding": "gzip"}):
+            status, result, _ = self._request("/test", headers)
+            self.assertEqual(status, 200)
+            etag = result.getheader("etag")
+            self.assertTrue(etag.startswith('"'))
+
+            headers["if-none-match"] = etag
+            status, result, data = self._request("/test", headers)
+            self.assertEqual(status, 304)
+            self.assertEqual(result.getheader("etag"), etag)
+            self.assertEqual(data, b"")
+
+            headers["if-none-match"] = '"other"'
+            self.assertEqual(self._request("/test", headers)[0], 200)
+
+        # Strong tags depend on the encoding
+        status, result, _ = self._request("/test")
+        headers = {"accept-encoding": "gzip",
+                   "if-none-match": result.getheader("etag")}
+        self.assertEqual(self._request("/test", headers)[0], 200)
+
+        # Explicit weak ETag
+        status, result, _ = self._request("/test/version")
+        self.assertEqual(status, 200)
+        self.assertEqual(result.getheader("etag"), 'W/"1"')
+
+        headers = {"if-none-match": 'W/"1"'}
+        self.assertEqual(self._request("/test/version", headers)[0], 304)
+
+        servlet.version = 2
+        status, result, _ = self._request("/test/version", headers)
+        self.assertEqual(status, 200)
+        self.assertEqual(result.getheader("etag"), 'W/"2"')
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "Requires Python 3.5+")
+class AsyncContentTest(BasicContentTest):
+    """
+    Tests of the compression and ETag parameters with the asyncio-based HTTP
+    service
+    """
+    FACTORY = http.FACTORY_HTTP_ASYNC
+    BUNDLE = "pelix.http.async_server"
+
+# ------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Pelix HTTP request metrics test module.
+
+:author: Thomas Calmant
+"""
+
+import json
+import sys
+import time
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    # Python 3
+    import http.client as httplib
+except (ImportError, AttributeError):
+    # Python 2 or IronPython
+    import httplib
+
+from pelix.framework import FrameworkFactory
+
+# HTTP service constants
+import pelix.http as http
+import pelix.http.metrics as metrics
+
+from tests.http.test_basic import install_bundle, install_ipopo
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+DEFAULT_HOST = "127.0.0.1"
+
+# ------------------------------------------------------------------------------
+
+
+class Servlet(object):
+    """
+    Servlet answering with different status codes
+    """
+    def do_GET(self, request, response):
+        if request.get_sub_path() == "/missing":
+            response.send_content(404, "missing", "text/plain")
+        else:
+            response.send_content(200, "hello", "text/plain")
+
+    def do_POST(self, request, response):
+        response.send_content(200, str(len(request.read_data())),
+                              "text/plain")
+
+    def do_PUT(self, request, response):
+        raise ValueError("Error in servlet")
+
+# ------------------------------------------------------------------------------
+
+
+class MetricsTest(unittest.TestCase):
+    """
+    Tests of the metrics recorders
+    """
+    def testServletMetrics(self):
+        """
+        Tests the metrics of a servlet
+        """
+        servlet_metrics = metrics.ServletMetrics()
+        self.assertEqual(servlet_metrics.to_dict()["p50"], 0)
+
+        for _ in range(8):
+            servlet_metrics.record(200, 0.002, 10, 100)
+        servlet_metrics.record(404, 0.02, 0, 50)
+        servlet_metrics.record(500, 20, 0, 50)
+        servlet_metrics.record(None, 0.0001, 0, 0)
+
+        result = servlet_metrics.to_dict()
+        self.assertEqual(result["requests"], 11)
+        self.assertEqual(result["statuses"],
+                         {"1xx": 0, "2xx": 8, "3xx": 0, "4xx": 1, "5xx": 1})
+        self.assertEqual(result["errors"], 2)
+        self.assertEqual(result["bytes_in"], 80)
+        self.assertEqual(result["bytes_out"], 900)
+        self.assertEqual(result["max_time"], 20)
+        self.assertAlmostEqual(result["mean_time"], 20.0361 / 11)
+
+        # Percentiles are the upper bounds of the buckets
+        self.assertEqual(result["p50"], 0.0025)
+        self.assertEqual(result["p90"], 0.025)
+        self.assertEqual(result["p99"], 20)
+
+        histogram = dict(result["histogram"])
+        self.assertEqual(histogram[0.001], 1)
+        self.assertEqual(histogram[0.0025], 8)
+        self.assertEqual(histogram[0.025], 1)
+        self.assertEqual(histogram[None], 1)
+        self.assertEqual(sum(histogram.values()), 11)
+
+    def testHttpMetrics(self):
+        """
+        Tests the metrics of the servlets of a service
+        """
+        http_metrics = metrics.HttpMetrics()
+        start = http_metrics.now()
+        http_metrics.record("/a", 200, start, 1, 2)
+        http_metrics.record("/a", 200, start, 1, 2)
+        http_metrics.record("/b", 500, start, 0, 3)
+
+        result = http_metrics.get_metrics()
+        self.assertEqual(sorted(result), ["/a", "/b"])
+        self.assertEqual(result["/a"]["requests"], 2)
+        self.assertGreaterEqual(result["/a"]["max_time"], 0)
+        self.assertEqual(list(http_metrics.get_metrics("/b")), ["/b"])
+        self.assertEqual(http_metrics.get_metrics("/c"), {})
+
+        http_metrics.reset()
+        self.assertEqual(http_metrics.get_metrics(), {})
+
+# ------------------------------------------------------------------------------
+
+
+class BasicMetricsTest(unittest.TestCase):
+    """
+    Tests of the metrics recorded by the basic HTTP service
+    """
+    FACTORY = http.FACTORY_HTTP_BASIC
+    BUNDLE = "pelix.http.basic"
+
+    def setUp(self):
+        """
+        Sets up the test environment
+        """
+        # Start a framework
+        self.framework = FrameworkFactory.get_framework()
+        self.framework.start()
+
+        # Install iPOPO
+        self.ipopo = install_ipopo(self.framework)
+
+        # Install HTTP service
+        install_bundle(self.framework, self.BUNDLE)
+        self.http_svc = self.ipopo.instantiate(
+            self.FACTORY, "test-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0})
+        self.http_svc.register_servlet("/test", Servlet())
+        self.http_svc.register_servlet(
+            "/limited", Servlet(), {http.PARAM_MAX_REQUEST_SIZE: 2})
+
+        self.port = self.http_svc.get_access()[1]
+
+    def tearDown(self):
+        """
+        Cleans up the test environment
+        """
+        # Stop the framework
+        FrameworkFactory.delete_framework()
+        self.framework = None
+
+    def _request(self, method, uri, data=None):
+        """
+        Sends a request to the HTTP service
+
+        :return: The status and the content of the response
+        """
+        conn = httplib.HTTPConnection(DEFAULT_HOST, self.port)
+        try:
+            conn.request(method, uri, data)
+            result = conn.getresponse()
+            return result.status, result.read()
+        finally:
+            conn.close()
+
+    def _get_metrics(self, nb_requests):
+        """
+        Waits for the given number of requests to be recorded: metrics are
+        recorded after the response has been sent
+
+        :return: The metrics of the servlets
+        """
+        deadline = time.time() + 5
+        while True:
+            result = self.http_svc.get_metrics()
+            total = sum(item["requests"] for item in result.values())
+            if total >= nb_requests or time.time() > deadline:
+                return result
+
+            time.sleep(0.01)
+
+    def testMetrics(self):
+        """
+        Tests the metrics of the requests
+        """
+        self.assertEqual(self._request("GET", "/test")[0], 200)
+        self.assertEqual(self._request("GET", "/test/missing")[0], 404)
+        self.assertEqual(self._request("POST", "/test", b"abcd"),
+                         (200, b"4"))
+        self.assertEqual(self._request("PUT", "/test")[0], 500)
+        self.assertEqual(self._request("POST", "/limited", b"abcd")[0], 413)
+
+        # Requests without servlet are ignored
+        self.assertEqual(self._request("GET", "/unknown")[0], 404)
+
+        result = self._get_metrics(5)
+        self.assertEqual(sorted(result), ["/limited", "/test"])
+
+        servlet_metrics = result["/test"]
+        self.assertEqual(servlet_metrics["requests"], 4)
+        self.assertEqual(servlet_metrics["statuses"]["2xx"], 2)
+        self.assertEqual(servlet_metrics["statuses"]["4xx"], 1)
+        self.assertEqual(servlet_metrics["statuses"]["5xx"], 1)
+        self.assertEqual(servlet_metrics["bytes_in"], 4)
+        self.assertGreater(servlet_metrics["bytes_out"], len("hello"))
+        self.assertGreater(servlet_metrics["total_time"], 0)
+
+        servlet_metrics = result["/limited"]
+        self.assertEqual(servlet_metrics["requests"], 1)
+        self.assertEqual(servlet_metrics["statuses"]["4xx"], 1)
+        self.assertEqual(servlet_metrics["bytes_in"], 0)
+
+        self.http_svc.reset_metrics()
+        self.assertEqual(self.http_svc.get_metrics(), {})
+
+    def testDisabled(self):
+        """
+        Tests the deactivation of the metrics
+        """
+        self.ipopo.kill("test-http-service")
+        self.http_svc = self.ipopo.instantiate(
+            self.FACTORY, "test-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0,
+             http.HTTP_SERVICE_METRICS: False})
+        self.http_svc.register_servlet("/test", Servlet())
+        self.port = self.http_svc.get_access()[1]
+
+        self.assertEqual(self._request("GET", "/test")[0], 200)
+        self.assertEqual(self.http_svc.get_metrics(), {})
+
+    def testServlet(self):
+        """
+        Tests the metrics servlet
+        """
+        install_bundle(self.framework, "pelix.http.metrics")
+        self.ipopo.instantiate(http.FACTORY_HTTP_METRICS, "metrics-servlet")
+
+        self.assertEqual(self._request("GET", "/test")[0], 200)
+        self._get_metrics(1)
+        status, data = self._request("GET", "/metrics")
+        self.assertEqual(status, 200)
+
+        result = json.loads(data.decode("utf-8"))
+        access = "{0}:{1}".format(*self.http_svc.get_access())
+        self.assertEqual(list(result), [access])
+        self.assertEqual(result[access]["/test"]["requests"], 1)
+
+        # Filter by path
+        self._get_metrics(2)
+        status, data = self._request("GET", "/metrics?path=/metrics")
+        result = json.loads(data.decode("utf-8"))
+        self.assertEqual(list(result[access]), ["/metrics"])
+
+        # URL-encoded path
+        status, data = self._request("GET", "/metrics?path=%2Ftest")
+        self.assertEqual(status, 200)
+        result = json.loads(data.decode("utf-8"))
+        self.assertEqual(list(result[access]), ["/test"])
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "Requires Python 3.5+")
+class AsyncMetricsTest(BasicMetricsTest):
+    """
+    Tests of the metrics recorded by the asyncio-based HTTP service
+    """
+    FACTORY = http.FACTORY_HTTP_ASYNC
+    BUNDLE = "pelix.http.async_server"
+
+# ------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ Pelix HTTP routing test module.
 """
 
 import random
+import sys
 import uuid
 
 try:
@@ -404,6 +405,78 @@ class HttpRoutingTests(unittest.TestCase):
             self.assertEqual(code, 200, path)
             self.assertListEqual(router.args, [toto, titi], path)
 
+    def test_many_routes(self):
+        """
+        Tests the dispatcher with many routes sharing prefixes
+        """
+        def make_method(idx):
+            @routing.HttpGet("/api/service-{0}/<key:int>/<label>".format(idx))
+            @routing.HttpGet("/api/service-{0}".format(idx))
+            def method(self, req, resp, key=None, label=None):
+                self.args = [idx, key, label]
+                resp.send_content(200, "OK")
+            return method
+
+        members = {"test_{0}".format(idx): make_method(idx)
+                   for idx in range(60)}
+
+        @routing.HttpGet("/items/<name>")
+        def named(self, req, resp, name):
+            self.args = [name]
+            resp.send_content(200, "OK")
+        members["named"] = named
+
+        @routing.HttpGet("/v1.0/<name>")
+        def version(self, req, resp, name):
+            self.args = [name]
+            resp.send_content(200, "OK")
+        members["version"] = version
+
+        Servlet = type("Servlet", (routing.RestDispatcher,), members)
+
+        # Use a random prefix
+        prefix = "/routing{0}".format(random.randint(0, 100))
+        router = Servlet()
+        self.http.register_servlet(prefix, router)
+
+        for path, args in (
+                ("/api/service-12", [12, None, None]),
+                ("/api/service-42/10/abc", [42, 10, "abc"]),
+                ("/api/service-59/", [59, None, None]),
+                ("/items/other", ["other"]),
+                ("/v1.0/abc", ["abc"]),
+                ("/v1_0/def", ["def"])):
+            router.args = None
+            code = get_http_page(uri="{0}{1}".format(prefix, path))
+            self.assertEqual(code, 200, path)
+            self.assertListEqual(router.args, args, path)
+
+        for path in ("/api/service-12/abc/def", "/api/service-60", "/api",
+                     "/other"):
+            code = get_http_page(uri="{0}{1}".format(prefix, path))
+            self.assertEqual(code, 404, path)
+
+    @unittest.skipIf(sys.version_info < (3, 0), "Requires Python 3")
+    def test_keyword_only(self):
+        """
+        Tests the arguments given to methods declaring keyword-only
+        parameters
+        """
+        from tests.http.routing_kwonly import KeywordOnlyServlet
+
+        # Use a random prefix
+        prefix = "/routing{0}".format(random.randint(0, 100))
+        router = KeywordOnlyServlet()
+        self.http.register_servlet(prefix, router)
+
+        code = get_http_page(uri="{0}/kwonly/abc/42".format(prefix))
+        self.assertEqual(code, 200)
+        self.assertListEqual(router.args, ["abc", 42])
+
+        code = get_http_page(uri="{0}/varargs/abc".format(prefix))
+        self.assertEqual(code, 200)
+        self.assertListEqual(router.args, [(), "abc"])
+
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
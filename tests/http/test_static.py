@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Pelix HTTP static files servlet test module.
+
+:author: Thomas Calmant
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    # Python 3
+    import http.client as httplib
+except (ImportError, AttributeError):
+    # Python 2 or IronPython
+    import httplib
+
+from pelix.framework import FrameworkFactory
+
+# HTTP service constants
+import pelix.http as http
+import pelix.http.static as static
+
+from tests.http.test_basic import install_bundle, install_ipopo
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+DEFAULT_HOST = "127.0.0.1"
+
+# Larger than the allocation granularity of mmap
+FILE_CONTENT = bytes(bytearray(range(256))) * 1000
+
+# ------------------------------------------------------------------------------
+
+
+class _Response(http.AbstractHTTPServletResponse):
+    """
+    Response keeping the written data
+    """
+    def __init__(self):
+        self.data = []
+
+    def write(self, data):
+        self.data.append(bytes(data))
+
+
+class FileServlet(object):
+    """
+    Servlet sending parts of a file with send_file()
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def do_GET(self, request, response):
+        with open(self.path, "rb") as file_obj:
+            response.send_file(file_obj, 1000, 5000, "application/data")
+
+# ------------------------------------------------------------------------------
+
+
+class StaticUtilitiesTest(unittest.TestCase):
+    """
+    Tests of the utility methods
+    """
+    def testParseRange(self):
+        """
+        Tests the parsing of the Range header
+        """
+        for header, expected in (
+                (None, None), ("", None), ("items=0-1", None),
+                ("bytes=0-1,5-6", None), ("bytes=abc", None),
+                ("bytes=-", None), ("bytes=5-1", None), ("bytes=a-5", None),
+                ("bytes=0-0", (0, 0)), ("bytes=10-19", (10, 19)),
+                ("bytes=10-", (10, 99)), ("bytes=90-200", (90, 99)),
+                ("bytes=-10", (90, 99)), ("bytes=-200", (0, 99))):
+            self.assertEqual(static.parse_range(header, 100), expected,
+                             header)
+
+        for header in ("bytes=100-", "bytes=200-300", "bytes=-0"):
+            self.assertRaises(ValueError, static.parse_range, header, 100)
+
+        self.assertRaises(ValueError, static.parse_range, "bytes=-1", 0)
+
+    def testWriteFile(self):
+        """
+        Tests the default implementation of write_file()
+        """
+        fd, path = tempfile.mkstemp()
+        try:
+            os.write(fd, FILE_CONTENT)
+            for offset, length in ((0, 0), (0, len(FILE_CONTENT)),
+                                   (1, 10), (70000, 100000),
+                                   (len(FILE_CONTENT) - 1, 1)):
+                response = _Response()
+                response.write_file(fd, offset, length)
+                self.assertEqual(b"".join(response.data),
+                                 FILE_CONTENT[offset:offset + length])
+
+            # Beyond the end of the file
+            response = _Response()
+            self.assertRaises(IOError, response.write_file, fd,
+                              len(FILE_CONTENT) - 10, 20)
+        finally:
+            os.close(fd)
+            os.remove(path)
+
+# ------------------------------------------------------------------------------
+
+
+class BasicStaticTest(unittest.TestCase):
+    """
+    Tests of the static files servlet with the basic HTTP service
+    """
+    FACTORY = http.FACTORY_HTTP_BASIC
+    BUNDLE = "pelix.http.basic"
+
+    def setUp(self):
+        """
+        Sets up the test environment
+        """
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, "sub"))
+        for name in ("data.bin", os.path.join("sub", "index.html")):
+            with open(os.path.join(self.directory, name), "wb") as file_obj:
+                file_obj.write(FILE_CONTENT)
+
+        # Start a framework
+        self.framework = FrameworkFactory.get_framework()
+        self.framework.start()
+
+        # Install iPOPO
+        self.ipopo = install_ipopo(self.framework)
+
+        # Install HTTP service
+        install_bundle(self.framework, self.BUNDLE)
+        install_bundle(self.framework, "pelix.http.static")
+        self.http_svc = self.ipopo.instantiate(
+            self.FACTORY, "test-http-service",
+            {http.HTTP_SERVICE_ADDRESS: DEFAULT_HOST,
+             http.HTTP_SERVICE_PORT: 0})
+        self.ipopo.instantiate(
+            http.FACTORY_HTTP_STATIC, "test-static-servlet",
+            {http.HTTP_SERVLET_PATH: "/static",
+             http.HTTP_STATIC_ROOT: self.directory})
+
+        self.conn = httplib.HTTPConnection(
+            DEFAULT_HOST, self.http_svc.get_access()[1])
+
+    def tearDown(self):
+        """
+        Cleans up the test environment
+        """
+        self.conn.close()
+
+        # Stop the framework
+        FrameworkFactory.delete_framework()
+        self.framework = None
+        shutil.rmtree(self.directory)
+
+    def _request(self, uri, headers=None, method="GET"):
+        """
+        Sends a request on the persistent connection
+
+        :return: The status, the response and its content
+        """
+        self.conn.request(method, uri, headers=headers or {})
+        result = self.conn.getresponse()
+        return result.status, result, result.read()
+
+    def testFiles(self):
+        """
+        Tests the files resolution
+        """
+        for uri in ("/static/data.bin", "/static/sub/", "/static/sub",
+                    "/static/sub/index.html", "/static/data.bin?query",
+                    "/static/%64ata.bin"):
+            status, result, data = self._request(uri)
+            self.assertEqual(status, 200, uri)
+            self.assertEqual(data, FILE_CONTENT, uri)
+            self.assertEqual(result.getheader("content-length"),
+                             str(len(FILE_CONTENT)), uri)
+            self.assertEqual(result.getheader("accept-ranges"), "bytes")
+
+        status, result, _ = self._request("/static/sub/index.html")
+        self.assertEqual(result.getheader("content-type"), "text/html")
+
+        # HEAD request
+        status, result, data = self._request("/static/data.bin", None,
+                                             "HEAD")
+        self.assertEqual(status, 200)
+        self.assertEqual(result.getheader("content-length"),
+                         str(len(FILE_CONTENT)))
+
+        # Unknown files and files outside the served directory
+        for uri in ("/static/unknown", "/static/", "/static/..%2Fdata.bin",
+                    "/static/sub/..%2F..%2F{0}".format(
+                        os.path.basename(self.directory))):
+            self.assertEqual(self._request(uri)[0], 404, uri)
+
+    @unittest.skipIf(not hasattr(os, "symlink"), "Symbolic links not supported")
+    def testIndexLink(self):
+        """
+        Tests the index files which are links
+        """
+        outside = tempfile.mkdtemp()
+        try:
+            outside_file = os.path.join(outside, "secret.html")
+            with open(outside_file, "wb") as file_obj:
+                file_obj.write(b"secret")
+
+            for name, target in (("inside", os.path.join("..", "data.bin")),
+                                 ("outside", outside_file)):
+                os.mkdir(os.path.join(self.directory, name))
+                os.symlink(target, os.path.join(
+                    self.directory, name, static.INDEX_FILE))
+
+            status, _, data = self._request("/static/inside/")
+            self.assertEqual(status, 200)
+            self.assertEqual(data, FILE_CONTENT)
+
+            # The link can't be followed outside the served directory
+            self.assertEqual(self._request("/static/outside/")[0], 404)
+            self.assertEqual(self._request("/static/outside")[0], 404)
+        finally:
+            shutil.rmtree(outside)
+
+    def testConditional(self):
+        """
+        Tests the ETag and Last-Modified headers
+        """
+        status, result, _ = self._request("/static/data.bin")
+        etag = result.getheader("etag")
+        last_modified = result.getheader("last-modified")
+        self.assertTrue(etag)
+        self.assertTrue(last_modified)
+
+        for headers in ({"if-none-match": etag},
+                        {"if-none-match": '"other", ' + etag},
+                        {"if-modified-since": last_modified}):
+            status, result, data = self._request("/static/data.bin", headers)
+            self.assertEqual(status, 304, headers)
+            self.assertEqual(data, b"")
+
+        for headers in ({"if-none-match": '"other"'},
+                        {"if-none-match": '"other"',
+                         "if-modified-since": last_modified},
+                        {"if-modified-since": "Thu, 01 Jan 1970 00:00:00 GMT"}):
+            self.assertEqual(
+                self._request("/static/data.bin", headers)[0], 200, headers)
+
+    def testRange(self):
+        """
+        Tests the Range requests
+        """
+        size = len(FILE_CONTENT)
+        for header, first, last in (("bytes=0-9", 0, 9),
+                                    ("bytes=70000-", 70000, size - 1),
+                                    ("bytes=-100", size - 100, size - 1)):
+            status, result, data = self._request("/static/data.bin",
+                                                 {"range": header})
+            self.assertEqual(status, 206, header)
+            self.assertEqual(data, FILE_CONTENT[first:last + 1], header)
+            self.assertEqual(result.getheader("content-range"),
+                             "bytes {0}-{1}/{2}".format(first, last, size))
+
+        # Unsatisfiable range
+        status, result, _ = self._request("/static/data.bin",
+                                          {"range": "bytes=1000000-"})
+        self.assertEqual(status, 416)
+        self.assertEqual(result.getheader("content-range"),
+                         "bytes */{0}".format(size))
+
+        # If-Range
+        etag = self._request("/static/data.bin")[1].getheader("etag")
+        status, _, data = self._request(
+            "/static/data.bin", {"range": "bytes=0-9", "if-range": etag})
+        self.assertEqual(status, 206)
+        self.assertEqual(data, FILE_CONTENT[:10])
+
+        status, _, data = self._request(
+            "/static/data.bin", {"range": "bytes=0-9", "if-range": '"old"'})
+        self.assertEqual(status, 200)
+        self.assertEqual(data, FILE_CONTENT)
+
+    def testSendFile(self):
+        """
+        Tests send_file() with a file object
+        """
+        self.http_svc.register_servlet(
+            "/file", FileServlet(os.path.join(self.directory, "data.bin")))
+
+        for _ in range(2):
+            status, result, data = self._request("/file")
+            self.assertEqual(status, 200)
+            self.assertEqual(result.getheader("content-type"),
+                             "application/data")
+            self.assertEqual(data, FILE_CONTENT[1000:6000])
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "Requires Python 3.5+")
+class AsyncStaticTest(BasicStaticTest):
+    """
+    Tests of the static files servlet with the asyncio-based HTTP service
+    """
+    FACTORY = http.FACTORY_HTTP_ASYNC
+    BUNDLE = "pelix.http.async_server"
+
+# ------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Bundle defining components with coroutine callbacks (Python 3.5+)
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import asyncio
+import threading
+
+# iPOPO
+from pelix.ipopo.decorators import ComponentFactory, Validate, Invalidate, \
+    Requires, Bind, Unbind, Property
+from pelix.ipopo.constants import IPopoEvent
+
+# Tests
+from tests.interfaces import IEchoService
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+FACTORY_ASYNC = "ipopo.tests.async"
+FACTORY_ASYNC_ERROR = "ipopo.tests.async.error"
+
+# ------------------------------------------------------------------------------
+
+
+@ComponentFactory(FACTORY_ASYNC)
+@Requires("service", IEchoService)
+@Property("wait", "pelix.ipopo.async.wait", True)
+class AsyncComponent(object):
+    """
+    Component with coroutine callbacks
+    """
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self.service = None
+        self.states = []
+        self.threads = set()
+        self.done = threading.Event()
+
+    async def __step(self, state):
+        """
+        Stores the given state, after a short pause
+        """
+        await asyncio.sleep(.05)
+        self.threads.add(threading.current_thread().name)
+        self.states.append(state)
+        self.done.set()
+
+    @Bind
+    async def bind(self, svc, svc_ref):
+        """
+        Bound
+        """
+        await self.__step(IPopoEvent.BOUND)
+
+    @Unbind
+    async def unbind(self, svc, svc_ref):
+        """
+        Unbound
+        """
+        await self.__step(IPopoEvent.UNBOUND)
+
+    @Validate
+    async def validate(self, context):
+        """
+        Validated
+        """
+        await self.__step(IPopoEvent.VALIDATED)
+
+    @Invalidate
+    async def invalidate(self, context):
+        """
+        Invalidated
+        """
+        await self.__step(IPopoEvent.INVALIDATED)
+
+
+@ComponentFactory(FACTORY_ASYNC_ERROR)
+class AsyncErrorComponent(object):
+    """
+    Component with a failing coroutine validation callback
+    """
+    @Validate
+    async def validate(self, context):
+        """
+        Validated
+        """
+        await asyncio.sleep(0)
+        raise ValueError("Validation error")
@@ -35,12 +35,15 @@ FACTORY_A = "ipopo.tests.a"
 FACTORY_B = "ipopo.tests.b"
 FACTORY_C = "ipopo.tests.c"
 FACTORY_IMMEDIATE = "ipopo.tests.immediate"
+FACTORY_IMMUTABLE = "ipopo.tests.immutable"
 FACTORY_PROVIDES_SVC_FACTORY = "ipopo.tests.provides.factory"
 FACTORY_PROVIDES_SVC_PROTOTYPE = "ipopo.tests.provides.prototype"
+FACTORY_PROVIDES_SVC_POOL = "ipopo.tests.provides.pool"
 FACTORY_REQUIRES_BEST = "ipopo.tests.best"
 FACTORY_REQUIRES_BROADCAST = "ipopo.tests.broadcast"
 FACTORY_REQUIRES_BROADCAST_REQUIRED = "ipopo.tests.broadcast.required"
 FACTORY_REQUIRES_BROADCAST_UNMUFFLED = "ipopo.tests.broadcast.unmuffled"
+FACTORY_REQUIRES_BROADCAST_CONCURRENT = "ipopo.tests.broadcast.concurrent"
 FACTORY_REQUIRES_VAR_FILTER = "ipopo.tests.var_filter"
 FACTORY_REQUIRES_VAR_FILTER_AGGREGATE = "ipopo.tests.var_filter.multiple"
 FACTORY_TEMPORAL = "ipopo.tests.temporal"
@@ -290,6 +293,29 @@ class MapComponentFactory(TestComponentFactory):
 # ------------------------------------------------------------------------------
 
 
+@ComponentFactory(FACTORY_IMMUTABLE)
+@Requires('services', IEchoService, aggregate=True, optional=True,
+          immutable=True)
+@RequiresMap('single', MAP_SPEC_TEST, 'single.key', optional=True,
+             immutable=True)
+@RequiresMap('multiple', MAP_SPEC_TEST, 'other.key', aggregate=True,
+             optional=True, immutable=True)
+class ImmutableComponentFactory(TestComponentFactory):
+    """
+    Component factory with immutable aggregated requirements
+    """
+    def __init__(self):
+        """
+        Sets up members
+        """
+        super(ImmutableComponentFactory, self).__init__()
+        self.services = None
+        self.single = None
+        self.multiple = None
+
+# ------------------------------------------------------------------------------
+
+
 @ComponentFactory(FACTORY_IMMEDIATE)
 @Requires('service', IEchoService, immediate_rebind=True)
 class ImmediateComponentFactory(TestComponentFactory):
@@ -362,6 +388,16 @@ class RequiresBroadcastUnMuffleComponentFactory(TestComponentFactory):
     exceptions flag
     """
 
+
+@ComponentFactory(FACTORY_REQUIRES_BROADCAST_CONCURRENT)
+@RequiresBroadcast('service', IEchoService, concurrent=True, timeout=1,
+                   gather=True)
+class RequiresBroadcastConcurrentComponentFactory(TestComponentFactory):
+    """
+    Component factory with a concurrent RequiresBroadcast requirement,
+    gathering results
+    """
+
 # ------------------------------------------------------------------------------
 
 
@@ -566,6 +602,36 @@ class SvcPrototypeFactoryProvider(object):
 # ------------------------------------------------------------------------------
 
 
+@ComponentFactory(FACTORY_PROVIDES_SVC_POOL)
+@Provides("pool.service", pool=2)
+@Property("value", "pool.value", 42)
+class SvcPoolProvider(object):
+    """
+    Test for providing a service with a pool of components
+    """
+    def __init__(self):
+        """
+        Sets up members
+        """
+        self.states = []
+
+    @Validate
+    def validate(self, context):
+        """
+        Validation
+        """
+        self.states.append(IPopoEvent.VALIDATED)
+
+    @Invalidate
+    def invalidate(self, context):
+        """
+        Invalidation
+        """
+        self.states.append(IPopoEvent.INVALIDATED)
+
+# ------------------------------------------------------------------------------
+
+
 @BundleActivator
 class ActivatorTest:
     """
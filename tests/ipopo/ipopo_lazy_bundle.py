@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Bundle to check the instantiation of lazy components with iPOPO
+
+:author: Thomas Calmant
+"""
+
+# iPOPO
+from pelix.ipopo.decorators import ComponentFactory, Validate, Invalidate, \
+    Instantiate, Property, Provides, Requires
+from pelix.ipopo.constants import IPopoEvent
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+LAZY_FACTORY = "lazy-factory"
+LAZY_INSTANCE = "lazy-component"
+LAZY_SPEC = "lazy.spec"
+
+REQUIRING_FACTORY = "lazy-requiring-factory"
+REQUIRING_SPEC = "lazy.requiring.spec"
+REQUIRED_SPEC = "lazy.required.spec"
+
+# ------------------------------------------------------------------------------
+
+STATES = []
+
+
+@ComponentFactory(LAZY_FACTORY)
+@Provides(LAZY_SPEC)
+@Property("value", "lazy.value", 42)
+@Instantiate(LAZY_INSTANCE, lazy=True)
+class LazyComponent(object):
+    """
+    Component instantiated on first use
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        STATES.append(IPopoEvent.INSTANTIATED)
+
+    @Validate
+    def validate(self, context):
+        """
+        Validation
+        """
+        STATES.append(IPopoEvent.VALIDATED)
+
+    @Invalidate
+    def invalidate(self, context):
+        """
+        Invalidation
+        """
+        STATES.append(IPopoEvent.INVALIDATED)
+
+
+@ComponentFactory(REQUIRING_FACTORY)
+@Provides(REQUIRING_SPEC)
+@Requires("dependency", REQUIRED_SPEC)
+class LazyRequiringComponent(object):
+    """
+    Lazy component with a requirement
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.dependency = None
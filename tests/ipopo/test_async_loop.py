@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Tests the iPOPO asyncio integration
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import sys
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+# Pelix
+from pelix.framework import FrameworkFactory
+from pelix.ipopo.constants import IPopoEvent, SERVICE_IPOPO_ASYNC_LOOP
+from pelix.ipopo.instance import StoredInstance
+
+# Tests
+from tests.interfaces import IEchoService
+from tests.ipopo import install_bundle, install_ipopo
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+NAME_A = "componentA"
+
+# ------------------------------------------------------------------------------
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "Requires Python 3.5+")
+class AsyncLoopTest(unittest.TestCase):
+    """
+    Tests the coroutine callbacks of components
+    """
+    def setUp(self):
+        """
+        Called before each test. Initiates a framework.
+        """
+        self.framework = FrameworkFactory.get_framework()
+        self.framework.start()
+        self.ipopo = install_ipopo(self.framework)
+        self.context = self.framework.get_bundle_context()
+
+    def tearDown(self):
+        """
+        Called after each test
+        """
+        self.framework.stop()
+        FrameworkFactory.delete_framework()
+
+    def test_no_loop(self):
+        """
+        Coroutine callbacks fail without the event loop service
+        """
+        module = install_bundle(
+            self.framework, "tests.ipopo.ipopo_async_bundle")
+        self.context.register_service(IEchoService, object(), {})
+
+        component = self.ipopo.instantiate(module.FACTORY_ASYNC, NAME_A)
+        self.assertListEqual([], component.states)
+        self.assertEqual(self.ipopo.get_instance_details(NAME_A)["state"],
+                         StoredInstance.ERRONEOUS)
+
+    def test_wait(self):
+        """
+        Tests the life-cycle with waited coroutine callbacks
+        """
+        install_bundle(self.framework, "pelix.ipopo.async_loop")
+        module = install_bundle(
+            self.framework, "tests.ipopo.ipopo_async_bundle")
+
+        component = self.ipopo.instantiate(module.FACTORY_ASYNC, NAME_A)
+        self.assertListEqual([], component.states)
+
+        # Bind a service: the callbacks are done when the component is valid
+        reg = self.context.register_service(IEchoService, object(), {})
+        self.assertListEqual([IPopoEvent.BOUND, IPopoEvent.VALIDATED],
+                             component.states)
+        self.assertEqual(self.ipopo.get_instance_details(NAME_A)["state"],
+                         StoredInstance.VALID)
+        self.assertSetEqual({"pelix-ipopo-async-loop"}, component.threads)
+        del component.states[:]
+
+        # Unbind it
+        reg.unregister()
+        self.assertListEqual([IPopoEvent.INVALIDATED, IPopoEvent.UNBOUND],
+                             component.states)
+
+        # An error in a coroutine validation is a validation error
+        self.ipopo.instantiate(module.FACTORY_ASYNC_ERROR, "error")
+        details = self.ipopo.get_instance_details("error")
+        self.assertEqual(details["state"], StoredInstance.ERRONEOUS)
+        self.assertIn("Validation error", details["error_trace"])
+
+    def test_no_wait(self):
+        """
+        Tests the life-cycle with scheduled coroutine callbacks
+        """
+        install_bundle(self.framework, "pelix.ipopo.async_loop")
+        module = install_bundle(
+            self.framework, "tests.ipopo.ipopo_async_bundle")
+
+        self.context.register_service(IEchoService, object(), {})
+        component = self.ipopo.instantiate(
+            module.FACTORY_ASYNC, NAME_A, {"pelix.ipopo.async.wait": False})
+
+        # The component is valid before the end of its callbacks
+        self.assertEqual(self.ipopo.get_instance_details(NAME_A)["state"],
+                         StoredInstance.VALID)
+        self.assertNotIn(IPopoEvent.VALIDATED, component.states)
+
+        # Wait for the callbacks
+        for _ in range(10):
+            if len(component.states) == 2:
+                break
+            component.done.wait(.5)
+            component.done.clear()
+
+        self.assertListEqual([IPopoEvent.BOUND, IPopoEvent.VALIDATED],
+                             component.states)
+
+    def test_use_service(self):
+        """
+        Tests the awaitable service getters
+        """
+        install_bundle(self.framework, "pelix.ipopo.async_loop")
+        from pelix.ipopo.async_loop import get_service, use_service
+
+        svc_ref = self.context.get_service_reference(SERVICE_IPOPO_ASYNC_LOOP)
+        loop_svc = self.context.get_service(svc_ref)
+
+        svc = object()
+        reg = self.context.register_service(IEchoService, svc, {})
+        echo_ref = reg.get_reference()
+
+        async def get():
+            return await get_service(self.context, echo_ref)
+
+        self.assertIs(loop_svc.run(get()), svc)
+        self.context.unget_service(echo_ref)
+
+        async def use():
+            async with use_service(self.context, echo_ref) as found:
+                return found
+
+        self.assertIs(loop_svc.run(use()), svc)
+
+        # Can't wait in the loop thread
+        async def inner():
+            return loop_svc.run(get())
+
+        self.assertRaises(ValueError, loop_svc.run, inner())
+
+# ------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    # Set logging level
+    import logging
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
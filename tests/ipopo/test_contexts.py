@@ -256,6 +256,62 @@ class ContextsTests(unittest.TestCase):
         self.assertEqual(context, context_2, "Copy equality error")
         self.assertIsNot(req_1, context_2, "Requirements must be copied")
 
+    def testInstantiationPlan(self):
+        """
+        Tests the instantiation plan of a FactoryContext bean
+        """
+        FactoryContext = contexts.FactoryContext
+        Requirement = contexts.Requirement
+
+        req_1 = Requirement("spec_1", spec_filter="(test=True)")
+        context = FactoryContext()
+        context.properties['prop'] = 42
+        context.hidden_properties['hidden'] = 'secret'
+        context.set_handler(constants.HANDLER_REQUIRES,
+                            {'field_req': req_1})
+
+        # The plan is computed once
+        plan = context.get_plan()
+        self.assertIs(plan, context.get_plan())
+        self.assertEqual(plan.handlers_ids, (constants.HANDLER_REQUIRES,))
+        self.assertEqual(plan.properties, {'prop': 42})
+        self.assertEqual(plan.hidden_keys, frozenset(['hidden']))
+
+        # Prepared configurations are built once
+        calls = []
+
+        def builder(config):
+            calls.append(config)
+            return len(config)
+
+        for _ in range(3):
+            self.assertEqual(plan.get_prepared("test", builder, {'a': 1}), 1)
+        self.assertEqual(len(calls), 1)
+
+        # Changing the handlers resets the plan
+        context.set_handler(constants.HANDLER_PROVIDES, [])
+        new_plan = context.get_plan()
+        self.assertIsNot(plan, new_plan)
+        self.assertIn(constants.HANDLER_PROVIDES, new_plan.handlers_ids)
+
+        # Component contexts are built from the plan
+        component = contexts.ComponentContext(
+            context, "name", {'prop': 1, 'hidden': 'other', 'extra': True})
+        self.assertEqual(component.properties['prop'], 1)
+        self.assertTrue(component.properties['extra'])
+        self.assertNotIn('hidden', component.properties)
+        self.assertEqual(component.grab_hidden_properties(),
+                         {'hidden': 'other'})
+        self.assertEqual(plan.properties, {'prop': 42})
+
+        # Copies of requirements share the parsed filter, but not changes
+        req_2 = req_1.copy()
+        self.assertEqual(req_1, req_2)
+        self.assertIs(req_1.filter, req_2.filter)
+        req_2.set_filter("(test=False)")
+        self.assertEqual(str(req_1.filter), "(test=True)")
+        self.assertEqual(req_1.original_filter, "(test=True)")
+
     def testHandlerInheritance(self):
         """
         Tests the inheritance of handlers
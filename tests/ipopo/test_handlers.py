@@ -8,6 +8,7 @@ Tests iPOPO handlers, using the sample logger handler
 
 # Standard library
 import sys
+import threading
 try:
     import unittest2 as unittest
 except ImportError:
@@ -158,6 +159,7 @@ class LifeCycleTest(unittest.TestCase):
 
         # Check the missing handler
         self.assertCountEqual(missing, [HANDLER_ID])
+        self.assertEqual(ipopo.get_missing_handlers(), {HANDLER_ID: 1})
 
         # The instance details must fail (instance not ready)
         self.assertRaises(ValueError, ipopo.get_instance_details,
@@ -177,6 +179,7 @@ class LifeCycleTest(unittest.TestCase):
         for name, factory, missing in waiting:
             if name == COMPONENT_NAME:
                 self.fail("Component is still waiting for its handler")
+        self.assertEqual(ipopo.get_missing_handlers(), {})
 
         # Get instance details (must not fail)
         ipopo.get_instance_details(COMPONENT_NAME)
@@ -192,6 +195,7 @@ class LifeCycleTest(unittest.TestCase):
         else:
             # Component not found
             self.fail("Component not in the waiting handler list")
+        self.assertEqual(ipopo.get_missing_handlers(), {HANDLER_ID: 1})
 
         # The instance details must fail (instance not ready)
         self.assertRaises(ValueError, ipopo.get_instance_details,
@@ -254,6 +258,61 @@ class LifeCycleTest(unittest.TestCase):
             # Component not found
             self.fail("Component not in the waiting handler list")
 
+    def testConcurrentHandler(self):
+        """
+        Tests the registration of a handler while a component is being put
+        in the waiting queue
+        """
+        # Install iPOPO
+        ipopo = install_ipopo(self.framework)
+
+        # Install the component bundle, to get its factory
+        install_bundle(self.framework, COMPONENT_BUNDLE_NAME)
+        factory = ipopo.get_waiting_components()[0][1]
+        ipopo.kill(COMPONENT_NAME)
+
+        # Register the handler while the component is being queued
+        context = self.framework.get_bundle_context()
+        registrations = []
+
+        def register_handler():
+            registrations.append(context.register_service(
+                constants.SERVICE_IPOPO_HANDLER_FACTORY,
+                DummyHandlerFactory(), {constants.PROP_HANDLER_ID: HANDLER_ID}))
+
+        add_waiting = ipopo._IPopoService__add_waiting
+        threads = []
+
+        def racing_add_waiting(component_context, instance):
+            if not threads:
+                thread = threading.Thread(target=register_handler)
+                threads.append(thread)
+                thread.start()
+                # Give it a chance to run
+                thread.join(.5)
+
+            add_waiting(component_context, instance)
+
+        ipopo._IPopoService__add_waiting = racing_add_waiting
+        try:
+            ipopo.instantiate(factory, "concurrent")
+        finally:
+            threads[0].join()
+            del ipopo._IPopoService__add_waiting
+
+        # The component must not be left waiting for the handler
+        self.assertEqual(len(registrations), 1)
+        self.assertTrue(ipopo.is_registered_instance("concurrent"),
+                        "Component left in the waiting queue")
+        self.assertEqual(ipopo.get_waiting_components(), [])
+        self.assertEqual(ipopo.get_missing_handlers(), {})
+
+        # Back to the waiting queue
+        registrations[0].unregister()
+        self.assertEqual(ipopo.get_missing_handlers(), {HANDLER_ID: 1})
+        ipopo.kill("concurrent")
+        self.assertEqual(ipopo.get_missing_handlers(), {})
+
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -13,10 +13,11 @@ except ImportError:
     import unittest
 
 # Pelix
-from pelix.framework import FrameworkFactory, BundleEvent
+from pelix.framework import FrameworkFactory, BundleEvent, BundleException
 
 # iPOPO
 from pelix.ipopo.constants import IPopoEvent
+from pelix.ipopo.instance import StoredInstance
 
 # Tests
 from tests.ipopo import install_ipopo
@@ -164,6 +165,103 @@ class InstantiateTest(unittest.TestCase):
         self.assertListEqual(
             [IPopoEvent.INVALIDATED, BundleEvent.STOPPED], module.STATES)
 
+    def test_lazy(self):
+        """
+        Tests the instantiation of a component on the first use of its service
+        """
+        # Install the bundle
+        context = self.framework.get_bundle_context()
+        bundle = context.install_bundle("tests.ipopo.ipopo_lazy_bundle")
+        module = bundle.get_module()
+        del module.STATES[:]
+
+        # Start the bundle
+        bundle.start()
+
+        # The service is registered but the component doesn't exist yet
+        ref = context.get_service_reference(module.LAZY_SPEC)
+        self.assertIsNotNone(ref, "Placeholder service not registered")
+        self.assertEqual(ref.get_property("lazy.value"), 42)
+        self.assertListEqual([], module.STATES)
+        self.assertFalse(
+            self.ipopo.is_registered_instance(module.LAZY_INSTANCE))
+
+        # The name is reserved
+        self.assertRaises(ValueError, self.ipopo.instantiate,
+                          module.LAZY_FACTORY, module.LAZY_INSTANCE)
+
+        # First use: instantiate and validate the component
+        svc = context.get_service(ref)
+        self.assertIsInstance(svc, module.LazyComponent)
+        self.assertListEqual(
+            [IPopoEvent.INSTANTIATED, IPopoEvent.VALIDATED], module.STATES)
+        self.assertTrue(
+            self.ipopo.is_registered_instance(module.LAZY_INSTANCE))
+
+        # The placeholder registration has been adopted
+        self.assertIs(context.get_service_reference(module.LAZY_SPEC), ref)
+        self.assertIs(context.get_service(ref), svc)
+        del module.STATES[:]
+
+        # Stop the bundle
+        bundle.stop()
+        self.assertListEqual([IPopoEvent.INVALIDATED], module.STATES)
+        self.assertIsNone(context.get_service_reference(module.LAZY_SPEC))
+        del module.STATES[:]
+
+        # Restart it and kill the component before its first use
+        bundle.start()
+        self.assertIsNotNone(context.get_service_reference(module.LAZY_SPEC))
+        self.ipopo.kill(module.LAZY_INSTANCE)
+        self.assertIsNone(context.get_service_reference(module.LAZY_SPEC))
+        self.assertListEqual([], module.STATES)
+
+        # The name can be used again
+        self.ipopo.instantiate(module.LAZY_FACTORY, module.LAZY_INSTANCE)
+        self.assertListEqual(
+            [IPopoEvent.INSTANTIATED, IPopoEvent.VALIDATED], module.STATES)
+
+    def test_lazy_requirements(self):
+        """
+        Tests a lazy component with a mandatory requirement
+        """
+        context = self.framework.get_bundle_context()
+        bundle = context.install_bundle("tests.ipopo.ipopo_lazy_bundle")
+        bundle.start()
+        module = bundle.get_module()
+        name = "lazy-requiring"
+
+        # Unsatisfied requirement: no placeholder
+        self.assertFalse(
+            self.ipopo.instantiate_lazy(module.REQUIRING_FACTORY, name))
+        self.assertTrue(self.ipopo.is_registered_instance(name))
+        self.assertIsNone(context.get_service_reference(module.REQUIRING_SPEC))
+        self.ipopo.kill(name)
+
+        # Satisfied requirement: placeholder registered
+        dependency = object()
+        dep_reg = context.register_service(module.REQUIRED_SPEC, dependency, {})
+        self.assertTrue(
+            self.ipopo.instantiate_lazy(module.REQUIRING_FACTORY, name))
+        ref = context.get_service_reference(module.REQUIRING_SPEC)
+        self.assertIsNotNone(ref)
+
+        # The requirement disappears before the first use
+        dep_reg.unregister()
+        self.assertRaises(BundleException, context.get_service, ref)
+        self.assertEqual(
+            self.ipopo.get_instance_details(name)["state"],
+            StoredInstance.INVALID)
+
+        # The placeholder has been removed
+        self.assertIsNone(context.get_service_reference(module.REQUIRING_SPEC))
+
+        # The component provides its service once valid
+        context.register_service(module.REQUIRED_SPEC, dependency, {})
+        ref = context.get_service_reference(module.REQUIRING_SPEC)
+        self.assertIsNotNone(ref)
+        self.assertIs(context.get_service(ref).dependency, dependency)
+
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -7,6 +7,7 @@ Tests the iPOPO core service.
 """
 
 # Standard library
+import threading
 try:
     import unittest2 as unittest
 except ImportError:
@@ -350,6 +351,61 @@ class IPopoServiceTest(unittest.TestCase):
         self.assertFalse(self.ipopo.remove_listener(listener),
                          "Listener unregistered twice")
 
+    def test_instance_stats(self):
+        """
+        Tests the life cycle statistics of components
+        """
+        module = install_bundle(self.framework)
+
+        class Listener(object):
+            """
+            iPOPO event listener
+            """
+            def __init__(self):
+                self.events = []
+
+            def handle_ipopo_event(self, event):
+                self.events.append(event)
+
+        listener = Listener()
+        self.ipopo.add_listener(listener)
+
+        # Component B waits for component A
+        self.ipopo.instantiate(module.FACTORY_B, "component-b")
+        stats = self.ipopo.get_instance_details("component-b")["stats"]
+        self.assertEqual(stats["validations"], 0)
+        self.assertIn("constructor", stats["timings"])
+        self.assertNotIn("validate", stats["timings"])
+        self.assertGreaterEqual(stats["waiting"], 0)
+
+        # Bind and validate it
+        self.ipopo.instantiate(module.FACTORY_A, "component-a")
+        stats = self.ipopo.get_instance_details("component-b")["stats"]
+        self.assertEqual(stats["validations"], 1)
+        self.assertEqual(stats["invalidations"], 0)
+        self.assertEqual(stats["timings"]["bind"]["count"], 1)
+        self.assertEqual(stats["timings"]["validate"]["count"], 1)
+        self.assertGreaterEqual(stats["timings"]["validate"]["max"],
+                                stats["timings"]["validate"]["mean"])
+
+        # Events carry the durations
+        kinds = [(event.get_kind(), event.get_component_name())
+                 for event in listener.events]
+        self.assertIn((IPopoEvent.BOUND, "component-b"), kinds)
+        for event in listener.events:
+            if event.get_kind() in (IPopoEvent.INSTANTIATED,
+                                    IPopoEvent.VALIDATED, IPopoEvent.BOUND):
+                self.assertGreaterEqual(event.get_duration(), 0)
+
+        # Flapping component
+        self.ipopo.kill("component-a")
+        self.ipopo.instantiate(module.FACTORY_A, "component-a")
+        stats = self.ipopo.get_instance_details("component-b")["stats"]
+        self.assertEqual(stats["validations"], 2)
+        self.assertEqual(stats["invalidations"], 1)
+        self.assertEqual(stats["timings"]["unbind"]["count"], 1)
+        self.assertEqual(stats["timings"]["bind"]["count"], 2)
+
     def test_get_instance(self):
         """
         Tests the get_instance(name) method
@@ -396,6 +452,114 @@ class IPopoServiceTest(unittest.TestCase):
         self.ipopo.kill(instance_name)
         self.ipopo.unregister_factory(factory_name)
 
+    def test_concurrent_instantiate(self):
+        """
+        Tests the reservation of names and concurrent instantiations
+        """
+        factory_name = "slow-factory"
+        context = self.framework.get_bundle_context()
+        constructing = threading.Event()
+        release = threading.Event()
+
+        @decorators.ComponentFactory(factory_name)
+        @decorators.Provides("slow.service")
+        class SlowComponent(object):
+            def __init__(self):
+                constructing.set()
+                release.wait(5)
+
+        self.ipopo.register_factory(context, SlowComponent)
+
+        # Start an instantiation, blocked in the constructor
+        thread = threading.Thread(target=self.ipopo.instantiate,
+                                  args=(factory_name, "slow"))
+        thread.start()
+        self.assertTrue(constructing.wait(5))
+
+        # The name is reserved
+        self.assertRaises(ValueError, self.ipopo.instantiate,
+                          factory_name, "slow")
+        release.set()
+        thread.join(5)
+        self.assertTrue(self.ipopo.is_registered_instance("slow"))
+
+        # Concurrent instantiations
+        errors = []
+
+        def instantiate(prefix):
+            try:
+                for idx in range(50):
+                    self.ipopo.instantiate(
+                        factory_name, "{0}-{1}".format(prefix, idx))
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=instantiate, args=(idx,))
+                   for idx in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertListEqual([], errors)
+        self.assertEqual(len(self.ipopo.get_instances()), 201)
+        self.assertEqual(
+            len(context.get_all_service_references("slow.service")), 201)
+
+    def test_kill_while_starting(self):
+        """
+        Tests the kill of a component while it is being instantiated
+        """
+        factory_name = "killed-factory"
+        context = self.framework.get_bundle_context()
+        constructing = threading.Event()
+        release = threading.Event()
+        validated = []
+
+        @decorators.ComponentFactory(factory_name)
+        @decorators.Provides("killed.service")
+        class KilledComponent(object):
+            def __init__(self):
+                constructing.set()
+                release.wait(5)
+
+            @decorators.Validate
+            def validate(self, _):
+                validated.append(self)
+
+        self.ipopo.register_factory(context, KilledComponent)
+
+        # Can't kill a component during its construction
+        thread = threading.Thread(target=self.ipopo.instantiate,
+                                  args=(factory_name, "killed"))
+        thread.start()
+        self.assertTrue(constructing.wait(5))
+        self.assertRaises(ValueError, self.ipopo.kill, "killed")
+        release.set()
+        thread.join(5)
+        self.ipopo.kill("killed")
+        del validated[:]
+
+        # Kill it once its handlers are started
+        class Listener(object):
+            def handle_ipopo_event(self, event):
+                if event.get_kind() == IPopoEvent.INSTANTIATED:
+                    self.ipopo.kill(event.get_component_name())
+
+        listener = Listener()
+        listener.ipopo = self.ipopo
+        self.ipopo.add_listener(listener)
+
+        self.ipopo.instantiate(factory_name, "killed")
+        self.assertFalse(self.ipopo.is_registered_instance("killed"))
+        self.assertListEqual([], validated)
+        self.assertIsNone(context.get_service_reference("killed.service"))
+
+        # The name can be used again
+        self.ipopo.remove_listener(listener)
+        self.ipopo.instantiate(factory_name, "killed")
+        self.assertEqual(len(validated), 1)
+
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -8,13 +8,22 @@ Tests the iPOPO @Provides decorator.
 
 # Standard library
 import sys
+import threading
+import time
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
 
 # Pelix
+from pelix.constants import BundleException
 from pelix.framework import FrameworkFactory, BundleContext
+from pelix.internals.events import ServiceEvent
+
+# iPOPO
+from pelix.ipopo.constants import IPopoEvent, properties_batch
+from pelix.ipopo.decorators import Provides
+from pelix.ipopo.handlers.provides import POOL_TIMEOUT
 
 # Tests
 from tests.interfaces import IEchoService
@@ -38,7 +47,7 @@ class ProvidesTest(unittest.TestCase):
         """
         Called before each test. Initiates a framework.
         """
-        self.framework = FrameworkFactory.get_framework()
+        self.framework = FrameworkFactory.get_framework({POOL_TIMEOUT: .5})
         self.framework.start()
         self.ipopo = install_ipopo(self.framework)
 
@@ -370,6 +379,156 @@ class ProvidesTest(unittest.TestCase):
         self.assertNotIn(svc, component.services)
         self.assertNotIn(svc2, component.services)
 
+    def test_properties_batch(self):
+        """
+        Tests the update of service properties in a batch
+        """
+        module = install_bundle(self.framework)
+        context = self.framework.get_bundle_context()
+
+        class Listener(object):
+            """
+            Service event listener
+            """
+            def __init__(self, svc_ref):
+                self.svc_ref = svc_ref
+                self.events = []
+
+            def service_changed(self, event):
+                if event.get_service_reference() is self.svc_ref:
+                    self.events.append(event.get_kind())
+
+        compo = self.ipopo.instantiate(module.FACTORY_A, NAME_A)
+        svc_ref = context.get_service_reference(IEchoService)
+        listener = Listener(svc_ref)
+        context.add_service_listener(listener)
+
+        # Single update
+        compo.prop_1 = 1
+        self.assertListEqual(listener.events, [ServiceEvent.MODIFIED])
+        del listener.events[:]
+
+        # Batch of updates
+        with properties_batch(compo):
+            compo.prop_1 = 2
+            compo.usable = False
+
+            with properties_batch(compo):
+                compo.prop_1 = 3
+
+            # Values are updated immediately in the component
+            self.assertEqual(compo.prop_1, 3)
+            self.assertListEqual(listener.events, [])
+
+        self.assertListEqual(listener.events, [ServiceEvent.MODIFIED])
+        self.assertEqual(svc_ref.get_property("prop.1"), 3)
+        self.assertFalse(svc_ref.get_property(module.PROP_USABLE))
+        del listener.events[:]
+
+        # Reverted values don't trigger an event
+        with properties_batch(compo):
+            compo.prop_1 = 4
+            compo.prop_1 = 3
+
+        self.assertListEqual(listener.events, [])
+
+        # Not a component
+        with self.assertRaises(TypeError):
+            with properties_batch(object()):
+                pass
+
+    def test_pool(self):
+        """
+        Tests @Provides with a pool of components
+        """
+        module = install_bundle(self.framework)
+        context = self.framework.get_bundle_context()
+
+        # Instantiate the pool owner
+        owner = self.ipopo.instantiate(
+            module.FACTORY_PROVIDES_SVC_POOL, "provides.pool")
+
+        # The pool has been filled
+        pooled = ["provides.pool.pool-1", "provides.pool.pool-2"]
+        for name in pooled:
+            self.assertTrue(self.ipopo.is_registered_instance(name))
+
+        # Only the owner provides the service, as a prototype
+        svc_refs = context.get_all_service_references("pool.service")
+        self.assertEqual(len(svc_refs), 1)
+        svc_ref = svc_refs[0]
+        self.assertTrue(svc_ref.is_prototype())
+        self.assertEqual(svc_ref.get_property("pool.value"), 42)
+
+        # Check out the pooled components
+        objs = context.get_service_objects(svc_ref)
+        svc1 = objs.get_service()
+        svc2 = objs.get_service()
+        self.assertIsNot(svc1, svc2)
+        self.assertIsNot(svc1, owner)
+        for svc in (svc1, svc2):
+            self.assertIsInstance(svc, module.SvcPoolProvider)
+            self.assertListEqual(svc.states, [IPopoEvent.VALIDATED])
+            self.assertEqual(svc.value, 42)
+
+        # Exhausted pool: no new component is instantiated
+        start = time.time()
+        self.assertRaises(BundleException, objs.get_service)
+        self.assertGreaterEqual(time.time() - start, .4)
+        self.assertFalse(
+            self.ipopo.is_registered_instance("provides.pool.pool-3"))
+
+        # Consumers wait for a component to be returned
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(objs.get_service()))
+        thread.start()
+        time.sleep(.1)
+        objs.unget_service(svc1)
+        thread.join()
+        self.assertListEqual(results, [svc1])
+
+        # Pooled components are reused
+        objs.unget_service(svc1)
+        objs.unget_service(svc2)
+        svc4 = objs.get_service()
+        self.assertIn(svc4, (svc1, svc2))
+        objs.unget_service(svc4)
+        self.assertListEqual(svc1.states, [IPopoEvent.VALIDATED])
+
+        # Invalid idle components are killed instead of being served
+        for name in pooled:
+            self.ipopo.invalidate(name)
+        svc5 = objs.get_service()
+        self.assertNotIn(svc5, (svc1, svc2))
+        self.assertListEqual(svc5.states, [IPopoEvent.VALIDATED])
+        for name in pooled:
+            self.assertFalse(self.ipopo.is_registered_instance(name))
+        pooled = ["provides.pool.pool-3"]
+
+        # Invalid components are killed when returned
+        svc6 = objs.get_service()
+        self.assertNotIn(svc6, (svc1, svc2, svc5))
+        self.ipopo.invalidate("provides.pool.pool-4")
+        objs.unget_service(svc6)
+        for _ in range(50):
+            if not self.ipopo.is_registered_instance("provides.pool.pool-4"):
+                break
+            time.sleep(.1)
+        self.assertFalse(
+            self.ipopo.is_registered_instance("provides.pool.pool-4"))
+        objs.unget_service(svc5)
+
+        # Killing the owner kills the pool
+        self.ipopo.kill("provides.pool")
+        self.assertIsNone(context.get_service_reference("pool.service"))
+        for name in pooled:
+            self.assertFalse(self.ipopo.is_registered_instance(name))
+
+        # Invalid configuration
+        self.assertRaises(ValueError, Provides, "spec", pool=-1)
+        self.assertRaises(ValueError, Provides, "spec", pool=1, factory=True)
+
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -7,6 +7,8 @@ Tests the component requirements behavior
 """
 
 # Standard library
+import sys
+
 try:
     import unittest2 as unittest
 except ImportError:
@@ -599,6 +601,92 @@ class RequirementTest(unittest.TestCase):
         self.assertIsNone(consumer.service, "Service still injected")
         consumer.reset()
 
+    def test_immutable(self):
+        """
+        Tests the immutable flag of @Requires and @RequiresMap
+        """
+        module = install_bundle(self.framework)
+        context = self.framework.get_bundle_context()
+
+        # Instantiate the consumer (all requirements are optional)
+        consumer = self.ipopo.instantiate(module.FACTORY_IMMUTABLE, NAME_A)
+        self.assertIsNone(consumer.services)
+        self.assertEqual(0, len(consumer.single))
+        self.assertEqual(0, len(consumer.multiple))
+
+        # Register some services
+        svc1 = object()
+        reg1 = context.register_service(IEchoService, svc1, {})
+        svc2 = object()
+        reg2 = context.register_service(IEchoService, svc2, {})
+
+        # Services are injected as a tuple
+        self.assertEqual((svc1, svc2), consumer.services)
+
+        # Unrelated changes don't rebuild the snapshot
+        snapshot = consumer.services
+        reg_map = context.register_service(module.MAP_SPEC_TEST, svc1, {})
+        self.assertIs(snapshot, consumer.services)
+        reg_map.unregister()
+
+        # Departures are reflected in a new snapshot
+        reg1.unregister()
+        self.assertEqual((svc2,), consumer.services)
+        reg2.unregister()
+        self.assertIsNone(consumer.services)
+
+        # Maps are injected as read-only mappings
+        svc3 = object()
+        reg3 = context.register_service(
+            module.MAP_SPEC_TEST, svc3, {"single.key": 1, "other.key": 2})
+        self.assertDictEqual({1: svc3}, dict(consumer.single))
+        self.assertDictEqual({2: (svc3,)}, dict(consumer.multiple))
+
+        if sys.version_info >= (3, 3):
+            # Read-only mappings are only available in Python 3.3+
+            with self.assertRaises(TypeError):
+                consumer.single[2] = svc3
+
+        # Property update
+        reg3.set_properties({"other.key": 3})
+        self.assertDictEqual({3: (svc3,)}, dict(consumer.multiple))
+
+        reg3.unregister()
+        self.assertEqual(0, len(consumer.single))
+        self.assertEqual(0, len(consumer.multiple))
+
+    def test_immutable_copies(self):
+        """
+        Tests the copies of the snapshots injected by @RequiresMap when
+        read-only mappings are not available
+        """
+        import pelix.ipopo.handlers.constants as handlers_constants
+        import pelix.ipopo.handlers.requiresmap as requiresmap
+        module = install_bundle(self.framework)
+        context = self.framework.get_bundle_context()
+
+        mapping_proxy = requiresmap.MappingProxyType
+        requiresmap.MappingProxyType = None
+        try:
+            consumer = self.ipopo.instantiate(module.FACTORY_IMMUTABLE, NAME_A)
+            svc = object()
+            context.register_service(
+                module.MAP_SPEC_TEST, svc, {"single.key": 1})
+            self.assertDictEqual({1: svc}, consumer.single)
+
+            # Altering the injected dictionary doesn't alter the snapshot
+            consumer.single[2] = svc
+            stored_instance = self.ipopo._get_stored_instance(NAME_A)
+            for handler in stored_instance.get_handlers(
+                    handlers_constants.KIND_DEPENDENCY):
+                if handler.get_field() == "single":
+                    self.assertDictEqual({1: svc}, handler.get_value())
+                    break
+            else:
+                self.fail("Handler not found")
+        finally:
+            requiresmap.MappingProxyType = mapping_proxy
+
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
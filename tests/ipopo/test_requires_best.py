@@ -194,6 +194,46 @@ class RequiresBestTest(unittest.TestCase):
                              [IPopoEvent.INVALIDATED, IPopoEvent.UNBOUND,
                               IPopoEvent.BOUND, IPopoEvent.VALIDATED])
 
+    def test_candidates_order(self):
+        """
+        Tests the order of injection with many services, rankings updates
+        and departures
+        """
+        module = install_bundle(self.framework)
+        context = self.framework.get_bundle_context()
+
+        # Register services with different rankings before the consumer
+        services = [object() for _ in range(20)]
+        registrations = [
+            context.register_service(IEchoService, svc,
+                                     {SERVICE_RANKING: idx % 7})
+            for idx, svc in enumerate(services)]
+
+        def best_service():
+            """
+            Returns the best service, as seen by the registry
+            """
+            return context.get_service(
+                context.get_service_reference(IEchoService))
+
+        consumer = self.ipopo.instantiate(module.FACTORY_REQUIRES_BEST, NAME_A)
+        self.assertIs(consumer.service, best_service())
+
+        # Update rankings
+        for idx, reg in enumerate(registrations):
+            reg.set_properties({SERVICE_RANKING: (idx * 3) % 11})
+            self.assertIs(consumer.service, best_service())
+
+        # Unregister services one by one
+        while registrations:
+            reg = registrations.pop(len(registrations) // 2)
+            reg.unregister()
+            if registrations:
+                self.assertIs(consumer.service, best_service())
+
+        # No service left
+        self.assertIsNone(consumer.service)
+
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -12,10 +12,13 @@ try:
 except ImportError:
     import unittest
 import random
+import threading
+import time
 
 # Pelix
 from pelix.ipopo.constants import IPopoEvent
 from pelix.framework import FrameworkFactory, BundleContext
+from pelix.ipopo.handlers.requiresbroadcast import DEFAULT_POOL_SIZE
 
 # Tests
 from tests.ipopo import install_bundle, install_ipopo
@@ -62,6 +65,24 @@ class SampleEchoService(IEchoService):
         self.raised = True
         raise KeyError("Oops")
 
+    def wait(self, event, delay):
+        self.called = True
+        event.wait(delay)
+        return threading.current_thread().name
+
+
+class RelayEchoService(SampleEchoService):
+    """
+    Service broadcasting the calls it receives
+    """
+
+    def __init__(self, consumer):
+        SampleEchoService.__init__(self)
+        self.consumer = consumer
+
+    def relay(self, value):
+        return len(self.consumer.service.echo(value).results)
+
 
 class RequiresBestTest(unittest.TestCase):
     """
@@ -473,6 +494,89 @@ class RequiresBestTest(unittest.TestCase):
         self.assertFalse(svc.sub_service.called, "Deeper service was called")
         self.assertIsNone(svc.sub_service.value, "Deeper service valued")
 
+    def test_concurrent(self):
+        """
+        Checks the concurrent and gathering mode
+        """
+        module = install_bundle(self.framework)
+        context = self.framework.get_bundle_context()
+
+        # Instantiate the component
+        consumer = self.ipopo.instantiate(
+            module.FACTORY_REQUIRES_BROADCAST_CONCURRENT, NAME_A
+        )
+
+        # No service: empty result
+        result = consumer.service.echo(42)
+        self.assertFalse(result, "Empty result is True")
+        self.assertDictEqual({}, result.results)
+
+        # Register services
+        services = {}
+        for _ in range(3):
+            svc = SampleEchoService()
+            svc_reg = context.register_service(IEchoService, svc, {})
+            services[svc_reg.get_reference()] = svc
+
+        # Results are gathered per reference
+        result = consumer.service.echo(42)
+        self.assertTrue(result, "Result is False")
+        self.assertDictEqual(
+            {svc_ref: 42 for svc_ref in services}, result.results
+        )
+        self.assertDictEqual({}, result.errors)
+
+        # Errors are gathered too
+        result = consumer.service.raise_ex()
+        self.assertFalse(result, "Result is True")
+        self.assertSetEqual(set(services), set(result.errors))
+        for error in result.errors.values():
+            self.assertIsInstance(error, KeyError)
+
+        # Services are called in parallel
+        event = threading.Event()
+        start = time.time()
+        result = consumer.service.wait(event, 0.5)
+        self.assertLess(time.time() - start, 1.4, "Calls were sequential")
+        self.assertEqual(len(services), len(set(result.results.values())))
+
+        # Slow services are reported
+        start = time.time()
+        result = consumer.service.wait(event, 3)
+        self.assertLess(time.time() - start, 2, "Timeout not respected")
+        self.assertSetEqual(set(services), set(result.timed_out))
+        event.set()
+
+    def test_nested_concurrent(self):
+        """
+        Checks concurrent broadcasts made by the called services
+        """
+        module = install_bundle(self.framework)
+        context = self.framework.get_bundle_context()
+
+        # Instantiate the components
+        consumer = self.ipopo.instantiate(
+            module.FACTORY_REQUIRES_BROADCAST_CONCURRENT, NAME_A
+        )
+        relay_consumer = self.ipopo.instantiate(
+            module.FACTORY_REQUIRES_BROADCAST_CONCURRENT, NAME_B
+        )
+
+        # Register more services than pool threads
+        nb_services = DEFAULT_POOL_SIZE * 2
+        for _ in range(nb_services):
+            context.register_service(
+                IEchoService, RelayEchoService(relay_consumer), {}
+            )
+
+        # Nested broadcasts don't wait for the busy pool threads
+        result = consumer.service.relay(42)
+        self.assertListEqual([], result.timed_out)
+        self.assertDictEqual({}, result.errors)
+        self.assertEqual(len(result.results), nb_services)
+        for nb_results in result.results.values():
+            self.assertEqual(nb_results, nb_services)
+
 
 # ------------------------------------------------------------------------------
 
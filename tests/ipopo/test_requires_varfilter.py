@@ -621,6 +621,50 @@ class RequiresVarFilterTest(unittest.TestCase):
         self.assertEqual(self.ipopo.get_instance_details("varservice-instance-1")["state"], StoredInstance.VALID)
         self.assertEqual(self.ipopo.get_instance_details("varservice-instance-2")["state"], StoredInstance.VALID)
 
+    def test_retarget(self):
+        """
+        Tests that changing the filter only binds and unbinds the services
+        which need it
+        """
+        module = install_bundle(self.framework)
+        context = self.framework.get_bundle_context()
+
+        consumer = self.ipopo.instantiate(
+            module.FACTORY_REQUIRES_VAR_FILTER_AGGREGATE,
+            NAME_B,
+            {"static": "static"},
+        )
+        consumer.change(1)
+
+        svc_1 = object()
+        svc_2 = object()
+        svc_3 = object()
+        context.register_service(IEchoService, svc_1,
+                                 {"s": "static", "a": 1})
+        context.register_service(IEchoService, svc_2,
+                                 {"s": "static", "a": [1, 2]})
+        context.register_service(IEchoService, svc_3,
+                                 {"s": "static", "a": 2})
+        self.assertListEqual(consumer.service, [svc_1, svc_2])
+        consumer.reset()
+
+        # svc_2 matches both filters: it must stay bound
+        consumer.change(2)
+        self.assertListEqual(
+            [IPopoEvent.BOUND, IPopoEvent.UNBOUND], consumer.states)
+        self.assertListEqual(consumer.service, [svc_2, svc_3])
+        consumer.reset()
+
+        # The listener still follows the new filter
+        svc_4 = object()
+        context.register_service(IEchoService, svc_4,
+                                 {"s": "static", "a": 2})
+        svc_5 = object()
+        context.register_service(IEchoService, svc_5,
+                                 {"s": "static", "a": 1})
+        self.assertListEqual([IPopoEvent.BOUND], consumer.states)
+        self.assertListEqual(consumer.service, [svc_2, svc_3, svc_4])
+
 # ------------------------------------------------------------------------------
 
 if __name__ == "__main__":
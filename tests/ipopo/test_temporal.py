@@ -117,6 +117,18 @@ class TemporalTest(unittest.TestCase):
         self.assertIs(proxy.value, svc.value)
         self.assertIs(proxy.values, svc.values)
 
+        # Bound methods are cached, but not other fields
+        self.assertIs(proxy.method, proxy.method)
+        svc.value = random.random()
+        self.assertEqual(proxy.method(), svc.value)
+        self.assertIs(proxy.value, svc.value)
+
+        # Rebinding must drop cached methods
+        svc2 = Dummy()
+        proxy.set_service(svc2)
+        self.assertEqual(proxy.method(), svc2.value)
+        self.assertIs(proxy.method.__self__, svc2)
+
         # Access invalid fields
         try:
             proxy.invalid()
@@ -149,6 +161,37 @@ class TemporalTest(unittest.TestCase):
         else:
             self.fail("TemporalException not raised on field access")
 
+    def test_proxy_unset(self):
+        """
+        Tests the order of the updates when unsetting the service
+        """
+        from pelix.ipopo.handlers.temporal import TemporalException, \
+            _TemporalProxy
+        from pelix.utilities import EventData
+
+        results = []
+
+        class RacingEvent(EventData):
+            """
+            Calls the proxy while it is being unset
+            """
+            def clear(self):
+                try:
+                    results.append(proxy.method())
+                except TemporalException as ex:
+                    results.append(ex)
+                EventData.clear(self)
+
+        proxy = _TemporalProxy(.1)
+        proxy._TemporalProxy__event = RacingEvent()
+        svc = Dummy()
+        proxy.set_service(svc)
+        proxy.unset_service()
+
+        # The caller didn't see an unbound proxy with a set event
+        self.assertListEqual(results, [svc.value])
+        self.assertRaises(TemporalException, getattr, proxy, "method")
+
     def test_temporal_lifecycle(self):
         """
         Tests the component life cycle
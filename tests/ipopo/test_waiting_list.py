@@ -80,6 +80,7 @@ class WaitingListTest(unittest.TestCase):
 
         # Remove it
         self.waiting.remove("some.instance")
+        self.assertEqual(self.waiting.get_pending_counts(), {})
 
         # Remove it twice
         self.assertRaises(KeyError, self.waiting.remove, "some.instance")
@@ -94,6 +95,7 @@ class WaitingListTest(unittest.TestCase):
         """
         # Add the component to the waiting list
         self.waiting.add(FACTORY_A, NAME_A)
+        self.assertEqual(self.waiting.get_pending_counts(), {FACTORY_A: 1})
 
         # Install iPOPO
         ipopo = install_ipopo(self.framework)
@@ -103,11 +105,23 @@ class WaitingListTest(unittest.TestCase):
                          "Instance already there")
 
         # Install the component bundle
-        install_bundle(self.framework)
+        module = install_bundle(self.framework)
 
         # The instance must have been started
         self.assertTrue(ipopo.is_registered_instance(NAME_A),
                         "Instance not there")
+        self.assertEqual(self.waiting.get_pending_counts(), {})
+
+        # Stop the bundle: the component waits for its factory again
+        bundle = self.framework.get_bundle_by_name(module.__name__)
+        bundle.stop()
+        self.assertEqual(self.waiting.get_pending_counts(), {FACTORY_A: 1})
+
+        # Restart it
+        bundle.start()
+        self.assertTrue(ipopo.is_registered_instance(NAME_A),
+                        "Instance not there")
+        self.assertEqual(self.waiting.get_pending_counts(), {})
 
         # Remove the component from the waiting list
         self.waiting.remove(NAME_A)
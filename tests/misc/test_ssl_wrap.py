@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Tests the SSL utility module
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import os
+import shutil
+import tempfile
+import threading
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+# XML RPC modules
+try:
+    # Python 3
+    from xmlrpc.server import SimpleXMLRPCServer
+except ImportError:
+    # Python 2
+    from SimpleXMLRPCServer import SimpleXMLRPCServer
+
+# Check if we can run the tests
+try:
+    import ssl
+    from ssl import SSLContext
+except ImportError:
+    raise unittest.SkipTest("SSLContext not supported")
+
+# Pelix
+import pelix.misc.ssl_wrap as ssl_wrap
+import pelix.misc.xml_rpc as xml_rpc
+
+from tests.http.gen_cert import make_certs
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+TMP_DIR = tempfile.mkdtemp(prefix="ipopo-tests-ssl-wrap")
+
+# ------------------------------------------------------------------------------
+
+
+def get_file(name):
+    """
+    Returns the path to the given certificate file
+    """
+    return os.path.join(TMP_DIR, name)
+
+
+class _XmlRpcServer(SimpleXMLRPCServer):
+    """
+    XML-RPC server keeping the session resumption flag of its clients
+    """
+    def __init__(self, *args, **kwargs):
+        SimpleXMLRPCServer.__init__(self, *args, **kwargs)
+        self.reused = []
+
+    def get_request(self):
+        sock, address = SimpleXMLRPCServer.get_request(self)
+        self.reused.append(sock.session_reused)
+        return sock, address
+
+
+class SslWrapTest(unittest.TestCase):
+    """
+    Tests the shared SSL contexts
+    """
+    @classmethod
+    def setUpClass(cls):
+        """
+        Setup the certificates
+        """
+        make_certs(TMP_DIR, None)
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Clears the certificates
+        """
+        shutil.rmtree(TMP_DIR)
+
+    def tearDown(self):
+        """
+        Clears the caches
+        """
+        ssl_wrap.clear_cache()
+
+    def testServerContextCache(self):
+        """
+        Tests the cache of server contexts
+        """
+        cert_file = get_file("server.crt")
+        key_file = get_file("server.key")
+
+        context = ssl_wrap.get_server_context(cert_file, key_file)
+        self.assertIsInstance(context, SSLContext)
+        self.assertIs(ssl_wrap.get_server_context(cert_file, key_file),
+                      context)
+        self.assertFalse(context.options & getattr(ssl, "OP_NO_TICKET", 0))
+
+        # Different configuration
+        other = ssl_wrap.get_server_context(
+            cert_file, key_file, ca_file=get_file("ca.crt"), client_auth=True)
+        self.assertIsNot(other, context)
+        self.assertEqual(other.verify_mode, ssl.CERT_REQUIRED)
+
+        # Renewed certificate: the context is replaced in the cache
+        nb_contexts = len(ssl_wrap._CONTEXTS)
+        stat = os.stat(cert_file)
+        os.utime(cert_file, (stat.st_atime, stat.st_mtime + 10))
+        renewed = ssl_wrap.get_server_context(cert_file, key_file)
+        self.assertIsNot(renewed, context)
+        self.assertIs(ssl_wrap.get_server_context(cert_file, key_file),
+                      renewed)
+        self.assertEqual(len(ssl_wrap._CONTEXTS), nb_contexts)
+
+        # Cleared cache
+        context = ssl_wrap.get_server_context(cert_file, key_file)
+        ssl_wrap.clear_cache()
+        self.assertIsNot(ssl_wrap.get_server_context(cert_file, key_file),
+                         context)
+
+    def testClientContextCache(self):
+        """
+        Tests the cache of client contexts
+        """
+        context = ssl_wrap.get_client_context(get_file("ca.crt"))
+        self.assertIs(ssl_wrap.get_client_context(get_file("ca.crt")),
+                      context)
+        self.assertTrue(context.check_hostname)
+
+        other = ssl_wrap.get_client_context(
+            get_file("ca.crt"), check_hostname=False)
+        self.assertIsNot(other, context)
+        self.assertFalse(other.check_hostname)
+
+    @unittest.skipIf(not hasattr(ssl.SSLSocket, "session"),
+                     "TLS sessions not accessible")
+    def testSessionResumption(self):
+        """
+        Tests the resumption of TLS sessions by the XML-RPC clients
+        """
+        server = _XmlRpcServer(("127.0.0.1", 0), logRequests=False)
+        server.register_function(lambda a, b: a + b, "add")
+        server.socket = ssl_wrap.wrap_socket(
+            server.socket, get_file("server.crt"), get_file("server.key"))
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        try:
+            url = "https://localhost:{0}".format(server.server_address[1])
+            context = ssl_wrap.get_client_context(
+                get_file("ca.crt"), check_hostname=False)
+
+            for _ in range(3):
+                # A new proxy for each call, as the remote services do
+                proxy = xml_rpc.make_server_proxy(
+                    url, transport=xml_rpc.SafeTransport(context))
+                self.assertEqual(proxy.add(1, 2), 3)
+
+            # Default transport
+            proxy = xml_rpc.make_server_proxy(url)
+            self.assertIsInstance(proxy("transport"), xml_rpc.SafeTransport)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(server.reused, [False, True, True])
+
+# ------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Tests the XML-RPC utility module
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import io
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+# XML RPC modules
+try:
+    # Python 3
+    from xmlrpc.server import SimpleXMLRPCDispatcher
+    import xmlrpc.client as xmlrpclib
+except ImportError:
+    # Python 2
+    from SimpleXMLRPCServer import SimpleXMLRPCDispatcher
+    import xmlrpclib
+
+# Pelix
+import pelix.misc.xml_rpc as xml_rpc
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# ------------------------------------------------------------------------------
+
+
+class _BrokenStream(object):
+    """
+    Stream raising an error
+    """
+    def read(self, size=-1):
+        raise IOError("Connection lost")
+
+
+class XmlRpcStreamTest(unittest.TestCase):
+    """
+    Tests the XML-RPC stream parsing
+    """
+    def setUp(self):
+        """
+        Prepares a dispatcher
+        """
+        self.dispatcher = SimpleXMLRPCDispatcher(allow_none=True)
+        self.dispatcher.register_function(lambda a, b: a + b, "add")
+
+    def _call(self, data, dispatch_method=None):
+        """
+        Dispatches the given request and parses the result
+        """
+        result = xml_rpc.dispatch_stream(
+            self.dispatcher, io.BytesIO(data), dispatch_method)
+        self.assertIsInstance(result, bytes)
+        return xmlrpclib.loads(result)[0][0]
+
+    def testLoadStream(self):
+        """
+        Tests the parsing of a request
+        """
+        # Larger than a read block
+        text = u"été " * xml_rpc.READ_BLOCK_SIZE
+        data = xmlrpclib.dumps((text, [1, 2]), "method").encode("utf-8")
+        params, method = xml_rpc.load_stream(io.BytesIO(data))
+        self.assertEqual(method, "method")
+        self.assertEqual(params, (text, [1, 2]))
+
+    def testDispatch(self):
+        """
+        Tests the dispatch of requests
+        """
+        data = xmlrpclib.dumps((1, 2), "add").encode()
+        self.assertEqual(self._call(data), 3)
+        self.assertEqual(
+            self._call(data, lambda method, params: [method, list(params)]),
+            ["add", [1, 2]])
+
+        # Errors are returned as faults
+        for data in (b"<invalid", xmlrpclib.dumps((1,), "unknown").encode()):
+            self.assertRaises(xmlrpclib.Fault, self._call, data)
+
+        # Reading errors are propagated
+        self.assertRaises(IOError, xml_rpc.dispatch_stream, self.dispatcher,
+                          _BrokenStream())
+
+# ------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    unittest.main()
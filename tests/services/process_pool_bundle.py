@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Bundle defining a component with offloaded methods
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import os
+
+# iPOPO
+from pelix.ipopo.decorators import ComponentFactory, Offload
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+FACTORY_OFFLOAD = "offload-factory"
+FACTORY_OFFLOAD_OTHER = "offload-other-factory"
+
+# ------------------------------------------------------------------------------
+
+
+@ComponentFactory(FACTORY_OFFLOAD)
+class OffloadComponent(object):
+    """
+    Component with CPU-bound methods
+    """
+    @Offload()
+    def compute(self, value, power=2):
+        """
+        Returns the PID of the worker and the computed value
+        """
+        return os.getpid(), value ** power, self
+
+    @Offload(wait=False)
+    def compute_async(self, value):
+        """
+        Returns a future
+        """
+        return value * 2
+
+
+@ComponentFactory(FACTORY_OFFLOAD_OTHER)
+class OtherPoolComponent(object):
+    """
+    Component using a configured pool
+    """
+    @Offload(pool="other")
+    def other(self):
+        """
+        Uses another pool
+        """
+        return os.getpid()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Tests the process pools service and the @Offload decorator
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import os
+import shutil
+import time
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+# Pelix
+from pelix.ipopo.constants import use_ipopo
+from pelix.ipopo.instance import StoredInstance
+import pelix.framework
+import pelix.services as services
+
+# Tests
+from tests.services.process_pool_bundle import FACTORY_OFFLOAD, \
+    FACTORY_OFFLOAD_OTHER
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# Use a local configuration folder
+conf_folder = os.path.join(os.path.dirname(__file__), "conf_pool")
+
+# ------------------------------------------------------------------------------
+
+
+class ProcessPoolTest(unittest.TestCase):
+    """
+    Tests the process pools
+    """
+    def setUp(self):
+        """
+        Sets up the test
+        """
+        self.framework = pelix.framework.create_framework(
+            ('pelix.ipopo.core', 'pelix.services.configadmin',
+             'pelix.services.process_pool',
+             'tests.services.process_pool_bundle'),
+            {'configuration.folder': conf_folder})
+        self.framework.start()
+        self.context = self.framework.get_bundle_context()
+
+        config_ref = self.context.get_service_reference(
+            services.SERVICE_CONFIGURATION_ADMIN)
+        self.config = self.context.get_service(config_ref)
+
+    def tearDown(self):
+        """
+        Cleans up for next test
+        """
+        pelix.framework.FrameworkFactory.delete_framework()
+        self.config = None
+        shutil.rmtree(conf_folder, True)
+
+    def _get_pool_ref(self, name):
+        """
+        Waits for the pool with the given name
+
+        :return: The reference to the pool, or None
+        """
+        for _ in range(50):
+            svc_ref = self.context.get_service_reference(
+                services.SERVICE_PROCESS_POOL,
+                "({0}={1})".format(services.PROP_PROCESS_POOL_NAME, name))
+            if svc_ref is not None:
+                return svc_ref
+            time.sleep(.1)
+        return None
+
+    def test_offload(self):
+        """
+        Tests the execution of offloaded methods
+        """
+        self.assertIsNotNone(self._get_pool_ref("cpu"))
+
+        with use_ipopo(self.context) as ipopo:
+            component = ipopo.instantiate(FACTORY_OFFLOAD, "offload")
+
+            # Executed in another process, without the component instance
+            pid, result, worker_self = component.compute(3, power=3)
+            self.assertNotEqual(pid, os.getpid())
+            self.assertEqual(result, 27)
+            self.assertIsNone(worker_self)
+
+            # Future
+            self.assertEqual(component.compute_async(21).result(10), 42)
+
+    def test_configuration(self):
+        """
+        Tests the configuration of pools
+        """
+        with use_ipopo(self.context) as ipopo:
+            component = ipopo.instantiate(FACTORY_OFFLOAD_OTHER, "offload")
+            details = ipopo.get_instance_details("offload")
+            self.assertEqual(details["state"], StoredInstance.INVALID)
+
+        # Configure the missing pool
+        config = self.config.create_factory_configuration(
+            services.PROCESS_POOL_FACTORY_PID)
+        config.update({services.PROP_PROCESS_POOL_NAME: "other",
+                       services.PROP_PROCESS_POOL_MAX_WORKERS: 1})
+        svc_ref = self._get_pool_ref("other")
+        self.assertIsNotNone(svc_ref)
+        self.assertEqual(
+            svc_ref.get_property(services.PROP_PROCESS_POOL_MAX_WORKERS), 1)
+
+        with use_ipopo(self.context) as ipopo:
+            details = ipopo.get_instance_details("offload")
+            self.assertEqual(details["state"], StoredInstance.VALID)
+
+        self.assertNotEqual(component.other(), os.getpid())
+
+        # Resize the default pool
+        default_ref = self._get_pool_ref("cpu")
+        config_cpu = self.config.create_factory_configuration(
+            services.PROCESS_POOL_FACTORY_PID)
+        config_cpu.update({services.PROP_PROCESS_POOL_NAME: "cpu",
+                           services.PROP_PROCESS_POOL_MAX_WORKERS: 2})
+        for _ in range(50):
+            svc_ref = self._get_pool_ref("cpu")
+            if svc_ref is not default_ref:
+                break
+            time.sleep(.1)
+        self.assertEqual(
+            svc_ref.get_property(services.PROP_PROCESS_POOL_MAX_WORKERS), 2)
+
+        # Deleting the configuration restores the default pool
+        config_cpu.delete()
+        for _ in range(50):
+            default_ref = self._get_pool_ref("cpu")
+            if default_ref is not svc_ref:
+                break
+            time.sleep(.1)
+        self.assertIsNone(default_ref.get_property(
+            services.PROP_PROCESS_POOL_MAX_WORKERS))
+
+        # Delete the other pool
+        config.delete()
+        for _ in range(50):
+            if self.context.get_service_reference(
+                    services.SERVICE_PROCESS_POOL,
+                    "({0}=other)".format(services.PROP_PROCESS_POOL_NAME)) \
+                    is None:
+                break
+            time.sleep(.1)
+        else:
+            self.fail("Pool still registered")
+
+# ------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    # Set logging level
+    import logging
+    logging.basicConfig(level=logging.DEBUG)
+    unittest.main()
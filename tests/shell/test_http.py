@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -- Content-Encoding: UTF-8 --
+"""
+Tests the HTTP service shell commands
+
+:author: Thomas Calmant
+"""
+
+# Standard library
+import time
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    # Python 3
+    import http.client as httplib
+except (ImportError, AttributeError):
+    # Python 2 or IronPython
+    import httplib
+
+# Pelix
+from pelix.ipopo.constants import use_ipopo
+import pelix.framework
+import pelix.http
+import pelix.shell
+import pelix.shell.beans as beans
+
+# ------------------------------------------------------------------------------
+
+__version_info__ = (1, 0, 2)
+__version__ = ".".join(str(x) for x in __version_info__)
+
+# ------------------------------------------------------------------------------
+
+
+class Servlet(object):
+    """
+    Simple servlet
+    """
+    def do_GET(self, request, response):
+        response.send_content(200, "hello", "text/plain")
+
+
+class HttpShellTest(unittest.TestCase):
+    """
+    Tests the HTTP service shell commands
+    """
+    def setUp(self):
+        """
+        Prepares a framework with an HTTP service
+        """
+        # Create the framework
+        self.framework = pelix.framework.create_framework(
+            ('pelix.ipopo.core',
+             'pelix.shell.core',
+             'pelix.http.basic',
+             'pelix.shell.http'))
+        self.framework.start()
+
+        # Get the Shell service
+        context = self.framework.get_bundle_context()
+        svc_ref = context.get_service_reference(pelix.shell.SERVICE_SHELL)
+        self.shell = context.get_service(svc_ref)
+
+        # Instantiate the HTTP service
+        with use_ipopo(context) as ipopo:
+            self.http_svc = ipopo.instantiate(
+                pelix.http.FACTORY_HTTP_BASIC, "http-server",
+                {pelix.http.HTTP_SERVICE_ADDRESS: "127.0.0.1",
+                 pelix.http.HTTP_SERVICE_PORT: 0})
+
+        self.http_svc.register_servlet("/first", Servlet())
+        self.http_svc.register_servlet("/second", Servlet())
+
+    def tearDown(self):
+        """
+        Cleans up for next test
+        """
+        # Stop the framework
+        pelix.framework.FrameworkFactory.delete_framework(self.framework)
+        self.framework = None
+
+    def _run_command(self, command, *args):
+        """
+        Runs the given command and returns the output stream
+        """
+        # String output
+        str_output = StringIO()
+
+        # Format command
+        if args:
+            command = command.format(*args)
+
+        # Run command
+        session = beans.ShellSession(beans.IOHandler(None, str_output))
+        self.shell.execute(command, session)
+        return str_output.getvalue()
+
+    def _request(self, uri):
+        """
+        Sends a GET request to the HTTP service
+        """
+        conn = httplib.HTTPConnection(*self.http_svc.get_access())
+        try:
+            conn.request("GET", uri)
+            conn.getresponse().read()
+        finally:
+            conn.close()
+
+    def testStats(self):
+        """
+        Tests the printing of the metrics
+        """
+        self._request("/first")
+        self._request("/second")
+
+        # Metrics are recorded after the response has been sent
+        deadline = time.time() + 5
+        while len(self.http_svc.get_metrics()) < 2 \
+                and time.time() < deadline:
+            time.sleep(0.01)
+
+        output = self._run_command("http.stats")
+        self.assertIn("/first", output)
+        self.assertIn("/second", output)
+        self.assertIn("2 servlets", output)
+
+        # Filter on a path
+        output = self._run_command("http.stats {0}", "/first")
+        self.assertIn("/first", output)
+        self.assertNotIn("/second", output)
+
+        # Reset metrics
+        self._run_command("http.reset")
+        self.assertIn("0 servlets", self._run_command("http.stats"))
+
+# ------------------------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    unittest.main()
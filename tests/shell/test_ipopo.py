@@ -126,6 +126,24 @@ class IPopoShellTest(unittest.TestCase):
                     self.assertIn(name, subout)
                     self.assertIn(factory, subout)
 
+    def testInstancesStats(self):
+        """
+        Tests the statistics of instances
+        """
+        with use_ipopo(self.framework.get_bundle_context()) as ipopo:
+            output = self._run_command('stats')
+            for name, _, _ in ipopo.get_instances():
+                # Check that the instance has been listed
+                self.assertIn(name, output)
+
+                # Check filtering
+                subout = self._run_command('stats {0}', name)
+                self.assertIn(name, subout)
+
+            # Unknown component
+            subout = self._run_command('stats <unknown>')
+            self.assertIn("0 components", subout)
+
     def testWaitingListing(self):
         """
         Tests listing the waiting instances
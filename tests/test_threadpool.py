@@ -476,6 +476,35 @@ class ThreadPoolTest(unittest.TestCase):
 
         self.pool.join()
 
+    def testTryEnqueue(self):
+        """
+        Checks that try_enqueue() doesn't wait for the queue to have room
+        """
+        # Start the pool
+        self.pool = threadpool.ThreadPool(1, queue_size=1)
+        self.pool.start()
+
+        # Lock the single thread, then fill the queue
+        event = threading.Event()
+        future = self.pool.try_enqueue(_slow_call, 5, 1, event)
+        while self.pool.get_stats()["active"] != 1:
+            time.sleep(.01)
+        self.pool.try_enqueue(_slow_call, 0, 2)
+        self.assertEqual(self.pool.get_stats(),
+                         {"threads": 1, "active": 1, "queued": 1})
+
+        # The queue is full
+        start = time.time()
+        self.assertRaises(threadpool.queue.Full, self.pool.try_enqueue,
+                          _slow_call, 0, 3)
+        self.assertLess(time.time() - start, 1)
+
+        # Release the thread
+        event.set()
+        self.assertEqual(future.result(2), 1)
+        self.pool.join()
+        self.assertEqual(self.pool.get_stats()["queued"], 0)
+
 # ------------------------------------------------------------------------------
 
 